@@ -0,0 +1,60 @@
+"""Add per-week AI training aggregates
+
+Revision ID: 020_ai_week_aggregates
+Revises: 019_add_clerk_user_id
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+# revision identifiers
+revision = "020_ai_week_aggregates"
+down_revision = "019_add_clerk_user_id"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create ai_training_week_aggregates table."""
+    op.create_table(
+        "ai_training_week_aggregates",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("week_start", sa.Date(), nullable=False),
+        sa.Column("activity_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_distance_m", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("total_duration_s", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("long_run_max_m", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("active_days_mask", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("missing_hr_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("hr_sum", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("hr_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("pace_histogram", JSONB(), nullable=False, server_default=sa.text("'{}'::jsonb")),
+        sa.Column("activity_ids", JSONB(), nullable=False, server_default=sa.text("'[]'::jsonb")),
+        sa.Column("source_updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("source_activity_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "week_start", name="uq_ai_training_week_user_week"),
+    )
+    op.create_index(
+        "ix_ai_training_week_aggregates_user_id",
+        "ai_training_week_aggregates",
+        ["user_id"],
+    )
+    op.create_index(
+        "ix_ai_training_week_aggregates_week_start",
+        "ai_training_week_aggregates",
+        ["week_start"],
+    )
+
+
+def downgrade() -> None:
+    """Drop ai_training_week_aggregates table."""
+    op.drop_index("ix_ai_training_week_aggregates_week_start", "ai_training_week_aggregates")
+    op.drop_index("ix_ai_training_week_aggregates_user_id", "ai_training_week_aggregates")
+    op.drop_table("ai_training_week_aggregates")
@@ -0,0 +1,59 @@
+"""Add AI generation job queue
+
+Revision ID: 021_ai_generation_jobs
+Revises: 020_ai_week_aggregates
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+# revision identifiers
+revision = "021_ai_generation_jobs"
+down_revision = "020_ai_week_aggregates"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create ai_generation_jobs table."""
+    op.create_table(
+        "ai_generation_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("conversation_id", sa.Integer(), nullable=False),
+        sa.Column("mode", sa.String(20), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="queued"),
+        sa.Column("stage", sa.String(30), nullable=False, server_default="queued"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("request_message", sa.Text(), nullable=False),
+        sa.Column("request_context", JSONB(), nullable=True),
+        sa.Column("save_mode", sa.String(20), nullable=True),
+        sa.Column("scheduled_for", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("arq_job_id", sa.String(100), nullable=True),
+        sa.Column("result", JSONB(), nullable=True),
+        sa.Column("error_message", sa.Text(), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["conversation_id"], ["ai_conversations.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_ai_generation_jobs_user_id", "ai_generation_jobs", ["user_id"])
+    op.create_index("ix_ai_generation_jobs_conversation_id", "ai_generation_jobs", ["conversation_id"])
+    op.create_index(
+        "ix_ai_generation_jobs_status_scheduled",
+        "ai_generation_jobs",
+        ["status", "scheduled_for"],
+    )
+
+
+def downgrade() -> None:
+    """Drop ai_generation_jobs table."""
+    op.drop_index("ix_ai_generation_jobs_status_scheduled", "ai_generation_jobs")
+    op.drop_index("ix_ai_generation_jobs_conversation_id", "ai_generation_jobs")
+    op.drop_index("ix_ai_generation_jobs_user_id", "ai_generation_jobs")
+    op.drop_table("ai_generation_jobs")
@@ -0,0 +1,43 @@
+"""Add compression dictionaries for zstd-compressed FIT files
+
+Revision ID: 022_compression_dictionaries
+Revises: 021_ai_generation_jobs
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = "022_compression_dictionaries"
+down_revision = "021_ai_generation_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create compression_dictionaries table."""
+    op.create_table(
+        "compression_dictionaries",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("dict_id", sa.BigInteger(), nullable=False),
+        sa.Column("codec", sa.String(20), nullable=False, server_default="zstd"),
+        sa.Column("content", sa.LargeBinary(), nullable=False),
+        sa.Column("sample_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("is_active", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("note", sa.String(200), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_compression_dictionaries_dict_id", "compression_dictionaries", ["dict_id"], unique=True
+    )
+    op.create_index("ix_compression_dictionaries_is_active", "compression_dictionaries", ["is_active"])
+
+
+def downgrade() -> None:
+    """Drop compression_dictionaries table."""
+    op.drop_index("ix_compression_dictionaries_is_active", "compression_dictionaries")
+    op.drop_index("ix_compression_dictionaries_dict_id", "compression_dictionaries")
+    op.drop_table("compression_dictionaries")
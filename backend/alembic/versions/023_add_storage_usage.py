@@ -0,0 +1,42 @@
+"""Add per-user storage usage counters
+
+Revision ID: 023_storage_usage
+Revises: 022_compression_dictionaries
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = "023_storage_usage"
+down_revision = "022_compression_dictionaries"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create storage_usage table.
+
+    Counters start empty; the first reconciliation run fills them from the bucket.
+    """
+    op.create_table(
+        "storage_usage",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("object_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("stored_bytes", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("original_bytes", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("reconciled_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_storage_usage_user_id", "storage_usage", ["user_id"], unique=True)
+
+
+def downgrade() -> None:
+    """Drop storage_usage table."""
+    op.drop_index("ix_storage_usage_user_id", "storage_usage")
+    op.drop_table("storage_usage")
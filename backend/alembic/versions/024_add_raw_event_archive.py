@@ -0,0 +1,102 @@
+"""Add raw event archive columns (payload hash, compressed body, cold tier key)
+
+Revision ID: 024_raw_event_archive
+Revises: 023_storage_usage
+Create Date: 2026-10-18
+"""
+
+import gzip
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = "024_raw_event_archive"
+down_revision = "023_storage_usage"
+branch_labels = None
+depends_on = None
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def upgrade() -> None:
+    """Add archive columns to garmin_raw_events.
+
+    Existing rows keep their inline payload; the archive compaction job
+    moves them into the compressed body over time.
+    """
+    op.alter_column("garmin_raw_events", "payload", nullable=True)
+    op.add_column("garmin_raw_events", sa.Column("payload_hash", sa.String(64), nullable=True))
+    op.add_column(
+        "garmin_raw_events",
+        sa.Column("body", sa.LargeBinary(), nullable=True,
+                  comment="Compressed canonical JSON payload (zstd or gzip)"),
+    )
+    op.add_column(
+        "garmin_raw_events",
+        sa.Column("body_size", sa.Integer(), nullable=True,
+                  comment="Uncompressed canonical JSON size in bytes"),
+    )
+    op.add_column("garmin_raw_events", sa.Column("record_count", sa.Integer(), nullable=True))
+    op.add_column(
+        "garmin_raw_events",
+        sa.Column("r2_key", sa.String(500), nullable=True,
+                  comment="Cold-tier object holding the body once aged out of the database"),
+    )
+    op.create_index(
+        "ix_garmin_raw_events_dedup",
+        "garmin_raw_events",
+        ["user_id", "endpoint", "payload_hash"],
+    )
+
+
+def _decode_body(body: bytes) -> str:
+    """Compressed canonical JSON body back to JSON text."""
+    if body[:4] == ZSTD_MAGIC:
+        import zstandard
+
+        body = zstandard.ZstdDecompressor().decompress(body)
+    elif body[:2] == GZIP_MAGIC:
+        body = gzip.decompress(body)
+    return body.decode("utf-8")
+
+
+def downgrade() -> None:
+    """Restore inline payloads, then drop archive columns.
+
+    Compressed bodies are decoded back into ``payload``. Events whose body
+    only lives in R2 cannot be restored here, so the downgrade refuses to
+    run while any exist (nothing is deleted).
+    """
+    bind = op.get_bind()
+    cold = bind.execute(sa.text(
+        "SELECT count(*) FROM garmin_raw_events WHERE payload IS NULL AND body IS NULL"
+    )).scalar()
+    if cold:
+        raise RuntimeError(
+            f"{cold} raw events are only stored in R2 (r2_key); restore their payloads "
+            "before downgrading 024_raw_event_archive"
+        )
+
+    select_batch = sa.text(
+        "SELECT id, body FROM garmin_raw_events "
+        "WHERE payload IS NULL AND id > :after_id ORDER BY id LIMIT 500"
+    )
+    restore = sa.text("UPDATE garmin_raw_events SET payload = CAST(:payload AS JSONB) WHERE id = :id")
+    after_id = 0
+    while True:
+        rows = bind.execute(select_batch, {"after_id": after_id}).fetchall()
+        if not rows:
+            break
+        for row in rows:
+            bind.execute(restore, {"id": row.id, "payload": _decode_body(row.body)})
+        after_id = rows[-1].id
+
+    op.drop_index("ix_garmin_raw_events_dedup", "garmin_raw_events")
+    op.drop_column("garmin_raw_events", "r2_key")
+    op.drop_column("garmin_raw_events", "record_count")
+    op.drop_column("garmin_raw_events", "body_size")
+    op.drop_column("garmin_raw_events", "body")
+    op.drop_column("garmin_raw_events", "payload_hash")
+    op.alter_column("garmin_raw_events", "payload", nullable=False)
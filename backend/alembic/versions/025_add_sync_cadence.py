@@ -0,0 +1,35 @@
+"""Add adaptive sync cadence columns to garmin_sync_states
+
+Revision ID: 025_sync_cadence
+Revises: 024_raw_event_archive
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = "025_sync_cadence"
+down_revision = "024_raw_event_archive"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Track unchanged runs and the next due time per endpoint."""
+    op.add_column(
+        "garmin_sync_states",
+        sa.Column("unchanged_runs", sa.Integer(), nullable=False, server_default="0",
+                  comment="Consecutive successful syncs that stored no new payloads"),
+    )
+    op.add_column(
+        "garmin_sync_states",
+        sa.Column("next_sync_at", sa.DateTime(timezone=True), nullable=True,
+                  comment="Incremental syncs skip the endpoint until this time"),
+    )
+
+
+def downgrade() -> None:
+    """Remove adaptive sync cadence columns."""
+    op.drop_column("garmin_sync_states", "next_sync_at")
+    op.drop_column("garmin_sync_states", "unchanged_runs")
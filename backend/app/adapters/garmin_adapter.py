@@ -9,9 +9,10 @@ import hashlib
 import io
 import logging
 import os
+import threading
 import time
 import zipfile
-from datetime import date, datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Optional, Protocol
 
@@ -56,6 +57,56 @@ def _parse_pace_seconds(pace: str | None) -> int | None:
     return _parse_single_pace(cleaned)
 
 
+# Keys under which all-day event responses have been seen to hold the event list
+_EVENT_LIST_KEYS = ("events", "calendarEvents", "calendar_events", "items", "data", "calendarList")
+_EVENT_FIELDS = ("eventName", "name", "title", "eventTypeName", "eventTypeId", "eventTypeKey", "eventTypeDesc")
+
+
+def normalize_day_events(raw: Any, event_date: date) -> list[dict[str, Any]]:
+    """Extract the event list from one day's all-day events response.
+
+    The response shape varies (a list, a dict holding the list under one of
+    several keys, possibly nested, or a single event dict). Each returned
+    event gets ``event_date`` set to the requested day.
+
+    Args:
+        raw: ``get_all_day_events`` response.
+        event_date: Day the response is for.
+
+    Returns:
+        Event dictionaries (empty if none were found).
+    """
+    events: list[Any] = []
+    if isinstance(raw, list):
+        events = raw
+    elif isinstance(raw, dict) and raw:
+        for key in _EVENT_LIST_KEYS:
+            value = raw.get(key)
+            if isinstance(value, list):
+                events = value
+                break
+            if isinstance(value, dict):
+                nested = next(
+                    (value[k] for k in ("events", "items") if isinstance(value.get(k), list)), None
+                )
+                if nested is not None:
+                    events = nested
+                    break
+        else:
+            if any(field in raw for field in _EVENT_FIELDS):
+                events = [raw]
+            else:
+                # Unknown shape: fall back to the first non-empty list
+                events = next((v for v in raw.values() if isinstance(v, list) and v), [])
+                logger.debug(f"Unrecognized all-day events response keys: {list(raw.keys())}")
+
+    return [
+        {**event, "event_date": event_date.isoformat()}
+        for event in events
+        if isinstance(event, dict)
+    ]
+
+
 class GarminAdapterError(Exception):
     """Base exception for Garmin adapter errors."""
 
@@ -118,6 +169,8 @@ class GarminConnectAdapter:
         self._client: Optional[Garmin] = None
         self._session_data: Optional[dict[str, Any]] = None
         self._metrics = get_metrics_backend()
+        # Serializes token refreshes and session snapshots (pooled adapters are shared)
+        self._lock = threading.Lock()
 
     @property
     def is_authenticated(self) -> bool:
@@ -242,9 +295,65 @@ class GarminConnectAdapter:
             return None
         # garminconnect 0.2.x uses garth library
         # dumps() returns base64 encoded string, wrap in dict for JSONB
-        garth_str = self._client.garth.dumps()
+        with self._lock:
+            garth_str = self._client.garth.dumps()
         return {"garth_session": garth_str} if garth_str else None
 
+    def clone(self) -> "GarminConnectAdapter":
+        """Independent adapter on the same tokens, with its own HTTP session.
+
+        Used to make calls in parallel without sharing this adapter's client
+        between threads.
+
+        Returns:
+            A new authenticated adapter.
+
+        Raises:
+            GarminAuthError: If this adapter has no session to copy.
+        """
+        session_data = self.get_session_data()
+        if not session_data:
+            raise GarminAuthError("Not authenticated. Call login() first.")
+        adapter = GarminConnectAdapter()
+        adapter.restore_session(session_data)
+        return adapter
+
+    def token_expires_at(self) -> Optional[float]:
+        """Expiry (epoch seconds) of the current OAuth2 access token, if known."""
+        if self._client is None:
+            return None
+        oauth2_token = getattr(self._client.garth, "oauth2_token", None)
+        return getattr(oauth2_token, "expires_at", None)
+
+    def refresh_tokens(self) -> bool:
+        """Exchange the OAuth1 token for a fresh OAuth2 access token.
+
+        Returns:
+            True if refreshed.
+
+        Raises:
+            GarminAuthError: If the OAuth1 token is no longer accepted.
+        """
+        self._ensure_authenticated()
+        start_time = time.perf_counter()
+        status_code = 500
+        try:
+            with self._lock:
+                # Refresh a copy and swap it in, so calls already running on the
+                # current client keep using a consistent token
+                client = Garmin()
+                client.garth.loads(self._client.garth.dumps())
+                client.garth.refresh_oauth2()
+                self._client = client
+            status_code = 200
+            return True
+        except Exception as e:
+            status_code = 401
+            logger.warning(f"Garmin token refresh failed: {e}")
+            raise GarminAuthError(f"Token refresh failed: {e}") from e
+        finally:
+            self._observe_api_call("refresh_tokens", status_code, start_time)
+
     def get_activities(
         self,
         start_date: date,
@@ -1290,27 +1399,10 @@ class GarminConnectAdapter:
             date_str = target_date.isoformat()  # YYYY-MM-DD format
             data = self._client.get_all_day_events(date_str)
             status_code = 200
-            
-            # Log raw response for debugging - use INFO level so we can see it
-            if data:
-                # Use DEBUG level for data details to avoid logging sensitive information
-                logger.debug(f"get_all_day_events for {date_str} returned: type={type(data)}")
-                if isinstance(data, dict):
-                    logger.debug(f"Dict keys: {list(data.keys())}")
-                    logger.debug(f"Dict has {len(data)} keys")
-                elif isinstance(data, list):
-                    logger.debug(f"List with {len(data)} items")
-                    if data and isinstance(data[0], dict):
-                        logger.debug(f"First item keys: {list(data[0].keys())}")
-                # Summary only at INFO level (no sensitive data)
-                logger.info(f"get_all_day_events for {date_str}: fetched {len(data) if isinstance(data, (list, dict)) else 0} items")
-
             return data or {}
         except Exception as e:
             status_code = 500
-            logger.error(f"Failed to get all-day events for {target_date}: {e}")
-            import traceback
-            logger.debug(traceback.format_exc())
+            logger.warning(f"Failed to get all-day events for {target_date}: {e}")
             raise GarminAPIError(f"Failed to get all-day events: {e}") from e
         finally:
             self._observe_api_call("get_all_day_events", status_code, start_time)
@@ -1320,15 +1412,16 @@ class GarminConnectAdapter:
     ) -> list[dict[str, Any]]:
         """Get all-day events from Garmin Connect for a date range.
 
-        Iterates through dates and collects events. Note: This may make
-        multiple API calls (one per day).
+        Makes one API call per day, sequentially; days that fail are
+        skipped. ``app.services.garmin_events`` fetches ranges in parallel
+        with a per-day cache.
 
         Args:
             start_date: Start date (inclusive).
             end_date: End date (inclusive).
 
         Returns:
-            List of event dictionaries with date information.
+            List of event dictionaries with ``event_date`` set.
 
         Raises:
             GarminAPIError: If API call fails.
@@ -1337,93 +1430,18 @@ class GarminConnectAdapter:
         start_time = time.perf_counter()
         status_code = 500
         events: list[dict[str, Any]] = []
-        
+
         try:
             current_date = start_date
-            from datetime import timedelta
-            
             while current_date <= end_date:
                 try:
-                    date_events = self.get_all_day_events(current_date)
-                    # Add date info to each event for reference
-                    if date_events:
-                        # Log structure for debugging
-                        logger.info(f"Processing events for {current_date}: type={type(date_events)}")
-                        
-                        event_list: list[dict[str, Any]] = []
-                        
-                        # Handle different response structures
-                        if isinstance(date_events, dict):
-                            # Try multiple possible keys for events
-                            for key in ["events", "calendarEvents", "calendar_events", "items", "data", "calendarList"]:
-                                if key in date_events:
-                                    value = date_events[key]
-                                    if isinstance(value, list):
-                                        event_list.extend(value)
-                                        logger.debug(f"Found {len(value)} events in key '{key}'")
-                                        break
-                                    elif isinstance(value, dict):
-                                        # Nested dict might contain events
-                                        for nested_key in ["events", "items"]:
-                                            if nested_key in value and isinstance(value[nested_key], list):
-                                                event_list.extend(value[nested_key])
-                                                logger.debug(f"Found {len(value[nested_key])} events in nested key '{key}.{nested_key}'")
-                                                break
-                            
-                            # If no list found in common keys, check if dict itself is event data
-                            if not event_list:
-                                # Check if this dict looks like a single event (has common event fields)
-                                event_fields = ["eventName", "name", "title", "eventTypeName", "eventTypeId", "eventTypeKey", "eventTypeDesc"]
-                                if any(key in date_events for key in event_fields):
-                                    event_list = [date_events]
-                                    logger.debug(f"Treating dict as single event with keys: {list(date_events.keys())}")
-                                else:
-                                    # Log all keys to help debug - use INFO so we can see it
-                                    logger.info(f"Dict doesn't look like an event. All keys: {list(date_events.keys())}")
-                                    # Try to extract any nested structures
-                                    for k, v in date_events.items():
-                                        if isinstance(v, (list, dict)):
-                                            logger.info(f"  Key '{k}': type={type(v)}, length={len(v) if isinstance(v, (list, dict)) else 'N/A'}")
-                                            if isinstance(v, list) and v:
-                                                logger.info(f"    First item type: {type(v[0])}, keys: {list(v[0].keys()) if isinstance(v[0], dict) else 'N/A'}")
-                                            elif isinstance(v, dict):
-                                                logger.info(f"    Nested dict keys: {list(v.keys())}")
-                                    # As last resort, if we see any list-like structure, try to use it
-                                    for k, v in date_events.items():
-                                        if isinstance(v, list) and len(v) > 0:
-                                            logger.info(f"Found list in key '{k}' with {len(v)} items, trying to use it")
-                                            event_list.extend(v)
-                                            break
-                        elif isinstance(date_events, list):
-                            event_list = date_events
-                            logger.info(f"Response is directly a list with {len(date_events)} items")
-                        
-                        # Add date to each event and append to results
-                        for event in event_list:
-                            if isinstance(event, dict):
-                                event["event_date"] = current_date.isoformat()
-                                events.append(event)
-                                
-                                # Log event details for debugging - use INFO so we can see it
-                                event_name = event.get("eventName") or event.get("name") or event.get("title") or "Unknown"
-                                event_keys = list(event.keys())
-                                logger.info(f"Added event: '{event_name}' on {current_date}, keys: {event_keys}")
-                            else:
-                                logger.warning(f"Skipping non-dict event item: type={type(event)}, value={str(event)[:100]}")
-                        
-                        if event_list:
-                            logger.info(f"Found {len(event_list)} events for {current_date}, total so far: {len(events)}")
-                        else:
-                            logger.info(f"No events extracted for {current_date} (raw response was not empty but parsing found no events)")
-                            
-                except Exception as e:
-                    logger.warning(f"Failed to get events for {current_date}: {e}")
-                    import traceback
-                    logger.debug(traceback.format_exc())
-                    # Continue with next date even if one fails
-                
+                    events.extend(
+                        normalize_day_events(self.get_all_day_events(current_date), current_date)
+                    )
+                except GarminAPIError:
+                    pass  # Logged by get_all_day_events; continue with next date
                 current_date += timedelta(days=1)
-            
+
             status_code = 200
             return events
         except Exception as e:
@@ -0,0 +1,235 @@
+"""Per-user pool of authenticated Garmin adapters.
+
+Every sync and Garmin-facing endpoint used to build a new
+``GarminConnectAdapter`` and restore it from ``GarminSession.session_data``,
+so each interaction started with a cold HTTP session and, once the OAuth2
+access token had expired, a token exchange before the first call.
+
+The pool keeps one restored adapter per user (LRU, at most
+GARMIN_POOL_MAX_ENTRIES, dropped after GARMIN_POOL_IDLE_SECONDS unused):
+
+- ``acquire`` returns the warm adapter while the stored session data is the
+  one it was restored from; data written by another process (reconnect,
+  refresh elsewhere) restores a new adapter.
+- A background task refreshes access tokens that expire within
+  GARMIN_POOL_REFRESH_MARGIN_SECONDS and writes session data that changed
+  in memory (refreshes here or inside garth) back to ``garmin_sessions``
+  once.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.adapters.garmin_adapter import GarminAdapterError, GarminConnectAdapter
+from app.core.config import get_settings
+from app.core.database import async_session_maker
+from app.models.garmin import GarminSession
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass
+class _PoolEntry:
+    """A restored adapter and the session data it was restored from."""
+
+    adapter: GarminConnectAdapter
+    session_data: dict[str, Any]
+    last_used: float
+
+
+class GarminAdapterPool:
+    """LRU pool of restored Garmin adapters keyed by user id."""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        idle_seconds: Optional[float] = None,
+        refresh_margin_seconds: Optional[float] = None,
+        session_factory: async_sessionmaker[AsyncSession] = async_session_maker,
+        background_refresh: bool = True,
+    ) -> None:
+        """Initialize the pool.
+
+        Args:
+            max_entries: Least recently used adapters are dropped above this.
+            idle_seconds: Adapters unused for this long are dropped.
+            refresh_margin_seconds: Refresh tokens expiring within this window.
+            session_factory: Sessions used to write refreshed session data back.
+            background_refresh: False disables the refresh task (tests, scripts).
+        """
+        self.max_entries = max_entries or settings.garmin_pool_max_entries
+        self.idle_seconds = idle_seconds or settings.garmin_pool_idle_seconds
+        self.refresh_margin_seconds = (
+            settings.garmin_pool_refresh_margin_seconds
+            if refresh_margin_seconds is None
+            else refresh_margin_seconds
+        )
+        self.session_factory = session_factory
+        self._background_refresh = background_refresh
+        self._entries: OrderedDict[int, _PoolEntry] = OrderedDict()
+        self._refresher: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def acquire(
+        self, user_id: int, session_data: dict[str, Any] | str
+    ) -> GarminConnectAdapter:
+        """Authenticated adapter for a user's stored session.
+
+        Args:
+            user_id: Owner of the session.
+            session_data: ``GarminSession.session_data`` as currently stored.
+
+        Returns:
+            The pooled adapter, restored first if needed.
+
+        Raises:
+            GarminAuthError: If the session data cannot be restored.
+        """
+        self._ensure_refresher()
+        now = time.monotonic()
+        entry = self._entries.get(user_id)
+        if (
+            entry is not None
+            and entry.session_data == session_data
+            and now - entry.last_used < self.idle_seconds
+        ):
+            entry.last_used = now
+            self._entries.move_to_end(user_id)
+            return entry.adapter
+
+        adapter = GarminConnectAdapter()
+        adapter.restore_session(session_data)
+        self._entries[user_id] = _PoolEntry(adapter, session_data, now)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return adapter
+
+    def discard(self, user_id: int) -> None:
+        """Drop a user's adapter (disconnect, rejected session)."""
+        self._entries.pop(user_id, None)
+
+    # ---------------------------------------------------------------------
+    # Refresh and write-back
+    # ---------------------------------------------------------------------
+
+    async def refresh(self) -> dict[str, int]:
+        """Refresh expiring tokens and write changed session data back.
+
+        Returns:
+            Counts of refreshed, persisted and dropped adapters.
+        """
+        stats = {"refreshed": 0, "persisted": 0, "dropped": 0}
+        now = time.monotonic()
+        loop = asyncio.get_running_loop()
+
+        for user_id, entry in list(self._entries.items()):
+            if now - entry.last_used >= self.idle_seconds:
+                self.discard(user_id)
+                stats["dropped"] += 1
+                continue
+
+            expires_at = entry.adapter.token_expires_at()
+            if (
+                expires_at is not None
+                and expires_at - time.time() < self.refresh_margin_seconds
+            ):
+                try:
+                    await loop.run_in_executor(None, entry.adapter.refresh_tokens)
+                    stats["refreshed"] += 1
+                except GarminAdapterError:
+                    # The next request restores from the stored data and surfaces the error
+                    self.discard(user_id)
+                    stats["dropped"] += 1
+                    continue
+
+            if await self._write_back(user_id, entry):
+                stats["persisted"] += 1
+
+        return stats
+
+    async def _write_back(self, user_id: int, entry: _PoolEntry) -> bool:
+        """Store the adapter's session data if it changed since it was restored."""
+        session_data = entry.adapter.get_session_data()
+        if not session_data or session_data == entry.session_data:
+            return False
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(GarminSession)
+                .where(
+                    GarminSession.user_id == user_id,
+                    GarminSession.session_data == entry.session_data,
+                )
+                .values(session_data=session_data)
+            )
+            await db.commit()
+        if result.rowcount:
+            entry.session_data = session_data
+            return True
+        # The stored session changed meanwhile (reconnect): it wins
+        self.discard(user_id)
+        return False
+
+    def _ensure_refresher(self) -> None:
+        if not self._background_refresh:
+            return
+        if self._refresher is not None and not self._refresher.done():
+            return
+        self._refresher = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    async def _refresh_loop(self) -> None:
+        while self._entries:
+            await asyncio.sleep(settings.garmin_pool_refresh_interval_seconds)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Garmin adapter pool refresh failed")
+
+    async def close(self) -> None:
+        """Stop the refresh task and write pending session data back."""
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+        for user_id, entry in list(self._entries.items()):
+            try:
+                await self._write_back(user_id, entry)
+            except Exception as e:
+                logger.warning(
+                    f"Failed to store Garmin session for user {user_id}: {e}"
+                )
+        self._entries.clear()
+
+
+_pool: Optional[GarminAdapterPool] = None
+
+
+def get_garmin_pool() -> GarminAdapterPool:
+    """Get singleton Garmin adapter pool."""
+    global _pool
+    if _pool is None:
+        _pool = GarminAdapterPool()
+    return _pool
+
+
+async def close_garmin_pool() -> None:
+    """Close the singleton pool, writing refreshed sessions back (shutdown)."""
+    global _pool
+    if _pool is not None:
+        try:
+            await _pool.close()
+        finally:
+            _pool = None
@@ -1,13 +1,16 @@
 """Activity endpoints."""
 
+import asyncio
 import math
 import os
+import tempfile
+import zipfile
 from datetime import datetime, timedelta, time
 from typing import Annotated
 from zoneinfo import ZoneInfo
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy import func, select, Integer
 from sqlalchemy.sql.functions import coalesce
@@ -21,6 +24,13 @@ from app.models.activity import Activity, ActivityMetric, ActivitySample, Activi
 from app.models.garmin import GarminRawFile
 from app.models.gear import ActivityGear, Gear
 from app.models.user import User
+from app.services.fit_archive import (
+    count_fit_members,
+    list_export_sources,
+    run_fit_archive_import,
+    stream_fit_archive,
+)
+from app.services.fit_blob_store import get_fit_blob_store
 
 router = APIRouter()
 
@@ -716,7 +726,7 @@ async def download_fit_file(
     activity_id: int,
     current_user: Annotated[User, Depends(get_current_user)],
     db: AsyncSession = Depends(get_db),
-) -> FileResponse:
+) -> StreamingResponse:
     """Download original FIT file for activity.
 
     Args:
@@ -742,54 +752,125 @@ async def download_fit_file(
             detail="Activity not found",
         )
 
-    # Get FIT file path - try GarminRawFile first, then fallback to Activity.fit_file_path
-    fit_result = await db.execute(
-        select(GarminRawFile).where(GarminRawFile.activity_id == activity_id)
-    )
-    fit_file = fit_result.scalar_one_or_none()
-
-    # Determine file path with fallback
-    file_path = None
-    if fit_file and fit_file.file_path:
-        file_path = fit_file.file_path
-    elif activity.fit_file_path:
-        # Fallback to Activity.fit_file_path if GarminRawFile record is missing
-        file_path = activity.fit_file_path
-
-    if not file_path:
+    # Local disk / cache first, then R2 and DB blobs (read-through cached), streamed
+    fit_stream = await get_fit_blob_store().stream(db, activity)
+    if fit_stream is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="FIT file not found for this activity",
         )
 
-    # Validate file path exists before serving
-    if not os.path.isfile(file_path):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="FIT file path is invalid or file has been deleted",
-        )
+    filename = f"activity_{activity.garmin_id}.fit"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if fit_stream.size is not None:
+        headers["Content-Length"] = str(fit_stream.size)
+    return StreamingResponse(
+        fit_stream.chunks,
+        media_type="application/octet-stream",
+        headers=headers,
+    )
 
-    # Path traversal protection: ensure file is within allowed storage directory
-    # This prevents serving arbitrary files if DB is compromised
-    settings = get_settings()
-    allowed_root = os.path.realpath(settings.fit_storage_path_absolute)
-    file_real_path = os.path.realpath(file_path)
-
-    if not file_real_path.startswith(allowed_root + os.sep):
-        # Log this as a security warning - possible DB tampering
-        import logging
-        logging.getLogger(__name__).warning(
-            f"Path traversal blocked: {file_path} not in {allowed_root}"
-        )
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="FIT file not found",  # Intentionally vague for security
-        )
 
-    return FileResponse(
-        path=file_real_path,
-        filename=f"activity_{activity.garmin_id}.fit",
-        media_type="application/octet-stream",
+# -------------------------------------------------------------------------
+# Bulk FIT Archive (export / import)
+# -------------------------------------------------------------------------
+
+
+class FitArchiveImportResponse(BaseModel):
+    """Accepted FIT archive import."""
+
+    files: int
+    message: str
+
+
+@router.get("/fit-archive/export")
+async def export_fit_archive(
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    """Download all of the user's FIT files as a ZIP archive.
+
+    The archive is assembled on the fly from local disk, DB blobs or R2 and
+    streamed without being buffered. A manifest.json entry lists exported
+    and missing activities.
+
+    Args:
+        current_user: Authenticated user.
+        db: Database session.
+
+    Returns:
+        Streaming ZIP download.
+    """
+    sources = await list_export_sources(db, current_user.id)
+    filename = f"fit_archive_{datetime.now():%Y%m%d}.zip"
+    return StreamingResponse(
+        stream_fit_archive(current_user.id, sources),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post(
+    "/fit-archive/import",
+    response_model=FitArchiveImportResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def import_fit_archive_upload(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> FitArchiveImportResponse:
+    """Import FIT files from a ZIP archive sent as the raw request body.
+
+    The body is spooled to a temporary file, then every .fit/.fit.gz entry is
+    parsed in the background with bounded concurrency. Files already present
+    (same SHA-256) are skipped.
+
+    Args:
+        request: Request whose body is the ZIP (Content-Type: application/zip).
+        background_tasks: FastAPI background tasks.
+        current_user: Authenticated user.
+
+    Returns:
+        Number of FIT entries accepted for import.
+    """
+    settings = get_settings()
+    max_bytes = settings.fit_archive_max_import_bytes
+    tmp = tempfile.NamedTemporaryFile(prefix="fit-archive-", suffix=".zip", delete=False)
+    try:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Archive exceeds {max_bytes} bytes",
+                )
+            await asyncio.to_thread(tmp.write, chunk)
+        tmp.close()
+
+        try:
+            files = await asyncio.to_thread(count_fit_members, tmp.name)
+        except zipfile.BadZipFile:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Request body is not a valid ZIP archive",
+            )
+        if files == 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Archive contains no FIT files",
+            )
+    except BaseException:
+        tmp.close()
+        os.unlink(tmp.name)
+        raise
+
+    # The background task owns the temp file from here on
+    background_tasks.add_task(run_fit_archive_import, current_user.id, tmp.name)
+    return FitArchiveImportResponse(
+        files=files,
+        message="Import started in background. New activities appear as they are parsed.",
     )
 
 
@@ -1426,18 +1507,16 @@ async def reparse_fit_file(
             detail="Activity not found",
         )
 
-    # Get FIT file path
-    if not activity.fit_file_path or not os.path.isfile(activity.fit_file_path):
+    # Get FIT file from whichever storage tier has it
+    fit_data = await get_fit_blob_store().get(db, activity)
+    if fit_data is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="FIT file not found for this activity",
         )
 
-    # Read and parse FIT file
+    # Parse FIT file
     try:
-        with open(activity.fit_file_path, "rb") as f:
-            fit_data = f.read()
-
         adapter = GarminConnectAdapter()  # Credentials not needed for parsing
         parsed_data = adapter.parse_fit_file(fit_data)
 
@@ -6,7 +6,7 @@ import time
 from datetime import date, datetime, timedelta, timezone
 from typing import Annotated, Any, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -19,14 +19,34 @@ from app.core.ai_constants import (
 )
 from app.core.config import get_settings
 from app.core.database import get_db
-from app.models.ai import AIConversation, AIImport, AIMessage
+from app.core.queue import get_arq_pool, has_live_worker
+from app.models.ai import (
+    AIConversation,
+    AIGenerationJob,
+    AIGenerationStatus,
+    AIImport,
+    AIMessage,
+)
 from app.models.user import User
 from app.observability import get_metrics_backend
+from app.services.ai_generation import (
+    enqueue_generation_job,
+    next_offpeak_run,
+    run_generation_job,
+)
+from app.services.ai_prompt import AssembledPrompt, assemble_prompt, get_gemini_model
+from app.services.ai_snapshot import SNAPSHOT_WEEKS, ensure_ai_training_snapshot
 
 router = APIRouter()
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# System prompts for structured (JSON) generation modes
+STRUCTURED_MODE_PROMPTS = {
+    "plan": RUNNING_COACH_PLAN_PROMPT,
+    "workout": RUNNING_COACH_WORKOUT_PROMPT,
+}
+
 
 # -------------------------------------------------------------------------
 # Request/Response Models
@@ -110,6 +130,47 @@ class ChatResponse(BaseModel):
     workout: dict[str, Any] | None = None
 
 
+class GenerationJobCreate(BaseModel):
+    """Request to queue a plan/workout generation on the AI worker."""
+
+    message: str = Field(min_length=1, max_length=5000, description="User message to AI coach")
+    mode: Literal["plan", "workout"]
+    context: dict[str, Any] | None = None
+    save_mode: Literal["draft", "approved", "active"] | None = None
+    conversation_id: int | None = None  # Continue an existing conversation
+    off_peak: bool = False  # Defer to the nightly batch window
+
+
+class GenerationJobResponse(BaseModel):
+    """Generation job status for polling."""
+
+    job_id: int
+    conversation_id: int
+    mode: str
+    status: str
+    stage: str
+    scheduled_for: datetime | None = None
+    started_at: datetime | None = None
+    completed_at: datetime | None = None
+    error: str | None = None
+    result: ChatResponse | None = None
+
+    @classmethod
+    def from_job(cls, job: AIGenerationJob) -> "GenerationJobResponse":
+        return cls(
+            job_id=job.id,
+            conversation_id=job.conversation_id,
+            mode=job.mode,
+            status=job.status,
+            stage=job.stage,
+            scheduled_for=job.scheduled_for,
+            started_at=job.started_at,
+            completed_at=job.completed_at,
+            error=job.error_message,
+            result=ChatResponse.model_validate(job.result) if job.result else None,
+        )
+
+
 # -------------------------------------------------------------------------
 # Import/Export Models
 # -------------------------------------------------------------------------
@@ -426,35 +487,14 @@ async def chat(
         )
 
     # Get AI response first (before saving user message to avoid duplication in history)
-    plan_id = None
-    import_id = None
-    plan_status = None
-    missing_fields = None
-    workout_id = None
-    workout_data = None
-
     try:
-        if request.mode == "plan":
-            ai_response = await _get_ai_plan_response(
-                conversation=conversation,
-                user_message=request.message,
-                context=request.context,
-                db=db,
-            )
-        elif request.mode == "workout":
-            ai_response = await _get_ai_workout_response(
-                conversation=conversation,
-                user_message=request.message,
-                context=request.context,
-                db=db,
-            )
-        else:
-            ai_response = await _get_ai_response(
-                conversation=conversation,
-                user_message=request.message,
-                context=request.context,
-                db=db,
-            )
+        ai_response = await _get_mode_response(
+            mode=request.mode,
+            conversation=conversation,
+            user_message=request.message,
+            context=request.context,
+            db=db,
+        )
     except HTTPException:
         raise
     except Exception:
@@ -464,137 +504,19 @@ async def chat(
             detail="AI service is temporarily unavailable. Please try again.",
         )
 
-    assistant_content = ai_response["content"]
-
-    if request.mode == "plan":
-        payload = ai_response.get("payload") or {}
-        response_status = payload.get("status")
-        assistant_content = payload.get("assistant_message") or "플랜 생성을 계속 진행합니다."
-
-        # Validate response status
-        if not response_status:
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail="AI plan response missing 'status' field",
-            )
-
-        if response_status not in ("plan", "need_info"):
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail=f"AI plan response has invalid status: '{response_status}'. Expected 'plan' or 'need_info'.",
-            )
-
-        if response_status == "plan":
-            plan_data = payload.get("plan")
-            if not isinstance(plan_data, dict):
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail="AI plan response status='plan' but 'plan' field is missing or invalid",
-                )
-            plan_data["source"] = "ai"
-            # Validate AI-generated plan JSON against schema
-            try:
-                from pydantic import ValidationError as PydanticValidationError
-                plan_request = PlanImportRequest.model_validate(plan_data)
-            except PydanticValidationError as e:
-                logger.warning(f"AI generated invalid plan JSON: {e}")
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail=f"AI generated plan with invalid format: {e.error_count()} validation errors. Please try again.",
-                )
-            import_result = await import_plan(plan_request, current_user, db)
-            plan_id = import_result.plan_id
-            import_id = import_result.import_id
-            plan_status = "draft"
-
-            save_mode = request.save_mode or "draft"
-            if save_mode in ("approved", "active"):
-                from app.api.v1.endpoints.plans import approve_plan, activate_plan
-
-                await approve_plan(plan_id, current_user, db)
-                plan_status = "approved"
-                if save_mode == "active":
-                    await activate_plan(plan_id, current_user, db)
-                    plan_status = "active"
-
-        elif response_status == "need_info":
-            # Validate need_info response has required fields
-            missing_fields = payload.get("missing_fields") or []
-            questions = payload.get("questions") or []
-
-            if not missing_fields and not questions:
-                logger.warning("AI plan response status='need_info' but no missing_fields or questions provided")
-                # Allow empty lists but log warning
-
-    elif request.mode == "workout":
-        payload = ai_response.get("payload") or {}
-        response_status = payload.get("status")
-        assistant_content = payload.get("assistant_message") or "워크아웃 생성을 계속 진행합니다."
-
-        # Validate response status
-        if not response_status:
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail="AI workout response missing 'status' field",
-            )
-
-        if response_status not in ("workout", "need_info"):
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail=f"AI workout response has invalid status: '{response_status}'. Expected 'workout' or 'need_info'.",
-            )
-
-        if response_status == "workout":
-            workout_payload = payload.get("workout")
-            if not isinstance(workout_payload, dict):
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail="AI workout response status='workout' but 'workout' field is missing or invalid",
-                )
-            # Return workout data for frontend to save
-            workout_data = workout_payload
-
-        elif response_status == "need_info":
-            missing_fields = payload.get("missing_fields") or []
-            questions = payload.get("questions") or []
-
-            if not missing_fields and not questions:
-                logger.warning("AI workout response status='need_info' but no missing_fields or questions provided")
-
-    # Save user message (after AI response to avoid duplication)
-    user_message = AIMessage(
-        conversation_id=conversation_id,
-        role="user",
-        content=request.message,
+    outcome = await _apply_ai_response(
+        mode=request.mode,
+        ai_response=ai_response,
+        save_mode=request.save_mode,
+        current_user=current_user,
+        db=db,
     )
-    db.add(user_message)
 
-    # Save AI response
-    assistant_message = AIMessage(
-        conversation_id=conversation_id,
-        role="assistant",
-        content=assistant_content,
-        token_count=ai_response.get("tokens"),
-    )
-    db.add(assistant_message)
-
-    # Update conversation timestamp
-    conversation.updated_at = datetime.now(timezone.utc)
-    await db.commit()
-
-    await db.refresh(user_message)
-    await db.refresh(assistant_message)
-
-    return ChatResponse(
-        conversation_id=conversation_id,
-        message=MessageResponse.model_validate(user_message),
-        reply=MessageResponse.model_validate(assistant_message),
-        plan_id=plan_id,
-        import_id=import_id,
-        plan_status=plan_status,
-        missing_fields=missing_fields,
-        workout_id=workout_id,
-        workout=workout_data,
+    return await _save_chat_turn(
+        conversation=conversation,
+        user_content=request.message,
+        outcome=outcome,
+        db=db,
     )
 
 
@@ -619,54 +541,26 @@ async def quick_chat(
     Returns:
         User message and AI reply with new conversation ID.
     """
-    # Create new conversation
-    # DB schema uses context_type and context_data instead of language/model
-    # Use Unicode-safe truncation to avoid cutting multi-byte characters
-    title = _truncate_unicode_safe(request.message, 50)
-    context_type = "plan_generation" if request.mode == "plan" else ("workout_generation" if request.mode == "workout" else "chat")
-    conversation = AIConversation(
-        user_id=current_user.id,
-        title=title,
-        context_type=context_type,
-        context_data={
-            "language": settings.ai_default_language,
-            "model": settings.google_ai_model if settings.ai_provider == "google" else settings.openai_model,
-            "mode": request.mode,
-        },
-    )
+    conversation = _new_conversation(current_user, request.message, request.mode)
     db.add(conversation)
     await db.flush()  # Need conversation.id for messages
 
     # Get AI response first (before saving user message to avoid duplication in history)
-    plan_id = None
-    import_id = None
-    plan_status = None
-    missing_fields = None
-    workout_id = None
-    workout_data = None
-
     try:
-        if request.mode == "plan":
-            ai_response = await _get_ai_plan_response(
-                conversation=conversation,
-                user_message=request.message,
-                context=request.context,
-                db=db,
-            )
-        elif request.mode == "workout":
-            ai_response = await _get_ai_workout_response(
-                conversation=conversation,
-                user_message=request.message,
-                context=request.context,
-                db=db,
-            )
-        else:
-            ai_response = await _get_ai_response(
-                conversation=conversation,
-                user_message=request.message,
-                context=request.context,
-                db=db,
-            )
+        ai_response = await _get_mode_response(
+            mode=request.mode,
+            conversation=conversation,
+            user_message=request.message,
+            context=request.context,
+            db=db,
+        )
+        outcome = await _apply_ai_response(
+            mode=request.mode,
+            ai_response=ai_response,
+            save_mode=request.save_mode,
+            current_user=current_user,
+            db=db,
+        )
     except HTTPException:
         await db.rollback()
         raise
@@ -678,144 +572,124 @@ async def quick_chat(
             detail="AI service is temporarily unavailable. Please try again.",
         )
 
-    assistant_content = ai_response["content"]
+    return await _save_chat_turn(
+        conversation=conversation,
+        user_content=request.message,
+        outcome=outcome,
+        db=db,
+    )
 
-    if request.mode == "plan":
-        payload = ai_response.get("payload") or {}
-        response_status = payload.get("status")
-        assistant_content = payload.get("assistant_message") or "플랜 생성을 계속 진행합니다."
 
-        # Validate response status
-        if not response_status:
-            await db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail="AI plan response missing 'status' field",
-            )
-
-        if response_status not in ("plan", "need_info"):
-            await db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail=f"AI plan response has invalid status: '{response_status}'. Expected 'plan' or 'need_info'.",
-            )
+# -------------------------------------------------------------------------
+# Generation Job Endpoints (plan/workout generation on the AI worker)
+# -------------------------------------------------------------------------
 
-        if response_status == "plan":
-            plan_data = payload.get("plan")
-            if not isinstance(plan_data, dict):
-                await db.rollback()
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail="AI plan response missing plan data",
-                )
-            plan_data["source"] = "ai"
-            # Validate AI-generated plan JSON against schema
-            try:
-                from pydantic import ValidationError as PydanticValidationError
-                plan_request = PlanImportRequest.model_validate(plan_data)
-            except PydanticValidationError as e:
-                await db.rollback()
-                logger.warning(f"AI generated invalid plan JSON: {e}")
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail=f"AI generated plan with invalid format: {e.error_count()} validation errors. Please try again.",
-                )
-            import_result = await import_plan(plan_request, current_user, db)
-            plan_id = import_result.plan_id
-            import_id = import_result.import_id
-            plan_status = "draft"
 
-            save_mode = request.save_mode or "draft"
-            if save_mode in ("approved", "active"):
-                from app.api.v1.endpoints.plans import approve_plan, activate_plan
+@router.post(
+    "/jobs",
+    response_model=GenerationJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_generation_job(
+    request: GenerationJobCreate,
+    current_user: Annotated[User, Depends(get_current_user)],
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+) -> GenerationJobResponse:
+    """Queue a plan/workout generation for the AI worker.
 
-                await approve_plan(plan_id, current_user, db)
-                plan_status = "approved"
-                if save_mode == "active":
-                    await activate_plan(plan_id, current_user, db)
-                    plan_status = "active"
-        elif response_status == "need_info":
-            # Validate need_info response has required fields
-            missing_fields = payload.get("missing_fields") or []
-            questions = payload.get("questions") or []
+    The LLM call and plan import run on the ARQ worker; poll
+    ``GET /ai/jobs/{job_id}`` for progress and the final chat response.
+    Without a live worker (Redis down, local dev) the job runs in this
+    process after the response is sent, and off-peak scheduling is ignored.
 
-            if not missing_fields and not questions:
-                logger.warning("AI plan response status='need_info' but no missing_fields or questions provided")
-                # Allow empty lists but log warning
-
-    elif request.mode == "workout":
-        payload = ai_response.get("payload") or {}
-        response_status = payload.get("status")
-        assistant_content = payload.get("assistant_message") or "워크아웃 생성을 계속 진행합니다."
+    Args:
+        request: Generation request (same fields as chat, plus scheduling).
+        current_user: Authenticated user.
+        background_tasks: Runs the job here when no worker is alive.
+        db: Database session.
 
-        # Validate response status
-        if not response_status:
-            await db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail="AI workout response missing 'status' field",
+    Returns:
+        The queued job.
+    """
+    if request.conversation_id is not None:
+        result = await db.execute(
+            select(AIConversation).where(
+                AIConversation.id == request.conversation_id,
+                AIConversation.user_id == current_user.id,
             )
-
-        if response_status not in ("workout", "need_info"):
-            await db.rollback()
+        )
+        conversation = result.scalar_one_or_none()
+        if not conversation:
             raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail=f"AI workout response has invalid status: '{response_status}'. Expected 'workout' or 'need_info'.",
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conversation not found",
             )
+    else:
+        conversation = _new_conversation(current_user, request.message, request.mode)
+        db.add(conversation)
+        await db.flush()
 
-        if response_status == "workout":
-            workout_payload = payload.get("workout")
-            if not isinstance(workout_payload, dict):
-                await db.rollback()
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail="AI workout response status='workout' but 'workout' field is missing or invalid",
-                )
-            # Return workout data for frontend to save
-            workout_data = workout_payload
-
-        elif response_status == "need_info":
-            missing_fields = payload.get("missing_fields") or []
-            questions = payload.get("questions") or []
-
-            if not missing_fields and not questions:
-                logger.warning("AI workout response status='need_info' but no missing_fields or questions provided")
-
-    # Save user message (after AI response to avoid duplication)
-    user_message = AIMessage(
-        conversation_id=conversation.id,
-        role="user",
-        content=request.message,
+    pool = await get_arq_pool()
+    has_worker = pool is not None and await has_live_worker(
+        pool, settings.ai_generation_queue_name
     )
-    db.add(user_message)
 
-    # Save AI response
-    assistant_message = AIMessage(
+    job = AIGenerationJob(
+        user_id=current_user.id,
         conversation_id=conversation.id,
-        role="assistant",
-        content=assistant_content,
-        token_count=ai_response.get("tokens"),
+        mode=request.mode,
+        status=AIGenerationStatus.QUEUED.value,
+        stage="queued",
+        attempts=0,
+        request_message=request.message,
+        request_context=request.context,
+        save_mode=request.save_mode,
+        # The off-peak sweep runs on the worker, so only schedule when one is alive
+        scheduled_for=next_offpeak_run() if request.off_peak and has_worker else None,
     )
-    db.add(assistant_message)
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
 
-    # Update conversation timestamp
-    conversation.updated_at = datetime.now(timezone.utc)
+    if job.scheduled_for is None and not (
+        has_worker and await enqueue_generation_job(job, db, pool=pool)
+    ):
+        logger.warning(f"No AI generation worker running; generating job {job.id} in-process")
+        background_tasks.add_task(run_generation_job, job.id)
 
-    await db.commit()
-    await db.refresh(user_message)
-    await db.refresh(assistant_message)
+    return GenerationJobResponse.from_job(job)
 
-    return ChatResponse(
-        conversation_id=conversation.id,
-        message=MessageResponse.model_validate(user_message),
-        reply=MessageResponse.model_validate(assistant_message),
-        plan_id=plan_id,
-        import_id=import_id,
-        plan_status=plan_status,
-        missing_fields=missing_fields,
-        workout_id=workout_id,
-        workout=workout_data,
+
+@router.get("/jobs/{job_id}", response_model=GenerationJobResponse)
+async def get_generation_job(
+    job_id: int,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: AsyncSession = Depends(get_db),
+) -> GenerationJobResponse:
+    """Poll a generation job.
+
+    Args:
+        job_id: Generation job ID.
+        current_user: Authenticated user.
+        db: Database session.
+
+    Returns:
+        Job status, progress stage and (when finished) the chat response.
+    """
+    result = await db.execute(
+        select(AIGenerationJob).where(
+            AIGenerationJob.id == job_id,
+            AIGenerationJob.user_id == current_user.id,
+        )
     )
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Generation job not found",
+        )
+    return GenerationJobResponse.from_job(job)
 
 
 # -------------------------------------------------------------------------
@@ -888,6 +762,34 @@ async def _get_rag_context(query: str) -> str:
         return ""
 
 
+async def _assemble_prompt(
+    conversation: AIConversation,
+    user_message: str,
+    context: dict[str, Any] | None,
+    db: AsyncSession,
+    system_prompt: str,
+) -> AssembledPrompt:
+    """Build the token-budgeted prompt for a conversation turn."""
+    knowledge = await _get_rag_context(user_message) if settings.rag_enabled else ""
+
+    async def build_context() -> dict[str, Any]:
+        # Only runs on a context cache miss; flushes (not commits) so a failed
+        # turn still rolls back cleanly
+        user = await db.get(User, conversation.user_id)
+        snapshot = await ensure_ai_training_snapshot(db, user, weeks=SNAPSHOT_WEEKS, commit=False)
+        return snapshot.payload
+
+    return await assemble_prompt(
+        db,
+        conversation,
+        user_message=user_message,
+        system_prompt=system_prompt,
+        context=context,
+        knowledge=knowledge,
+        build_context=build_context,
+    )
+
+
 async def _get_ai_response(
     conversation: AIConversation,
     user_message: str,
@@ -905,83 +807,43 @@ async def _get_ai_response(
     Returns:
         Dict with content and token count.
     """
-    metrics = get_metrics_backend()
-
-    # Build message history (get most recent N messages, ordered chronologically)
-    history_limit = settings.ai_max_history_messages
-    msg_result = await db.execute(
-        select(AIMessage)
-        .where(AIMessage.conversation_id == conversation.id)
-        .order_by(AIMessage.created_at.desc())
-        .limit(history_limit)
+    prompt = await _assemble_prompt(
+        conversation=conversation,
+        user_message=user_message,
+        context=context,
+        db=db,
+        system_prompt=RUNNING_COACH_SYSTEM_PROMPT,
     )
-    history_raw = list(reversed(msg_result.scalars().all()))
-
-    # Deduplicate consecutive messages with same role and content
-    history: list = []
-    for msg in history_raw:
-        if history and history[-1].role == msg.role and history[-1].content == msg.content:
-            continue
-        history.append(msg)
-
-    # RAG: Search knowledge base for relevant context
-    system_prompt = RUNNING_COACH_SYSTEM_PROMPT
-    if settings.rag_enabled:
-        rag_context = await _get_rag_context(user_message)
-        if rag_context:
-            system_prompt = f"{RUNNING_COACH_SYSTEM_PROMPT}\n\n[참고 자료]\n{rag_context}"
-
-    # Use Google Gemini or OpenAI based on settings
-    if settings.ai_provider == "google" and settings.google_ai_api_key:
-        return await _get_gemini_response(
-            history=history,
-            user_message=user_message,
-            context=context,
-            system_prompt=system_prompt,
-            metrics=metrics,
-        )
-    else:
-        return await _get_openai_response(
-            history=history,
-            user_message=user_message,
-            context=context,
-            system_prompt=system_prompt,
-            metrics=metrics,
-        )
+    return await _complete_prompt(prompt)
 
 
 async def _get_gemini_response(
-    history: list,
-    user_message: str,
-    context: dict[str, Any] | None,
-    system_prompt: str,
+    prompt: AssembledPrompt,
     metrics,
 ) -> dict[str, Any]:
-    """Get AI response using Google Gemini API."""
-    import google.generativeai as genai
+    """Get AI response using Google Gemini API.
 
-    genai.configure(api_key=settings.google_ai_api_key)
-    model = genai.GenerativeModel(
-        model_name=settings.google_ai_model,
-        system_instruction=system_prompt,
-    )
+    The static system prompt is served from Gemini context caching when
+    available; per-turn material (knowledge, summary, context) is prefixed
+    to the user message.
+    """
+    model = await get_gemini_model(prompt.system_prompt)
 
     # Build chat history for Gemini
     gemini_history = []
-    for msg in history:
+    for msg in prompt.history:
         role = "user" if msg.role == "user" else "model"
         gemini_history.append({"role": role, "parts": [msg.content]})
 
-    # Add context to user message if provided
-    full_message = user_message
-    if context:
-        full_message = f"[사용자 컨텍스트: {context}]\n\n{user_message}"
+    full_message = prompt.user_message
+    if prompt.preamble:
+        full_message = f"{prompt.preamble}\n\n{prompt.user_message}"
 
     start_time = time.perf_counter()
     status_code = 500
     try:
         chat = model.start_chat(history=gemini_history)
-        response = chat.send_message(full_message)
+        response = await chat.send_message_async(full_message)
         status_code = 200
     except Exception:
         status_code = 500
@@ -1008,27 +870,27 @@ async def _get_gemini_response(
 
 
 async def _get_openai_response(
-    history: list,
-    user_message: str,
-    context: dict[str, Any] | None,
-    system_prompt: str,
+    prompt: AssembledPrompt,
     metrics,
 ) -> dict[str, Any]:
-    """Get AI response using OpenAI API (fallback)."""
+    """Get AI response using OpenAI API (fallback).
+
+    The static system prompt is always the first message so OpenAI's
+    automatic prefix caching can reuse it across turns and users.
+    """
     from openai import AsyncOpenAI
 
     client = AsyncOpenAI(api_key=settings.openai_api_key)
 
-    messages = [{"role": "system", "content": system_prompt}]
+    messages = [{"role": "system", "content": prompt.system_prompt}]
 
-    if context:
-        context_str = f"[사용자 컨텍스트: {context}]"
-        messages.append({"role": "system", "content": context_str})
+    if prompt.preamble:
+        messages.append({"role": "system", "content": prompt.preamble})
 
-    for msg in history:
+    for msg in prompt.history:
         messages.append({"role": msg.role, "content": msg.content})
 
-    messages.append({"role": "user", "content": user_message})
+    messages.append({"role": "user", "content": prompt.user_message})
 
     start_time = time.perf_counter()
     status_code = 500
@@ -1058,62 +920,27 @@ async def _get_openai_response(
     }
 
 
-async def _get_ai_plan_response(
-    conversation: AIConversation,
-    user_message: str,
-    context: dict[str, Any] | None,
-    db: AsyncSession,
-) -> dict[str, Any]:
-    """Get AI plan response in JSON format using Google Gemini or OpenAI."""
+async def _complete_prompt(prompt: AssembledPrompt) -> dict[str, Any]:
+    """Send an assembled prompt to Google Gemini or OpenAI based on settings."""
     metrics = get_metrics_backend()
-
-    history_limit = settings.ai_max_history_messages
-    msg_result = await db.execute(
-        select(AIMessage)
-        .where(AIMessage.conversation_id == conversation.id)
-        .order_by(AIMessage.created_at.desc())
-        .limit(history_limit)
-    )
-    history_raw = list(reversed(msg_result.scalars().all()))
-
-    history: list = []
-    for msg in history_raw:
-        if history and history[-1].role == msg.role and history[-1].content == msg.content:
-            continue
-        history.append(msg)
-
-    # RAG: Search knowledge base for relevant context (plan mode)
-    system_prompt = RUNNING_COACH_PLAN_PROMPT
-    if settings.rag_enabled:
-        rag_context = await _get_rag_context(user_message)
-        if rag_context:
-            system_prompt = f"{RUNNING_COACH_PLAN_PROMPT}\n\n[참고 자료]\n{rag_context}"
-
-    # Use Google Gemini or OpenAI based on settings
     if settings.ai_provider == "google" and settings.google_ai_api_key:
-        response_data = await _get_gemini_response(
-            history=history,
-            user_message=user_message,
-            context=context,
-            system_prompt=system_prompt,
-            metrics=metrics,
-        )
-    else:
-        response_data = await _get_openai_response(
-            history=history,
-            user_message=user_message,
-            context=context,
-            system_prompt=system_prompt,
-            metrics=metrics,
-        )
+        return await _get_gemini_response(prompt=prompt, metrics=metrics)
+    return await _get_openai_response(prompt=prompt, metrics=metrics)
+
 
+def _parse_structured_response(response_data: dict[str, Any], mode: str) -> dict[str, Any]:
+    """Extract the JSON payload from a plan/workout response.
+
+    Raises:
+        HTTPException: If the response does not contain a JSON object.
+    """
     content = response_data["content"] or ""
     try:
         payload = _extract_json_payload(content)
     except (ValueError, json.JSONDecodeError) as exc:
         raise HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY,
-            detail="AI plan response is not valid JSON",
+            detail=f"AI {mode} response is not valid JSON",
         ) from exc
 
     return {
@@ -1123,6 +950,23 @@ async def _get_ai_plan_response(
     }
 
 
+async def _get_ai_plan_response(
+    conversation: AIConversation,
+    user_message: str,
+    context: dict[str, Any] | None,
+    db: AsyncSession,
+) -> dict[str, Any]:
+    """Get AI plan response in JSON format using Google Gemini or OpenAI."""
+    prompt = await _assemble_prompt(
+        conversation=conversation,
+        user_message=user_message,
+        context=context,
+        db=db,
+        system_prompt=STRUCTURED_MODE_PROMPTS["plan"],
+    )
+    return _parse_structured_response(await _complete_prompt(prompt), "plan")
+
+
 async def _get_ai_workout_response(
     conversation: AIConversation,
     user_message: str,
@@ -1140,63 +984,257 @@ async def _get_ai_workout_response(
     Returns:
         Dict with content, payload (parsed JSON), and token count.
     """
-    metrics = get_metrics_backend()
-
-    history_limit = settings.ai_max_history_messages
-    msg_result = await db.execute(
-        select(AIMessage)
-        .where(AIMessage.conversation_id == conversation.id)
-        .order_by(AIMessage.created_at.desc())
-        .limit(history_limit)
+    prompt = await _assemble_prompt(
+        conversation=conversation,
+        user_message=user_message,
+        context=context,
+        db=db,
+        system_prompt=STRUCTURED_MODE_PROMPTS["workout"],
     )
-    history_raw = list(reversed(msg_result.scalars().all()))
-
-    history: list = []
-    for msg in history_raw:
-        if history and history[-1].role == msg.role and history[-1].content == msg.content:
-            continue
-        history.append(msg)
-
-    # RAG: Search knowledge base for relevant context (workout mode)
-    system_prompt = RUNNING_COACH_WORKOUT_PROMPT
-    if settings.rag_enabled:
-        rag_context = await _get_rag_context(user_message)
-        if rag_context:
-            system_prompt = f"{RUNNING_COACH_WORKOUT_PROMPT}\n\n[참고 자료]\n{rag_context}"
-
-    # Use Google Gemini or OpenAI based on settings
-    if settings.ai_provider == "google" and settings.google_ai_api_key:
-        response_data = await _get_gemini_response(
-            history=history,
-            user_message=user_message,
-            context=context,
-            system_prompt=system_prompt,
-            metrics=metrics,
-        )
+    return _parse_structured_response(await _complete_prompt(prompt), "workout")
+
+
+async def _get_mode_response(
+    mode: str | None,
+    conversation: AIConversation,
+    user_message: str,
+    context: dict[str, Any] | None,
+    db: AsyncSession,
+) -> dict[str, Any]:
+    """Dispatch a chat turn to the chat, plan or workout generator."""
+    if mode == "plan":
+        generator = _get_ai_plan_response
+    elif mode == "workout":
+        generator = _get_ai_workout_response
     else:
-        response_data = await _get_openai_response(
-            history=history,
-            user_message=user_message,
-            context=context,
-            system_prompt=system_prompt,
-            metrics=metrics,
-        )
+        generator = _get_ai_response
+    return await generator(
+        conversation=conversation,
+        user_message=user_message,
+        context=context,
+        db=db,
+    )
 
-    content = response_data["content"] or ""
-    try:
-        payload = _extract_json_payload(content)
-    except (ValueError, json.JSONDecodeError) as exc:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail="AI workout response is not valid JSON",
-        ) from exc
 
-    return {
-        "content": content,
-        "payload": payload,
-        "tokens": response_data.get("tokens"),
+def _new_conversation(user: User, message: str, mode: str | None) -> AIConversation:
+    """Create (unsaved) conversation for a first message."""
+    # DB schema uses context_type and context_data instead of language/model
+    # Use Unicode-safe truncation to avoid cutting multi-byte characters
+    context_type = "plan_generation" if mode == "plan" else ("workout_generation" if mode == "workout" else "chat")
+    return AIConversation(
+        user_id=user.id,
+        title=_truncate_unicode_safe(message, 50),
+        context_type=context_type,
+        context_data={
+            "language": settings.ai_default_language,
+            "model": settings.google_ai_model if settings.ai_provider == "google" else settings.openai_model,
+            "mode": mode,
+        },
+    )
+
+
+async def _apply_ai_response(
+    mode: str | None,
+    ai_response: dict[str, Any],
+    save_mode: str | None,
+    current_user: User,
+    db: AsyncSession,
+    import_source: str | None = None,
+) -> dict[str, Any]:
+    """Validate a mode response and import generated plans.
+
+    Args:
+        import_source: Source recorded on the plan import. When given, it
+            identifies the caller's import (e.g. a generation job) and a
+            plan already imported under it is reused instead of imported
+            again, so retries cannot create duplicate plans.
+
+    Returns:
+        Dict with assistant_content, tokens and the ChatResponse extras
+        (plan_id, import_id, plan_status, missing_fields, workout).
+
+    Raises:
+        HTTPException: If the structured response is malformed.
+    """
+    outcome: dict[str, Any] = {
+        "assistant_content": ai_response["content"],
+        "tokens": ai_response.get("tokens"),
+        "plan_id": None,
+        "import_id": None,
+        "plan_status": None,
+        "missing_fields": None,
+        "workout": None,
     }
 
+    if mode == "plan":
+        payload = ai_response.get("payload") or {}
+        response_status = payload.get("status")
+        outcome["assistant_content"] = payload.get("assistant_message") or "플랜 생성을 계속 진행합니다."
+
+        # Validate response status
+        if not response_status:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail="AI plan response missing 'status' field",
+            )
+
+        if response_status not in ("plan", "need_info"):
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"AI plan response has invalid status: '{response_status}'. Expected 'plan' or 'need_info'.",
+            )
+
+        if response_status == "plan":
+            plan_data = payload.get("plan")
+            if not isinstance(plan_data, dict):
+                raise HTTPException(
+                    status_code=status.HTTP_502_BAD_GATEWAY,
+                    detail="AI plan response status='plan' but 'plan' field is missing or invalid",
+                )
+            plan_data["source"] = import_source or "ai"
+            # Validate AI-generated plan JSON against schema
+            try:
+                from pydantic import ValidationError as PydanticValidationError
+                plan_request = PlanImportRequest.model_validate(plan_data)
+            except PydanticValidationError as e:
+                logger.warning(f"AI generated invalid plan JSON: {e}")
+                raise HTTPException(
+                    status_code=status.HTTP_502_BAD_GATEWAY,
+                    detail=f"AI generated plan with invalid format: {e.error_count()} validation errors. Please try again.",
+                )
+
+            from app.models.plan import Plan
+
+            existing_import = None
+            if import_source is not None:
+                existing_result = await db.execute(
+                    select(AIImport)
+                    .where(
+                        AIImport.user_id == current_user.id,
+                        AIImport.source == import_source,
+                        AIImport.import_type == "plan",
+                        AIImport.status == "success",
+                        AIImport.result_plan_id.is_not(None),
+                    )
+                    .order_by(AIImport.id.desc())
+                    .limit(1)
+                )
+                existing_import = existing_result.scalar_one_or_none()
+
+            if existing_import is not None:
+                logger.info(
+                    f"Reusing plan {existing_import.result_plan_id} already imported for {import_source}"
+                )
+                outcome["plan_id"] = existing_import.result_plan_id
+                outcome["import_id"] = existing_import.id
+                plan = await db.get(Plan, existing_import.result_plan_id)
+                outcome["plan_status"] = plan.status if plan else "draft"
+            else:
+                import_result = await import_plan(plan_request, current_user, db)
+                outcome["plan_id"] = import_result.plan_id
+                outcome["import_id"] = import_result.import_id
+                outcome["plan_status"] = "draft"
+
+            save_mode = save_mode or "draft"
+            if save_mode in ("approved", "active"):
+                from app.api.v1.endpoints.plans import approve_plan, activate_plan
+
+                if outcome["plan_status"] == "draft":
+                    await approve_plan(outcome["plan_id"], current_user, db)
+                    outcome["plan_status"] = "approved"
+                if save_mode == "active" and outcome["plan_status"] == "approved":
+                    await activate_plan(outcome["plan_id"], current_user, db)
+                    outcome["plan_status"] = "active"
+
+        elif response_status == "need_info":
+            # Validate need_info response has required fields
+            outcome["missing_fields"] = payload.get("missing_fields") or []
+            questions = payload.get("questions") or []
+
+            if not outcome["missing_fields"] and not questions:
+                logger.warning("AI plan response status='need_info' but no missing_fields or questions provided")
+                # Allow empty lists but log warning
+
+    elif mode == "workout":
+        payload = ai_response.get("payload") or {}
+        response_status = payload.get("status")
+        outcome["assistant_content"] = payload.get("assistant_message") or "워크아웃 생성을 계속 진행합니다."
+
+        # Validate response status
+        if not response_status:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail="AI workout response missing 'status' field",
+            )
+
+        if response_status not in ("workout", "need_info"):
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"AI workout response has invalid status: '{response_status}'. Expected 'workout' or 'need_info'.",
+            )
+
+        if response_status == "workout":
+            workout_payload = payload.get("workout")
+            if not isinstance(workout_payload, dict):
+                raise HTTPException(
+                    status_code=status.HTTP_502_BAD_GATEWAY,
+                    detail="AI workout response status='workout' but 'workout' field is missing or invalid",
+                )
+            # Return workout data for frontend to save
+            outcome["workout"] = workout_payload
+
+        elif response_status == "need_info":
+            outcome["missing_fields"] = payload.get("missing_fields") or []
+            questions = payload.get("questions") or []
+
+            if not outcome["missing_fields"] and not questions:
+                logger.warning("AI workout response status='need_info' but no missing_fields or questions provided")
+
+    return outcome
+
+
+async def _save_chat_turn(
+    conversation: AIConversation,
+    user_content: str,
+    outcome: dict[str, Any],
+    db: AsyncSession,
+) -> ChatResponse:
+    """Persist the user message and AI reply, then build the chat response."""
+    # Save user message (after AI response to avoid duplication)
+    user_message = AIMessage(
+        conversation_id=conversation.id,
+        role="user",
+        content=user_content,
+    )
+    db.add(user_message)
+
+    # Save AI response
+    assistant_message = AIMessage(
+        conversation_id=conversation.id,
+        role="assistant",
+        content=outcome["assistant_content"],
+        token_count=outcome.get("tokens"),
+    )
+    db.add(assistant_message)
+
+    # Update conversation timestamp
+    conversation.updated_at = datetime.now(timezone.utc)
+    await db.commit()
+
+    await db.refresh(user_message)
+    await db.refresh(assistant_message)
+
+    return ChatResponse(
+        conversation_id=conversation.id,
+        message=MessageResponse.model_validate(user_message),
+        reply=MessageResponse.model_validate(assistant_message),
+        plan_id=outcome.get("plan_id"),
+        import_id=outcome.get("import_id"),
+        plan_status=outcome.get("plan_status"),
+        missing_fields=outcome.get("missing_fields"),
+        workout=outcome.get("workout"),
+    )
+
 
 # -------------------------------------------------------------------------
 # Import/Export Endpoints
@@ -1429,44 +1467,29 @@ async def export_summary(
     import json
     from datetime import timedelta
 
-    from app.models.activity import Activity
     from app.models.health import FitnessMetricDaily
+    from app.services.ai_snapshot import (
+        get_first_aggregate_week,
+        get_window_totals,
+        refresh_week_aggregates,
+    )
 
     now = datetime.now(timezone.utc)
+    today = now.date()
     six_weeks_ago = now - timedelta(weeks=6)
-    twelve_weeks_ago = now - timedelta(weeks=12)
 
-    # Get recent activities (6 weeks)
-    recent_result = await db.execute(
-        select(Activity)
-        .where(
-            Activity.user_id == current_user.id,
-            Activity.start_time >= six_weeks_ago,
-        )
-        .order_by(Activity.start_time.desc())
-    )
-    recent_activities = recent_result.scalars().all()
-
-    # Get 12-week activities for trend
-    trend_result = await db.execute(
-        select(Activity)
-        .where(
-            Activity.user_id == current_user.id,
-            Activity.start_time >= twelve_weeks_ago,
-        )
-        .order_by(Activity.start_time.desc())
+    # Combine per-week aggregates instead of rescanning every activity
+    if await refresh_week_aggregates(db, current_user.id):
+        await db.commit()
+    recent = await get_window_totals(
+        db, current_user.id, today - timedelta(weeks=6) + timedelta(days=1), today
     )
-    trend_activities = trend_result.scalars().all()
-
-    # Get all-time stats
-    all_time_result = await db.execute(
-        select(
-            func.count(Activity.id).label("total_count"),
-            func.sum(Activity.distance_meters).label("total_distance"),
-            func.sum(Activity.duration_seconds).label("total_duration"),
-        ).where(Activity.user_id == current_user.id)
+    trend = await get_window_totals(
+        db, current_user.id, today - timedelta(weeks=12) + timedelta(days=1), today
     )
-    all_time = all_time_result.one()
+    # All-time starts at the first aggregated week, however old it is
+    first_week = await get_first_aggregate_week(db, current_user.id)
+    all_time = await get_window_totals(db, current_user.id, first_week or today, today)
 
     # Get recent fitness metrics
     fitness_result = await db.execute(
@@ -1487,21 +1510,21 @@ async def export_summary(
             "timezone": current_user.timezone or settings.default_timezone,
         },
         "recent_6_weeks": {
-            "total_activities": len(recent_activities),
-            "total_distance_km": round(sum(a.distance_meters or 0 for a in recent_activities) / 1000, 1),
-            "total_duration_hours": round(sum(a.duration_seconds or 0 for a in recent_activities) / 3600, 1),
-            "avg_pace_per_km": _calculate_avg_pace(recent_activities),
-            "avg_hr": _calculate_avg_hr(recent_activities),
+            "total_activities": recent.activity_count,
+            "total_distance_km": round(recent.total_distance_m / 1000, 1),
+            "total_duration_hours": round(recent.total_duration_s / 3600, 1),
+            "avg_pace_per_km": _calculate_avg_pace(recent.total_distance_m, recent.total_duration_s),
+            "avg_hr": round(recent.hr_sum / recent.hr_count) if recent.hr_count else None,
         },
         "trend_12_weeks": {
-            "total_activities": len(trend_activities),
-            "total_distance_km": round(sum(a.distance_meters or 0 for a in trend_activities) / 1000, 1),
-            "weekly_avg_distance_km": round(sum(a.distance_meters or 0 for a in trend_activities) / 1000 / 12, 1),
+            "total_activities": trend.activity_count,
+            "total_distance_km": round(trend.total_distance_m / 1000, 1),
+            "weekly_avg_distance_km": round(trend.total_distance_m / 1000 / 12, 1),
         },
         "all_time": {
-            "total_activities": all_time.total_count or 0,
-            "total_distance_km": round((all_time.total_distance or 0) / 1000, 1),
-            "total_duration_hours": round((all_time.total_duration or 0) / 3600, 1),
+            "total_activities": all_time.activity_count,
+            "total_distance_km": round(all_time.total_distance_m / 1000, 1),
+            "total_duration_hours": round(all_time.total_duration_s / 3600, 1),
         },
         "fitness_metrics": {
             "latest_ctl": recent_fitness[0].ctl if recent_fitness else None,
@@ -1523,32 +1546,17 @@ async def export_summary(
     )
 
 
-def _calculate_avg_pace(activities: list) -> str:
-    """Calculate average pace from activities."""
-    total_distance = sum(a.distance_meters or 0 for a in activities)
-    total_duration = sum(a.duration_seconds or 0 for a in activities)
-
-    if total_distance == 0:
+def _calculate_avg_pace(total_distance_m: float, total_duration_s: int) -> str:
+    """Calculate average pace from summed distance and duration."""
+    if total_distance_m == 0:
         return "N/A"
 
-    pace_seconds_per_km = (total_duration / total_distance) * 1000
+    pace_seconds_per_km = (total_duration_s / total_distance_m) * 1000
     minutes = int(pace_seconds_per_km // 60)
     seconds = int(pace_seconds_per_km % 60)
     return f"{minutes}:{seconds:02d}/km"
 
 
-def _calculate_avg_hr(activities: list) -> int | None:
-    """Calculate average heart rate from activities with valid HR data.
-
-    Only considers activities that have actual heart rate data (avg_hr > 0).
-    Returns None if no activities have valid HR data.
-    """
-    activities_with_hr = [a for a in activities if a.avg_hr and a.avg_hr > 0]
-    if not activities_with_hr:
-        return None
-    return round(sum(a.avg_hr for a in activities_with_hr) / len(activities_with_hr))
-
-
 def _format_markdown_summary(data: dict) -> str:
     """Format summary data as markdown."""
     lines = [
@@ -12,8 +12,6 @@ import logging
 from datetime import datetime, timezone as tz
 from typing import Annotated, Any
 
-logger = logging.getLogger(__name__)
-
 from fastapi import APIRouter, Cookie, Depends, HTTPException, Query, Request, Response, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from pydantic import BaseModel, EmailStr
@@ -25,6 +23,7 @@ from app.adapters.garmin_adapter import (
     GarminAuthError,
     GarminConnectAdapter,
 )
+from app.adapters.garmin_pool import get_garmin_pool
 from app.core.config import get_settings
 from app.core.database import get_db
 from app.core.security import verify_password_async
@@ -32,6 +31,7 @@ from app.core.session import create_session, delete_session, get_session, refres
 from app.models.garmin import GarminSession, GarminSyncState
 from app.models.user import User
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 router = APIRouter()
 
@@ -543,6 +543,7 @@ async def disconnect_garmin(
     if session:
         await db.delete(session)
         await db.commit()
+        get_garmin_pool().discard(current_user.id)
         return DisconnectResponse(message="Garmin account disconnected")
 
     return DisconnectResponse(message="No Garmin account was connected")
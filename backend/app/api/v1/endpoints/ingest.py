@@ -3,46 +3,43 @@
 Paths:
   POST /api/v1/ingest/run    - 수동 동기화 실행
   GET  /api/v1/ingest/status - 동기화 상태 조회
+  GET  /api/v1/ingest/events - 동기화 진행 이벤트 (Server-Sent Events)
   GET  /api/v1/ingest/history - 동기화 이력
 """
 
 import asyncio
+import json
 import logging
 from datetime import date, datetime, timedelta, timezone
 from typing import Annotated, Any
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy import select, desc, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.endpoints.auth import get_current_user
 from app.core.config import get_settings
-from app.core.database import get_db, async_session_maker
-from app.core.session import acquire_lock, release_lock, check_lock, extend_lock
+from app.core.database import get_db
+from app.core.session import acquire_lock, release_lock, check_lock
 from app.models.garmin import GarminSession, GarminSyncState, GarminRawEvent
 from app.models.user import User
 from app.services.ai_snapshot import ensure_ai_training_snapshot
+from app.services.garmin_sync_jobs import enqueue_user_sync, run_user_sync, sync_lock_name
+from app.services.raw_archive import count_records
 from app.services.sync_service import GarminSyncService, create_sync_service
+from app.services.sync_status import TERMINAL_EVENT, get_sync_status_store
 from app.adapters.garmin_adapter import GarminConnectAdapter, GarminAuthError
 
 router = APIRouter()
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
-# In-memory sync status (per user)
-# Format: {user_id: {"error": str|None, "started_at": datetime|None}}
-_sync_status: dict[int, dict[str, Any]] = {}
-
 # Default endpoints for quick sync (activities only for faster sync)
 DEFAULT_SYNC_ENDPOINTS = ["activities"]
 
 
-def _sync_lock_name(user_id: int) -> str:
-    """Get lock name for user sync."""
-    return f"sync:user:{user_id}"
-
-
 async def validate_garmin_session(
     db: AsyncSession,
     user_id: int,
@@ -107,6 +104,7 @@ class IngestRunRequest(BaseModel):
     full_backfill: bool = False
     start_date: date | None = None
     end_date: date | None = None
+    force: bool = True  # User-triggered runs skip the adaptive cadence; False honors it
 
 
 class SyncResultItem(BaseModel):
@@ -117,6 +115,7 @@ class SyncResultItem(BaseModel):
     items_fetched: int
     items_created: int
     items_updated: int
+    skipped: bool = False  # Not due yet (adaptive cadence)
     error: str | None
 
 
@@ -168,156 +167,28 @@ class SyncHistoryItem(BaseModel):
     record_count: int
 
 
-class SyncHistoryResponse(BaseModel):
-    """Sync history response."""
-
-    items: list[SyncHistoryItem]
-    total: int
-
-
-# -------------------------------------------------------------------------
-# Background Task
-# -------------------------------------------------------------------------
+class SyncStageTiming(BaseModel):
+    """Occurrences and self time of one sync stage."""
 
+    n: int
+    ms: float
 
-async def run_sync_background(
-    user_id: int,
-    endpoints: list[str],
-    lock_owner: str,
-    full_backfill: bool = False,
-    start_date: date | None = None,
-    end_date: date | None = None,
-) -> None:
-    """Run sync in background.
-
-    This function runs in a separate task and performs the actual sync.
-    Uses Redis distributed lock for multi-worker safety with periodic extension
-    to support long-running syncs (1000+ activities).
 
-    Args:
-        user_id: User ID to sync.
-        endpoints: List of endpoints to sync.
-        lock_owner: Lock owner token (for releasing lock).
-        full_backfill: If True, sync all historical data.
-        start_date: Optional start date filter.
-        end_date: Optional end date filter.
-    """
-    lock_name = _sync_lock_name(user_id)
-
-    # Initialize sync status with progress tracking
-    _sync_status[user_id] = {
-        "error": None,
-        "started_at": datetime.now(timezone.utc),
-        "progress": {
-            "current_endpoint": endpoints[0] if endpoints else "",
-            "current_index": 0,
-            "total_endpoints": len(endpoints),
-            "items_synced": 0,
-        },
-    }
-
-    # Background task to periodically extend lock during long syncs
-    async def extend_lock_periodically():
-        """Extend lock every N minutes to prevent expiration during long syncs."""
-        try:
-            while True:
-                await asyncio.sleep(settings.sync_lock_extension_interval)
-                success = await extend_lock(
-                    lock_name,
-                    lock_owner,
-                    ttl_seconds=settings.sync_lock_ttl_seconds,
-                )
-                if success:
-                    logger.debug(f"Extended sync lock for user {user_id}")
-                else:
-                    logger.warning(f"Failed to extend sync lock for user {user_id}")
-        except asyncio.CancelledError:
-            # Normal cancellation when sync completes
-            pass
+class SyncRunTrace(BaseModel):
+    """Stage timings of a recent sync run (see app.services.sync_trace)."""
 
-    # Start lock extension task
-    extension_task = asyncio.create_task(extend_lock_periodically())
+    started_at: datetime
+    duration_ms: float
+    stages: dict[str, SyncStageTiming]  # Whole run, slowest first
+    endpoints: dict[str, dict[str, Any]]  # Per endpoint: ms, outcome, stages
 
-    try:
-        async with async_session_maker() as session:
-            # Get user
-            result = await session.execute(select(User).where(User.id == user_id))
-            user = result.scalar_one_or_none()
-            if not user:
-                logger.error(f"User {user_id} not found")
-                _sync_status[user_id]["error"] = "User not found"
-                return
-
-            # Create sync service
-            sync_service = await create_sync_service(session, user)
-            if not sync_service:
-                logger.error(f"Could not create sync service for user {user_id}")
-                _sync_status[user_id]["error"] = "Garmin 연결이 필요합니다"
-                return
-
-            # Sync user profile once per run (max HR, raw snapshot)
-            await sync_service.sync_user_profile()
-
-            # Run sync for each endpoint
-            errors = []
-            for idx, endpoint in enumerate(endpoints):
-                # Update progress before starting each endpoint
-                _sync_status[user_id]["progress"] = {
-                    "current_endpoint": endpoint,
-                    "current_index": idx,
-                    "total_endpoints": len(endpoints),
-                    "items_synced": 0,
-                }
-
-                try:
-                    result = await sync_service.sync_endpoint(
-                        endpoint,
-                        start_date=start_date,
-                        end_date=end_date,
-                        full_backfill=full_backfill,
-                    )
-
-                    # Update items_synced after completion
-                    _sync_status[user_id]["progress"]["items_synced"] = (
-                        result.items_created + result.items_updated
-                    )
-
-                    logger.info(
-                        f"Sync {endpoint} for user {user_id}: "
-                        f"fetched={result.items_fetched}, "
-                        f"created={result.items_created}, "
-                        f"updated={result.items_updated}"
-                    )
-                except Exception as e:
-                    logger.exception(f"Error syncing {endpoint} for user {user_id}")
-                    errors.append(f"{endpoint}: {str(e)[:50]}")
-
-            # Store error summary if any failures
-            if errors:
-                _sync_status[user_id]["error"] = "; ".join(errors[:3])  # Max 3 errors
-
-            try:
-                await ensure_ai_training_snapshot(session, user)
-            except Exception as e:
-                logger.warning(
-                    "Failed to refresh AI snapshot for user %s: %s",
-                    user_id,
-                    e,
-                )
 
-    except Exception as e:
-        logger.exception(f"Background sync error for user {user_id}")
-        _sync_status[user_id]["error"] = str(e)[:100]
-    finally:
-        # Cancel lock extension task
-        extension_task.cancel()
-        try:
-            await extension_task
-        except asyncio.CancelledError:
-            pass
+class SyncHistoryResponse(BaseModel):
+    """Sync history response."""
 
-        # Always release the lock when done
-        await release_lock(lock_name, lock_owner)
+    items: list[SyncHistoryItem]
+    total: int
+    runs: list[SyncRunTrace] = []  # Recent sync runs, newest first
 
 
 # -------------------------------------------------------------------------
@@ -336,7 +207,9 @@ async def run_ingest(
 
     FR-002: 활동 데이터 수집 - 수동 동기화 트리거
 
-    This endpoint starts a background sync job. Use /status to check progress.
+    This endpoint queues a sync job for the Garmin sync worker (or runs it
+    as a background task when the queue is unavailable). Use /status to
+    check progress.
 
     Args:
         current_user: Authenticated user.
@@ -348,7 +221,7 @@ async def run_ingest(
         Ingestion job status.
     """
     # Try to acquire distributed lock
-    lock_name = _sync_lock_name(current_user.id)
+    lock_name = sync_lock_name(current_user.id)
     lock_owner = await acquire_lock(lock_name, ttl_seconds=settings.sync_lock_ttl_seconds)
 
     if not lock_owner:
@@ -401,16 +274,19 @@ async def run_ingest(
                     detail="start_date must be before or equal to end_date",
                 )
 
-        # Start background sync (lock will be released by background task)
-        background_tasks.add_task(
-            run_sync_background,
-            user_id=current_user.id,
-            endpoints=endpoints,
-            lock_owner=lock_owner,
-            full_backfill=request.full_backfill if request else False,
-            start_date=request.start_date if request else None,
-            end_date=request.end_date if request else None,
-        )
+        # Hand the sync (and the lock) to the Garmin sync worker
+        sync_kwargs = {
+            "user_id": current_user.id,
+            "endpoints": endpoints,
+            "lock_owner": lock_owner,
+            "full_backfill": request.full_backfill if request else False,
+            "start_date": request.start_date if request else None,
+            "end_date": request.end_date if request else None,
+            "force": request.force if request else True,
+        }
+        if not await enqueue_user_sync(**sync_kwargs):
+            # No queue or no worker (Redis down, local dev): run in this process instead
+            background_tasks.add_task(run_user_sync, **sync_kwargs)
 
         return IngestRunResponse(
             started=True,
@@ -447,7 +323,7 @@ async def run_ingest_sync(
         HTTPException 409: If sync is already running for this user.
     """
     # Try to acquire distributed lock
-    lock_name = _sync_lock_name(current_user.id)
+    lock_name = sync_lock_name(current_user.id)
     lock_owner = await acquire_lock(lock_name, ttl_seconds=settings.sync_lock_ttl_seconds)
 
     if not lock_owner:
@@ -498,6 +374,7 @@ async def run_ingest_sync(
                 start_date=request.start_date if request else None,
                 end_date=request.end_date if request else None,
                 full_backfill=request.full_backfill if request else False,
+                force=request.force if request else True,
             )
             results.append(
                 SyncResultItem(
@@ -506,6 +383,7 @@ async def run_ingest_sync(
                     items_fetched=sync_result.items_fetched,
                     items_created=sync_result.items_created,
                     items_updated=sync_result.items_updated,
+                    skipped=sync_result.skipped,
                     error=sync_result.error,
                 )
             )
@@ -519,6 +397,11 @@ async def run_ingest_sync(
                 e,
             )
 
+        try:
+            await get_sync_status_store().record_trace(current_user.id, sync_service.trace.to_dict())
+        except Exception as e:
+            logger.warning(f"Failed to store sync trace for user {current_user.id}: {e}")
+
         return results
 
     finally:
@@ -557,11 +440,12 @@ async def get_ingest_status(
     states = result.scalars().all()
 
     # Check if running (via distributed lock)
-    lock_name = _sync_lock_name(current_user.id)
+    lock_name = sync_lock_name(current_user.id)
     is_running = await check_lock(lock_name)
 
-    # Get last error and started_at from in-memory status
-    user_status = _sync_status.get(current_user.id, {})
+    # Get last error and started_at from the shared status
+    sync_status = get_sync_status_store()
+    user_status = await sync_status.get(current_user.id)
     last_sync_started_at = user_status.get("started_at")
 
     # Detect and handle stale locks
@@ -590,9 +474,8 @@ async def get_ingest_status(
             # Mark as not running for UI - the lock TTL will handle cleanup
             is_running = False
             # Set error message
-            if current_user.id not in _sync_status:
-                _sync_status[current_user.id] = {}
-            _sync_status[current_user.id]["error"] = "동기화 시간 초과 - 다시 시도해주세요"
+            user_status["error"] = "동기화 시간 초과 - 다시 시도해주세요"
+            await sync_status.set_error(current_user.id, user_status["error"])
 
     # Only show error after sync completes
     last_error = user_status.get("error") if not is_running else None
@@ -627,6 +510,69 @@ async def get_ingest_status(
     )
 
 
+@router.get("/events")
+async def stream_ingest_events(
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> StreamingResponse:
+    """Stream sync progress as Server-Sent Events.
+
+    Sends the current status first (``event: status``), then each progress
+    event as it is published by whichever process runs the sync. The
+    stream ends after the ``finished`` event; comment lines are sent as
+    keepalives while the sync is quiet. If the sync lock is gone at a
+    keepalive, a ``finished`` event is built from the stored status so the
+    stream never outlives the run.
+
+    Args:
+        current_user: Authenticated user.
+
+    Returns:
+        ``text/event-stream`` response.
+    """
+    sync_status = get_sync_status_store()
+    user_id = current_user.id
+
+    async def _events():
+        # Subscribe before reading the snapshot so no event falls in between
+        subscription = await sync_status.subscribe(user_id)
+        try:
+            snapshot = await sync_status.get(user_id)
+            yield f"event: status\ndata: {json.dumps(snapshot, default=str)}\n\n"
+            if not await check_lock(sync_lock_name(user_id)):
+                return  # Nothing running; the snapshot is the final state
+
+            while True:
+                event = await subscription.next()
+                if event is None:
+                    if not await check_lock(sync_lock_name(user_id)):
+                        # The run ended without its terminal event reaching us
+                        # (e.g. the worker died); report the stored state and stop
+                        snapshot = await sync_status.get(user_id)
+                        error = snapshot.get("error")
+                        if not error and not snapshot.get("finished_at"):
+                            error = "Sync stopped unexpectedly"
+                        event = {
+                            "type": TERMINAL_EVENT,
+                            "finished_at": snapshot.get("finished_at"),
+                            "error": error,
+                        }
+                        yield f"event: {TERMINAL_EVENT}\ndata: {json.dumps(event, default=str)}\n\n"
+                        return
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event.get('type', 'message')}\ndata: {json.dumps(event)}\n\n"
+                if event.get("type") == TERMINAL_EVENT:
+                    return
+        finally:
+            await subscription.close()
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/history", response_model=SyncHistoryResponse)
 async def get_sync_history(
     current_user: Annotated[User, Depends(get_current_user)],
@@ -645,7 +591,7 @@ async def get_sync_history(
         per_page: Items per page.
 
     Returns:
-        Sync history based on raw events.
+        Sync history based on raw events, plus stage timings of recent runs.
     """
     # Build base filter
     base_filter = GarminRawEvent.user_id == current_user.id
@@ -672,9 +618,10 @@ async def get_sync_history(
                 id=e.id,
                 endpoint=e.endpoint,
                 fetched_at=e.fetched_at,
-                record_count=len(e.payload.get("data", [])) if isinstance(e.payload, dict) and "data" in e.payload else (len(e.payload) if isinstance(e.payload, list) else 1),
+                record_count=e.record_count if e.record_count is not None else count_records(e.payload or {}),
             )
             for e in events
         ],
         total=total,
+        runs=await get_sync_status_store().traces(current_user.id),
     )
@@ -11,7 +11,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.api.v1.endpoints.auth import get_current_user
-from app.adapters.garmin_adapter import GarminAuthError, GarminConnectAdapter, GarminAPIError
+from app.adapters.garmin_adapter import GarminAuthError, GarminAPIError
+from app.adapters.garmin_pool import get_garmin_pool
 from app.core.database import get_db
 from app.models.garmin import GarminSession
 from app.models.plan import Plan, PlanWeek
@@ -461,9 +462,8 @@ async def activate_plan(
             detail="Garmin account not connected",
         )
 
-    adapter = GarminConnectAdapter()
     try:
-        adapter.restore_session(session.session_data)
+        adapter = await get_garmin_pool().acquire(current_user.id, session.session_data)
     except GarminAuthError as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -15,7 +15,9 @@ from app.core.database import get_db
 from app.models.race import Race
 from app.models.user import User
 from app.models.garmin import GarminSession
-from app.adapters.garmin_adapter import GarminConnectAdapter, GarminAuthError, GarminAPIError
+from app.adapters.garmin_adapter import GarminAuthError, GarminAPIError
+from app.adapters.garmin_pool import get_garmin_pool
+from app.services.garmin_events import get_garmin_events_fetcher
 
 logger = logging.getLogger(__name__)
 
@@ -225,8 +227,7 @@ async def get_garmin_race_predictions(
         )
 
     try:
-        adapter = GarminConnectAdapter()
-        adapter.restore_session(garmin_session.session_data)
+        adapter = await get_garmin_pool().acquire(current_user.id, garmin_session.session_data)
 
         predictions_data = adapter.get_race_predictions()
 
@@ -344,8 +345,7 @@ async def get_garmin_events_debug(
         )
 
     try:
-        adapter = GarminConnectAdapter()
-        adapter.restore_session(garmin_session.session_data)
+        adapter = await get_garmin_pool().acquire(current_user.id, garmin_session.session_data)
 
         # Get events for single date
         loop = asyncio.get_event_loop()
@@ -383,9 +383,9 @@ async def get_garmin_events(
 
     Fetches all-day events from Garmin Connect for the specified date range.
     Events may include races, workouts, and other scheduled activities.
-    
-    If the date range exceeds 90 days, it will be automatically split into
-    multiple 90-day chunks and all events will be merged.
+
+    Days are fetched in parallel and cached per day (see
+    ``app.services.garmin_events``), so only days not seen recently hit Garmin.
 
     Args:
         start_date: Start date for event search.
@@ -396,21 +396,6 @@ async def get_garmin_events(
     Returns:
         List of Garmin events that may include race information.
     """
-    # If range exceeds 90 days, split into multiple requests
-    total_days = (end_date - start_date).days
-    if total_days <= 90:
-        # Single request
-        date_ranges = [(start_date, end_date)]
-    else:
-        # Split into 90-day chunks
-        date_ranges = []
-        current = start_date
-        from datetime import timedelta
-        while current <= end_date:
-            chunk_end = min(current + timedelta(days=89), end_date)  # 90-day chunks
-            date_ranges.append((current, chunk_end))
-            current = chunk_end + timedelta(days=1)
-
     # Get Garmin session
     result = await db.execute(
         select(GarminSession).where(GarminSession.user_id == current_user.id)
@@ -424,28 +409,15 @@ async def get_garmin_events(
         )
 
     try:
-        adapter = GarminConnectAdapter()
-        adapter.restore_session(garmin_session.session_data)
-
-        # Get events for all date ranges and merge them
-        loop = asyncio.get_event_loop()
-        all_raw_events = []
-        
-        for range_start, range_end in date_ranges:
-            logger.info(f"Fetching Garmin events for range {range_start} to {range_end}")
-            chunk_events = await loop.run_in_executor(
-                None,
-                lambda s=range_start, e=range_end: adapter.get_events_in_range(s, e),
-            )
-            all_raw_events.extend(chunk_events)
-            logger.info(f"Retrieved {len(chunk_events)} events from range {range_start} to {range_end}")
+        adapter = await get_garmin_pool().acquire(current_user.id, garmin_session.session_data)
+        all_raw_events = await get_garmin_events_fetcher().fetch_range(
+            current_user.id, adapter, start_date, end_date
+        )
 
         # Remove duplicates based on event_date + name (or other unique identifier)
         seen_events = set()
         unique_events = []
         for event in all_raw_events:
-            if not isinstance(event, dict):
-                continue
             # Create a unique key for deduplication
             event_date = event.get("event_date") or event.get("date") or "unknown"
             event_name = event.get("eventName") or event.get("name") or event.get("title") or "unknown"
@@ -453,35 +425,11 @@ async def get_garmin_events(
             if event_key not in seen_events:
                 seen_events.add(event_key)
                 unique_events.append(event)
-        
+
         raw_events = unique_events
-        logger.info(f"Retrieved total {len(raw_events)} unique events from Garmin for range {start_date} to {end_date} (from {len(date_ranges)} chunks)")
-        
-        # Log details about what was retrieved
-        if raw_events:
-            dates_with_events = set()
-            event_names = []
-            for event in raw_events[:20]:  # First 20 events
-                if isinstance(event, dict):
-                    event_date = event.get("event_date") or event.get("date") or "unknown"
-                    event_name = event.get("eventName") or event.get("name") or event.get("title") or "Unknown"
-                    dates_with_events.add(event_date)
-                    event_names.append(f"{event_name} ({event_date})")
-            logger.info(f"Events found on {len(dates_with_events)} different dates")
-            logger.info(f"Sample event names: {', '.join(event_names[:10])}")
-        else:
-            logger.warning(f"No events returned for range {start_date} to {end_date}")
-        
-        if raw_events:
-            # Log sample event structure
-            sample_event = raw_events[0]
-            logger.info(f"Sample event structure: {list(sample_event.keys()) if isinstance(sample_event, dict) else type(sample_event)}")
-            logger.info(f"Sample event data: {sample_event}")
-        else:
-            logger.warning(f"No events found in range {start_date} to {end_date}. This might indicate:")
-            logger.warning("1. No events registered in Garmin Connect for this date range")
-            logger.warning("2. API response structure is different than expected")
-            logger.warning("3. Events are stored in a different key than we're checking")
+        logger.info(
+            f"Retrieved {len(raw_events)} unique Garmin events for {start_date} to {end_date}"
+        )
 
         # Parse events and extract race-like information
         parsed_events: list[GarminEventResponse] = []
@@ -490,9 +438,6 @@ async def get_garmin_events(
                 if not isinstance(event, dict):
                     continue
                 
-                # Log raw event for debugging
-                logger.debug(f"Parsing event: {list(event.keys())}")
-                
                 # Extract event information (structure may vary)
                 # Try multiple possible field names
                 event_date = (
@@ -764,8 +709,7 @@ async def import_race_from_garmin(
     distance_km, distance_label = distance_map[distance]
 
     try:
-        adapter = GarminConnectAdapter()
-        adapter.restore_session(garmin_session.session_data)
+        adapter = await get_garmin_pool().acquire(current_user.id, garmin_session.session_data)
 
         predictions_data = adapter.get_race_predictions()
         goal_time_seconds = None
@@ -5,7 +5,6 @@ import logging
 import secrets
 import time
 from datetime import datetime, timezone
-from pathlib import Path
 from typing import Annotated, Optional
 
 import httpx
@@ -23,6 +22,7 @@ from app.models.activity import Activity
 from app.models.strava import StravaActivityMap, StravaSession, StravaSyncState
 from app.models.user import User
 from app.observability import get_metrics_backend
+from app.services.fit_blob_store import get_fit_blob_store
 
 router = APIRouter()
 settings = get_settings()
@@ -851,18 +851,18 @@ async def upload_single_activity(
         )
 
     # Check if FIT file exists
-    if not activity.has_fit_file or not activity.fit_file_path:
+    if not activity.has_fit_file:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Activity does not have a FIT file for upload",
         )
 
-    # Upload to Strava
-    fit_path = Path(activity.fit_file_path)
-    if not fit_path.exists():
+    # Local disk / cache first, then R2 and DB blobs
+    fit_data = await get_fit_blob_store().get(db, activity)
+    if fit_data is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="FIT file not found on disk",
+            detail="FIT file not found in storage",
         )
 
     # Ensure token is valid (refresh if needed, with 5-min buffer)
@@ -873,23 +873,24 @@ async def upload_single_activity(
     upload_status_code = 500
     try:
         async with httpx.AsyncClient() as client:
-            with fit_path.open("rb") as f:
-                files = {"file": (fit_path.name, f, "application/octet-stream")}
-                data = {
-                    "data_type": "fit",
-                    "name": activity.name or f"Run {activity.start_time.strftime('%Y-%m-%d')}",
-                    "activity_type": "run",
-                }
-                response = await client.post(
-                    f"{settings.strava_api_base_url}/uploads",
-                    headers={"Authorization": f"Bearer {_decrypt_token(session.access_token)}"},
-                    files=files,
-                    data=data,
-                    timeout=60.0,
-                )
-                upload_status_code = response.status_code
-                response.raise_for_status()
-                upload_result = response.json()
+            files = {
+                "file": (f"activity_{activity.garmin_id}.fit", fit_data, "application/octet-stream")
+            }
+            data = {
+                "data_type": "fit",
+                "name": activity.name or f"Run {activity.start_time.strftime('%Y-%m-%d')}",
+                "activity_type": "run",
+            }
+            response = await client.post(
+                f"{settings.strava_api_base_url}/uploads",
+                headers={"Authorization": f"Bearer {_decrypt_token(session.access_token)}"},
+                files=files,
+                data=data,
+                timeout=60.0,
+            )
+            upload_status_code = response.status_code
+            response.raise_for_status()
+            upload_result = response.json()
 
         # Strava returns upload_id, activity_id comes later
         # We'll store the upload_id temporarily and poll for completion
@@ -11,7 +11,7 @@ import logging
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from pydantic import BaseModel, Field
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -19,9 +19,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import get_settings
 from app.core.database import get_db
 from app.core.hybrid_auth import get_current_user
+from app.core.queue import get_arq_pool, has_live_worker
 from app.models.activity import Activity
 from app.models.user import User
+from app.services.fit_compression import CODEC_ZSTD, detect_codec
+from app.services.fit_ingest import ANALYZE_FIT_TASK_NAME, run_fit_ingest
 from app.services.r2_storage import R2StorageService, get_r2_service
+from app.services.storage_accounting import account_object, get_usage, release_object
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -73,6 +77,9 @@ class StorageStatsResponse(BaseModel):
     free_tier_limit_gb: int
     free_tier_used_percent: float
     free_tier_remaining_gb: float
+    original_size_mb: float = 0.0
+    compression_saved_percent: float = 0.0
+    reconciled_at: Optional[str] = None
 
 
 # ======================
@@ -182,6 +189,7 @@ async def generate_upload_url(
 @router.post("/complete", response_model=UploadCompleteResponse)
 async def confirm_upload_complete(
     request: UploadCompleteRequest,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
     r2: R2StorageService = Depends(get_r2_service)
@@ -189,10 +197,12 @@ async def confirm_upload_complete(
     """Confirm FIT file upload completion and trigger analysis.
 
     Call this endpoint after successfully uploading to the presigned URL.
-    It updates the activity status and optionally queues analysis.
+    It updates the activity status and queues analysis on the FIT ingest
+    worker, or runs it in this process when no worker is alive.
 
     Args:
         request: Upload completion details
+        background_tasks: Runs the analysis here when no worker is alive
         current_user: Authenticated user
         db: Database session
         r2: R2 storage service
@@ -226,6 +236,8 @@ async def confirm_upload_complete(
     activity.storage_metadata = metadata
     activity.has_fit_file = True
     activity.fit_file_size = request.file_size
+    # The uploaded object's size; analysis later records the decompressed size
+    await account_object(db, activity, stored_size=request.file_size)
 
     await db.commit()
 
@@ -234,24 +246,30 @@ async def confirm_upload_complete(
         f"user={current_user.id}"
     )
 
-    # Try to enqueue async analysis job
+    # Try to enqueue async analysis job on the shared pool.
+    # The job id is keyed by the upload checksum so a retried /complete call
+    # for the same file does not queue a second analysis.
     job_id = None
-    try:
-        from arq import create_pool
-        from arq.connections import RedisSettings
-
-        redis_settings = RedisSettings.from_dsn(settings.redis_url)
-        pool = await create_pool(redis_settings)
-        job = await pool.enqueue_job(
-            'analyze_fit',
-            activity_id=activity.id,
-            user_id=current_user.id
-        )
-        job_id = job.job_id if job else None
-        logger.info(f"Enqueued analysis job: job_id={job_id}, activity={activity.id}")
-    except Exception as e:
-        logger.warning(f"Failed to enqueue analysis job: {e}")
-        # Continue without async processing - analysis can be triggered later
+    queued = False
+    pool = await get_arq_pool()
+    if pool is not None and await has_live_worker(pool, settings.fit_ingest_queue_name):
+        try:
+            job = await pool.enqueue_job(
+                ANALYZE_FIT_TASK_NAME,
+                activity_id=activity.id,
+                user_id=current_user.id,
+                _job_id=f"analyze-fit:{activity.id}:{request.checksum or request.file_size}",
+                _queue_name=settings.fit_ingest_queue_name,
+            )
+            queued = True
+            job_id = job.job_id if job else None
+            logger.info(f"Enqueued analysis job: job_id={job_id}, activity={activity.id}")
+        except Exception as e:
+            logger.warning(f"Failed to enqueue analysis job: {e}")
+    if not queued:
+        # No queue or no worker (Redis down, local dev): analyze in this process instead
+        logger.warning(f"No FIT ingest worker running; analyzing activity {activity.id} in-process")
+        background_tasks.add_task(run_fit_ingest, activity.id, current_user.id)
 
     return UploadCompleteResponse(
         status="uploaded",
@@ -299,11 +317,24 @@ async def get_download_url(
             detail="FIT file not found in cloud storage"
         )
 
+    # Dictionary-compressed objects can't be decoded by clients: serve them
+    # decompressed through the API instead of a presigned URL. The codec is
+    # read from the object itself (client uploads carry no codec metadata)
+    prefix = await r2.read_prefix(activity.r2_key)
+    if prefix and detect_codec(prefix) == CODEC_ZSTD:
+        return {
+            'download_url': f"{settings.api_prefix}/activities/{activity_id}/fit",
+            'expires_in': None,
+            'content_type': 'application/octet-stream',
+            'file_size': activity.fit_file_size
+        }
+
     # Generate presigned download URL
     download_url = r2.generate_presigned_download_url(
         user_id=current_user.id,
         activity_id=activity_id,
-        expires_in=300  # 5 minutes
+        expires_in=300,  # 5 minutes
+        key=activity.r2_key,
     )
 
     if not download_url:
@@ -325,30 +356,38 @@ async def get_download_url(
 @router.get("/stats", response_model=StorageStatsResponse)
 async def get_storage_stats(
     current_user: User = Depends(get_current_user),
-    r2: R2StorageService = Depends(get_r2_service)
+    db: AsyncSession = Depends(get_db)
 ) -> StorageStatsResponse:
     """Get storage statistics for current user.
 
+    Reads the per-user counters maintained on upload/delete (and rebuilt by
+    the periodic reconciliation job) instead of listing the bucket.
+
     Args:
         current_user: Authenticated user
-        r2: R2 storage service
+        db: Database session
 
     Returns:
         Storage usage statistics including free tier information
     """
-    stats = await r2.get_storage_stats(user_id=current_user.id)
+    usage = await get_usage(db, current_user.id)
+    stored = usage.stored_bytes if usage else 0
+    original = usage.original_bytes if usage else 0
 
-    if 'error' in stats:
-        logger.warning(f"Error getting storage stats: {stats['error']}")
+    free_tier_gb = 10
+    total_gb = stored / (1024 ** 3)
 
     return StorageStatsResponse(
         user_id=current_user.id,
-        total_files=stats.get('total_files', 0),
-        total_size_mb=round(stats.get('total_size_mb', 0), 2),
-        total_size_gb=round(stats.get('total_size_gb', 0), 3),
-        free_tier_limit_gb=stats.get('free_tier_limit_gb', 10),
-        free_tier_used_percent=round(stats.get('free_tier_used_percent', 0), 2),
-        free_tier_remaining_gb=round(stats.get('free_tier_remaining_gb', 10), 3)
+        total_files=usage.object_count if usage else 0,
+        total_size_mb=round(stored / (1024 ** 2), 2),
+        total_size_gb=round(total_gb, 3),
+        free_tier_limit_gb=free_tier_gb,
+        free_tier_used_percent=round((total_gb / free_tier_gb) * 100, 2),
+        free_tier_remaining_gb=round(max(0, free_tier_gb - total_gb), 3),
+        original_size_mb=round(original / (1024 ** 2), 2),
+        compression_saved_percent=round(usage.saved_bytes / original * 100, 1) if original else 0.0,
+        reconciled_at=usage.reconciled_at.isoformat() if usage and usage.reconciled_at else None,
     )
 
 
@@ -393,11 +432,13 @@ async def delete_fit_file(
     # Delete from R2
     deleted = await r2.delete_fit(
         user_id=current_user.id,
-        activity_id=activity_id
+        activity_id=activity_id,
+        key=activity.r2_key,
     )
 
     if deleted:
         # Update activity
+        await release_object(db, activity)
         old_key = activity.r2_key
         activity.r2_key = None
         activity.has_fit_file = False
@@ -12,6 +12,7 @@ from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.auth_cache import get_auth_cache
 from app.core.clerk_auth import verify_webhook_signature
 from app.core.config import get_settings
 from app.core.database import get_db
@@ -94,6 +95,7 @@ async def handle_clerk_webhook(
             )
         elif event_type == "user.updated":
             await _handle_user_updated(db, event_data)
+            await get_auth_cache().invalidate(clerk_user_ids=[clerk_user_id])
             CloudMigrationDebug.log_webhook_event(
                 event_type=event_type,
                 clerk_user_id=clerk_user_id,
@@ -101,6 +103,8 @@ async def handle_clerk_webhook(
             )
         elif event_type == "user.deleted":
             await _handle_user_deleted(db, clerk_user_id)
+            # Tokens issued before the deletion must stop authenticating now
+            await get_auth_cache().invalidate(clerk_user_ids=[clerk_user_id])
             CloudMigrationDebug.log_webhook_event(
                 event_type=event_type,
                 clerk_user_id=clerk_user_id,
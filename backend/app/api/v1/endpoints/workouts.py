@@ -12,7 +12,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.api.v1.endpoints.auth import get_current_user
-from app.adapters.garmin_adapter import GarminAuthError, GarminConnectAdapter, GarminAPIError
+from app.adapters.garmin_adapter import GarminAuthError, GarminAPIError
+from app.adapters.garmin_pool import get_garmin_pool
 from app.core.database import get_db
 from app.models.garmin import GarminSession
 from app.models.user import User
@@ -378,9 +379,8 @@ async def push_to_garmin(
             detail="Garmin account not connected",
         )
 
-    adapter = GarminConnectAdapter()
     try:
-        adapter.restore_session(session.session_data)
+        adapter = await get_garmin_pool().acquire(current_user.id, session.session_data)
     except GarminAuthError as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -908,9 +908,8 @@ async def list_garmin_workouts(
     )
     imported_ids = {row[0] for row in imported_result.all()}
 
-    adapter = GarminConnectAdapter()
     try:
-        adapter.restore_session(session.session_data)
+        adapter = await get_garmin_pool().acquire(current_user.id, session.session_data)
     except GarminAuthError as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -992,9 +991,8 @@ async def import_garmin_workouts(
     )
     imported_ids = {row[0] for row in imported_result.all()}
 
-    adapter = GarminConnectAdapter()
     try:
-        adapter.restore_session(session.session_data)
+        adapter = await get_garmin_pool().acquire(current_user.id, session.session_data)
     except GarminAuthError as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1111,9 +1109,8 @@ async def refresh_from_garmin(
             detail="Garmin account not connected",
         )
 
-    adapter = GarminConnectAdapter()
     try:
-        adapter.restore_session(session.session_data)
+        adapter = await get_garmin_pool().acquire(current_user.id, session.session_data)
     except GarminAuthError as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1188,9 +1185,8 @@ async def get_garmin_workout_raw(
             detail="Garmin account not connected",
         )
 
-    adapter = GarminConnectAdapter()
     try:
-        adapter.restore_session(session.session_data)
+        adapter = await get_garmin_pool().acquire(current_user.id, session.session_data)
     except GarminAuthError as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
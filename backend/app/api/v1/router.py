@@ -28,6 +28,8 @@ Activities:
   GET    /api/v1/activities/{id}         - 활동 상세
   GET    /api/v1/activities/{id}/samples - 활동 샘플 (초 단위)
   GET    /api/v1/activities/{id}/fit     - FIT 파일 다운로드
+  GET    /api/v1/activities/fit-archive/export - 전체 FIT ZIP 다운로드 (스트리밍)
+  POST   /api/v1/activities/fit-archive/import - FIT ZIP 일괄 가져오기
   GET    /api/v1/activities/types/list   - 활동 타입 목록
   GET    /api/v1/activities/{id}/hr-zones - 심박 존 분석
   GET    /api/v1/activities/{id}/laps    - 랩 데이터
@@ -0,0 +1,283 @@
+"""Short-lived cache of verified Clerk JWTs and the users they resolve to.
+
+Every authenticated request used to verify the JWT (RSA signature check)
+and look the user up by ``clerk_user_id`` before the endpoint ran; the
+dashboard fires 6-10 requests in parallel with the same token. The cache
+keeps, per token (keyed by its SHA-256), the decoded claims and a snapshot
+of the user's columns for AUTH_CACHE_TTL_SECONDS, never past the token's
+``exp``. A hit re-attaches the snapshot to the request's session with
+``merge(load=False)``, so no query is issued and the endpoint still gets a
+persistent ``User`` it can modify and commit.
+
+Entries are dropped when the user changes:
+
+- Clerk ``user.updated`` / ``user.deleted`` webhooks invalidate by Clerk id.
+- Any committed update or delete of a ``User`` row invalidates by user id
+  (profile edits, max HR from Garmin sync...).
+
+The cache lives in each process; invalidations are broadcast on the Redis
+channel ``auth:invalidate`` so every API worker drops its copies.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.config import get_settings
+from app.core.session import get_redis
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+INVALIDATION_CHANNEL = "auth:invalidate"
+
+
+@dataclass
+class CachedAuth:
+    """Verified claims and user snapshot for one token."""
+
+    claims: dict[str, Any]
+    user_snapshot: dict[str, Any]
+    expires_at: float
+
+    @property
+    def user_id(self) -> int:
+        return self.user_snapshot["id"]
+
+    @property
+    def clerk_user_id(self) -> Optional[str]:
+        return self.claims.get("sub")
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _snapshot(user: User) -> Optional[dict[str, Any]]:
+    """Loaded column values (None if any would need a lazy load)."""
+    loaded = inspect(user).dict
+    keys = [attr.key for attr in User.__mapper__.column_attrs]
+    if any(key not in loaded for key in keys):
+        return None
+    return {key: loaded[key] for key in keys}
+
+
+class AuthCache:
+    """Process-local token cache with cross-process invalidation."""
+
+    def __init__(
+        self,
+        redis_client: Any = None,
+        use_redis: bool = True,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            redis_client: Redis client (default: the shared client from ``get_redis``).
+            use_redis: False disables the invalidation broadcast (tests, scripts).
+            ttl_seconds: Entry lifetime (default AUTH_CACHE_TTL_SECONDS).
+            max_entries: Least recently used entries are evicted above this.
+        """
+        self._redis = redis_client
+        self._use_redis = use_redis
+        self.ttl_seconds = (
+            settings.auth_cache_ttl_seconds if ttl_seconds is None else ttl_seconds
+        )
+        self.max_entries = max_entries or settings.auth_cache_max_entries
+        self._entries: OrderedDict[str, CachedAuth] = OrderedDict()
+        self._listener: Optional[asyncio.Task] = None
+        self._broadcasts: set[asyncio.Task] = set()
+
+    async def _client(self) -> Any:
+        if not self._use_redis:
+            return None
+        if self._redis is None:
+            self._redis = await get_redis()
+        return self._redis
+
+    # ---------------------------------------------------------------------
+    # Lookup
+    # ---------------------------------------------------------------------
+
+    def get(self, token: str) -> Optional[CachedAuth]:
+        """Return the cached entry for a token, if still valid."""
+        if self.ttl_seconds <= 0:
+            return None
+        key = _token_key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, token: str, claims: dict[str, Any], user: User) -> None:
+        """Cache a verified token and the user it resolved to."""
+        if self.ttl_seconds <= 0:
+            return
+        snapshot = _snapshot(user)
+        if snapshot is None or snapshot["id"] is None:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if claims.get("exp"):
+            expires_at = min(expires_at, float(claims["exp"]))
+        key = _token_key(token)
+        self._entries[key] = CachedAuth(claims, snapshot, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def resolve(
+        self, token: str, db: AsyncSession
+    ) -> Optional[tuple[dict[str, Any], User]]:
+        """Claims and a session-bound user for a cached token, without a query.
+
+        Returns:
+            ``(claims, user)`` on a hit, otherwise None.
+        """
+        await self.ensure_listener()
+        entry = self.get(token)
+        if entry is None:
+            return None
+
+        # Build a clean detached instance, then attach it as if just loaded
+        user = User.__mapper__.class_manager.new_instance()
+        for key, value in copy.deepcopy(entry.user_snapshot).items():
+            set_committed_value(user, key, value)
+        make_transient_to_detached(user)
+        return entry.claims, await db.merge(user, load=False)
+
+    # ---------------------------------------------------------------------
+    # Invalidation
+    # ---------------------------------------------------------------------
+
+    def invalidate_local(self, user_ids: Any = (), clerk_user_ids: Any = ()) -> int:
+        """Drop this process's entries for the given users; returns the number dropped."""
+        user_ids, clerk_user_ids = set(user_ids), set(clerk_user_ids)
+        stale = [
+            key
+            for key, entry in self._entries.items()
+            if entry.user_id in user_ids or entry.clerk_user_id in clerk_user_ids
+        ]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    async def invalidate(
+        self,
+        user_ids: Any = (),
+        clerk_user_ids: Any = (),
+    ) -> None:
+        """Drop entries for the given users in every process."""
+        user_ids, clerk_user_ids = list(user_ids), list(clerk_user_ids)
+        if not (user_ids or clerk_user_ids):
+            return
+        self.invalidate_local(user_ids, clerk_user_ids)
+        client = await self._client()
+        if client is None:
+            return
+        try:
+            await client.publish(
+                INVALIDATION_CHANNEL,
+                json.dumps({"user_ids": user_ids, "clerk_user_ids": clerk_user_ids}),
+            )
+        except RedisError as e:
+            logger.warning(f"Failed to broadcast auth cache invalidation: {e}")
+
+    def invalidate_soon(self, user_ids: Any = (), clerk_user_ids: Any = ()) -> None:
+        """Invalidate locally now and broadcast from a background task (sync callers)."""
+        self.invalidate_local(user_ids, clerk_user_ids)
+        try:
+            task = asyncio.get_running_loop().create_task(
+                self.invalidate(user_ids, clerk_user_ids)
+            )
+        except RuntimeError:
+            return  # No loop (sync scripts): only this process had entries
+        self._broadcasts.add(task)
+        task.add_done_callback(self._broadcasts.discard)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def ensure_listener(self) -> None:
+        """Start the invalidation subscriber for this process (once)."""
+        if self._listener is not None and not self._listener.done():
+            return
+        client = await self._client()
+        if client is None:
+            return
+        self._listener = asyncio.create_task(self._listen(client))
+
+    async def _listen(self, client: Any) -> None:
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                data = json.loads(message["data"])
+                self.invalidate_local(
+                    data.get("user_ids", ()), data.get("clerk_user_ids", ())
+                )
+        except RedisError as e:
+            # Without the subscriber, entries may outlive a change by one TTL
+            logger.warning(f"Auth cache invalidation listener stopped: {e}")
+            self.clear()
+        finally:
+            await pubsub.aclose()
+
+
+_cache: Optional[AuthCache] = None
+
+
+def get_auth_cache() -> AuthCache:
+    """Get singleton auth cache instance."""
+    global _cache
+    if _cache is None:
+        _cache = AuthCache()
+    return _cache
+
+
+# -------------------------------------------------------------------------
+# Invalidate on committed User changes
+# -------------------------------------------------------------------------
+
+_CHANGED_USERS = "auth_cache_changed_users"
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _record_user_change(mapper: Any, connection: Any, target: User) -> None:
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault(_CHANGED_USERS, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    user_ids = session.info.pop(_CHANGED_USERS, None)
+    if not user_ids:
+        return
+    get_auth_cache().invalidate_soon(user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session: Session) -> None:
+    session.info.pop(_CHANGED_USERS, None)
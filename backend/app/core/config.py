@@ -64,6 +64,12 @@ class Settings(BaseSettings):
     garmin_backfill_days: int = 0  # 0 = full history
     garmin_safety_window_days: int = 3
     garmin_max_consecutive_empty: int = 30  # Stop backfill after N empty days
+    garmin_pool_max_entries: int = 500  # Warm per-user adapters kept per process
+    garmin_pool_idle_seconds: int = 1800  # Drop adapters unused for this long
+    garmin_pool_refresh_margin_seconds: int = 300  # Refresh access tokens expiring within this window
+    garmin_pool_refresh_interval_seconds: int = 120  # Background refresh/write-back cadence
+    garmin_events_cache_ttl_seconds: int = 6 * 60 * 60  # Per-day all-day events cache
+    garmin_events_fetch_concurrency: int = 4  # Parallel day requests per range fetch
 
     # FIT Storage (default to ./data/fit for local dev, override in production)
     fit_storage_path: str = "./data/fit_files"
@@ -116,6 +122,26 @@ class Settings(BaseSettings):
     # AI Coach settings
     ai_default_language: str = "ko"
     ai_max_history_messages: int = 20
+
+    # AI prompt assembly (token budget per turn)
+    ai_prompt_max_input_tokens: int = 8000  # Upper bound on input tokens sent per turn
+    ai_history_verbatim_messages: int = 8  # Most recent turns sent verbatim
+    ai_history_summary_min_messages: int = 6  # Older turns needed before re-summarizing
+    ai_history_summary_max_tokens: int = 400  # Max length of the rolling history summary
+    ai_context_max_tokens: int = 1500  # Max tokens for the rendered training context block
+    ai_context_cache_ttl_seconds: int = 86400  # Rendered context cache (also keyed by last sync)
+    ai_provider_cache_enabled: bool = True  # Gemini context caching for the static system prompt
+    ai_provider_cache_ttl_seconds: int = 3600
+
+    # AI generation worker (plan/workout jobs on ARQ)
+    ai_generation_queue_name: str = "ai_generation"
+    ai_generation_concurrency: int = 4  # Concurrent LLM calls per worker
+    ai_generation_job_timeout_seconds: int = 600
+    ai_generation_max_attempts: int = 3
+    ai_generation_offpeak_hour_utc: int = 18  # 03:00 KST - off-peak batch window
+    ai_generation_batch_size: int = 50  # Jobs enqueued per sweep
+    ai_generation_stale_seconds: int = 900  # Re-enqueue queued/running jobs older than this
+
     ai_snapshot_weeks: int = 12  # Training snapshot window
     ai_snapshot_recovery_days: int = 7  # Recovery period
     ai_default_interval_pace: int = 270  # 4:30/km in seconds (user-adjustable)
@@ -135,11 +161,18 @@ class Settings(BaseSettings):
     rag_top_k: int = 3
     rag_min_score: float = 0.3
     rag_max_context_length: int = 3000
+    rag_index_reload_interval_seconds: int = 60  # Check for a rebuilt index (0 = disabled)
 
     # Embedding settings (for RAG)
-    embedding_provider: str = "google"  # "google" or "openai"
+    embedding_provider: str = "google"  # "google", "openai" or "local"
     google_embedding_model: str = "text-embedding-004"
     openai_embedding_model: str = "text-embedding-3-small"
+    # Local CPU embeddings (requires fastembed; works offline)
+    local_embedding_model: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    local_embedding_cache_dir: Optional[str] = None  # Pre-downloaded model dir for air-gapped hosts
+    local_embedding_threads: Optional[int] = None  # onnxruntime threads (None = all cores)
+    local_embedding_batch_window_ms: float = 2.0  # Coalesce concurrent queries within this window
+    local_embedding_max_batch: int = 32
 
     # Localization
     default_timezone: str = "Asia/Seoul"
@@ -156,6 +189,18 @@ class Settings(BaseSettings):
     strava_upload_concurrency: int = 3  # Max concurrent uploads
     strava_upload_retry_delays: str = "60,300,1800,7200"  # Retry delays in seconds (1m, 5m, 30m, 2h)
     strava_upload_max_retries: int = 4
+    strava_upload_queue_name: str = "strava_uploads"
+    strava_upload_batch_size: int = 50  # Ready jobs claimed per drain round
+    strava_upload_drain_seconds: int = 100  # Max time one pending-uploads run keeps draining (cron is every 2 min)
+    strava_upload_stale_seconds: int = 900  # UPLOADING jobs older than this are reclaimed (> worker job_timeout)
+    strava_upload_poll_initial_seconds: float = 1.0  # First upload status poll delay (doubles each attempt)
+    strava_upload_poll_max_seconds: float = 16.0
+    strava_upload_poll_attempts: int = 8
+    strava_rate_limit_15min: int = 200  # Defaults until Strava reports the app's real limits
+    strava_rate_limit_daily: int = 2000
+    strava_rate_limit_reserve: int = 10  # Requests per window left for interactive API calls
+    strava_rate_limit_max_wait_seconds: float = 30.0  # Longer waits reschedule the job instead
+    strava_http_max_connections: int = 20  # Shared upload client pool size
 
     # Runalyze
     runalyze_api_token: Optional[str] = None
@@ -168,9 +213,27 @@ class Settings(BaseSettings):
     sync_lock_ttl_seconds: int = 300  # 5 minutes (short TTL, extended during active sync)
     sync_lock_extension_interval: int = 60  # Extend lock every 1 minute during sync
     sync_stale_threshold_seconds: int = 600  # 10 minutes - consider sync stale after this
+    sync_status_ttl_seconds: int = 7 * 24 * 3600  # Keep the last run's status/results this long
+    sync_trace_history_size: int = 20  # Stage-timing traces of recent runs kept per user
+    sync_events_keepalive_seconds: int = 15  # SSE keepalive comment interval
+    sync_upsert_batch_size: int = 100  # Days of raw events per multi-row upsert batch
+    garmin_adaptive_cadence: bool = True  # Back off endpoints whose payloads stopped changing
+    garmin_cadence_base_minutes: int = 60  # Skip window after one unchanged run (doubles per run)
+    garmin_cadence_max_minutes: int = 3 * 24 * 60  # Longest an endpoint is skipped
+
+    # Garmin sync worker (ARQ)
+    garmin_sync_queue_name: str = "garmin_sync"
+    garmin_sync_concurrency: int = 4  # Users synced against Garmin at once
+    garmin_sync_job_timeout_seconds: int = 3600  # Full backfills can take a while
+    garmin_scheduled_sync_interval_minutes: int = 360  # Scheduled incremental sync cadence (0 = off)
+    garmin_scheduled_sync_batch_size: int = 20  # Users enqueued per scheduler run (every 10 min)
 
     # Observability
     metrics_backend: str = "inmemory"  # "inmemory" | "prometheus"
+    request_log_sample_rate: float = 1.0  # Share of fast successful requests logged
+    request_log_slow_ms: float = 1000.0  # Requests at least this slow are always logged
+    db_query_profiling: bool = True  # Per-request SQL count/time in metrics and request logs
+    db_n_plus_one_threshold: int = 10  # Flag requests repeating one statement shape more often
     otel_enabled: bool = False
     otel_service_name: str = "runningcoach-api"
     otel_exporter_otlp_endpoint: Optional[str] = None
@@ -188,6 +251,8 @@ class Settings(BaseSettings):
     clerk_publishable_key: Optional[str] = None
     clerk_secret_key: Optional[str] = None
     clerk_webhook_secret: Optional[str] = None
+    auth_cache_ttl_seconds: int = 60  # Verified-JWT cache lifetime (capped by the token's exp; 0 = off)
+    auth_cache_max_entries: int = 10_000
 
     @property
     def clerk_frontend_api(self) -> Optional[str]:
@@ -256,6 +321,44 @@ class Settings(BaseSettings):
     r2_access_key: Optional[str] = None
     r2_secret_key: Optional[str] = None
     r2_bucket_name: str = "fit-files"
+    r2_executor_workers: int = 16  # Threads for blocking boto3 calls (max concurrent R2 requests)
+    r2_max_pool_connections: int = 32  # HTTP connection pool (executor threads + multipart parts)
+    r2_stream_chunk_bytes: int = 256 * 1024  # Chunk size for streamed downloads
+    r2_multipart_threshold_bytes: int = 8 * 1024 * 1024  # Use multipart upload at/above this size
+    r2_multipart_chunk_bytes: int = 8 * 1024 * 1024
+    r2_multipart_concurrency: int = 4  # Parallel part uploads per object
+    storage_reconcile_hour_utc: int = 4  # Daily bucket walk that rebuilds the storage usage counters
+
+    # FIT ingest worker (analyze_fit jobs for presigned R2 uploads)
+    fit_ingest_queue_name: str = "fit_ingest"
+    fit_ingest_concurrency: int = 4  # Concurrent analyze_fit jobs per worker
+    fit_ingest_job_timeout_seconds: int = 300
+    fit_ingest_max_bytes: int = 50 * 1024 * 1024  # Reject FIT files larger than this (decompressed)
+    fit_ingest_fitness_backfill_days: int = 60  # Max days of CTL/ATL recomputed after a backdated upload
+
+    # Stored FIT compression. zstd + trained dictionary is opt-in: set "zstd" and install
+    # the optional zstandard package (requirements.txt)
+    fit_compression_codec: str = "gzip"  # "gzip" or "zstd" for newly written objects
+    fit_zstd_level: int = 9
+    fit_zstd_dict_size: int = 112 * 1024  # Trained dictionary size in bytes
+    fit_zstd_dict_refresh_seconds: int = 300  # How often the active dictionary id is re-read
+    fit_recompress_batch_size: int = 100
+    fit_recompress_concurrency: int = 4
+
+    # Tiered FIT blob store (local LRU disk cache in front of R2/DB)
+    fit_cache_dir: Optional[str] = None  # Default: <fit_storage_path>/.cache
+    fit_cache_max_bytes: int = 1024 * 1024 * 1024  # Evict least recently used files above this
+
+    # Raw Garmin event archive (deduplicated, compressed, old bodies moved to R2)
+    raw_event_zstd_level: int = 9
+    raw_event_cold_after_days: int = 90  # Move bodies fetched longer ago to R2 (0 = keep in the database)
+    raw_event_archive_batch_size: int = 500
+    raw_event_archive_max_seconds: int = 240  # Per run of the hourly archive job (stays under the job timeout)
+
+    # Bulk FIT archive export/import (streaming ZIP)
+    fit_archive_compresslevel: int = 6  # Deflate level for exported archives
+    fit_archive_import_concurrency: int = 4  # Parallel FIT parses during import
+    fit_archive_max_import_bytes: int = 2 * 1024 * 1024 * 1024  # Reject larger uploaded archives
 
     @property
     def r2_endpoint_url(self) -> Optional[str]:
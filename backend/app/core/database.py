@@ -1,7 +1,23 @@
-"""Database configuration and session management."""
+"""Database configuration and session management.
 
+Query profiling: when DB_QUERY_PROFILING is on, engine events record every
+statement into the ``QueryStats`` of the current request (set by
+``RequestLoggingMiddleware``): statement count, total DB time, the slowest
+statement, and how often each statement shape repeated, which flags likely
+N+1 loops. Code running outside a request (workers, scripts) is not
+profiled.
+"""
+
+import re
+import time
+from collections import Counter
 from collections.abc import AsyncGenerator
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Optional
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
@@ -26,6 +42,83 @@ async_session_maker = async_sessionmaker(
 )
 
 
+# -------------------------------------------------------------------------
+# Query profiling
+# -------------------------------------------------------------------------
+
+# Literals and IN-list lengths vary between otherwise identical statements
+# A bind placeholder (qmark, pyformat, numeric, named), optionally with an
+# asyncpg-style cast such as ``$1::INTEGER`` or ``$2::VARCHAR(255)``
+_PLACEHOLDER = r"(?:[?]|%\(\w+\)s|\$\d+|:\w+)(?:::\w+(?: \w+)*(?:\(\d+(?:,\s*\d+)?\))?(?:\[\])?)?"
+
+_SHAPE_PATTERNS = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)"), "(?)"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+@lru_cache(maxsize=1024)
+def statement_shape(statement: str) -> str:
+    """Normalize a SQL statement so repeats of the same query compare equal.
+
+    Memoized: compiled statements are cached by SQLAlchemy, so the same
+    strings come back on every request.
+    """
+    for pattern, replacement in _SHAPE_PATTERNS:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+@dataclass
+class QueryStats:
+    """SQL statements issued while serving one request."""
+
+    count: int = 0
+    total_ms: float = 0.0
+    slowest_ms: float = 0.0
+    slowest_statement: Optional[str] = None
+    shapes: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        if duration_ms > self.slowest_ms:
+            self.slowest_ms = duration_ms
+            self.slowest_statement = statement
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement shapes issued more than ``threshold`` times (likely N+1)."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+
+query_stats_ctx: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if query_stats_ctx.get() is not None:
+        context._query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = query_stats_ctx.get()
+    started_at: Any = getattr(context, "_query_started_at", None)
+    if stats is not None and started_at is not None:
+        stats.record(statement, (time.perf_counter() - started_at) * 1000)
+
+
+def install_query_profiling(target: Any) -> None:
+    """Attach the profiling listeners to a (sync) engine."""
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+
+
+if settings.db_query_profiling:
+    install_query_profiling(engine.sync_engine)
+
+
 class Base(DeclarativeBase):
     """Base class for all database models."""
 
@@ -7,6 +7,9 @@ This module provides authentication dependencies that work with both:
 The authentication method is determined automatically based on:
 - Presence of Bearer token (Clerk JWT)
 - Presence of session cookie (local session)
+
+Verified Clerk tokens are cached briefly (``app.core.auth_cache``) so
+parallel requests with the same token skip verification and the user lookup.
 """
 
 import logging
@@ -17,6 +20,7 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.auth_cache import get_auth_cache
 from app.core.config import get_settings
 from app.core.database import get_db
 from app.core.debug_utils import CloudMigrationDebug
@@ -57,6 +61,13 @@ async def get_current_user_hybrid(
             from app.core.clerk_auth import ClerkAuth
 
             token = credentials.credentials
+            auth_cache = get_auth_cache()
+            cached = await auth_cache.resolve(token, db)
+            if cached:
+                _, user = cached
+                logger.debug(f"Authenticated via cached Clerk JWT: user_id={user.id}")
+                return user
+
             payload = await ClerkAuth.verify_token(token)
             clerk_user_id = payload.get("sub")
 
@@ -72,6 +83,7 @@ async def get_current_user_hybrid(
                         user_id=user.id,
                         clerk_user_id=clerk_user_id,
                     )
+                    auth_cache.put(token, payload, user)
                     return user
 
                 # Auto-create user on first Clerk login or link to existing account
@@ -101,6 +113,7 @@ async def get_current_user_hybrid(
                             user_id=existing_user.id,
                             clerk_user_id=clerk_user_id,
                         )
+                        auth_cache.put(token, payload, existing_user)
                         return existing_user
 
                     # Create new user
@@ -123,6 +136,7 @@ async def get_current_user_hybrid(
                         user_id=user.id,
                         clerk_user_id=clerk_user_id,
                     )
+                    auth_cache.put(token, payload, user)
                     return user
 
         except HTTPException:
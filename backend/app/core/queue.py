@@ -0,0 +1,114 @@
+"""Shared ARQ connection pool for enqueueing background jobs.
+
+API processes reuse a single pool instead of opening a Redis connection per
+request. Returns None when Redis is unavailable so callers can fall back to
+the scheduled sweeps in the workers.
+"""
+
+import asyncio
+import logging
+from collections.abc import Iterable
+from typing import Any, Optional
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_arq_pool: Optional[Any] = None
+
+
+async def get_arq_pool() -> Optional[Any]:
+    """Get the shared ARQ Redis pool.
+
+    Returns:
+        ArqRedis pool or None if Redis is unavailable.
+    """
+    global _arq_pool
+
+    if _arq_pool is None:
+        try:
+            from arq import create_pool
+            from arq.connections import RedisSettings
+
+            redis_settings = RedisSettings.from_dsn(settings.redis_url)
+            redis_settings.conn_retries = (
+                1  # Don't stall requests/startup when Redis is down
+            )
+            _arq_pool = await create_pool(redis_settings)
+        except Exception as e:
+            logger.warning(f"ARQ pool unavailable: {e}")
+            return None
+
+    return _arq_pool
+
+
+async def close_arq_pool() -> None:
+    """Close the shared ARQ pool (application shutdown)."""
+    global _arq_pool
+    if _arq_pool is not None:
+        try:
+            await _arq_pool.close()
+        except Exception as e:
+            logger.warning(f"Error closing ARQ pool: {e}")
+        finally:
+            _arq_pool = None
+
+
+async def has_live_worker(pool: Any, queue_name: str) -> bool:
+    """Check whether a worker is consuming ``queue_name``.
+
+    ARQ workers refresh ``<queue>:health-check`` every
+    ``health_check_interval`` seconds with a slightly longer expiry, so the
+    key disappears shortly after the last worker stops.
+
+    Returns:
+        True if the health-check key exists; False if not or Redis fails.
+    """
+    from arq.constants import health_check_key_suffix
+
+    try:
+        return bool(await pool.exists(queue_name + health_check_key_suffix))
+    except Exception as e:
+        logger.warning(f"Could not check {queue_name} worker health: {e}")
+        return False
+
+
+async def enqueue_jobs_bulk(
+    pool: Any,
+    function: str,
+    jobs: Iterable[tuple[str, dict[str, Any]]],
+    queue_name: Optional[str] = None,
+    concurrency: int = 20,
+) -> int:
+    """Enqueue many ARQ jobs with their round-trips overlapped.
+
+    Each job goes through ``ArqRedis.enqueue_job`` (so ARQ's own checks
+    apply: a job id that is queued, running, or finished within
+    ``keep_result`` is not queued again), but up to ``concurrency`` of them
+    are in flight at once instead of one after another. Callers should pass
+    deterministic job ids.
+
+    Args:
+        pool: ArqRedis pool.
+        function: Task function name.
+        jobs: (job id, keyword arguments) pairs.
+        queue_name: Target queue (default: the pool's default queue).
+        concurrency: Enqueue calls in flight at once.
+
+    Returns:
+        Number of jobs newly enqueued.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _enqueue(job_id: str, kwargs: dict[str, Any]) -> bool:
+        async with semaphore:
+            job = await pool.enqueue_job(
+                function, _job_id=job_id, _queue_name=queue_name, **kwargs
+            )
+        return job is not None
+
+    results = await asyncio.gather(
+        *(_enqueue(job_id, kwargs) for job_id, kwargs in jobs)
+    )
+    return sum(results)
@@ -8,6 +8,7 @@ from app.knowledge.models import DocumentChunk, RetrievalResult
 from app.knowledge.retriever import (
     get_knowledge_retriever,
     initialize_knowledge_retriever,
+    reload_knowledge_retriever,
     KnowledgeRetriever,
 )
 
@@ -17,4 +18,5 @@ __all__ = [
     "KnowledgeRetriever",
     "get_knowledge_retriever",
     "initialize_knowledge_retriever",
+    "reload_knowledge_retriever",
 ]
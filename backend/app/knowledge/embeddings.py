@@ -1,8 +1,10 @@
 """Embedding generation for knowledge base documents.
 
-Supports Google (text-embedding-004) and OpenAI (text-embedding-3-small) models.
+Supports Google (text-embedding-004) and OpenAI (text-embedding-3-small) models,
+plus a local CPU model (see app.knowledge.local_embeddings) for offline use.
 """
 
+import asyncio
 import logging
 from typing import TYPE_CHECKING
 
@@ -24,8 +26,8 @@ async def generate_embeddings(
 
     Args:
         texts: List of text strings to embed.
-        provider: Embedding provider ("google" or "openai").
-        api_key: API key for the provider.
+        provider: Embedding provider ("google", "openai" or "local").
+        api_key: API key for the provider (unused for "local").
         model: Model name to use (optional, uses defaults).
 
     Returns:
@@ -41,6 +43,10 @@ async def generate_embeddings(
         return await _generate_google_embeddings(texts, api_key, model)
     elif provider == "openai":
         return await _generate_openai_embeddings(texts, api_key, model)
+    elif provider == "local":
+        from app.knowledge.local_embeddings import embed_local
+
+        return await embed_local(texts, model=model)
     else:
         raise ValueError(f"Unsupported embedding provider: {provider}")
 
@@ -55,7 +61,7 @@ async def generate_single_embedding(
 
     Args:
         text: Text string to embed.
-        provider: Embedding provider ("google" or "openai").
+        provider: Embedding provider ("google", "openai" or "local").
         api_key: API key for the provider.
         model: Model name to use (optional, uses defaults).
 
@@ -94,7 +100,9 @@ async def _generate_google_embeddings(
     batch_size = 100
     for i in range(0, len(texts), batch_size):
         batch = texts[i : i + batch_size]
-        result = genai.embed_content(
+        # genai is synchronous; run it off the event loop so batches can overlap
+        result = await asyncio.to_thread(
+            genai.embed_content,
             model=f"models/{model_name}",
             content=batch,
             task_type="retrieval_document",
@@ -148,7 +156,8 @@ async def generate_query_embedding(
 ) -> "NDArray[np.float32]":
     """Generate embedding for a search query.
 
-    Uses retrieval_query task type for Google embeddings.
+    Uses retrieval_query task type for Google embeddings and the query-side
+    encoding (micro-batched across requests) for the local provider.
 
     Args:
         query: Query text.
@@ -166,7 +175,8 @@ async def generate_query_embedding(
             genai.configure(api_key=api_key)
 
         model_name = model or "text-embedding-004"
-        result = genai.embed_content(
+        result = await asyncio.to_thread(
+            genai.embed_content,
             model=f"models/{model_name}",
             content=query,
             task_type="retrieval_query",
@@ -176,5 +186,11 @@ async def generate_query_embedding(
     elif provider == "openai":
         return await generate_single_embedding(query, provider, api_key, model)
 
+    elif provider == "local":
+        # Concurrent queries are coalesced into one model call
+        from app.knowledge.local_embeddings import embed_local_query
+
+        return await embed_local_query(query, model=model)
+
     else:
         raise ValueError(f"Unsupported embedding provider: {provider}")
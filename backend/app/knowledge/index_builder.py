@@ -0,0 +1,354 @@
+"""Incremental knowledge index builder.
+
+Each chunk is keyed by a hash of its normalized content. When the index is
+rebuilt, vectors for unchanged chunks are reused from the existing index and
+only new or edited chunks are sent to the embedding provider.
+
+Every build is written to its own directory under ``versions/`` and then
+published by atomically replacing the ``CURRENT`` pointer file, so a
+retriever reloading concurrently sees either the old or the new index,
+never chunks from one build and vectors from another. Indexes written
+before versioning (files directly in the index directory) are still read.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from app.knowledge.embeddings import generate_embeddings
+from app.knowledge.models import DocumentChunk
+
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+logger = logging.getLogger(__name__)
+
+CHUNKS_FILENAME = "chunks.json"
+EMBEDDINGS_FILENAME = "embeddings.npy"
+MANIFEST_FILENAME = "manifest.json"
+CURRENT_FILENAME = "CURRENT"
+VERSIONS_DIRNAME = "versions"
+
+# Published versions kept on disk; the previous one stays readable for
+# retrievers that resolved the pointer just before it was swapped
+KEEP_INDEX_VERSIONS = 2
+
+# Metadata key holding the content hash on each stored chunk
+CONTENT_HASH_KEY = "content_hash"
+
+DEFAULT_EMBED_BATCH_SIZE = 100
+DEFAULT_EMBED_CONCURRENCY = 4
+
+
+@dataclass
+class IndexBuildStats:
+    """Summary of an incremental index build."""
+
+    total_chunks: int = 0
+    reused_chunks: int = 0
+    embedded_chunks: int = 0
+    removed_chunks: int = 0
+    embedding_dim: int = 0
+    full_rebuild: bool = False
+    sources: dict[str, int] = field(default_factory=dict)
+
+
+def compute_chunk_hash(content: str) -> str:
+    """Hash chunk content after whitespace normalization.
+
+    Whitespace-only edits (re-wrapped lines, trailing spaces) produce the
+    same hash, so they do not trigger re-embedding.
+
+    Args:
+        content: Chunk text content.
+
+    Returns:
+        Hex-encoded SHA-256 digest.
+    """
+    normalized = re.sub(r"\s+", " ", content).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def resolve_index_dir(index_dir: Path) -> Path | None:
+    """Directory holding the published index files.
+
+    Args:
+        index_dir: Root index directory.
+
+    Returns:
+        The version directory named by ``CURRENT``, the root itself for an
+        unversioned index, or None if no index has been built.
+    """
+    try:
+        version = (index_dir / CURRENT_FILENAME).read_text(encoding="utf-8").strip()
+    except OSError:
+        version = ""
+    if version:
+        return index_dir / VERSIONS_DIRNAME / version
+    if (index_dir / CHUNKS_FILENAME).exists():
+        return index_dir
+    return None
+
+
+def load_existing_vectors(
+    index_dir: Path,
+    provider: str,
+    model: str | None,
+) -> dict[str, "NDArray[np.float32]"]:
+    """Load stored vectors from an existing index, keyed by content hash.
+
+    Vectors are only reused when the index was built with the same
+    provider and model; otherwise an empty mapping is returned.
+
+    Args:
+        index_dir: Directory containing the current index.
+        provider: Embedding provider for the new build.
+        model: Embedding model for the new build.
+
+    Returns:
+        Mapping of content hash to embedding vector.
+    """
+    current_dir = resolve_index_dir(index_dir)
+    if current_dir is None:
+        return {}
+    chunks_path = current_dir / CHUNKS_FILENAME
+    embeddings_path = current_dir / EMBEDDINGS_FILENAME
+    manifest_path = current_dir / MANIFEST_FILENAME
+
+    if not (
+        chunks_path.exists() and embeddings_path.exists() and manifest_path.exists()
+    ):
+        return {}
+
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("provider") != provider or manifest.get("model") != model:
+            logger.info(
+                "Embedding provider/model changed "
+                f"({manifest.get('provider')}/{manifest.get('model')} -> {provider}/{model}); "
+                "rebuilding all vectors"
+            )
+            return {}
+
+        with open(chunks_path, encoding="utf-8") as f:
+            chunks_data = json.load(f)
+        embeddings: NDArray[np.float32] = np.load(embeddings_path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Existing index unreadable, rebuilding all vectors: {e}")
+        return {}
+
+    if len(chunks_data) != embeddings.shape[0]:
+        logger.warning("Existing index is inconsistent, rebuilding all vectors")
+        return {}
+
+    vectors: dict[str, NDArray[np.float32]] = {}
+    for chunk_data, vector in zip(chunks_data, embeddings):
+        content_hash = chunk_data.get("metadata", {}).get(CONTENT_HASH_KEY)
+        if content_hash is None:
+            content_hash = compute_chunk_hash(chunk_data.get("content", ""))
+        vectors[content_hash] = vector
+    return vectors
+
+
+async def embed_in_batches(
+    texts: list[str],
+    provider: str,
+    api_key: str | None,
+    model: str | None,
+    batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+    concurrency: int = DEFAULT_EMBED_CONCURRENCY,
+) -> "NDArray[np.float32]":
+    """Embed texts in batches, running up to `concurrency` batches at once.
+
+    Args:
+        texts: Texts to embed.
+        provider: Embedding provider.
+        api_key: API key for the provider.
+        model: Model name.
+        batch_size: Texts per provider request.
+        concurrency: Maximum in-flight batches.
+
+    Returns:
+        NumPy array of shape (len(texts), embedding_dim), in input order.
+    """
+    if not texts:
+        return np.array([], dtype=np.float32)
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    batches = [texts[i : i + batch_size] for i in range(0, len(texts), batch_size)]
+
+    async def _embed(batch: list[str]) -> "NDArray[np.float32]":
+        async with semaphore:
+            return await generate_embeddings(
+                texts=batch,
+                provider=provider,
+                api_key=api_key,
+                model=model,
+            )
+
+    results = await asyncio.gather(*(_embed(batch) for batch in batches))
+    return np.vstack(results).astype(np.float32)
+
+
+def _write_synced(target: Path, write: Any) -> None:
+    with open(target, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _prune_versions(versions_dir: Path, keep: str) -> None:
+    """Remove all but the newest KEEP_INDEX_VERSIONS published versions."""
+    published = sorted(
+        p for p in versions_dir.iterdir() if p.is_dir() and not p.name.startswith(".")
+    )
+    stale = [p for p in published[:-KEEP_INDEX_VERSIONS] if p.name != keep]
+    for path in stale:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def write_index(
+    index_dir: Path,
+    chunks: list[DocumentChunk],
+    embeddings: "NDArray[np.float32]",
+    provider: str,
+    model: str | None,
+) -> dict[str, Any]:
+    """Write a new index version and publish it.
+
+    The chunks, embeddings and manifest go into a fresh directory under
+    ``versions/``; the ``CURRENT`` pointer is then replaced with
+    os.replace(), which is the single atomic switch retrievers watch (see
+    KnowledgeRetriever.reload_if_changed).
+
+    Returns:
+        The manifest that was written.
+    """
+    versions_dir = index_dir / VERSIONS_DIRNAME
+    versions_dir.mkdir(parents=True, exist_ok=True)
+
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    manifest = {
+        "version": version,
+        "provider": provider,
+        "model": model,
+        "chunk_count": len(chunks),
+        "embedding_dim": int(embeddings.shape[1]) if embeddings.ndim == 2 else 0,
+    }
+    chunks_payload = json.dumps(
+        [chunk.model_dump() for chunk in chunks], ensure_ascii=False, indent=2
+    ).encode("utf-8")
+    manifest_payload = json.dumps(manifest, indent=2).encode("utf-8")
+
+    staging_dir = Path(tempfile.mkdtemp(dir=versions_dir, prefix=f".{version}."))
+    try:
+        _write_synced(staging_dir / CHUNKS_FILENAME, lambda f: f.write(chunks_payload))
+        _write_synced(
+            staging_dir / EMBEDDINGS_FILENAME, lambda f: np.save(f, embeddings)
+        )
+        _write_synced(
+            staging_dir / MANIFEST_FILENAME, lambda f: f.write(manifest_payload)
+        )
+        os.rename(staging_dir, versions_dir / version)
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+    fd, tmp_name = tempfile.mkstemp(
+        dir=index_dir, prefix=f".{CURRENT_FILENAME}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(version.encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, index_dir / CURRENT_FILENAME)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+    _prune_versions(versions_dir, keep=version)
+    return manifest
+
+
+async def build_index_incremental(
+    chunks: list[DocumentChunk],
+    index_dir: Path,
+    provider: str,
+    api_key: str | None = None,
+    model: str | None = None,
+    batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+    concurrency: int = DEFAULT_EMBED_CONCURRENCY,
+    full: bool = False,
+) -> IndexBuildStats:
+    """Build or update the knowledge index, re-embedding only changed chunks.
+
+    Args:
+        chunks: Freshly loaded document chunks.
+        index_dir: Directory holding the index.
+        provider: Embedding provider.
+        api_key: API key for the provider.
+        model: Embedding model name.
+        batch_size: Texts per embedding request.
+        concurrency: Maximum concurrent embedding requests.
+        full: Ignore stored vectors and re-embed everything.
+
+    Returns:
+        Build statistics.
+    """
+    stats = IndexBuildStats(total_chunks=len(chunks), full_rebuild=full)
+
+    existing = {} if full else load_existing_vectors(index_dir, provider, model)
+    if not existing:
+        stats.full_rebuild = True
+    previous_hashes = set(existing)
+
+    hashes: list[str] = []
+    for chunk in chunks:
+        content_hash = compute_chunk_hash(chunk.content)
+        chunk.metadata[CONTENT_HASH_KEY] = content_hash
+        hashes.append(content_hash)
+        stats.sources[chunk.source] = stats.sources.get(chunk.source, 0) + 1
+
+    # Deduplicate: identical content is embedded once
+    missing = list(dict.fromkeys(h for h in hashes if h not in existing))
+    text_by_hash = {h: c.content for h, c in zip(hashes, chunks)}
+
+    if missing:
+        logger.info(
+            f"Embedding {len(missing)} new/changed chunks with {provider} ({model})"
+        )
+        new_vectors = await embed_in_batches(
+            [text_by_hash[h] for h in missing],
+            provider=provider,
+            api_key=api_key,
+            model=model,
+            batch_size=batch_size,
+            concurrency=concurrency,
+        )
+        existing.update(zip(missing, new_vectors))
+
+    stats.reused_chunks = sum(1 for h in hashes if h in previous_hashes)
+    stats.embedded_chunks = stats.total_chunks - stats.reused_chunks
+    stats.removed_chunks = len(previous_hashes - set(hashes))
+
+    if not chunks:
+        return stats
+
+    embeddings = np.vstack([existing[h] for h in hashes]).astype(np.float32)
+    stats.embedding_dim = int(embeddings.shape[1])
+
+    write_index(index_dir, chunks, embeddings, provider, model)
+    return stats
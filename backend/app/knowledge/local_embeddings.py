@@ -0,0 +1,171 @@
+"""Local CPU embedding provider (EMBEDDING_PROVIDER=local).
+
+Runs a small ONNX sentence-embedding model through ``fastembed`` so RAG
+works without network access and without per-query API latency/cost.
+
+- The model is loaded once per process and reused.
+- Inference runs on a single dedicated thread: onnxruntime already
+  parallelizes internally, and serializing calls avoids oversubscribing
+  the CPU when several requests embed at once.
+- Query embeddings from concurrent requests are micro-batched into one
+  model call (see ``QueryBatcher``).
+
+Requires the optional ``fastembed`` package. For air-gapped deployments,
+pre-download the model and point LOCAL_EMBEDDING_CACHE_DIR at it.
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCAL_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+
+_models: dict[str, Any] = {}
+_model_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="local-embed")
+_batchers: dict[str, "QueryBatcher"] = {}
+
+
+def _get_model(model_name: str) -> Any:
+    """Load (once) and return the fastembed model."""
+    model = _models.get(model_name)
+    if model is not None:
+        return model
+
+    with _model_lock:
+        model = _models.get(model_name)
+        if model is None:
+            try:
+                from fastembed import TextEmbedding
+            except ImportError as e:
+                raise ValueError(
+                    "EMBEDDING_PROVIDER=local requires the 'fastembed' package"
+                ) from e
+
+            from app.core.config import get_settings
+
+            settings = get_settings()
+            logger.info(f"Loading local embedding model: {model_name}")
+            model = TextEmbedding(
+                model_name=model_name,
+                cache_dir=settings.local_embedding_cache_dir,
+                threads=settings.local_embedding_threads,
+            )
+            _models[model_name] = model
+    return model
+
+
+def _embed_sync(
+    texts: list[str], model_name: str, is_query: bool
+) -> "NDArray[np.float32]":
+    model = _get_model(model_name)
+    vectors = model.query_embed(texts) if is_query else model.passage_embed(texts)
+    return np.array(list(vectors), dtype=np.float32)
+
+
+async def embed_local(
+    texts: list[str],
+    model: str | None = None,
+    is_query: bool = False,
+) -> "NDArray[np.float32]":
+    """Embed texts with the local model on the embedding thread.
+
+    Args:
+        texts: Texts to embed.
+        model: Model name (default: multilingual MiniLM).
+        is_query: Use query-side encoding (for models with asymmetric prefixes).
+
+    Returns:
+        NumPy array of shape (len(texts), embedding_dim).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _executor, _embed_sync, texts, model or DEFAULT_LOCAL_MODEL, is_query
+    )
+
+
+async def warm_up(model: str | None = None) -> None:
+    """Load the model ahead of the first query (call at startup)."""
+    await embed_local(["warm up"], model=model, is_query=True)
+
+
+class QueryBatcher:
+    """Coalesce concurrent query embeddings into a single model call.
+
+    The first query in a window waits up to ``window_ms`` for others to
+    arrive (or until ``max_batch`` is reached), then all are embedded
+    together and each caller gets its own row.
+    """
+
+    def __init__(self, model: str, window_ms: float = 2.0, max_batch: int = 32) -> None:
+        self.model = model
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def embed(self, query: str) -> "NDArray[np.float32]":
+        """Embed one query, batched with concurrent callers."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((query, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        try:
+            vectors = await embed_local(
+                [q for q, _ in batch], model=self.model, is_query=True
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+
+async def embed_local_query(
+    query: str, model: str | None = None
+) -> "NDArray[np.float32]":
+    """Embed a search query through the shared per-model batcher."""
+    model_name = model or DEFAULT_LOCAL_MODEL
+    batcher = _batchers.get(model_name)
+    if batcher is None:
+        from app.core.config import get_settings
+
+        settings = get_settings()
+        batcher = QueryBatcher(
+            model_name,
+            window_ms=settings.local_embedding_batch_window_ms,
+            max_batch=settings.local_embedding_max_batch,
+        )
+        _batchers[model_name] = batcher
+    return await batcher.embed(query)
@@ -3,6 +3,7 @@
 Provides in-memory vector search for document chunks.
 """
 
+import asyncio
 import json
 import logging
 import time
@@ -12,6 +13,12 @@ from typing import TYPE_CHECKING
 import numpy as np
 
 from app.knowledge.embeddings import generate_query_embedding
+from app.knowledge.index_builder import (
+    CHUNKS_FILENAME,
+    EMBEDDINGS_FILENAME,
+    MANIFEST_FILENAME,
+    resolve_index_dir,
+)
 from app.knowledge.models import DocumentChunk, RetrievalResult
 
 if TYPE_CHECKING:
@@ -41,6 +48,10 @@ class KnowledgeRetriever:
         self._embedding_provider: str = "google"
         self._api_key: str | None = None
         self._embedding_model: str | None = None
+        self._index_dir: Path | None = None
+        self._manifest_version: str | None = None
+        self._reload_check_interval: float = 0.0
+        self._last_reload_check: float = time.monotonic()
         # Cache for search results: (query, top_k, min_score) -> (timestamp, results)
         self._cache: dict[tuple[str, int, float], tuple[float, list[RetrievalResult]]] = {}
 
@@ -60,6 +71,7 @@ class KnowledgeRetriever:
         embedding_provider: str = "google",
         api_key: str | None = None,
         embedding_model: str | None = None,
+        reload_check_interval: float = 0.0,
     ) -> None:
         """Load pre-built index from disk.
 
@@ -69,16 +81,21 @@ class KnowledgeRetriever:
             embedding_provider: Provider for query embeddings.
             api_key: API key for the embedding provider.
             embedding_model: Model name for embeddings.
+            reload_check_interval: Seconds between checks for a rebuilt index
+                during search (0 disables automatic hot reload).
         """
-        import faiss
-
         if index_dir is None:
             index_dir = Path(__file__).parent / "index"
 
-        chunks_path = index_dir / "chunks.json"
-        embeddings_path = index_dir / "embeddings.npy"
+        # Store embedding config for query time
+        self._index_dir = index_dir
+        self._embedding_provider = embedding_provider
+        self._api_key = api_key
+        self._embedding_model = embedding_model
+        self._reload_check_interval = reload_check_interval
 
-        if not chunks_path.exists() or not embeddings_path.exists():
+        current_dir = resolve_index_dir(index_dir)
+        if current_dir is None or not (current_dir / EMBEDDINGS_FILENAME).exists():
             logger.warning(
                 f"Knowledge index not found at {index_dir}. "
                 "RAG will be disabled. Run build_knowledge_index.py to create the index."
@@ -86,38 +103,103 @@ class KnowledgeRetriever:
             self._initialized = False
             return
 
+        self._load_index(index_dir)
+        self._initialized = True
+
+        if embedding_provider == "local":
+            # Load the model now so the first query doesn't pay for it
+            from app.knowledge.local_embeddings import warm_up
+
+            try:
+                await warm_up(embedding_model)
+            except Exception as e:
+                logger.warning(f"Local embedding model warm-up failed: {e}")
+
+        logger.info(
+            f"Knowledge retriever initialized: {len(self.chunks)} chunks, "
+            f"{self.index.d if self.index is not None else 0}-dim embeddings"
+        )
+
+    def _load_index(self, index_dir: Path) -> None:
+        """Read index files and swap them in as the active index.
+
+        All files are read from the version directory the ``CURRENT``
+        pointer named when loading started, so a concurrent rebuild cannot
+        mix chunks and vectors of different versions. The new FAISS index is
+        fully built before replacing the current one, so concurrent searches
+        keep using the old index until the swap.
+
+        Raises:
+            OSError: If no index has been published.
+            ValueError: If chunk and embedding counts do not match.
+        """
+        import faiss
+
+        current_dir = resolve_index_dir(index_dir)
+        if current_dir is None:
+            raise FileNotFoundError(f"No knowledge index in {index_dir}")
+        manifest_version = _read_manifest_version(current_dir)
+
         # Load chunks
-        with open(chunks_path, encoding="utf-8") as f:
+        with open(current_dir / CHUNKS_FILENAME, encoding="utf-8") as f:
             chunks_data = json.load(f)
-            self.chunks = [DocumentChunk(**c) for c in chunks_data]
+            chunks = [DocumentChunk(**c) for c in chunks_data]
 
         # Load embeddings and build FAISS index
-        embeddings: NDArray[np.float32] = np.load(embeddings_path)
+        embeddings: NDArray[np.float32] = np.load(current_dir / EMBEDDINGS_FILENAME)
 
-        if len(self.chunks) != embeddings.shape[0]:
+        if len(chunks) != embeddings.shape[0]:
             raise ValueError(
-                f"Chunk count ({len(self.chunks)}) does not match "
+                f"Chunk count ({len(chunks)}) does not match "
                 f"embedding count ({embeddings.shape[0]})"
             )
 
         # Create FAISS index (Inner Product for cosine similarity with normalized vectors)
         embedding_dim = embeddings.shape[1]
-        self.index = faiss.IndexFlatIP(embedding_dim)
+        index = faiss.IndexFlatIP(embedding_dim)
 
         # Normalize embeddings for cosine similarity
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
         faiss.normalize_L2(embeddings)
-        self.index.add(embeddings)
+        index.add(embeddings)
 
-        # Store embedding config for query time
-        self._embedding_provider = embedding_provider
-        self._api_key = api_key
-        self._embedding_model = embedding_model
-        self._initialized = True
+        self.chunks, self.index = chunks, index
+        self._manifest_version = manifest_version
+        self._cache.clear()
+
+    def reload_if_changed(self, force: bool = False) -> bool:
+        """Hot-reload the index if build_knowledge_index.py published a new version.
 
+        Compares the published version on disk with the loaded one. On
+        failure the currently loaded index stays active. Reads files, so
+        async callers should run it in a thread.
+
+        Args:
+            force: Reload even if the manifest version is unchanged.
+
+        Returns:
+            True if a new index was loaded.
+        """
+        self._last_reload_check = time.monotonic()
+        if self._index_dir is None:
+            return False
+
+        current_dir = resolve_index_dir(self._index_dir)
+        version = None if current_dir is None else _read_manifest_version(current_dir)
+        if not force and (version is None or version == self._manifest_version):
+            return False
+
+        try:
+            self._load_index(self._index_dir)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Knowledge index reload failed, keeping current index: {e}")
+            return False
+
+        self._initialized = True
         logger.info(
-            f"Knowledge retriever initialized: {len(self.chunks)} chunks, "
-            f"{embedding_dim}-dim embeddings"
+            f"Knowledge index reloaded (version={version}): {len(self.chunks)} chunks"
         )
+        return True
 
     async def search(
         self,
@@ -135,6 +217,14 @@ class KnowledgeRetriever:
         Returns:
             List of RetrievalResult sorted by relevance (highest first).
         """
+        if (
+            self._reload_check_interval > 0
+            and time.monotonic() - self._last_reload_check >= self._reload_check_interval
+        ):
+            # Claim the check before yielding so concurrent searches don't all reload
+            self._last_reload_check = time.monotonic()
+            await asyncio.to_thread(self.reload_if_changed)
+
         if not self.is_initialized or self.index is None:
             return []
 
@@ -247,11 +337,12 @@ async def initialize_knowledge_retriever(
     """
     global _retriever_instance
 
+    from app.core.config import get_settings
+
+    settings = get_settings()
+
     # Get defaults from settings if not provided
     if embedding_provider is None or api_key is None:
-        from app.core.config import get_settings
-
-        settings = get_settings()
         embedding_provider = embedding_provider or getattr(
             settings, "embedding_provider", "google"
         )
@@ -260,6 +351,8 @@ async def initialize_knowledge_retriever(
             embedding_model = embedding_model or getattr(
                 settings, "google_embedding_model", "text-embedding-004"
             )
+        elif embedding_provider == "local":
+            embedding_model = embedding_model or settings.local_embedding_model
         else:
             api_key = api_key or settings.openai_api_key
             embedding_model = embedding_model or getattr(
@@ -272,9 +365,27 @@ async def initialize_knowledge_retriever(
         embedding_provider=embedding_provider or "google",
         api_key=api_key,
         embedding_model=embedding_model,
+        reload_check_interval=settings.rag_index_reload_interval_seconds,
     )
 
 
+def reload_knowledge_retriever(force: bool = False) -> bool:
+    """Hot-reload hook for the global retriever.
+
+    Call after rebuilding the index (e.g. from an admin task or worker) to
+    pick up the new index without restarting the process.
+
+    Args:
+        force: Reload even if the manifest version is unchanged.
+
+    Returns:
+        True if a new index was loaded.
+    """
+    if _retriever_instance is None:
+        return False
+    return _retriever_instance.reload_if_changed(force=force)
+
+
 def get_knowledge_retriever() -> KnowledgeRetriever | None:
     """Get the global knowledge retriever instance.
 
@@ -282,3 +393,14 @@ def get_knowledge_retriever() -> KnowledgeRetriever | None:
         The initialized retriever, or None if not initialized.
     """
     return _retriever_instance
+
+
+def _read_manifest_version(index_dir: Path) -> str | None:
+    """Return the index version recorded in manifest.json, if any."""
+    manifest_path = index_dir / MANIFEST_FILENAME
+    if not manifest_path.exists():
+        return None
+    try:
+        return json.loads(manifest_path.read_text(encoding="utf-8")).get("version")
+    except (OSError, ValueError):
+        return None
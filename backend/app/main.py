@@ -7,7 +7,9 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import PlainTextResponse
 
+from app.adapters.garmin_pool import close_garmin_pool
 from app.core.config import get_settings
+from app.core.queue import close_arq_pool, get_arq_pool
 from app.core.session import close_redis
 from app.api.v1.router import api_router
 from app.observability import RequestLoggingMiddleware, get_metrics_backend, setup_tracing
@@ -32,8 +34,13 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
                 f"Failed to initialize knowledge retriever: {e}. RAG will be disabled."
             )
 
+    # Open the shared ARQ pool up front (best effort; enqueue retries lazily)
+    await get_arq_pool()
+
     yield
     # Shutdown - cleanup resources
+    await close_garmin_pool()  # Write refreshed Garmin sessions back
+    await close_arq_pool()
     await close_redis()
 
 
@@ -7,13 +7,14 @@ from app.models.health import Sleep, HRRecord, HealthMetric, FitnessMetricDaily,
 from app.models.workout import Workout, WorkoutSchedule
 from app.models.plan import Plan, PlanWeek
 from app.models.analytics import AnalyticsSummary
-from app.models.ai import AIConversation, AIMessage, AIImport
-from app.models.ai_snapshot import AITrainingSnapshot
+from app.models.ai import AIConversation, AIMessage, AIImport, AIGenerationJob, AIGenerationStatus
+from app.models.ai_snapshot import AITrainingSnapshot, AITrainingWeekAggregate
 from app.models.strava import StravaSession, StravaSyncState, StravaActivityMap, StravaUploadJob, StravaUploadStatus
 from app.models.gear import Gear, ActivityGear, GearType, GearStatus
 from app.models.strength import StrengthSession, StrengthExercise
 from app.models.calendar_note import CalendarNote
 from app.models.race import Race
+from app.models.storage import CompressionDictionary, StorageUsage
 
 __all__ = [
     # User
@@ -47,7 +48,10 @@ __all__ = [
     "AIConversation",
     "AIMessage",
     "AIImport",
+    "AIGenerationJob",
+    "AIGenerationStatus",
     "AITrainingSnapshot",
+    "AITrainingWeekAggregate",
     # Strava
     "StravaSession",
     "StravaSyncState",
@@ -66,4 +70,7 @@ __all__ = [
     "CalendarNote",
     # Race
     "Race",
+    # Storage
+    "CompressionDictionary",
+    "StorageUsage",
 ]
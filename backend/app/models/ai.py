@@ -7,9 +7,10 @@ Schema matches migration 001_initial_schema.py:
 """
 
 from datetime import datetime
+from enum import Enum
 from typing import TYPE_CHECKING, Any, Optional
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -129,3 +130,68 @@ class AIImport(BaseModel):
 
     def __repr__(self) -> str:
         return f"<AIImport(id={self.id}, user_id={self.user_id}, status={self.status})>"
+
+
+class AIGenerationStatus(str, Enum):
+    """Status of a queued AI generation job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class AIGenerationJob(BaseModel):
+    """Queued plan/workout generation request processed by the AI worker.
+
+    The row is the source of truth for job state; clients poll it while the
+    ARQ worker runs the LLM call outside of any HTTP request.
+    """
+
+    __tablename__ = "ai_generation_jobs"
+    __table_args__ = (
+        Index("ix_ai_generation_jobs_status_scheduled", "status", "scheduled_for"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        index=True,
+    )
+    conversation_id: Mapped[int] = mapped_column(
+        ForeignKey("ai_conversations.id", ondelete="CASCADE"),
+        index=True,
+    )
+
+    mode: Mapped[str] = mapped_column(String(20), nullable=False)  # "plan" | "workout"
+    status: Mapped[str] = mapped_column(
+        String(20),
+        default=AIGenerationStatus.QUEUED.value,
+    )
+    # Coarse progress for polling: queued, building_prompt, generating, saving, done
+    stage: Mapped[str] = mapped_column(String(30), default="queued")
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Original request
+    request_message: Mapped[str] = mapped_column(Text, nullable=False)
+    request_context: Mapped[Optional[dict[str, Any]]] = mapped_column(JSONB, nullable=True)
+    save_mode: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+
+    # Off-peak batch scheduling (None = run as soon as possible)
+    scheduled_for: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    arq_job_id: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+
+    # Outcome
+    result: Mapped[Optional[dict[str, Any]]] = mapped_column(JSONB, nullable=True)
+    error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    started_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    completed_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    def __repr__(self) -> str:
+        return f"<AIGenerationJob(id={self.id}, mode={self.mode}, status={self.status})>"
@@ -3,7 +3,7 @@
 from datetime import date, datetime
 from typing import TYPE_CHECKING, Any, Optional
 
-from sqlalchemy import Date, DateTime, ForeignKey, Integer, UniqueConstraint, func
+from sqlalchemy import Date, DateTime, Float, ForeignKey, Integer, UniqueConstraint, func
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -63,3 +63,55 @@ class AITrainingSnapshot(BaseModel):
             f"schema_version={self.schema_version}"
             ")>"
         )
+
+
+class AITrainingWeekAggregate(BaseModel):
+    """Additive per-week activity aggregates used to build training snapshots.
+
+    Rows are keyed by the Monday (UTC) that starts the week. Every field can
+    be summed (or max/or-ed) across weeks, so any snapshot window is a
+    combination of stored weeks plus the partial weeks at its edges.
+    """
+
+    __tablename__ = "ai_training_week_aggregates"
+    __table_args__ = (
+        UniqueConstraint("user_id", "week_start", name="uq_ai_training_week_user_week"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        index=True,
+    )
+    week_start: Mapped[date] = mapped_column(Date, index=True)
+
+    activity_count: Mapped[int] = mapped_column(Integer, default=0)
+    total_distance_m: Mapped[float] = mapped_column(Float, default=0.0)
+    total_duration_s: Mapped[int] = mapped_column(Integer, default=0)
+    long_run_max_m: Mapped[float] = mapped_column(Float, default=0.0)
+    # Bit N set = at least one activity on weekday N (0 = Monday)
+    active_days_mask: Mapped[int] = mapped_column(Integer, default=0)
+    missing_hr_count: Mapped[int] = mapped_column(Integer, default=0)
+    hr_sum: Mapped[int] = mapped_column(Integer, default=0)
+    hr_count: Mapped[int] = mapped_column(Integer, default=0)
+    # {pace_sec: [activity_count, distance_m]} for percentile and zone splits
+    pace_histogram: Mapped[dict[str, Any]] = mapped_column(JSONB, default=dict)
+    # Activities folded into this row, so one that moves to another week
+    # (e.g. an upload placeholder getting its real start time) dirties both
+    activity_ids: Mapped[list[int]] = mapped_column(JSONB, default=list)
+
+    # Newest (Activity.updated_at, Activity.id) folded into this row (incremental watermark)
+    source_updated_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+    source_activity_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    def __repr__(self) -> str:
+        return (
+            "<AITrainingWeekAggregate("
+            f"user_id={self.user_id}, "
+            f"week_start={self.week_start}, "
+            f"activity_count={self.activity_count}"
+            ")>"
+        )
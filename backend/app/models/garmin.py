@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, Any, Optional
 
-from sqlalchemy import DateTime, ForeignKey, Integer, LargeBinary, String, Text, UniqueConstraint
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, LargeBinary, String, Text, UniqueConstraint
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship, deferred
 
@@ -84,6 +84,14 @@ class GarminSyncState(BaseModel):
     )
     cursor: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
+    # Adaptive cadence: consecutive successful runs that stored no new
+    # payloads, and the time before which incremental syncs skip the endpoint
+    unchanged_runs: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    next_sync_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
     # Relationship
     user: Mapped["User"] = relationship("User", back_populates="garmin_sync_states")
 
@@ -92,9 +100,18 @@ class GarminSyncState(BaseModel):
 
 
 class GarminRawEvent(BaseModel):
-    """Raw JSON data fetched from Garmin API."""
+    """Raw JSON data fetched from Garmin API.
+
+    New events are stored as a compressed canonical-JSON ``body`` identified
+    by ``payload_hash`` (exact duplicates are not stored again) and move to
+    R2 (``r2_key``) once they age out; see ``app.services.raw_archive``.
+    ``payload`` holds the inline JSON of events written before that.
+    """
 
     __tablename__ = "garmin_raw_events"
+    __table_args__ = (
+        Index("ix_garmin_raw_events_dedup", "user_id", "endpoint", "payload_hash"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(
@@ -107,7 +124,23 @@ class GarminRawEvent(BaseModel):
         DateTime(timezone=True),
         index=True,
     )
-    payload: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    payload: Mapped[Optional[dict[str, Any]]] = mapped_column(JSONB, nullable=True)
+
+    # Archive tier
+    payload_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    body: Mapped[Optional[bytes]] = mapped_column(
+        LargeBinary, nullable=True, deferred=True,
+        comment="Compressed canonical JSON payload (zstd or gzip)"
+    )
+    body_size: Mapped[Optional[int]] = mapped_column(
+        Integer, nullable=True,
+        comment="Uncompressed canonical JSON size in bytes"
+    )
+    record_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    r2_key: Mapped[Optional[str]] = mapped_column(
+        String(500), nullable=True,
+        comment="Cold-tier object holding the body once aged out of the database"
+    )
 
     def __repr__(self) -> str:
         return f"<GarminRawEvent(id={self.id}, endpoint={self.endpoint})>"
@@ -0,0 +1,76 @@
+"""Storage bookkeeping models (FIT compression dictionaries, usage counters)."""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Integer,
+    LargeBinary,
+    String,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import BaseModel
+
+
+class CompressionDictionary(BaseModel):
+    """Trained zstd dictionary used to compress stored FIT files.
+
+    ``dict_id`` is the id zstd embeds in every frame compressed with the
+    dictionary, so any stored object can be matched to the dictionary
+    version it needs. Old versions are kept (inactive) for as long as
+    objects compressed with them exist.
+    """
+
+    __tablename__ = "compression_dictionaries"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    dict_id: Mapped[int] = mapped_column(BigInteger, unique=True, index=True)
+    codec: Mapped[str] = mapped_column(String(20), default="zstd")
+    content: Mapped[bytes] = mapped_column(LargeBinary)
+    sample_count: Mapped[int] = mapped_column(Integer, default=0)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
+    note: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"<CompressionDictionary(dict_id={self.dict_id}, active={self.is_active})>"
+        )
+
+
+class StorageUsage(BaseModel):
+    """Per-user R2 storage counters.
+
+    Adjusted incrementally whenever an object is written, replaced or
+    deleted, so usage reads are a single row lookup instead of a bucket
+    listing. ``reconciled_at`` is the last time the counters were
+    overwritten from a full bucket walk (which also corrects any drift).
+    """
+
+    __tablename__ = "storage_usage"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), unique=True, index=True
+    )
+    object_count: Mapped[int] = mapped_column(Integer, default=0)
+    stored_bytes: Mapped[int] = mapped_column(
+        BigInteger, default=0
+    )  # As stored (compressed)
+    original_bytes: Mapped[int] = mapped_column(
+        BigInteger, default=0
+    )  # Before compression
+    reconciled_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    @property
+    def saved_bytes(self) -> int:
+        return max(0, self.original_bytes - self.stored_bytes)
+
+    def __repr__(self) -> str:
+        return f"<StorageUsage(user_id={self.user_id}, objects={self.object_count}, bytes={self.stored_bytes})>"
@@ -5,6 +5,10 @@ Cardinality Protection:
 - Paths use route templates, not raw URLs (to avoid PII and cardinality explosion)
 - Unknown paths are mapped to /__unknown__
 
+Request Logging:
+- RequestLoggingMiddleware is pure ASGI (no BaseHTTPMiddleware task/stream)
+- Request log lines go through a queue to a listener thread
+
 Streaming Responses:
 - Duration measures time until response headers are sent
 - For streaming/FIT downloads, this doesn't include transfer time
@@ -13,29 +17,34 @@ Streaming Responses:
 
 from __future__ import annotations
 
+import atexit
 import json
 import logging
+import queue
+import random
 import re
+import threading
 import time
 import uuid
 from collections import defaultdict
 from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
 from threading import Lock
 from typing import Iterable, Protocol
 
 from fastapi import FastAPI
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
-from starlette.types import ASGIApp
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.config import get_settings
+from app.core.database import QueryStats, query_stats_ctx, statement_shape
 
 request_id_ctx: ContextVar[str | None] = ContextVar("request_id", default=None)
 logger = logging.getLogger(__name__)
 
-# Flag to prevent duplicate tracing setup
+# Flags to prevent duplicate tracing setup
 _tracing_initialized = False
+_app_instrumented = False
 
 # -------------------------------------------------------------------------
 # Cardinality Protection: Fixed allowlist for external API operations
@@ -109,6 +118,16 @@ class MetricsBackend(Protocol):
     ) -> None:
         ...
 
+    def observe_db_queries(
+        self,
+        method: str,
+        path: str,
+        query_count: int,
+        duration_ms: float,
+        n_plus_one: bool = False,
+    ) -> None:
+        ...
+
     def observe_sync_job(
         self,
         endpoint: str,
@@ -120,6 +139,9 @@ class MetricsBackend(Protocol):
     ) -> None:
         ...
 
+    def observe_sync_stage(self, endpoint: str, stage: str, duration_ms: float) -> None:
+        ...
+
     def observe_external_api(
         self,
         provider: str,
@@ -136,34 +158,71 @@ class MetricsBackend(Protocol):
         ...
 
 
+# Histogram buckets for SQL statements issued per request
+DB_QUERY_COUNT_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 250]
+
+_METRIC_TABLES = (
+    "request_counts", "request_sum", "request_count", "request_buckets",
+    "db_queries_sum", "db_queries_count", "db_queries_buckets",
+    "db_time_sum", "db_time_count", "db_time_buckets", "db_n_plus_one",
+    "sync_counts", "sync_sum", "sync_count", "sync_buckets", "sync_items",
+    "stage_sum", "stage_count", "stage_buckets",
+    "external_counts", "external_sum", "external_count", "external_buckets",
+    "fit_bytes", "fit_downloads",
+)
+
+
+def _add(table: dict, key: tuple[str, ...], amount: float) -> None:
+    table[key] = table.get(key, 0) + amount
+
+
 class MetricsCollector:
-    """In-process metrics collector with Prometheus text output."""
+    """In-process metrics collector with Prometheus text output.
+
+    Observations go to a per-thread shard of plain dicts that only its own
+    thread writes, so the request path takes no lock (the event loop thread
+    and executor threads each keep their own counters). Shards are merged
+    when metrics are rendered.
+    """
 
     def __init__(self, buckets_ms: Iterable[int] | None = None) -> None:
-        self._lock = Lock()
-        self._request_counts: dict[tuple[str, str, str], int] = defaultdict(int)
-        self._duration_sum_ms: dict[tuple[str, str], float] = defaultdict(float)
-        self._duration_count: dict[tuple[str, str], int] = defaultdict(int)
-        self._duration_buckets: dict[tuple[str, str], dict[str, int]] = defaultdict(
-            lambda: defaultdict(int)
-        )
-        self._sync_counts: dict[tuple[str, str], int] = defaultdict(int)
-        self._sync_duration_sum_ms: dict[tuple[str, str], float] = defaultdict(float)
-        self._sync_duration_count: dict[tuple[str, str], int] = defaultdict(int)
-        self._sync_duration_buckets: dict[tuple[str, str], dict[str, int]] = defaultdict(
-            lambda: defaultdict(int)
-        )
-        self._sync_items: dict[tuple[str, str], int] = defaultdict(int)
-        self._external_counts: dict[tuple[str, str, str], int] = defaultdict(int)
-        self._external_duration_sum_ms: dict[tuple[str, str], float] = defaultdict(float)
-        self._external_duration_count: dict[tuple[str, str], int] = defaultdict(int)
-        self._external_duration_buckets: dict[tuple[str, str], dict[str, int]] = defaultdict(
-            lambda: defaultdict(int)
-        )
-        self._fit_bytes_total: dict[str, int] = defaultdict(int)
-        self._fit_downloads_total: dict[str, int] = defaultdict(int)
+        self._lock = Lock()  # Guards shard registration only
+        self._local = threading.local()
+        self._shards: list[dict[str, dict]] = []
         self._buckets_ms = list(buckets_ms or [50, 100, 250, 500, 1000, 2500, 5000, 10000])
 
+    def _shard(self) -> dict[str, dict]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {name: {} for name in _METRIC_TABLES}
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def _merged(self) -> dict[str, dict]:
+        with self._lock:
+            shards = list(self._shards)
+        merged: dict[str, dict] = {name: defaultdict(int) for name in _METRIC_TABLES}
+        for shard in shards:
+            for name, table in shard.items():
+                # dict.copy() is atomic under the GIL, so the owner thread may keep writing
+                for key, value in table.copy().items():
+                    merged[name][key] += value
+        return merged
+
+    def _observe_histogram(
+        self,
+        shard: dict[str, dict],
+        prefix: str,
+        key: tuple[str, ...],
+        value: float,
+        buckets: list[int] | None = None,
+    ) -> None:
+        _add(shard[f"{prefix}_sum"], key, value)
+        _add(shard[f"{prefix}_count"], key, 1)
+        _add(shard[f"{prefix}_buckets"], (*key, self._bucket_for(value, buckets)), 1)
+
     def observe_request(
         self,
         method: str,
@@ -172,15 +231,24 @@ class MetricsCollector:
         duration_ms: float,
     ) -> None:
         """Record a single request observation."""
-        count_key = (method, path, str(status_code))
-        duration_key = (method, path)
-        bucket_key = self._bucket_for(duration_ms)
+        shard = self._shard()
+        _add(shard["request_counts"], (method, path, str(status_code)), 1)
+        self._observe_histogram(shard, "request", (method, path), duration_ms)
 
-        with self._lock:
-            self._request_counts[count_key] += 1
-            self._duration_sum_ms[duration_key] += duration_ms
-            self._duration_count[duration_key] += 1
-            self._duration_buckets[duration_key][bucket_key] += 1
+    def observe_db_queries(
+        self,
+        method: str,
+        path: str,
+        query_count: int,
+        duration_ms: float,
+        n_plus_one: bool = False,
+    ) -> None:
+        """Record the SQL statements issued by one request."""
+        shard = self._shard()
+        self._observe_histogram(shard, "db_queries", (method, path), query_count, DB_QUERY_COUNT_BUCKETS)
+        self._observe_histogram(shard, "db_time", (method, path), duration_ms)
+        if n_plus_one:
+            _add(shard["db_n_plus_one"], (method, path), 1)
 
     def observe_sync_job(
         self,
@@ -193,21 +261,20 @@ class MetricsCollector:
     ) -> None:
         """Record a sync job observation."""
         status = "success" if success else "error"
-        duration_key = (endpoint, status)
-        bucket_key = self._bucket_for(duration_ms)
+        shard = self._shard()
+        _add(shard["sync_counts"], (endpoint, status), 1)
+        self._observe_histogram(shard, "sync", (endpoint, status), duration_ms)
 
-        with self._lock:
-            self._sync_counts[(endpoint, status)] += 1
-            self._sync_duration_sum_ms[duration_key] += duration_ms
-            self._sync_duration_count[duration_key] += 1
-            self._sync_duration_buckets[duration_key][bucket_key] += 1
-
-            if items_fetched is not None:
-                self._sync_items[(endpoint, "fetched")] += items_fetched
-            if items_created is not None:
-                self._sync_items[(endpoint, "created")] += items_created
-            if items_updated is not None:
-                self._sync_items[(endpoint, "updated")] += items_updated
+        if items_fetched is not None:
+            _add(shard["sync_items"], (endpoint, "fetched"), items_fetched)
+        if items_created is not None:
+            _add(shard["sync_items"], (endpoint, "created"), items_created)
+        if items_updated is not None:
+            _add(shard["sync_items"], (endpoint, "updated"), items_updated)
+
+    def observe_sync_stage(self, endpoint: str, stage: str, duration_ms: float) -> None:
+        """Record one stage of a sync (see app.services.sync_trace)."""
+        self._observe_histogram(self._shard(), "stage", (endpoint, stage), duration_ms)
 
     def observe_external_api(
         self,
@@ -223,180 +290,119 @@ class MetricsCollector:
         """
         # Normalize operation to prevent cardinality explosion
         normalized_op = normalize_external_operation(operation)
-        duration_key = (provider, normalized_op)
-        bucket_key = self._bucket_for(duration_ms)
-        status = str(status_code)
-
-        with self._lock:
-            self._external_counts[(provider, normalized_op, status)] += 1
-            self._external_duration_sum_ms[duration_key] += duration_ms
-            self._external_duration_count[duration_key] += 1
-            self._external_duration_buckets[duration_key][bucket_key] += 1
+        shard = self._shard()
+        _add(shard["external_counts"], (provider, normalized_op, str(status_code)), 1)
+        self._observe_histogram(shard, "external", (provider, normalized_op), duration_ms)
 
     def observe_fit_download(self, size_bytes: int, success: bool) -> None:
         """Record FIT download metrics."""
         status = "success" if success else "error"
-        with self._lock:
-            self._fit_downloads_total[status] += 1
-            if success and size_bytes > 0:
-                self._fit_bytes_total[status] += size_bytes
+        shard = self._shard()
+        _add(shard["fit_downloads"], (status,), 1)
+        if success and size_bytes > 0:
+            _add(shard["fit_bytes"], (status,), size_bytes)
 
     def render_prometheus(self) -> str:
         """Render metrics in Prometheus text format."""
-        lines: list[str] = [
-            "# HELP http_requests_total Total HTTP requests",
-            "# TYPE http_requests_total counter",
-        ]
-        with self._lock:
-            for (method, path, status), count in sorted(self._request_counts.items()):
-                lines.append(
-                    f'http_requests_total{{method="{method}",path="{path}",status="{status}"}} {count}'
-                )
-
-            lines.extend(
-                [
-                    "# HELP http_request_duration_ms Request duration in milliseconds",
-                    "# TYPE http_request_duration_ms histogram",
-                ]
-            )
-            for (method, path), total in sorted(self._duration_sum_ms.items()):
-                buckets = self._duration_buckets[(method, path)]
-                cumulative = 0
-                for bound in self._buckets_ms:
-                    cumulative += buckets.get(str(bound), 0)
-                    lines.append(
-                        "http_request_duration_ms_bucket"
-                        f'{{method="{method}",path="{path}",le="{bound}"}} {cumulative}'
-                    )
-                cumulative += buckets.get("+Inf", 0)
-                lines.append(
-                    "http_request_duration_ms_bucket"
-                    f'{{method="{method}",path="{path}",le="+Inf"}} {cumulative}'
-                )
-                count = self._duration_count[(method, path)]
-                lines.append(
-                    f'http_request_duration_ms_sum{{method="{method}",path="{path}"}} {total:.2f}'
-                )
-                lines.append(
-                    f'http_request_duration_ms_count{{method="{method}",path="{path}"}} {count}'
-                )
+        merged = self._merged()
+        lines: list[str] = []
 
-            lines.extend(
-                [
-                    "# HELP sync_jobs_total Total sync jobs",
-                    "# TYPE sync_jobs_total counter",
-                ]
-            )
-            for (endpoint, status), count in sorted(self._sync_counts.items()):
-                lines.append(
-                    f'sync_jobs_total{{endpoint="{endpoint}",status="{status}"}} {count}'
-                )
-
-            lines.extend(
-                [
-                    "# HELP sync_job_duration_ms Sync job duration in milliseconds",
-                    "# TYPE sync_job_duration_ms histogram",
-                ]
-            )
-            for (endpoint, status), total in sorted(self._sync_duration_sum_ms.items()):
-                buckets = self._sync_duration_buckets[(endpoint, status)]
-                cumulative = 0
-                for bound in self._buckets_ms:
-                    cumulative += buckets.get(str(bound), 0)
-                    lines.append(
-                        "sync_job_duration_ms_bucket"
-                        f'{{endpoint="{endpoint}",status="{status}",le="{bound}"}} {cumulative}'
-                    )
-                cumulative += buckets.get("+Inf", 0)
-                lines.append(
-                    "sync_job_duration_ms_bucket"
-                    f'{{endpoint="{endpoint}",status="{status}",le="+Inf"}} {cumulative}'
-                )
-                count = self._sync_duration_count[(endpoint, status)]
-                lines.append(
-                    "sync_job_duration_ms_sum"
-                    f'{{endpoint="{endpoint}",status="{status}"}} {total:.2f}'
-                )
-                lines.append(
-                    "sync_job_duration_ms_count"
-                    f'{{endpoint="{endpoint}",status="{status}"}} {count}'
-                )
-
-            lines.extend(
-                [
-                    "# HELP sync_items_total Items processed during sync",
-                    "# TYPE sync_items_total counter",
-                ]
-            )
-            for (endpoint, item_type), count in sorted(self._sync_items.items()):
-                lines.append(
-                    f'sync_items_total{{endpoint="{endpoint}",type="{item_type}"}} {count}'
-                )
-
-            lines.extend(
-                [
-                    "# HELP external_api_requests_total External API requests",
-                    "# TYPE external_api_requests_total counter",
-                ]
-            )
-            for (provider, operation, status), count in sorted(self._external_counts.items()):
-                lines.append(
-                    "external_api_requests_total"
-                    f'{{provider="{provider}",operation="{operation}",status="{status}"}} {count}'
-                )
+        self._counter_lines(
+            lines, "http_requests_total", "Total HTTP requests",
+            ("method", "path", "status"), merged["request_counts"],
+        )
+        self._histogram_lines(
+            lines, "http_request_duration_ms", "Request duration in milliseconds",
+            ("method", "path"), merged, "request",
+        )
+        self._histogram_lines(
+            lines, "http_request_db_queries", "SQL statements per request",
+            ("method", "path"), merged, "db_queries", DB_QUERY_COUNT_BUCKETS,
+        )
+        self._histogram_lines(
+            lines, "http_request_db_duration_ms", "SQL time per request in milliseconds",
+            ("method", "path"), merged, "db_time",
+        )
+        self._counter_lines(
+            lines, "http_request_n_plus_one_total", "Requests repeating one SQL statement shape",
+            ("method", "path"), merged["db_n_plus_one"],
+        )
+        self._counter_lines(
+            lines, "sync_jobs_total", "Total sync jobs",
+            ("endpoint", "status"), merged["sync_counts"],
+        )
+        self._histogram_lines(
+            lines, "sync_job_duration_ms", "Sync job duration in milliseconds",
+            ("endpoint", "status"), merged, "sync",
+        )
+        self._counter_lines(
+            lines, "sync_items_total", "Items processed during sync",
+            ("endpoint", "type"), merged["sync_items"],
+        )
+        self._histogram_lines(
+            lines, "sync_stage_duration_ms", "Sync stage duration in milliseconds",
+            ("endpoint", "stage"), merged, "stage",
+        )
+        self._counter_lines(
+            lines, "external_api_requests_total", "External API requests",
+            ("provider", "operation", "status"), merged["external_counts"],
+        )
+        self._histogram_lines(
+            lines, "external_api_duration_ms", "External API duration in milliseconds",
+            ("provider", "operation"), merged, "external",
+        )
+        self._counter_lines(
+            lines, "fit_downloads_total", "FIT file download attempts",
+            ("status",), merged["fit_downloads"],
+        )
+        self._counter_lines(
+            lines, "fit_download_bytes_total", "FIT file download bytes",
+            ("status",), merged["fit_bytes"],
+        )
+        return "\n".join(lines) + "\n"
 
-            lines.extend(
-                [
-                    "# HELP external_api_duration_ms External API duration in milliseconds",
-                    "# TYPE external_api_duration_ms histogram",
-                ]
-            )
-            for (provider, operation), total in sorted(self._external_duration_sum_ms.items()):
-                buckets = self._external_duration_buckets[(provider, operation)]
-                cumulative = 0
-                for bound in self._buckets_ms:
-                    cumulative += buckets.get(str(bound), 0)
-                    lines.append(
-                        "external_api_duration_ms_bucket"
-                        f'{{provider="{provider}",operation="{operation}",le="{bound}"}} {cumulative}'
-                    )
-                cumulative += buckets.get("+Inf", 0)
-                lines.append(
-                    "external_api_duration_ms_bucket"
-                    f'{{provider="{provider}",operation="{operation}",le="+Inf"}} {cumulative}'
-                )
-                count = self._external_duration_count[(provider, operation)]
-                lines.append(
-                    "external_api_duration_ms_sum"
-                    f'{{provider="{provider}",operation="{operation}"}} {total:.2f}'
-                )
-                lines.append(
-                    "external_api_duration_ms_count"
-                    f'{{provider="{provider}",operation="{operation}"}} {count}'
-                )
+    @staticmethod
+    def _labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+        return ",".join(f'{name}="{value}"' for name, value in zip(names, values))
 
-            lines.extend(
-                [
-                    "# HELP fit_downloads_total FIT file download attempts",
-                    "# TYPE fit_downloads_total counter",
-                ]
-            )
-            for status, count in sorted(self._fit_downloads_total.items()):
-                lines.append(f'fit_downloads_total{{status="{status}"}} {count}')
-
-            lines.extend(
-                [
-                    "# HELP fit_download_bytes_total FIT file download bytes",
-                    "# TYPE fit_download_bytes_total counter",
-                ]
-            )
-            for status, total_bytes in sorted(self._fit_bytes_total.items()):
-                lines.append(f'fit_download_bytes_total{{status="{status}"}} {total_bytes}')
-        return "\n".join(lines) + "\n"
+    def _counter_lines(
+        self,
+        lines: list[str],
+        name: str,
+        help_text: str,
+        label_names: tuple[str, ...],
+        counts: dict[tuple[str, ...], int],
+    ) -> None:
+        lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} counter"])
+        for key, count in sorted(counts.items()):
+            lines.append(f"{name}{{{self._labels(label_names, key)}}} {count}")
 
-    def _bucket_for(self, duration_ms: float) -> str:
-        for bound in self._buckets_ms:
-            if duration_ms <= bound:
+    def _histogram_lines(
+        self,
+        lines: list[str],
+        name: str,
+        help_text: str,
+        label_names: tuple[str, ...],
+        merged: dict[str, dict],
+        prefix: str,
+        bounds: list[int] | None = None,
+    ) -> None:
+        lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} histogram"])
+        buckets = merged[f"{prefix}_buckets"]
+        for key, total in sorted(merged[f"{prefix}_sum"].items()):
+            labels = self._labels(label_names, key)
+            cumulative = 0
+            for bound in bounds or self._buckets_ms:
+                cumulative += buckets.get((*key, str(bound)), 0)
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            cumulative += buckets.get((*key, "+Inf"), 0)
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {total:.2f}")
+            lines.append(f"{name}_count{{{labels}}} {merged[f'{prefix}_count'][key]}")
+
+    def _bucket_for(self, value: float, buckets: list[int] | None = None) -> str:
+        for bound in buckets or self._buckets_ms:
+            if value <= bound:
                 return str(bound)
         return "+Inf"
 
@@ -423,6 +429,26 @@ class PrometheusMetrics:
             buckets=self._buckets_ms,
             registry=self._registry,
         )
+        self._http_request_db_queries = Histogram(
+            "http_request_db_queries",
+            "SQL statements per request",
+            ["method", "path"],
+            buckets=DB_QUERY_COUNT_BUCKETS,
+            registry=self._registry,
+        )
+        self._http_request_db_duration_ms = Histogram(
+            "http_request_db_duration_ms",
+            "SQL time per request in milliseconds",
+            ["method", "path"],
+            buckets=self._buckets_ms,
+            registry=self._registry,
+        )
+        self._http_request_n_plus_one_total = Counter(
+            "http_request_n_plus_one_total",
+            "Requests repeating one SQL statement shape",
+            ["method", "path"],
+            registry=self._registry,
+        )
         self._sync_jobs_total = Counter(
             "sync_jobs_total",
             "Total sync jobs",
@@ -442,6 +468,13 @@ class PrometheusMetrics:
             ["endpoint", "type"],
             registry=self._registry,
         )
+        self._sync_stage_duration_ms = Histogram(
+            "sync_stage_duration_ms",
+            "Sync stage duration in milliseconds",
+            ["endpoint", "stage"],
+            buckets=self._buckets_ms,
+            registry=self._registry,
+        )
         self._external_api_requests_total = Counter(
             "external_api_requests_total",
             "External API requests",
@@ -478,6 +511,19 @@ class PrometheusMetrics:
         self._http_requests_total.labels(method, path, str(status_code)).inc()
         self._http_request_duration_ms.labels(method, path).observe(duration_ms)
 
+    def observe_db_queries(
+        self,
+        method: str,
+        path: str,
+        query_count: int,
+        duration_ms: float,
+        n_plus_one: bool = False,
+    ) -> None:
+        self._http_request_db_queries.labels(method, path).observe(query_count)
+        self._http_request_db_duration_ms.labels(method, path).observe(duration_ms)
+        if n_plus_one:
+            self._http_request_n_plus_one_total.labels(method, path).inc()
+
     def observe_sync_job(
         self,
         endpoint: str,
@@ -498,6 +544,9 @@ class PrometheusMetrics:
         if items_updated is not None:
             self._sync_items_total.labels(endpoint, "updated").inc(items_updated)
 
+    def observe_sync_stage(self, endpoint: str, stage: str, duration_ms: float) -> None:
+        self._sync_stage_duration_ms.labels(endpoint, stage).observe(duration_ms)
+
     def observe_external_api(
         self,
         provider: str,
@@ -551,92 +600,208 @@ def _build_metrics_backend(backend: str) -> MetricsBackend:
     return MetricsCollector(buckets_ms)
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Attach request_id, log request/response, and emit metrics."""
+class _DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _ForwardHandler(logging.Handler):
+    """Passes queued records on to a logger's handlers (listener thread)."""
+
+    def __init__(self, target: logging.Logger) -> None:
+        super().__init__()
+        self._target = target
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._target.handle(record)
+
+
+_request_log_listener: QueueListener | None = None
+
+
+def get_request_logger() -> logging.Logger:
+    """Return the request logger, emitting through a background queue.
+
+    Records are put on an in-memory queue and formatted and written by a
+    listener thread through the parent loggers' handlers, so the request
+    path never blocks on log I/O. Loggers that already have handlers
+    configured are left alone.
+    """
+    global _request_log_listener
+    request_logger = logging.getLogger("app.request")
+    if _request_log_listener is None and not request_logger.handlers:
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        _request_log_listener = QueueListener(log_queue, _ForwardHandler(request_logger.parent))
+        request_logger.addHandler(_DeferredQueueHandler(log_queue))
+        request_logger.propagate = False
+        _request_log_listener.start()
+        atexit.register(_request_log_listener.stop)
+    return request_logger
+
+
+class _JsonLogLine:
+    """Log argument serialized only when the record is formatted."""
+
+    __slots__ = ("payload",)
+
+    def __init__(self, payload: dict) -> None:
+        self.payload = payload
+
+    def __str__(self) -> str:
+        return json.dumps(self.payload)
+
+
+def _request_id_from(scope: Scope) -> str:
+    # Validate and sanitize X-Request-ID to prevent injection
+    raw_request_id = Headers(scope=scope).get("x-request-id")
+    if raw_request_id and len(raw_request_id) <= 64 and raw_request_id.replace("-", "").isalnum():
+        return raw_request_id
+    return str(uuid.uuid4())
+
+
+class RequestLoggingMiddleware:
+    """Attach request_id, log request/response, and emit metrics.
+
+    Pure ASGI middleware: response messages pass straight through (the
+    X-Request-ID header is added to the start message), so streaming
+    responses (FileResponse, SSE) are not buffered or moved to another task.
+
+    Errors and requests slower than REQUEST_LOG_SLOW_MS are always logged;
+    other requests are logged at REQUEST_LOG_SAMPLE_RATE. Metrics see every
+    request.
+
+    With DB_QUERY_PROFILING on, the SQL statements of each request are
+    counted and timed (see ``app.core.database``) and reported in the log
+    line and per-route histograms. Requests repeating one statement shape
+    more than DB_N_PLUS_ONE_THRESHOLD times are flagged as likely N+1 and
+    always logged.
+    """
 
     def __init__(
         self,
         app: ASGIApp,
         metrics: MetricsBackend | None = None,
         logger: logging.Logger | None = None,
+        sample_rate: float | None = None,
+        slow_ms: float | None = None,
     ) -> None:
-        super().__init__(app)
+        settings = get_settings()
+        self.app = app
         self.metrics = metrics or get_metrics_backend()
-        self.logger = logger or logging.getLogger("app.request")
-
-    async def dispatch(self, request: Request, call_next) -> Response:
-        # Validate and sanitize X-Request-ID to prevent injection
-        raw_request_id = request.headers.get("X-Request-ID")
-        if raw_request_id and len(raw_request_id) <= 64 and raw_request_id.replace("-", "").isalnum():
-            request_id = raw_request_id
-        else:
-            request_id = str(uuid.uuid4())
-
+        self.logger = logger or get_request_logger()
+        self.sample_rate = settings.request_log_sample_rate if sample_rate is None else sample_rate
+        self.slow_ms = settings.request_log_slow_ms if slow_ms is None else slow_ms
+        self.profile_queries = settings.db_query_profiling
+        self.n_plus_one_threshold = settings.db_n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _request_id_from(scope)
         token = request_id_ctx.set(request_id)
-        request.state.request_id = request_id
+        scope.setdefault("state", {})["request_id"] = request_id
+        query_stats = QueryStats() if self.profile_queries else None
+        query_stats_token = query_stats_ctx.set(query_stats)
 
         start = time.perf_counter()
-        response: Response | None = None
+        status_code = 500
+        duration_ms: float | None = None
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code, duration_ms
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                duration_ms = (time.perf_counter() - start) * 1000
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
+
         try:
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send_with_request_id)
         finally:
-            duration_ms = (time.perf_counter() - start) * 1000
-            status_code = response.status_code if response else 500
-
-            if response is not None:
-                response.headers["X-Request-ID"] = request_id
-
-            route = request.scope.get("route")
-            route_path = getattr(route, "path", None)
-            # Normalize unmatched paths to avoid label cardinality explosion
-            path = route_path or "/__unknown__"
-
-            if self.metrics:
-                self.metrics.observe_request(
-                    request.method,
-                    path,
-                    status_code,
-                    duration_ms,
-                )
-
-            # Normalize path for logging to prevent PII leakage
-            log_path = normalize_log_path(request.url.path)
-            log_payload = {
-                "request_id": request_id,
-                "method": request.method,
-                "path": log_path,
-                "route": route_path,
-                "status_code": status_code,
-                "elapsed_ms": round(duration_ms, 2),
-                "client": request.client.host if request.client else None,
-            }
-            self.logger.info(json.dumps(log_payload))
+            if duration_ms is None:
+                duration_ms = (time.perf_counter() - start) * 1000
+            self._record(scope, request_id, status_code, duration_ms, query_stats)
+            query_stats_ctx.reset(query_stats_token)
             request_id_ctx.reset(token)
 
+    def _record(
+        self,
+        scope: Scope,
+        request_id: str,
+        status_code: int,
+        duration_ms: float,
+        query_stats: QueryStats | None,
+    ) -> None:
+        route_path = getattr(scope.get("route"), "path", None)
+        # Normalize unmatched paths to avoid label cardinality explosion
+        path = route_path or "/__unknown__"
+        repeated = query_stats.repeated(self.n_plus_one_threshold) if query_stats else []
+
+        if self.metrics:
+            self.metrics.observe_request(scope["method"], path, status_code, duration_ms)
+            if query_stats is not None:
+                self.metrics.observe_db_queries(
+                    scope["method"], path, query_stats.count, query_stats.total_ms, bool(repeated)
+                )
 
-def setup_tracing(app: FastAPI, settings=None) -> None:
-    """Configure OpenTelemetry tracing if enabled.
-
-    This function is idempotent - calling it multiple times is safe.
-    Duplicate calls (e.g., during hot reload) will be ignored.
+        if not self._should_log(status_code, duration_ms, bool(repeated)):
+            return
+        client = scope.get("client")
+        payload = {
+            "request_id": request_id,
+            "method": scope["method"],
+            # Normalize path for logging to prevent PII leakage
+            "path": normalize_log_path(scope["path"]),
+            "route": route_path,
+            "status_code": status_code,
+            "elapsed_ms": round(duration_ms, 2),
+            "client": client[0] if client else None,
+        }
+        if query_stats is not None:
+            payload["db_queries"] = query_stats.count
+            payload["db_ms"] = round(query_stats.total_ms, 2)
+            payload["db_slowest_ms"] = round(query_stats.slowest_ms, 2)
+            if query_stats.slowest_statement and duration_ms >= self.slow_ms:
+                payload["db_slowest_statement"] = statement_shape(query_stats.slowest_statement)[:300]
+        if repeated:
+            shape, count = repeated[0]
+            payload["n_plus_one"] = {"statement": shape[:300], "count": count}
+        self.logger.info("%s", _JsonLogLine(payload))
+
+    def _should_log(self, status_code: int, duration_ms: float, flagged: bool = False) -> bool:
+        if not self.logger.isEnabledFor(logging.INFO):
+            return False
+        if flagged or status_code >= 400 or duration_ms >= self.slow_ms:
+            return True
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+
+def init_tracer_provider(settings=None) -> bool:
+    """Install the OTLP tracer provider if tracing is enabled.
+
+    Idempotent; used by ``setup_tracing`` and by worker processes that have
+    no FastAPI app to instrument.
+
+    Returns:
+        True if tracing is active.
     """
     global _tracing_initialized
 
     settings = settings or get_settings()
     if not settings.otel_enabled:
-        return
+        return False
 
-    # Idempotent guard: prevent duplicate instrumentation
+    # Idempotent guard: prevent duplicate provider setup
     if _tracing_initialized:
-        logger.debug("Tracing already initialized, skipping duplicate setup")
-        return
+        return True
 
     try:
         from opentelemetry import trace
         from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
-        from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
-        from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
         from opentelemetry.sdk.resources import Resource
         from opentelemetry.sdk.trace import TracerProvider
         from opentelemetry.sdk.trace.export import BatchSpanProcessor
@@ -644,7 +809,7 @@ def setup_tracing(app: FastAPI, settings=None) -> None:
         logger.warning(
             "OpenTelemetry enabled but required packages are not installed."
         )
-        return
+        return False
 
     resource = Resource.create({"service.name": settings.otel_service_name})
     provider = TracerProvider(resource=resource)
@@ -656,8 +821,44 @@ def setup_tracing(app: FastAPI, settings=None) -> None:
     exporter = OTLPSpanExporter(**exporter_kwargs)
     provider.add_span_processor(BatchSpanProcessor(exporter))
 
-    FastAPIInstrumentor.instrument_app(app)
-    HTTPXClientInstrumentor().instrument()
-
     _tracing_initialized = True
     logger.info("OpenTelemetry tracing initialized")
+    return True
+
+
+def get_tracer(name: str):
+    """Return an OpenTelemetry tracer, or None if tracing is not active."""
+    if not _tracing_initialized:
+        return None
+    from opentelemetry import trace
+
+    return trace.get_tracer(name)
+
+
+def setup_tracing(app: FastAPI, settings=None) -> None:
+    """Configure OpenTelemetry tracing if enabled.
+
+    This function is idempotent - calling it multiple times is safe.
+    Duplicate calls (e.g., during hot reload) will be ignored.
+    """
+    global _app_instrumented
+
+    # Idempotent guard: prevent duplicate instrumentation
+    if _app_instrumented:
+        logger.debug("Tracing already initialized, skipping duplicate setup")
+        return
+    if not init_tracer_provider(settings):
+        return
+
+    try:
+        from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+        from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+    except Exception:
+        logger.warning(
+            "OpenTelemetry enabled but required packages are not installed."
+        )
+        return
+
+    FastAPIInstrumentor.instrument_app(app)
+    HTTPXClientInstrumentor().instrument()
+    _app_instrumented = True
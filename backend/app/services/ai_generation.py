@@ -0,0 +1,342 @@
+"""Queued AI plan/workout generation.
+
+Plan and workout generation can take longer than proxy timeouts allow, so
+they run on the AI worker (``app.workers.ai_worker``) instead of inside the
+HTTP request. A job is processed in three phases so no database connection
+is held while waiting on the LLM:
+
+1. Claim the job and assemble the prompt (short session).
+2. Call the provider (no session).
+3. Validate the payload, import the plan and save the chat turn (short session).
+   The plan import is recorded under a job-specific source, so a retry
+   after the import committed reuses that plan instead of importing again.
+
+The ``ai_generation_jobs`` row is the source of truth; clients poll it.
+"""
+
+import logging
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.database import async_session_maker
+from app.core.queue import get_arq_pool
+from app.models.ai import AIConversation, AIGenerationJob, AIGenerationStatus
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+GENERATION_TASK_NAME = "process_ai_generation"
+
+SessionFactory = Callable[[], AsyncSession]
+
+
+def job_import_source(job_id: int) -> str:
+    """AIImport.source of the plan imported by a generation job."""
+    return f"ai_job:{job_id}"
+
+
+def next_offpeak_run(now: Optional[datetime] = None) -> datetime:
+    """Next start of the off-peak batch window (strictly after now)."""
+    now = now or datetime.now(timezone.utc)
+    run_at = now.replace(
+        hour=settings.ai_generation_offpeak_hour_utc, minute=0, second=0, microsecond=0
+    )
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    return run_at
+
+
+async def enqueue_generation_job(
+    job: AIGenerationJob,
+    db: AsyncSession,
+    pool: Optional[Any] = None,
+) -> bool:
+    """Enqueue a generation job on the ARQ queue.
+
+    The ARQ job id includes the attempt number, so re-enqueueing a job that
+    is still pending in Redis is a no-op.
+
+    Args:
+        job: Generation job (already committed).
+        db: Database session used to record the ARQ job id.
+        pool: ARQ pool (defaults to the shared API pool).
+
+    Returns:
+        True if the job was enqueued (or is already pending).
+    """
+    pool = pool or await get_arq_pool()
+    if pool is None:
+        logger.warning(
+            f"Could not enqueue AI generation job {job.id}: Redis unavailable"
+        )
+        return False
+
+    arq_job_id = f"ai-generation:{job.id}:{job.attempts}"
+    try:
+        await pool.enqueue_job(
+            GENERATION_TASK_NAME,
+            job.id,
+            _job_id=arq_job_id,
+            _queue_name=settings.ai_generation_queue_name,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to enqueue AI generation job {job.id}: {e}")
+        return False
+
+    job.arq_job_id = arq_job_id
+    await db.commit()
+    return True
+
+
+async def _claim_job(db: AsyncSession, job_id: int) -> bool:
+    """Atomically move a queued job to running."""
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        update(AIGenerationJob)
+        .where(
+            AIGenerationJob.id == job_id,
+            AIGenerationJob.status == AIGenerationStatus.QUEUED.value,
+        )
+        .values(
+            status=AIGenerationStatus.RUNNING.value,
+            stage="building_prompt",
+            attempts=AIGenerationJob.attempts + 1,
+            started_at=now,
+            error_message=None,
+        )
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+
+async def _load(
+    db: AsyncSession, job_id: int
+) -> tuple[AIGenerationJob, AIConversation, User]:
+    job = await db.get(AIGenerationJob, job_id)
+    conversation = await db.get(AIConversation, job.conversation_id)
+    user = await db.get(User, job.user_id)
+    return job, conversation, user
+
+
+async def _record_failure(
+    session_factory: SessionFactory, job_id: int, error: str
+) -> dict[str, Any]:
+    """Requeue the job with a delay, or fail it after the last attempt."""
+    async with session_factory() as db:
+        job = await db.get(AIGenerationJob, job_id)
+        now = datetime.now(timezone.utc)
+        job.error_message = error
+        if job.attempts < settings.ai_generation_max_attempts:
+            job.status = AIGenerationStatus.QUEUED.value
+            job.stage = "queued"
+            job.scheduled_for = now + timedelta(minutes=2**job.attempts)
+        else:
+            job.status = AIGenerationStatus.FAILED.value
+            job.stage = "failed"
+            job.completed_at = now
+        await db.commit()
+        logger.warning(
+            f"AI generation job {job_id} attempt {job.attempts} failed "
+            f"(status={job.status}): {error}"
+        )
+        return {
+            "success": False,
+            "job_id": job_id,
+            "status": job.status,
+            "error": error,
+        }
+
+
+async def run_generation_job(
+    job_id: int,
+    session_factory: SessionFactory = async_session_maker,
+) -> dict[str, Any]:
+    """Process one generation job.
+
+    Args:
+        job_id: ID of the AIGenerationJob to process.
+        session_factory: Factory for short-lived database sessions.
+
+    Returns:
+        Result dictionary with job status.
+    """
+    # Validation/import helpers live with the chat endpoints so both paths
+    # produce identical responses. Imported lazily to avoid a cycle.
+    from app.api.v1.endpoints import ai as ai_endpoints
+
+    # Phase 1: claim and build the prompt
+    async with session_factory() as db:
+        if not await _claim_job(db, job_id):
+            job = await db.get(AIGenerationJob, job_id)
+            if job is None:
+                logger.warning(f"AI generation job {job_id} not found")
+                return {"success": False, "error": "Job not found"}
+            logger.info(
+                f"AI generation job {job_id} already claimed (status: {job.status})"
+            )
+            return {"success": True, "job_id": job_id, "status": job.status}
+
+        job, conversation, user = await _load(db, job_id)
+        mode = job.mode
+        save_mode = job.save_mode
+        user_message = job.request_message
+        try:
+            prompt = await ai_endpoints._assemble_prompt(
+                conversation=conversation,
+                user_message=user_message,
+                context=job.request_context,
+                db=db,
+                system_prompt=ai_endpoints.STRUCTURED_MODE_PROMPTS[mode],
+            )
+            job.stage = "generating"
+            await db.commit()  # Also persists any refreshed history summary
+        except Exception as e:
+            logger.exception(f"Failed to build prompt for AI generation job {job_id}")
+            await db.rollback()
+            return await _record_failure(
+                session_factory, job_id, f"{type(e).__name__}: {e}"
+            )
+
+    # Phase 2: provider call with no database session held
+    try:
+        ai_response = ai_endpoints._parse_structured_response(
+            await ai_endpoints._complete_prompt(prompt), mode
+        )
+    except HTTPException as e:
+        return await _record_failure(session_factory, job_id, str(e.detail))
+    except Exception as e:
+        logger.exception(f"AI provider error in generation job {job_id}")
+        return await _record_failure(
+            session_factory, job_id, f"{type(e).__name__}: {e}"
+        )
+
+    # Phase 3: validate, import and save the turn
+    async with session_factory() as db:
+        job, conversation, user = await _load(db, job_id)
+        job.stage = "saving"
+        try:
+            outcome = await ai_endpoints._apply_ai_response(
+                mode=mode,
+                ai_response=ai_response,
+                save_mode=save_mode,
+                current_user=user,
+                db=db,
+                import_source=job_import_source(job_id),
+            )
+            chat_response = await ai_endpoints._save_chat_turn(
+                conversation=conversation,
+                user_content=user_message,
+                outcome=outcome,
+                db=db,
+            )
+        except Exception as e:
+            await db.rollback()
+            error = (
+                str(e.detail)
+                if isinstance(e, HTTPException)
+                else f"{type(e).__name__}: {e}"
+            )
+            if not isinstance(e, HTTPException):
+                logger.exception(f"Failed to save AI generation job {job_id}")
+            return await _record_failure(session_factory, job_id, error)
+
+        job = await db.get(AIGenerationJob, job_id)
+        job.status = AIGenerationStatus.SUCCEEDED.value
+        job.stage = "done"
+        job.result = chat_response.model_dump(mode="json")
+        job.completed_at = datetime.now(timezone.utc)
+        await db.commit()
+
+    logger.info(
+        f"AI generation job {job_id} succeeded (mode={mode}, plan_id={outcome['plan_id']})"
+    )
+    return {
+        "success": True,
+        "job_id": job_id,
+        "status": AIGenerationStatus.SUCCEEDED.value,
+        "plan_id": outcome["plan_id"],
+    }
+
+
+async def sweep_generation_jobs(
+    pool: Any,
+    session_factory: SessionFactory = async_session_maker,
+) -> dict[str, int]:
+    """Enqueue due jobs and recover stuck ones.
+
+    - Jobs scheduled for the off-peak window (or a retry backoff) whose time
+      has come are enqueued in batches.
+    - Queued jobs that never reached Redis are re-enqueued.
+    - Running jobs older than the job timeout (worker died) are requeued or
+      failed once attempts are exhausted.
+
+    Args:
+        pool: ARQ pool used to enqueue jobs.
+        session_factory: Factory for database sessions.
+
+    Returns:
+        Counts of enqueued, recovered and failed jobs.
+    """
+    now = datetime.now(timezone.utc)
+    stale_before = now - timedelta(seconds=settings.ai_generation_stale_seconds)
+    running_before = now - timedelta(seconds=settings.ai_generation_job_timeout_seconds)
+    enqueued = recovered = failed = 0
+
+    async with session_factory() as db:
+        result = await db.execute(
+            select(AIGenerationJob).where(
+                AIGenerationJob.status == AIGenerationStatus.RUNNING.value,
+                AIGenerationJob.started_at < running_before,
+            )
+        )
+        for job in result.scalars().all():
+            if job.attempts >= settings.ai_generation_max_attempts:
+                job.status = AIGenerationStatus.FAILED.value
+                job.stage = "failed"
+                job.error_message = "Generation timed out"
+                job.completed_at = now
+                failed += 1
+            else:
+                job.status = AIGenerationStatus.QUEUED.value
+                job.stage = "queued"
+                job.scheduled_for = None
+                recovered += 1
+        await db.commit()
+
+        result = await db.execute(
+            select(AIGenerationJob)
+            .where(
+                AIGenerationJob.status == AIGenerationStatus.QUEUED.value,
+                or_(
+                    AIGenerationJob.scheduled_for <= now,
+                    and_(
+                        AIGenerationJob.scheduled_for.is_(None),
+                        AIGenerationJob.updated_at < stale_before,
+                    ),
+                ),
+            )
+            .order_by(AIGenerationJob.created_at)
+            .limit(settings.ai_generation_batch_size)
+        )
+        jobs = list(result.scalars().all())
+        for job in jobs:
+            # Clear the schedule so the next sweep doesn't pick it up again
+            job.scheduled_for = None
+        await db.commit()
+
+        for job in jobs:
+            if await enqueue_generation_job(job, db, pool=pool):
+                enqueued += 1
+
+    if enqueued or recovered or failed:
+        logger.info(
+            f"AI generation sweep: enqueued={enqueued}, recovered={recovered}, failed={failed}"
+        )
+    return {"enqueued": enqueued, "recovered": recovered, "failed": failed}
@@ -0,0 +1,505 @@
+"""Token-budgeted prompt assembly for AI coach conversations.
+
+Builds the model input for a chat turn from separately accounted segments:
+
+- system: the static coach prompt (identical every turn, so it can be cached
+  provider-side: Gemini CachedContent, OpenAI automatic prefix caching)
+- knowledge: RAG context for the current message
+- context: the user's training context block, built and rendered once per
+  sync and cached in Redis, followed by any per-request client context
+- summary: a rolling summary of older turns, generated once and stored on
+  the conversation (context_data["history_summary"])
+- history: the most recent turns verbatim
+- user: the current message
+
+Each segment is token-counted and the total is trimmed to
+settings.ai_prompt_max_input_tokens, so input size stays bounded no matter
+how long a conversation runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.session import get_redis
+from app.models.activity import Activity
+from app.models.ai import AIConversation, AIMessage
+from app.observability import get_metrics_backend
+from app.services.ai_snapshot import get_last_sync_at
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+CONTEXT_CACHE_PREFIX = "ai:context_block"
+HISTORY_SUMMARY_KEY = "history_summary"
+
+HISTORY_SUMMARY_PROMPT = """다음은 러닝 코치와 사용자의 이전 대화입니다.
+이후 대화에 필요한 사실만 간결하게 요약하세요: 사용자의 목표, 대회, 부상/제약,
+합의한 훈련 계획과 페이스, 아직 답하지 않은 질문. 인사말과 반복은 제외합니다.
+요약은 불릿 목록으로 작성합니다."""
+
+# Builds the user's training context; only awaited on a context cache miss
+ContextBuilder = Callable[[], Awaitable[dict[str, Any] | None]]
+
+# Gemini CachedContent handles keyed by (model, prompt hash): (content, expires_at)
+_provider_cache: dict[str, tuple[Any, float]] = {}
+# Prompts the provider refused to cache (e.g. below the minimum token count)
+_provider_cache_unsupported: set[str] = set()
+# Prompts whose cache creation failed transiently: key -> retry not before
+_provider_cache_retry_at: dict[str, float] = {}
+PROVIDER_CACHE_RETRY_SECONDS = 300
+
+_tiktoken_encoding: Any = None
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens in text.
+
+    Uses tiktoken when installed; otherwise a conservative estimate of one
+    token per 4 ASCII characters and one per non-ASCII character (Hangul
+    syllables usually encode to at least one token).
+    """
+    global _tiktoken_encoding
+
+    if not text:
+        return 0
+    if tiktoken is not None:
+        if _tiktoken_encoding is None:
+            _tiktoken_encoding = tiktoken.get_encoding("cl100k_base")
+        return len(_tiktoken_encoding.encode(text))
+
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return math.ceil((len(text) - non_ascii) / 4) + non_ascii
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Trim text so count_tokens(text) <= max_tokens."""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if count_tokens(text[:mid]) <= max_tokens - 1:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low] + "…"
+
+
+@dataclass
+class PromptMessage:
+    """A history turn in provider-neutral form."""
+
+    role: str  # "user" or "assistant"
+    content: str
+
+
+@dataclass
+class AssembledPrompt:
+    """Model input for one turn, split into token-accounted segments."""
+
+    system_prompt: str
+    knowledge: str = ""
+    context_block: str = ""
+    history_summary: str = ""
+    history: list[PromptMessage] = field(default_factory=list)
+    user_message: str = ""
+    segment_tokens: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(self.segment_tokens.values())
+
+    @property
+    def preamble(self) -> str:
+        """Per-turn material that follows the cacheable system prompt."""
+        parts = []
+        if self.knowledge:
+            parts.append(f"[참고 자료]\n{self.knowledge}")
+        if self.history_summary:
+            parts.append(f"[이전 대화 요약]\n{self.history_summary}")
+        if self.context_block:
+            parts.append(f"[사용자 컨텍스트: {self.context_block}]")
+        return "\n\n".join(parts)
+
+    def recount(self) -> None:
+        self.segment_tokens = {
+            "system": count_tokens(self.system_prompt),
+            "knowledge": count_tokens(self.knowledge),
+            "context": count_tokens(self.context_block),
+            "summary": count_tokens(self.history_summary),
+            "history": sum(count_tokens(m.content) for m in self.history),
+            "user": count_tokens(self.user_message),
+        }
+
+
+# -------------------------------------------------------------------------
+# Training context block
+# -------------------------------------------------------------------------
+
+
+def _render_context(context: dict[str, Any]) -> str:
+    return json.dumps(
+        context, ensure_ascii=False, separators=(",", ":"), sort_keys=True, default=str
+    )
+
+
+async def _context_watermark(db: AsyncSession, user_id: int) -> str:
+    """Changes whenever the data behind the user's training context does."""
+    last_sync_at = await get_last_sync_at(db, user_id)
+    result = await db.execute(
+        select(func.max(Activity.updated_at), func.count(Activity.id)).where(
+            Activity.user_id == user_id
+        )
+    )
+    last_updated_at, activity_count = result.one()
+    return ":".join(
+        (
+            last_sync_at.isoformat() if last_sync_at else "never",
+            last_updated_at.isoformat() if last_updated_at else "none",
+            str(activity_count),
+        )
+    )
+
+
+async def get_context_block(
+    db: AsyncSession,
+    user_id: int,
+    build_context: ContextBuilder,
+) -> str:
+    """Render the user's training context block, cached until the data changes.
+
+    The cache key is the user plus a watermark of their last successful
+    Garmin sync and latest activity change, so ``build_context`` only runs
+    on a miss and a new sync naturally invalidates the rendered block.
+    ``build_context`` must reflect the data at that watermark; an empty
+    block is never cached so a context that isn't available yet is retried.
+    """
+    cache_key = (
+        f"{CONTEXT_CACHE_PREFIX}:{user_id}:{await _context_watermark(db, user_id)}"
+    )
+
+    redis_client = await get_redis()
+    if redis_client is not None:
+        try:
+            cached = await redis_client.get(cache_key)
+            if cached is not None:
+                return cached
+        except Exception as e:
+            logger.debug(f"Context block cache read failed: {e}")
+
+    context = await build_context()
+    block = (
+        truncate_to_tokens(_render_context(context), settings.ai_context_max_tokens)
+        if context
+        else ""
+    )
+
+    if redis_client is not None and block:
+        try:
+            await redis_client.setex(
+                cache_key, settings.ai_context_cache_ttl_seconds, block
+            )
+        except Exception as e:
+            logger.debug(f"Context block cache write failed: {e}")
+
+    return block
+
+
+# -------------------------------------------------------------------------
+# History with rolling summary
+# -------------------------------------------------------------------------
+
+
+def _dedupe(messages: list[AIMessage]) -> list[AIMessage]:
+    """Drop consecutive messages with the same role and content."""
+    deduped: list[AIMessage] = []
+    for msg in messages:
+        if (
+            deduped
+            and deduped[-1].role == msg.role
+            and deduped[-1].content == msg.content
+        ):
+            continue
+        deduped.append(msg)
+    return deduped
+
+
+async def _summarize(
+    previous_summary: str, messages: list[AIMessage]
+) -> tuple[str, int | None]:
+    """Fold older turns into the rolling summary with one LLM call."""
+    transcript = "\n".join(
+        f"{'사용자' if m.role == 'user' else '코치'}: {m.content}" for m in messages
+    )
+    if previous_summary:
+        transcript = f"[기존 요약]\n{previous_summary}\n\n[추가 대화]\n{transcript}"
+    max_tokens = settings.ai_history_summary_max_tokens
+    metrics = get_metrics_backend()
+
+    start_time = time.perf_counter()
+    status_code = 500
+    try:
+        if settings.ai_provider == "google" and settings.google_ai_api_key:
+            import google.generativeai as genai
+
+            genai.configure(api_key=settings.google_ai_api_key)
+            model = genai.GenerativeModel(
+                model_name=settings.google_ai_model,
+                system_instruction=HISTORY_SUMMARY_PROMPT,
+            )
+            response = await model.generate_content_async(
+                transcript,
+                generation_config={"max_output_tokens": max_tokens, "temperature": 0.2},
+            )
+            status_code = 200
+            tokens = None
+            if getattr(response, "usage_metadata", None):
+                tokens = response.usage_metadata.total_token_count
+            return response.text.strip(), tokens
+
+        from openai import AsyncOpenAI
+
+        client = AsyncOpenAI(api_key=settings.openai_api_key)
+        response = await client.chat.completions.create(
+            model=settings.openai_model,
+            messages=[
+                {"role": "system", "content": HISTORY_SUMMARY_PROMPT},
+                {"role": "user", "content": transcript},
+            ],
+            max_tokens=max_tokens,
+            temperature=0.2,
+        )
+        status_code = 200
+        return (
+            (response.choices[0].message.content or "").strip(),
+            response.usage.total_tokens if response.usage else None,
+        )
+    finally:
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        provider = (
+            "google"
+            if settings.ai_provider == "google" and settings.google_ai_api_key
+            else "openai"
+        )
+        metrics.observe_external_api(
+            provider, "history_summary", status_code, duration_ms
+        )
+
+
+async def load_history(
+    db: AsyncSession,
+    conversation: AIConversation,
+) -> tuple[str, list[PromptMessage]]:
+    """Return (rolling summary, recent verbatim turns) for a conversation.
+
+    Turns older than the verbatim window are folded into the stored summary
+    once enough of them accumulate (ai_history_summary_min_messages), so the
+    summarizer runs every few turns rather than on every request. If
+    summarization fails, older turns stay verbatim and are subject to the
+    normal budget trimming.
+    """
+    stored = (conversation.context_data or {}).get(HISTORY_SUMMARY_KEY) or {}
+    summary = stored.get("text", "")
+    through_id = stored.get("through_message_id") or 0
+
+    msg_result = await db.execute(
+        select(AIMessage)
+        .where(
+            AIMessage.conversation_id == conversation.id,
+            AIMessage.id > through_id,
+        )
+        .order_by(AIMessage.created_at.asc(), AIMessage.id.asc())
+    )
+    messages = _dedupe(list(msg_result.scalars().all()))
+
+    verbatim = max(1, settings.ai_history_verbatim_messages)
+    older, recent = messages[:-verbatim], messages[-verbatim:]
+
+    if len(older) >= settings.ai_history_summary_min_messages:
+        try:
+            summary, _ = await _summarize(summary, older)
+            conversation.context_data = {
+                **(conversation.context_data or {}),
+                HISTORY_SUMMARY_KEY: {
+                    "text": summary,
+                    "through_message_id": older[-1].id,
+                    "tokens": count_tokens(summary),
+                },
+            }
+        except Exception as e:
+            logger.warning(
+                f"History summarization failed, sending older turns verbatim: {e}"
+            )
+            recent = older + recent
+    else:
+        # Not enough to summarize yet; keep them verbatim
+        recent = older + recent
+
+    recent = recent[-settings.ai_max_history_messages :]
+    return summary, [PromptMessage(role=m.role, content=m.content) for m in recent]
+
+
+# -------------------------------------------------------------------------
+# Assembly
+# -------------------------------------------------------------------------
+
+
+async def assemble_prompt(
+    db: AsyncSession,
+    conversation: AIConversation,
+    user_message: str,
+    system_prompt: str,
+    context: dict[str, Any] | None = None,
+    knowledge: str = "",
+    build_context: ContextBuilder | None = None,
+) -> AssembledPrompt:
+    """Assemble a token-budgeted prompt for one conversation turn.
+
+    ``build_context`` supplies the user's cached training context;
+    ``context`` is per-request client context and is not cached.
+
+    Over budget, segments are trimmed in this order: oldest verbatim
+    history turns, knowledge, context block, summary.
+    """
+    summary, history = await load_history(db, conversation)
+    context_parts = []
+    if build_context is not None:
+        context_parts.append(
+            await get_context_block(db, conversation.user_id, build_context)
+        )
+    if context:
+        context_parts.append(
+            truncate_to_tokens(_render_context(context), settings.ai_context_max_tokens)
+        )
+    prompt = AssembledPrompt(
+        system_prompt=system_prompt,
+        knowledge=knowledge,
+        context_block="\n".join(part for part in context_parts if part),
+        history_summary=summary,
+        history=history,
+        user_message=user_message,
+    )
+    prompt.recount()
+
+    budget = settings.ai_prompt_max_input_tokens
+    while prompt.total_tokens > budget and len(prompt.history) > 1:
+        dropped = prompt.history.pop(0)
+        prompt.segment_tokens["history"] -= count_tokens(dropped.content)
+
+    for segment, attr in (
+        ("knowledge", "knowledge"),
+        ("context", "context_block"),
+        ("summary", "history_summary"),
+    ):
+        overflow = prompt.total_tokens - budget
+        if overflow <= 0:
+            break
+        allowed = max(0, prompt.segment_tokens[segment] - overflow)
+        setattr(prompt, attr, truncate_to_tokens(getattr(prompt, attr), allowed))
+        prompt.segment_tokens[segment] = count_tokens(getattr(prompt, attr))
+
+    logger.info(
+        "AI prompt assembled conversation_id=%s total_tokens=%s segments=%s",
+        conversation.id,
+        prompt.total_tokens,
+        prompt.segment_tokens,
+    )
+    return prompt
+
+
+# -------------------------------------------------------------------------
+# Provider-side caching of the static prefix
+# -------------------------------------------------------------------------
+
+
+def _is_unsupported_cache_error(error: Exception) -> bool:
+    """True for a definitive 4xx refusal (e.g. prompt below the minimum size)."""
+    from google.api_core import exceptions as google_exceptions
+
+    return isinstance(error, google_exceptions.ClientError) and not isinstance(
+        error, google_exceptions.TooManyRequests
+    )
+
+
+async def get_gemini_model(system_prompt: str) -> Any:
+    """Return a Gemini model for the system prompt, using cached content when possible.
+
+    The static system prompt is uploaded once as CachedContent (off the
+    event loop) and reused until its TTL expires. Prompts the API refuses
+    to cache (a 4xx such as too short for the model's minimum) fall back to
+    a plain system_instruction for the life of the process; other failures
+    fall back for PROVIDER_CACHE_RETRY_SECONDS and are then retried.
+    """
+    import google.generativeai as genai
+
+    genai.configure(api_key=settings.google_ai_api_key)
+    model_name = settings.google_ai_model
+
+    if not settings.ai_provider_cache_enabled:
+        return genai.GenerativeModel(
+            model_name=model_name, system_instruction=system_prompt
+        )
+
+    cache_key = (
+        f"{model_name}:{hashlib.sha256(system_prompt.encode('utf-8')).hexdigest()[:16]}"
+    )
+    now = time.time()
+    if (
+        cache_key in _provider_cache_unsupported
+        or _provider_cache_retry_at.get(cache_key, 0) > now
+    ):
+        return genai.GenerativeModel(
+            model_name=model_name, system_instruction=system_prompt
+        )
+
+    from google.generativeai import caching
+
+    cached = _provider_cache.get(cache_key)
+    try:
+        if cached is None or cached[1] <= now + 60:
+            ttl_seconds = settings.ai_provider_cache_ttl_seconds
+            content = await asyncio.to_thread(
+                caching.CachedContent.create,
+                model=f"models/{model_name}",
+                display_name=f"runningcoach-{cache_key}",
+                system_instruction=system_prompt,
+                ttl=timedelta(seconds=ttl_seconds),
+            )
+            _provider_cache[cache_key] = (content, now + ttl_seconds)
+            _provider_cache_retry_at.pop(cache_key, None)
+        else:
+            content = cached[0]
+        return genai.GenerativeModel.from_cached_content(cached_content=content)
+    except Exception as e:
+        _provider_cache.pop(cache_key, None)
+        if _is_unsupported_cache_error(e):
+            logger.info(
+                f"Gemini context caching unsupported for {model_name}, using system_instruction: {e}"
+            )
+            _provider_cache_unsupported.add(cache_key)
+        else:
+            logger.warning(f"Gemini context cache creation failed, retrying later: {e}")
+            _provider_cache_retry_at[cache_key] = now + PROVIDER_CACHE_RETRY_SECONDS
+        return genai.GenerativeModel(
+            model_name=model_name, system_instruction=system_prompt
+        )
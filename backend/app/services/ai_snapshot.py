@@ -3,15 +3,24 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timedelta, timezone
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
 from typing import Any
 
 import httpx
-from sqlalchemy import func, select
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
-from app.models import Activity, AITrainingSnapshot, GarminSyncState, HRRecord, Sleep
+from app.models import (
+    Activity,
+    AITrainingSnapshot,
+    AITrainingWeekAggregate,
+    GarminSyncState,
+    HRRecord,
+    Sleep,
+)
 from app.models.race import Race
 from app.models.user import User
 
@@ -47,14 +56,6 @@ def _parse_pace(value: Any) -> int | None:
     return None
 
 
-def _percentile(values: list[int], percentile: float) -> int | None:
-    if not values:
-        return None
-    values = sorted(values)
-    index = int(round((len(values) - 1) * percentile))
-    return values[index]
-
-
 async def _fetch_runalyze_training_paces() -> dict[str, Any] | None:
     if not settings.runalyze_api_token:
         return None
@@ -82,7 +83,7 @@ async def _fetch_runalyze_training_paces() -> dict[str, Any] | None:
     return None
 
 
-async def _resolve_pace_profile(pace_values: list[int]) -> tuple[int, int, str]:
+async def _resolve_pace_profile(totals: WindowTotals) -> tuple[int, int, str]:
     paces = await _fetch_runalyze_training_paces()
     if paces:
         easy_min = _parse_pace(paces.get("easy_min"))
@@ -98,9 +99,9 @@ async def _resolve_pace_profile(pace_values: list[int]) -> tuple[int, int, str]:
                 tempo_cutoff = interval_cutoff + 10
             return interval_cutoff, tempo_cutoff, "runalyze"
 
-    if len(pace_values) >= 5:
-        interval_cutoff = _percentile(pace_values, 0.2) or DEFAULT_INTERVAL_CUTOFF
-        tempo_cutoff = _percentile(pace_values, 0.6) or DEFAULT_TEMPO_CUTOFF
+    if totals.pace_count >= 5:
+        interval_cutoff = totals.pace_percentile(0.2) or DEFAULT_INTERVAL_CUTOFF
+        tempo_cutoff = totals.pace_percentile(0.6) or DEFAULT_TEMPO_CUTOFF
         if tempo_cutoff <= interval_cutoff:
             tempo_cutoff = interval_cutoff + 10
         return interval_cutoff, tempo_cutoff, "activity_percentile"
@@ -108,7 +109,7 @@ async def _resolve_pace_profile(pace_values: list[int]) -> tuple[int, int, str]:
     return DEFAULT_INTERVAL_CUTOFF, DEFAULT_TEMPO_CUTOFF, "heuristic"
 
 
-def _calculate_pace_seconds(activity: Activity) -> int | None:
+def _calculate_pace_seconds(activity: Any) -> int | None:
     if activity.avg_pace_seconds and activity.avg_pace_seconds > 0:
         return int(activity.avg_pace_seconds)
     if activity.distance_meters and activity.duration_seconds:
@@ -117,7 +118,7 @@ def _calculate_pace_seconds(activity: Activity) -> int | None:
     return None
 
 
-async def _get_last_sync_at(db: AsyncSession, user_id: int) -> datetime | None:
+async def get_last_sync_at(db: AsyncSession, user_id: int) -> datetime | None:
     result = await db.execute(
         select(func.max(GarminSyncState.last_success_at)).where(
             GarminSyncState.user_id == user_id
@@ -126,6 +127,21 @@ async def _get_last_sync_at(db: AsyncSession, user_id: int) -> datetime | None:
     return result.scalar_one_or_none()
 
 
+async def _activities_changed_since(db: AsyncSession, user_id: int, since: datetime) -> bool:
+    """Whether any activity was added or updated after ``since`` (e.g. an upload)."""
+    result = await db.execute(
+        select(func.max(Activity.updated_at)).where(Activity.user_id == user_id)
+    )
+    last_updated_at = result.scalar_one_or_none()
+    if last_updated_at is None:
+        return False
+    if last_updated_at.tzinfo is None:
+        last_updated_at = last_updated_at.replace(tzinfo=timezone.utc)
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_updated_at > since
+
+
 async def _get_race_data(db: AsyncSession, user_id: int) -> dict[str, Any]:
     """Fetch race data for AI context.
 
@@ -215,45 +231,391 @@ def _format_time(seconds: int | None) -> str | None:
     return f"{minutes}:{secs:02d}"
 
 
+@dataclass
+class WindowTotals:
+    """Additive activity totals for a set of days.
+
+    Mirrors the columns of AITrainingWeekAggregate so stored weeks and
+    partial edge weeks can be combined into any snapshot window.
+    """
+
+    activity_count: int = 0
+    total_distance_m: float = 0.0
+    total_duration_s: int = 0
+    long_run_max_m: float = 0.0
+    active_days: int = 0
+    missing_hr_count: int = 0
+    hr_sum: int = 0
+    hr_count: int = 0
+    pace_histogram: dict[int, list[float]] = field(default_factory=dict)
+
+    def add_pace(self, pace_sec: int, distance_m: float, count: int = 1) -> None:
+        bucket = self.pace_histogram.setdefault(pace_sec, [0, 0.0])
+        bucket[0] += count
+        bucket[1] += distance_m
+
+    def merge(self, other: "WindowTotals") -> None:
+        self.activity_count += other.activity_count
+        self.total_distance_m += other.total_distance_m
+        self.total_duration_s += other.total_duration_s
+        self.long_run_max_m = max(self.long_run_max_m, other.long_run_max_m)
+        self.active_days += other.active_days
+        self.missing_hr_count += other.missing_hr_count
+        self.hr_sum += other.hr_sum
+        self.hr_count += other.hr_count
+        for pace_sec, (count, distance_m) in other.pace_histogram.items():
+            self.add_pace(pace_sec, distance_m, int(count))
+
+    def pace_percentile(self, percentile: float) -> int | None:
+        """Nearest-rank percentile over the expanded pace values."""
+        total = sum(int(count) for count, _ in self.pace_histogram.values())
+        if total == 0:
+            return None
+        target = int(round((total - 1) * percentile))
+        seen = 0
+        for pace_sec in sorted(self.pace_histogram):
+            seen += int(self.pace_histogram[pace_sec][0])
+            if seen > target:
+                return pace_sec
+        return None
+
+    @property
+    def pace_count(self) -> int:
+        return sum(int(count) for count, _ in self.pace_histogram.values())
+
+
+# Columns needed to aggregate activities (avoids loading full ORM rows)
+_AGGREGATE_COLUMNS = (
+    Activity.id,
+    Activity.start_time,
+    Activity.distance_meters,
+    Activity.duration_seconds,
+    Activity.avg_pace_seconds,
+    Activity.avg_hr,
+    Activity.updated_at,
+)
+
+
+def _week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def _totals_from_rows(rows: Any) -> tuple[WindowTotals, int]:
+    """Aggregate activity rows; returns totals and the weekday bitmask."""
+    totals = WindowTotals()
+    mask = 0
+    active_dates: set[date] = set()
+    for row in rows:
+        distance_m = row.distance_meters or 0
+        totals.activity_count += 1
+        totals.total_distance_m += distance_m
+        totals.total_duration_s += row.duration_seconds or 0
+        totals.long_run_max_m = max(totals.long_run_max_m, distance_m)
+        if row.start_time:
+            day = row.start_time.date()
+            active_dates.add(day)
+            mask |= 1 << day.weekday()
+        if row.avg_hr and row.avg_hr > 0:
+            totals.hr_sum += row.avg_hr
+            totals.hr_count += 1
+        else:
+            totals.missing_hr_count += 1
+        pace_sec = _calculate_pace_seconds(row)
+        if pace_sec:
+            totals.add_pace(pace_sec, distance_m if distance_m > 0 else 0.0)
+    totals.active_days = len(active_dates)
+    return totals, mask
+
+
+def _totals_from_aggregate(row: AITrainingWeekAggregate) -> WindowTotals:
+    return WindowTotals(
+        activity_count=row.activity_count,
+        total_distance_m=row.total_distance_m,
+        total_duration_s=row.total_duration_s,
+        long_run_max_m=row.long_run_max_m,
+        active_days=bin(row.active_days_mask).count("1"),
+        missing_hr_count=row.missing_hr_count,
+        hr_sum=row.hr_sum,
+        hr_count=row.hr_count,
+        pace_histogram={
+            int(pace_sec): [int(count), float(distance_m)]
+            for pace_sec, (count, distance_m) in (row.pace_histogram or {}).items()
+        },
+    )
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+
+
+async def refresh_week_aggregates(
+    db: AsyncSession,
+    user_id: int,
+    *,
+    full: bool = False,
+) -> int:
+    """Fold activities changed since the last refresh into per-week aggregates.
+
+    The watermark is the newest ``(updated_at, id)`` folded into any week;
+    only weeks containing activities strictly after it, plus the weeks those
+    activities were previously folded into, are recomputed, so an unchanged
+    history is a read-only no-op. If activity counts no longer
+    match (e.g. activities were deleted), all weeks are rebuilt.
+
+    Args:
+        db: Database session.
+        user_id: User ID.
+        full: Rebuild every week from scratch.
+
+    Returns:
+        Number of weeks recomputed.
+    """
+    if not full:
+        folded_result = await db.execute(
+            select(func.coalesce(func.sum(AITrainingWeekAggregate.activity_count), 0)).where(
+                AITrainingWeekAggregate.user_id == user_id
+            )
+        )
+        folded_count = folded_result.scalar_one()
+        watermark_result = await db.execute(
+            select(
+                AITrainingWeekAggregate.source_updated_at,
+                AITrainingWeekAggregate.source_activity_id,
+            )
+            .where(
+                AITrainingWeekAggregate.user_id == user_id,
+                AITrainingWeekAggregate.source_updated_at.is_not(None),
+            )
+            .order_by(
+                AITrainingWeekAggregate.source_updated_at.desc(),
+                AITrainingWeekAggregate.source_activity_id.desc(),
+            )
+            .limit(1)
+        )
+        watermark, watermark_id = watermark_result.one_or_none() or (None, None)
+
+        count_result = await db.execute(
+            select(func.count(Activity.id)).where(Activity.user_id == user_id)
+        )
+        activity_count = count_result.scalar_one()
+
+        if watermark is None and activity_count:
+            full = True
+
+    if full:
+        dirty_weeks = None  # every week
+        rows_result = await db.execute(
+            select(*_AGGREGATE_COLUMNS).where(Activity.user_id == user_id)
+        )
+    else:
+        if watermark is None:
+            return 0
+        changed_result = await db.execute(
+            select(Activity.id, Activity.start_time).where(
+                Activity.user_id == user_id,
+                or_(
+                    Activity.updated_at > watermark,
+                    and_(Activity.updated_at == watermark, Activity.id > (watermark_id or 0)),
+                ),
+            )
+        )
+        changed = changed_result.all()
+        dirty_weeks = {_week_start(start_time.date()) for _, start_time in changed if start_time}
+        if not dirty_weeks:
+            if folded_count == activity_count:
+                return 0
+            # Activities were removed: counts drifted, rebuild everything
+            return await refresh_week_aggregates(db, user_id, full=True)
+
+        # Weeks a changed activity was folded into before (it may have moved)
+        changed_ids = {activity_id for activity_id, _ in changed}
+        folded_result = await db.execute(
+            select(AITrainingWeekAggregate.week_start, AITrainingWeekAggregate.activity_ids).where(
+                AITrainingWeekAggregate.user_id == user_id
+            )
+        )
+        dirty_weeks.update(
+            week
+            for week, activity_ids in folded_result.all()
+            if changed_ids.intersection(activity_ids or ())
+        )
+
+        rows_result = await db.execute(
+            select(*_AGGREGATE_COLUMNS).where(
+                Activity.user_id == user_id,
+                or_(
+                    *(
+                        and_(
+                            Activity.start_time >= _day_start(week),
+                            Activity.start_time < _day_start(week + timedelta(days=7)),
+                        )
+                        for week in dirty_weeks
+                    )
+                ),
+            )
+        )
+
+    rows_by_week: dict[date, list[Any]] = {}
+    for row in rows_result.all():
+        if not row.start_time:
+            continue
+        rows_by_week.setdefault(_week_start(row.start_time.date()), []).append(row)
+
+    # Upsert rather than delete + insert: concurrent refreshes for the same
+    # user (sync, chat, export) would otherwise race on uq_ai_training_week_user_week
+    values = []
+    for week, week_rows in rows_by_week.items():
+        totals, mask = _totals_from_rows(week_rows)
+        newest = max(
+            (r for r in week_rows if r.updated_at), key=lambda r: (r.updated_at, r.id), default=None
+        )
+        values.append(
+            {
+                "user_id": user_id,
+                "week_start": week,
+                "activity_count": totals.activity_count,
+                "total_distance_m": totals.total_distance_m,
+                "total_duration_s": totals.total_duration_s,
+                "long_run_max_m": totals.long_run_max_m,
+                "active_days_mask": mask,
+                "missing_hr_count": totals.missing_hr_count,
+                "hr_sum": totals.hr_sum,
+                "hr_count": totals.hr_count,
+                "pace_histogram": {
+                    str(pace_sec): bucket for pace_sec, bucket in totals.pace_histogram.items()
+                },
+                "activity_ids": sorted(r.id for r in week_rows),
+                "source_updated_at": newest.updated_at if newest else None,
+                "source_activity_id": newest.id if newest else None,
+            }
+        )
+    if values:
+        stmt = insert(AITrainingWeekAggregate).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "week_start"],
+            set_={
+                **{
+                    column: stmt.excluded[column]
+                    for column in values[0]
+                    if column not in ("user_id", "week_start")
+                },
+                "updated_at": func.now(),
+            },
+        )
+        await db.execute(stmt)
+
+    # Weeks that no longer hold any activity
+    empty_weeks = delete(AITrainingWeekAggregate).where(
+        AITrainingWeekAggregate.user_id == user_id,
+        AITrainingWeekAggregate.week_start.not_in(rows_by_week),
+    )
+    if dirty_weeks is not None:
+        empty_weeks = empty_weeks.where(AITrainingWeekAggregate.week_start.in_(dirty_weeks))
+    await db.execute(empty_weeks)
+    await db.flush()
+
+    if dirty_weeks is not None:
+        folded_result = await db.execute(
+            select(func.coalesce(func.sum(AITrainingWeekAggregate.activity_count), 0)).where(
+                AITrainingWeekAggregate.user_id == user_id
+            )
+        )
+        if folded_result.scalar_one() != activity_count:
+            # Activities outside the changed weeks were removed; rebuild everything
+            return await refresh_week_aggregates(db, user_id, full=True)
+
+    return len(rows_by_week) if dirty_weeks is None else len(dirty_weeks)
+
+
+async def get_first_aggregate_week(db: AsyncSession, user_id: int) -> date | None:
+    """Monday of the user's earliest aggregated week (None without activities)."""
+    result = await db.execute(
+        select(func.min(AITrainingWeekAggregate.week_start)).where(
+            AITrainingWeekAggregate.user_id == user_id
+        )
+    )
+    return result.scalar_one()
+
+
+async def get_window_totals(
+    db: AsyncSession,
+    user_id: int,
+    window_start: date,
+    window_end: date,
+) -> WindowTotals:
+    """Combine stored week aggregates into totals for [window_start, window_end].
+
+    Weeks fully inside the window come from AITrainingWeekAggregate; the
+    partial weeks at either edge are aggregated from raw activities, which
+    touches at most 12 days of data.
+
+    Call refresh_week_aggregates() first so stored weeks are current.
+    """
+    first_full_week = _week_start(window_start)
+    if first_full_week < window_start:
+        first_full_week += timedelta(days=7)
+    last_full_week = _week_start(window_end)
+    if last_full_week + timedelta(days=6) > window_end:
+        last_full_week -= timedelta(days=7)
+
+    totals = WindowTotals()
+    edge_ranges: list[tuple[date, date]] = []
+
+    if first_full_week <= last_full_week:
+        agg_result = await db.execute(
+            select(AITrainingWeekAggregate)
+            .where(
+                AITrainingWeekAggregate.user_id == user_id,
+                AITrainingWeekAggregate.week_start >= first_full_week,
+                AITrainingWeekAggregate.week_start <= last_full_week,
+            )
+            # Rows are upserted with Core statements; don't reuse stale loaded objects
+            .execution_options(populate_existing=True)
+        )
+        for row in agg_result.scalars().all():
+            totals.merge(_totals_from_aggregate(row))
+        if window_start < first_full_week:
+            edge_ranges.append((window_start, first_full_week - timedelta(days=1)))
+        if last_full_week + timedelta(days=6) < window_end:
+            edge_ranges.append((last_full_week + timedelta(days=7), window_end))
+    else:
+        edge_ranges.append((window_start, window_end))
+
+    for edge_start, edge_end in edge_ranges:
+        edge_result = await db.execute(
+            select(*_AGGREGATE_COLUMNS).where(
+                Activity.user_id == user_id,
+                Activity.start_time >= _day_start(edge_start),
+                Activity.start_time < _day_start(edge_end + timedelta(days=1)),
+            )
+        )
+        edge_totals, _ = _totals_from_rows(edge_result.all())
+        totals.merge(edge_totals)
+
+    return totals
+
+
 async def _build_snapshot_payload(
     db: AsyncSession,
     user: User,
     window_start: datetime,
     window_end: datetime,
 ) -> dict[str, Any]:
-    activity_result = await db.execute(
-        select(Activity)
-        .where(
-            Activity.user_id == user.id,
-            Activity.start_time >= window_start,
-            Activity.start_time <= window_end,
-        )
-        .order_by(Activity.start_time.desc())
-    )
-    activities = activity_result.scalars().all()
+    totals = await get_window_totals(db, user.id, window_start.date(), window_end.date())
 
-    total_distance_m = sum(a.distance_meters or 0 for a in activities)
-    total_duration_s = sum(a.duration_seconds or 0 for a in activities)
-    total_activities = len(activities)
-    long_run_max_m = max((a.distance_meters or 0 for a in activities), default=0)
+    total_distance_m = totals.total_distance_m
+    total_duration_s = totals.total_duration_s
+    total_activities = totals.activity_count
+    long_run_max_m = totals.long_run_max_m
 
-    active_dates = {a.start_time.date() for a in activities if a.start_time}
     window_days = (window_end.date() - window_start.date()).days + 1
-    coverage_pct = round(len(active_dates) / window_days, 2) if window_days > 0 else 0.0
-
-    pace_values = []
-    for activity in activities:
-        pace_sec = _calculate_pace_seconds(activity)
-        if pace_sec:
-            pace_values.append(pace_sec)
+    coverage_pct = round(totals.active_days / window_days, 2) if window_days > 0 else 0.0
 
-    interval_cutoff, tempo_cutoff, pace_source = await _resolve_pace_profile(pace_values)
+    interval_cutoff, tempo_cutoff, pace_source = await _resolve_pace_profile(totals)
 
     easy_m = tempo_m = interval_m = 0.0
-    for activity in activities:
-        pace_sec = _calculate_pace_seconds(activity)
-        distance_m = activity.distance_meters or 0
-        if not pace_sec or distance_m <= 0:
+    for pace_sec, (_, distance_m) in totals.pace_histogram.items():
+        if distance_m <= 0:
             continue
         if pace_sec <= interval_cutoff:
             interval_m += distance_m
@@ -270,8 +632,18 @@ async def _build_snapshot_payload(
     else:
         easy_pct = tempo_pct = interval_pct = 0.0
 
+    recent_result = await db.execute(
+        select(Activity)
+        .where(
+            Activity.user_id == user.id,
+            Activity.start_time >= window_start,
+            Activity.start_time <= window_end,
+        )
+        .order_by(Activity.start_time.desc())
+        .limit(RECENT_ACTIVITY_LIMIT)
+    )
     recent_activities = []
-    for activity in activities[:RECENT_ACTIVITY_LIMIT]:
+    for activity in recent_result.scalars().all():
         recent_activities.append(
             {
                 "date": activity.start_time.date().isoformat() if activity.start_time else None,
@@ -303,7 +675,7 @@ async def _build_snapshot_payload(
     )
     resting_hr = hr_result.scalar_one_or_none()
 
-    missing_hr_count = sum(1 for a in activities if not (a.avg_hr and a.avg_hr > 0))
+    missing_hr_count = totals.missing_hr_count
     missing_hr_pct = round(missing_hr_count / total_activities * 100, 1) if total_activities else 0.0
 
     payload = {
@@ -368,14 +740,25 @@ async def ensure_ai_training_snapshot(
     *,
     force: bool = False,
     weeks: int | None = None,
+    refresh_aggregates: bool = True,
+    commit: bool = True,
 ) -> AITrainingSnapshot:
     """Generate training snapshot for a specific time window.
 
+    The payload is combined from per-week aggregates, so a rebuild after a
+    sync only re-reads the weeks whose activities changed. A stored snapshot
+    is reused while neither the last sync nor any activity changed since it
+    was generated.
+
     Args:
         db: Database session.
         user: User.
-        force: Force regeneration even if cached.
+        force: Force regeneration even if cached (also rebuilds all weeks).
         weeks: Number of weeks to include. None = all-time, otherwise specific weeks.
+        refresh_aggregates: Fold changed weeks before building. Callers that
+            already refreshed (get_multi_period_snapshots) pass False.
+        commit: Commit the snapshot. Callers in the middle of their own
+            transaction (chat prompt assembly) pass False to only flush it.
 
     Returns:
         Generated or cached snapshot.
@@ -392,7 +775,7 @@ async def ensure_ai_training_snapshot(
     window_start_dt = datetime.combine(window_start, datetime.min.time(), tzinfo=timezone.utc)
     window_end_dt = datetime.combine(window_end, datetime.max.time(), tzinfo=timezone.utc)
 
-    last_sync_at = await _get_last_sync_at(db, user.id)
+    last_sync_at = await get_last_sync_at(db, user.id)
 
     existing_result = await db.execute(
         select(AITrainingSnapshot)
@@ -407,17 +790,27 @@ async def ensure_ai_training_snapshot(
     )
     existing = existing_result.scalar_one_or_none()
 
-    if existing and not force and existing.source_last_sync_at == last_sync_at:
+    if (
+        existing
+        and not force
+        and existing.source_last_sync_at == last_sync_at
+        and not await _activities_changed_since(db, user.id, existing.generated_at)
+    ):
         return existing
 
+    if refresh_aggregates:
+        await refresh_week_aggregates(db, user.id, full=force)
     payload = await _build_snapshot_payload(db, user, window_start_dt, window_end_dt)
 
     if existing:
         existing.payload = payload
         existing.source_last_sync_at = last_sync_at
         existing.generated_at = now
-        await db.commit()
-        await db.refresh(existing)
+        if commit:
+            await db.commit()
+            await db.refresh(existing)
+        else:
+            await db.flush()
         return existing
 
     snapshot = AITrainingSnapshot(
@@ -430,8 +823,11 @@ async def ensure_ai_training_snapshot(
         payload=payload,
     )
     db.add(snapshot)
-    await db.commit()
-    await db.refresh(snapshot)
+    if commit:
+        await db.commit()
+        await db.refresh(snapshot)
+    else:
+        await db.flush()
     return snapshot
 
 
@@ -454,10 +850,18 @@ async def get_multi_period_snapshots(
     Returns:
         Dictionary containing snapshots for different time periods.
     """
-    # Generate snapshots for each period
-    snapshot_6w = await ensure_ai_training_snapshot(db, user, force=force, weeks=6)
-    snapshot_12w = await ensure_ai_training_snapshot(db, user, force=force, weeks=12)
-    snapshot_all = await ensure_ai_training_snapshot(db, user, force=force, weeks=None)
+    # Fold changed weeks once, then combine them for each period
+    if await refresh_week_aggregates(db, user.id, full=force):
+        await db.commit()
+    snapshot_6w = await ensure_ai_training_snapshot(
+        db, user, force=force, weeks=6, refresh_aggregates=False
+    )
+    snapshot_12w = await ensure_ai_training_snapshot(
+        db, user, force=force, weeks=12, refresh_aggregates=False
+    )
+    snapshot_all = await ensure_ai_training_snapshot(
+        db, user, force=force, weeks=None, refresh_aggregates=False
+    )
 
     return {
         "recent_6_weeks": snapshot_6w.payload,
@@ -0,0 +1,174 @@
+"""Buffered multi-row upserts for Garmin daily data.
+
+Daily endpoints (sleep, heart rate, health metrics) used to write each day
+with a flush for its ``GarminRawEvent`` (to learn the id) followed by one
+``INSERT ... ON CONFLICT`` per normalized row, so a multi-year backfill
+issued tens of thousands of statements.
+
+``BufferedUpsertWriter`` collects a batch of days and writes it with:
+
+1. one lookup and one multi-row ``INSERT ... RETURNING id`` for the raw
+   events (``raw_archive.store_raw_events``, which skips payloads already
+   stored), whose ids are linked to the normalized rows, and
+2. one multi-row ``INSERT ... ON CONFLICT DO UPDATE`` per target table
+   (split only to stay under the driver's bind parameter limit).
+
+Rows that hit the same conflict key within a batch are collapsed (last one
+wins), since PostgreSQL rejects a statement that updates a row twice.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import UniqueConstraint
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.health import HealthMetric, HRRecord, Sleep
+from app.services.raw_archive import store_raw_events
+
+settings = get_settings()
+
+# asyncpg allows at most 32767 bind parameters per statement
+_MAX_BIND_PARAMS = 32_000
+
+
+@dataclass(frozen=True)
+class UpsertTarget:
+    """A table written with ``ON CONFLICT (<unique constraint>) DO UPDATE``."""
+
+    model: type
+    constraint: str
+    update_columns: tuple[str, ...]
+
+    @property
+    def conflict_columns(self) -> list[str]:
+        for constraint in self.model.__table__.constraints:
+            if (
+                isinstance(constraint, UniqueConstraint)
+                and constraint.name == self.constraint
+            ):
+                return [column.name for column in constraint.columns]
+        raise ValueError(
+            f"{self.model.__tablename__} has no constraint {self.constraint}"
+        )
+
+
+SLEEP_UPSERT = UpsertTarget(
+    Sleep,
+    "uq_sleep_user_date",
+    ("duration_seconds", "score", "stages", "raw_event_id"),
+)
+HR_RECORD_UPSERT = UpsertTarget(
+    HRRecord,
+    "uq_hr_record_user_date",
+    ("avg_hr", "max_hr", "resting_hr", "samples", "raw_event_id"),
+)
+HEALTH_METRIC_UPSERT = UpsertTarget(
+    HealthMetric,
+    "uq_health_metric_user_type_time",
+    ("value", "unit", "payload", "raw_event_id"),
+)
+
+
+class BufferedUpsertWriter:
+    """Collects raw events and their normalized rows; writes them in batches.
+
+    The caller decides when to flush (``full``) and commits afterwards.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        batch_size: Optional[int] = None,
+        raw_stats: Optional[dict[str, int]] = None,
+    ) -> None:
+        """Initialize the writer.
+
+        Args:
+            session: Database session (caller commits).
+            user_id: Owner of every buffered row.
+            batch_size: Raw events per flush (default SYNC_UPSERT_BATCH_SIZE).
+            raw_stats: New/unchanged raw payload counters (see ``store_raw_events``).
+        """
+        self.session = session
+        self.user_id = user_id
+        self.batch_size = batch_size or settings.sync_upsert_batch_size
+        self.raw_stats = raw_stats
+        self._pending: list[
+            tuple[tuple[str, Any], Optional[UpsertTarget], list[dict[str, Any]]]
+        ] = []
+        self.statements = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self._pending) >= self.batch_size
+
+    def add(
+        self,
+        endpoint: str,
+        payload: Any,
+        target: Optional[UpsertTarget] = None,
+        rows: Optional[list[dict[str, Any]]] = None,
+    ) -> None:
+        """Buffer one raw response and the rows derived from it.
+
+        Each row gets ``raw_event_id`` pointing at the raw event on flush.
+        """
+        self._pending.append(((endpoint, payload), target, list(rows or [])))
+
+    async def flush(self) -> int:
+        """Write everything buffered.
+
+        Returns:
+            Number of normalized rows upserted.
+        """
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, []
+
+        raw_event_ids = await store_raw_events(
+            self.session,
+            self.user_id,
+            [raw_event for raw_event, _, _ in pending],
+            self.raw_stats,
+        )
+        self.statements += 1
+
+        by_target: dict[UpsertTarget, dict[tuple, dict[str, Any]]] = {}
+        for raw_event_id, (_, target, rows) in zip(raw_event_ids, pending):
+            if target is None:
+                continue
+            keys = target.conflict_columns
+            bucket = by_target.setdefault(target, {})
+            for row in rows:
+                row = {**row, "raw_event_id": raw_event_id}
+                bucket[tuple(row[key] for key in keys)] = row
+
+        written = 0
+        for target, rows_by_key in by_target.items():
+            rows = list(rows_by_key.values())
+            await self._upsert(target, rows)
+            written += len(rows)
+        return written
+
+    async def _upsert(self, target: UpsertTarget, rows: list[dict[str, Any]]) -> None:
+        per_statement = max(1, _MAX_BIND_PARAMS // len(rows[0]))
+        now = datetime.now(timezone.utc)
+        for start in range(0, len(rows), per_statement):
+            stmt = insert(target.model).values(rows[start : start + per_statement])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=target.conflict_columns,
+                set_={
+                    **{
+                        column: stmt.excluded[column]
+                        for column in target.update_columns
+                    },
+                    "updated_at": now,
+                },
+            )
+            await self.session.execute(stmt)
+            self.statements += 1
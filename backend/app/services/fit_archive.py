@@ -0,0 +1,378 @@
+"""Bulk FIT archive export and import (streaming ZIP).
+
+Export assembles a ZIP of every FIT file a user has, entry by entry, read
+through the tiered FIT blob store (``FitBlobStore.stream``, so the same
+tier order as every other reader). Each file is read in full before its
+entry header is written, so a read that fails half-way
+skips the file (it is listed in the manifest) instead of leaving a
+truncated entry in an archive that is already on the wire. The archive
+itself is never buffered: what ``zipfile`` writes is yielded to the
+response as soon as it is produced, so memory stays at roughly one FIT
+file regardless of how many years of data are exported.
+
+Import takes a ZIP (e.g. a previous export or a watch-data dump), reads and
+parses members on worker threads with bounded concurrency (a parsed file
+holds its slot until it is written, so memory stays bounded), and stores
+the results through the same pipeline as the Garmin sync. Files already present
+for the user (same SHA-256) are skipped, so re-importing is a no-op.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import zipfile
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, AsyncIterator, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import defer
+
+from app.adapters.garmin_adapter import GarminConnectAdapter
+from app.core.config import get_settings
+from app.core.database import async_session_maker
+from app.models.activity import Activity
+from app.models.garmin import GarminRawFile
+from app.models.user import User
+from app.services.fit_blob_store import FitBlobStore, get_fit_blob_store
+from app.services.fit_compression import compress_fit
+from app.services.fit_ingest import apply_session_summary
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+FIT_MEMBER_SUFFIXES = (".fit", ".fit.gz")
+MANIFEST_NAME = "manifest.json"
+
+
+@dataclass
+class _ExportSource:
+    """An activity with a FIT file in some storage tier (light row, no blobs)."""
+
+    activity_id: int
+    garmin_id: int
+    start_time: datetime
+
+    @property
+    def member_name(self) -> str:
+        return f"{self.start_time:%Y}/{self.start_time:%Y-%m-%d}_{self.activity_id}.fit"
+
+
+class _ZipSink(io.RawIOBase):
+    """Write-only, non-seekable sink that collects zipfile output for draining.
+
+    zipfile falls back to data descriptors when the target cannot seek, so
+    each entry can be drained as soon as it is written, without rewinding
+    to patch its header.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b: Any) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def synthetic_garmin_id(file_hash: str) -> int:
+    """Stable per-file id for activities that did not come from Garmin.
+
+    Negative so it can never collide with a real Garmin activity id, and
+    derived from the file hash so the (user_id, garmin_id) unique constraint
+    also rejects a second copy of the same file.
+    """
+    return -int(file_hash[:15], 16)
+
+
+async def list_export_sources(db: AsyncSession, user_id: int) -> list[_ExportSource]:
+    """List a user's activities that have a FIT file in any storage tier."""
+    result = await db.execute(
+        select(Activity.id, Activity.garmin_id, Activity.start_time)
+        .outerjoin(GarminRawFile, GarminRawFile.activity_id == Activity.id)
+        .where(
+            Activity.user_id == user_id,
+            or_(
+                Activity.fit_file_path.isnot(None),
+                Activity.fit_file_content.isnot(None),
+                Activity.r2_key.isnot(None),
+                GarminRawFile.file_path.isnot(None),
+                GarminRawFile.file_content.isnot(None),
+            ),
+        )
+        .order_by(Activity.start_time)
+    )
+    return [
+        _ExportSource(activity_id=row[0], garmin_id=row[1], start_time=row[2])
+        for row in result.all()
+    ]
+
+
+async def _read_fit_bytes(
+    db: AsyncSession, source: _ExportSource, store: FitBlobStore
+) -> Optional[bytes]:
+    """Read one activity's FIT file completely (None if no tier has it)."""
+    activity = await db.get(
+        Activity, source.activity_id, options=[defer(Activity.fit_file_content)]
+    )
+    if activity is None:
+        return None
+    fit_stream = await store.stream(db, activity)
+    if fit_stream is None:
+        return None
+    try:
+        parts = [chunk async for chunk in fit_stream.chunks]
+    finally:
+        await fit_stream.chunks.aclose()
+    return b"".join(parts)
+
+
+async def stream_fit_archive(
+    user_id: int,
+    sources: list[_ExportSource],
+    session_factory: async_sessionmaker[AsyncSession] = async_session_maker,
+    store: Optional[FitBlobStore] = None,
+) -> AsyncIterator[bytes]:
+    """Yield a ZIP archive of the given activities' FIT files, chunk by chunk.
+
+    Runs with its own session because the response body is produced after
+    the request-scoped session has been released. A ``manifest.json`` entry
+    at the end lists what was exported, what could not be found and what
+    failed to read.
+
+    Args:
+        user_id: Owner of the activities (recorded in the manifest).
+        sources: Rows from ``list_export_sources``.
+        session_factory: Session factory for loading activities and DB blobs.
+        store: FIT blob store (defaults to the singleton).
+    """
+    store = store or get_fit_blob_store()
+    sink = _ZipSink()
+    exported: list[dict[str, Any]] = []
+    missing: list[int] = []
+    failed: list[dict[str, Any]] = []
+
+    with zipfile.ZipFile(
+        sink,
+        mode="w",
+        compression=zipfile.ZIP_DEFLATED,
+        compresslevel=settings.fit_archive_compresslevel,
+    ) as zf:
+        async with session_factory() as db:
+            for source in sources:
+                try:
+                    fit_data = await _read_fit_bytes(db, source, store)
+                except Exception as e:
+                    logger.warning(
+                        f"FIT archive: failed to read activity {source.activity_id}: {e}"
+                    )
+                    failed.append({"activity_id": source.activity_id, "error": str(e)})
+                    continue
+                if fit_data is None:
+                    missing.append(source.activity_id)
+                    continue
+
+                info = zipfile.ZipInfo(
+                    source.member_name,
+                    date_time=source.start_time.timetuple()[:6],
+                )
+                info.compress_type = zipfile.ZIP_DEFLATED
+                # Deflate off the event loop; zipfile is only touched by one thread at a time
+                await asyncio.to_thread(zf.writestr, info, fit_data)
+                exported.append(
+                    {
+                        "activity_id": source.activity_id,
+                        "garmin_id": source.garmin_id,
+                        "file": source.member_name,
+                        "size": len(fit_data),
+                    }
+                )
+
+                data = sink.drain()
+                if data:
+                    yield data
+
+        manifest = {
+            "user_id": user_id,
+            "exported_at": datetime.now(timezone.utc).isoformat(),
+            "activities": exported,
+            "missing_activity_ids": missing,
+            "failed": failed,
+        }
+        zf.writestr(MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=2))
+
+    # Central directory is written on close
+    data = sink.drain()
+    if data:
+        yield data
+    logger.info(
+        f"FIT archive export for user {user_id}: "
+        f"{len(exported)} files, {len(missing)} missing, {len(failed)} failed"
+    )
+
+
+def _fit_members(archive_path: str) -> list[zipfile.ZipInfo]:
+    with zipfile.ZipFile(archive_path) as zf:
+        return [
+            info
+            for info in zf.infolist()
+            if not info.is_dir() and info.filename.lower().endswith(FIT_MEMBER_SUFFIXES)
+        ]
+
+
+def count_fit_members(archive_path: str) -> int:
+    """Number of FIT entries in an archive (raises BadZipFile if invalid)."""
+    return len(_fit_members(archive_path))
+
+
+def _read_member(archive_path: str, info: zipfile.ZipInfo) -> bytes:
+    max_bytes = settings.fit_ingest_max_bytes
+    # Each call opens its own handle: ZipFile reads are not thread-safe
+    with zipfile.ZipFile(archive_path) as zf, zf.open(info) as member:
+        data = member.read(max_bytes + 1)
+    if info.filename.lower().endswith(".gz"):
+        with gzip.GzipFile(fileobj=io.BytesIO(data)) as gz:
+            data = gz.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise ValueError(f"{info.filename} exceeds {max_bytes} bytes")
+    return data
+
+
+async def import_fit_archive(
+    db: AsyncSession,
+    user: User,
+    archive_path: str,
+    concurrency: Optional[int] = None,
+) -> dict[str, Any]:
+    """Import every FIT file in a ZIP archive as an activity.
+
+    Reading and parsing run on worker threads, at most ``concurrency`` at a
+    time; DB writes are serialized on the given session.
+
+    Args:
+        db: Database session.
+        user: Owner of the imported activities.
+        archive_path: Path to the ZIP file on local disk.
+        concurrency: Parallel parses (default FIT_ARCHIVE_IMPORT_CONCURRENCY).
+
+    Returns:
+        Summary with imported/duplicate/failed counts.
+    """
+    from app.services.sync_service import GarminSyncService
+
+    members = await asyncio.to_thread(_fit_members, archive_path)
+    existing = await db.execute(
+        select(Activity.fit_file_hash).where(
+            Activity.user_id == user.id,
+            Activity.fit_file_hash.isnot(None),
+        )
+    )
+    seen_hashes = set(existing.scalars().all())
+
+    adapter = GarminConnectAdapter()  # parse_fit_file needs no Garmin session
+    sync = GarminSyncService(db, adapter, user)
+    semaphore = asyncio.Semaphore(
+        concurrency or settings.fit_archive_import_concurrency
+    )
+    write_lock = asyncio.Lock()
+    summary: dict[str, Any] = {
+        "files": len(members),
+        "imported": 0,
+        "duplicates": 0,
+        "failed": [],
+    }
+    earliest: list[date] = []
+
+    async def _import_one(info: zipfile.ZipInfo) -> None:
+        # The slot is held until the file is written, so at most
+        # ``concurrency`` read/parsed files are in memory at once
+        async with semaphore:
+            try:
+                fit_data = await asyncio.to_thread(_read_member, archive_path, info)
+                file_hash = hashlib.sha256(fit_data).hexdigest()
+                if file_hash in seen_hashes:
+                    summary["duplicates"] += 1
+                    return
+                seen_hashes.add(file_hash)
+                # fitparse is CPU-bound
+                parsed = await asyncio.to_thread(adapter.parse_fit_file, fit_data)
+                compressed, _ = await compress_fit(fit_data)
+            except Exception as e:
+                logger.warning(f"FIT archive import: skipping {info.filename}: {e}")
+                summary["failed"].append(info.filename)
+                return
+
+            session_data = parsed.get("session") or {}
+            async with write_lock:
+                try:
+                    activity = Activity(
+                        user_id=user.id,
+                        garmin_id=synthetic_garmin_id(file_hash),
+                        name=os.path.basename(info.filename).split(".")[0],
+                        activity_type=str(session_data.get("sport") or "running"),
+                        start_time=datetime.now(timezone.utc),
+                        fit_file_hash=file_hash,
+                        fit_file_size=len(fit_data),
+                        fit_file_content=compressed,
+                        storage_provider="db",
+                        storage_metadata={
+                            "status": "imported",
+                            "source": info.filename,
+                        },
+                    )
+                    apply_session_summary(activity, session_data)
+                    db.add(activity)
+                    await db.flush()
+                    await sync.store_fit_data(activity, parsed)
+                    activity.has_fit_file = True
+                    await db.commit()
+                except Exception as e:
+                    await db.rollback()
+                    logger.warning(
+                        f"FIT archive import: failed to store {info.filename}: {e}"
+                    )
+                    summary["failed"].append(info.filename)
+                    return
+
+        summary["imported"] += 1
+        earliest.append(activity.start_time.date())
+
+    await asyncio.gather(*(_import_one(info) for info in members))
+
+    if earliest:
+        await sync.update_fitness_metrics(since=min(earliest))
+
+    logger.info(
+        f"FIT archive import for user {user.id}: {summary['imported']} imported, "
+        f"{summary['duplicates']} duplicates, {len(summary['failed'])} failed"
+    )
+    return summary
+
+
+async def run_fit_archive_import(user_id: int, archive_path: str) -> None:
+    """Background entry point: import with a fresh session, then delete the upload."""
+    try:
+        async with async_session_maker() as db:
+            user = await db.get(User, user_id)
+            if user is None:
+                return
+            await import_fit_archive(db, user, archive_path)
+    except Exception:
+        logger.exception(f"FIT archive import failed for user {user_id}")
+    finally:
+        try:
+            os.unlink(archive_path)
+        except OSError:
+            pass
@@ -0,0 +1,399 @@
+"""Tiered FIT blob store.
+
+FIT bytes for an activity can live in several places:
+
+1. the local LRU disk cache (hot tier, bounded by FIT_CACHE_MAX_BYTES),
+2. the original download on disk (``Activity.fit_file_path`` /
+   ``GarminRawFile.file_path``),
+3. R2 (``Activity.r2_key``),
+4. DB blobs (``Activity.fit_file_content`` / ``GarminRawFile.file_content``).
+
+``FitBlobStore.get`` checks them in that order and copies anything fetched
+from R2 or the DB into the cache (read-through), so repeated Strava uploads,
+reparses and downloads are served from local disk instead of refetching or
+decompressing every time. ``FitBlobStore.stream`` does the same but yields
+chunks, so large files can be forwarded (e.g. to Strava or a download)
+without holding them in memory. ``FitBlobStore.put`` adds a hot copy to the
+cache, e.g. before the sync deletes the original download.
+
+The cache directory is shared by every process on the host (API, sync and
+Strava workers); entries written by another process are picked up on
+first lookup.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+
+from botocore.exceptions import ClientError
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import get_settings
+from app.core.database import async_session_maker
+from app.models.activity import Activity
+from app.models.garmin import GarminRawFile
+from app.services.fit_compression import decompress_fit
+from app.services.r2_storage import R2StorageService, get_r2_service
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def resolve_fit_path(path: str) -> str:
+    """Resolve a stored FIT path (relative paths are relative to the backend dir)."""
+    if os.path.isabs(path):
+        return path
+    backend_dir = os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    return os.path.join(backend_dir, path)
+
+
+def within_storage_root(path: str) -> bool:
+    """True if path is inside the FIT storage directory (path traversal guard)."""
+    allowed_root = os.path.realpath(settings.fit_storage_path_absolute)
+    return os.path.realpath(path).startswith(allowed_root + os.sep)
+
+
+class LocalLRUCache:
+    """Size-bounded LRU cache of files in a local directory.
+
+    Recency is tracked in memory and mirrored in file mtimes, so the order
+    survives restarts (the index is rebuilt from the directory on first use).
+    Files another process added later are adopted into the index when looked
+    up. All methods are blocking; call them from a worker thread.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.startswith("."):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._index[name] = size
+            self._total += size
+        self._loaded = True
+
+    def _touch(self, key: str) -> bool:
+        """Mark an entry as most recently used; False if it is not on disk."""
+        with self._lock:
+            self._load()
+            if key in self._index:
+                self._index.move_to_end(key)
+                return True
+            # Possibly written by another process after our index was loaded
+            try:
+                size = os.stat(self._path(key)).st_size
+            except FileNotFoundError:
+                return False
+            self._index[key] = size
+            self._total += size
+            self._evict(keep_newest=True)
+            return True
+
+    def open(self, key: str) -> Optional[BinaryIO]:
+        """Open a cached entry for reading (None on a miss).
+
+        The handle stays valid even if the entry is evicted meanwhile.
+        """
+        if not self._touch(key):
+            return None
+        try:
+            f = open(self._path(key), "rb")
+            os.utime(self._path(key))
+            return f
+        except FileNotFoundError:
+            self.discard(key)
+            return None
+
+    def get(self, key: str) -> Optional[bytes]:
+        if not self._touch(key):
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+            os.utime(self._path(key))
+            return data
+        except FileNotFoundError:
+            self.discard(key)
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            self._load()
+            # Write to a temp name and rename so readers never see partial files
+            tmp_path = self._path(f".{key}.{uuid.uuid4().hex}")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+            self._total -= self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self._total += len(data)
+            self._evict()
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._load()
+            self._total -= self._index.pop(key, 0)
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def _evict(self, keep_newest: bool = False) -> None:
+        while self._total > self.max_bytes and len(self._index) > int(keep_newest):
+            key, size = self._index.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            self._load()
+            return self._total
+
+
+@dataclass
+class FitStream:
+    """FIT bytes as a chunk stream; ``size`` is known for local and DB tiers."""
+
+    chunks: AsyncIterator[bytes]
+    size: Optional[int] = None
+
+
+async def _iter_handle(f: BinaryIO) -> AsyncIterator[bytes]:
+    try:
+        while True:
+            chunk = await asyncio.to_thread(f.read, settings.r2_stream_chunk_bytes)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        f.close()
+
+
+def _file_stream(f: BinaryIO) -> FitStream:
+    return FitStream(_iter_handle(f), os.fstat(f.fileno()).st_size)
+
+
+async def _single_chunk(data: bytes) -> AsyncIterator[bytes]:
+    yield data
+
+
+class FitBlobStore:
+    """Read-through cached access to an activity's FIT bytes."""
+
+    def __init__(
+        self,
+        cache: Optional[LocalLRUCache] = None,
+        r2: Optional[R2StorageService] = None,
+        session_factory: async_sessionmaker[AsyncSession] = async_session_maker,
+    ) -> None:
+        self.cache = cache or LocalLRUCache(
+            settings.fit_cache_dir
+            or os.path.join(settings.fit_storage_path_absolute, ".cache"),
+            settings.fit_cache_max_bytes,
+        )
+        self._r2 = r2
+        self._session_factory = session_factory
+
+    @property
+    def r2(self) -> R2StorageService:
+        if self._r2 is None:
+            self._r2 = get_r2_service()
+        return self._r2
+
+    @staticmethod
+    def _cache_key(activity: Activity) -> str:
+        # Include the content hash so a replaced file never serves stale bytes
+        suffix = (activity.fit_file_hash or "nohash")[:16]
+        return f"{activity.id}_{suffix}.fit"
+
+    async def get(self, db: AsyncSession, activity: Activity) -> Optional[bytes]:
+        """Return the activity's FIT bytes from the fastest tier that has them.
+
+        Args:
+            db: Database session (used for the DB blob tier).
+            activity: Activity whose file to read.
+
+        Returns:
+            Raw (decompressed) FIT bytes or None if no tier has the file.
+        """
+        key = self._cache_key(activity)
+        data = await asyncio.to_thread(self.cache.get, key)
+        if data is not None:
+            return data
+
+        raw_file = await db.scalar(
+            select(GarminRawFile).where(GarminRawFile.activity_id == activity.id)
+        )
+
+        for path in (activity.fit_file_path, raw_file.file_path if raw_file else None):
+            if not path:
+                continue
+            path = resolve_fit_path(path)
+            if within_storage_root(path) and os.path.isfile(path):
+                # Already on local disk; no need to duplicate it in the cache
+                return await asyncio.to_thread(_read_file, path)
+
+        data = None
+        if activity.r2_key and self.r2.is_available:
+            data = await self.r2.download_by_key(
+                activity.r2_key, max_bytes=settings.fit_ingest_max_bytes
+            )
+
+        if data is None:
+            data = await self._db_blob(db, activity, raw_file)
+
+        if data is not None:
+            await asyncio.to_thread(self.cache.put, key, data)
+        return data
+
+    async def stream(self, db: AsyncSession, activity: Activity) -> Optional[FitStream]:
+        """Open the activity's FIT bytes as a chunk stream from the fastest tier.
+
+        Same tier order as ``get``. Local files are read in chunks, R2
+        objects are decompressed while streaming (and copied into the cache
+        once fully read), DB blobs are decompressed in one piece.
+
+        Args:
+            db: Database session (used for the DB blob tier).
+            activity: Activity whose file to read.
+
+        Returns:
+            FitStream or None if no tier has the file.
+        """
+        key = self._cache_key(activity)
+        f = await asyncio.to_thread(self.cache.open, key)
+        if f is not None:
+            return _file_stream(f)
+
+        raw_file = await db.scalar(
+            select(GarminRawFile).where(GarminRawFile.activity_id == activity.id)
+        )
+
+        for path in (activity.fit_file_path, raw_file.file_path if raw_file else None):
+            if not path:
+                continue
+            path = resolve_fit_path(path)
+            if within_storage_root(path) and os.path.isfile(path):
+                try:
+                    return _file_stream(await asyncio.to_thread(open, path, "rb"))
+                except OSError:
+                    continue
+
+        if activity.r2_key and self.r2.is_available:
+            chunks = self.r2.iter_object(
+                activity.r2_key, max_bytes=settings.fit_ingest_max_bytes
+            )
+            try:
+                # Fetch the first chunk up front so a missing object falls through
+                first = await chunks.__anext__()
+            except StopAsyncIteration:
+                first = b""
+            except ClientError as e:
+                logger.warning(f"R2 stream failed for {activity.r2_key}: {e}")
+                first = None
+            if first is not None:
+                return FitStream(self._tee_to_cache(key, first, chunks))
+
+        data = await self._db_blob(db, activity, raw_file)
+        if data is None:
+            return None
+        await asyncio.to_thread(self.cache.put, key, data)
+        return FitStream(_single_chunk(data), len(data))
+
+    async def _tee_to_cache(
+        self, key: str, first: bytes, rest: AsyncIterator[bytes]
+    ) -> AsyncIterator[bytes]:
+        """Yield a stream while keeping a copy for the cache (dropped if it outgrows it)."""
+        parts: Optional[list[bytes]] = [first]
+        size = len(first)
+        yield first
+        async for chunk in rest:
+            if parts is not None:
+                size += len(chunk)
+                if size <= self.cache.max_bytes:
+                    parts.append(chunk)
+                else:
+                    parts = None
+            yield chunk
+        if parts is not None:
+            await asyncio.to_thread(self.cache.put, key, b"".join(parts))
+
+    async def _db_blob(
+        self, db: AsyncSession, activity: Activity, raw_file: Optional[GarminRawFile]
+    ) -> Optional[bytes]:
+        blob = await db.scalar(
+            select(Activity.fit_file_content).where(Activity.id == activity.id)
+        )
+        if blob:
+            return await decompress_fit(blob, session_factory=self._session_factory)
+        if raw_file is not None:
+            blob = await db.scalar(
+                select(GarminRawFile.file_content).where(
+                    GarminRawFile.id == raw_file.id
+                )
+            )
+            if blob:
+                return await decompress_fit(
+                    blob, raw_file.compression_type, self._session_factory
+                )
+        return None
+
+    async def put(self, activity: Activity, data: bytes) -> None:
+        """Store FIT bytes in the hot cache.
+
+        Args:
+            activity: Activity the file belongs to (must have an id).
+            data: Raw FIT bytes.
+        """
+        await asyncio.to_thread(self.cache.put, self._cache_key(activity), data)
+
+    def invalidate(self, activity: Activity) -> None:
+        """Drop the cached copy (e.g. after the stored file was replaced)."""
+        self.cache.discard(self._cache_key(activity))
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+_store: Optional[FitBlobStore] = None
+
+
+def get_fit_blob_store() -> FitBlobStore:
+    """Get singleton FIT blob store instance."""
+    global _store
+    if _store is None:
+        _store = FitBlobStore()
+    return _store
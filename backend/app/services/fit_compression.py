@@ -0,0 +1,302 @@
+"""Compression codec for stored FIT files (zstd with a trained dictionary).
+
+FIT files are small and highly repetitive across activities (the same
+definition messages, device_info, file_id...), so compressing each file on
+its own wastes most of the redundancy. A zstd dictionary trained on the
+corpus captures it once and typically shrinks files well beyond gzip, and
+decompresses faster.
+
+- Every zstd frame carries the id of the dictionary it was compressed with,
+  so readers look the dictionary up from the data itself; dictionaries are
+  versioned in the ``compression_dictionaries`` table and never deleted
+  while in use.
+- Decompression detects the codec from magic bytes, so gzip objects written
+  before the switch (and gzip presigned uploads from clients) keep working.
+- zstd is opt-in: new data is gzipped unless ``FIT_COMPRESSION_CODEC=zstd``
+  and the optional ``zstandard`` package is installed. Without the package
+  only zstd data is unreadable.
+
+Existing objects are migrated with ``scripts/recompress_fit_files.py``.
+"""
+
+import asyncio
+import gzip
+import logging
+import time
+import zlib
+from typing import Any, Optional, Protocol
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import get_settings
+from app.core.database import async_session_maker
+from app.models.storage import CompressionDictionary
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+CODEC_GZIP = "gzip"
+CODEC_ZSTD = "zstd"
+CODEC_NONE = "none"
+
+CONTENT_TYPES = {
+    CODEC_GZIP: "application/gzip",
+    CODEC_ZSTD: "application/zstd",
+    CODEC_NONE: "application/octet-stream",
+}
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+class StreamDecompressor(Protocol):
+    def decompress(self, data: bytes) -> bytes: ...
+    def flush(self) -> bytes: ...
+
+
+def zstd_available() -> bool:
+    return zstandard is not None
+
+
+def detect_codec(data: bytes) -> str:
+    """Identify a stored blob's codec from its magic bytes."""
+    if data[:4] == ZSTD_MAGIC:
+        return CODEC_ZSTD
+    if data[:2] == GZIP_MAGIC:
+        return CODEC_GZIP
+    return CODEC_NONE
+
+
+def require_zstd() -> None:
+    if zstandard is None:
+        raise ValueError(
+            "Reading zstd-compressed FIT data requires the 'zstandard' package"
+        )
+
+
+# -------------------------------------------------------------------------
+# Dictionary registry
+# -------------------------------------------------------------------------
+
+_dictionaries: dict[int, Any] = {}
+_active: dict[str, Any] = {"dict_id": None, "loaded_at": 0.0}
+_registry_lock = asyncio.Lock()
+
+
+def _as_zstd_dict(content: bytes) -> Any:
+    d = zstandard.ZstdCompressionDict(content)
+    d.precompute_compress(level=settings.fit_zstd_level)
+    return d
+
+
+async def get_dictionary(
+    dict_id: int,
+    session_factory: async_sessionmaker[AsyncSession] = async_session_maker,
+) -> Any:
+    """Return the zstd dictionary with the given id (loaded once per process).
+
+    Raises:
+        ValueError: If no such dictionary exists.
+    """
+    require_zstd()
+    d = _dictionaries.get(dict_id)
+    if d is not None:
+        return d
+    async with session_factory() as db:
+        content = await db.scalar(
+            select(CompressionDictionary.content).where(
+                CompressionDictionary.dict_id == dict_id
+            )
+        )
+    if content is None:
+        raise ValueError(f"Unknown zstd dictionary id {dict_id}")
+    d = _as_zstd_dict(content)
+    _dictionaries[dict_id] = d
+    return d
+
+
+async def get_active_dictionary(
+    session_factory: async_sessionmaker[AsyncSession] = async_session_maker,
+) -> Optional[Any]:
+    """Return the dictionary new data is compressed with (None if none trained).
+
+    The active id is re-read every FIT_ZSTD_DICT_REFRESH_SECONDS so a newly
+    trained dictionary is picked up without a restart.
+    """
+    if zstandard is None:
+        return None
+    async with _registry_lock:
+        if (
+            time.monotonic() - _active["loaded_at"]
+            > settings.fit_zstd_dict_refresh_seconds
+        ):
+            async with session_factory() as db:
+                _active["dict_id"] = await db.scalar(
+                    select(CompressionDictionary.dict_id)
+                    .where(CompressionDictionary.is_active.is_(True))
+                    .order_by(CompressionDictionary.id.desc())
+                    .limit(1)
+                )
+            _active["loaded_at"] = time.monotonic()
+    if _active["dict_id"] is None:
+        return None
+    return await get_dictionary(_active["dict_id"], session_factory)
+
+
+def reset_registry() -> None:
+    """Forget cached dictionaries (after training, and in tests)."""
+    _dictionaries.clear()
+    _active.update(dict_id=None, loaded_at=0.0)
+
+
+# -------------------------------------------------------------------------
+# Codec
+# -------------------------------------------------------------------------
+
+
+def _zstd_compress(data: bytes, dictionary: Any) -> bytes:
+    # Compressor objects are not thread-safe; build one per call
+    compressor = zstandard.ZstdCompressor(
+        level=settings.fit_zstd_level,
+        dict_data=dictionary,
+        write_checksum=True,
+        write_content_size=True,
+    )
+    return compressor.compress(data)
+
+
+def _zstd_decompress(data: bytes, dictionary: Any) -> bytes:
+    return zstandard.ZstdDecompressor(dict_data=dictionary).decompress(data)
+
+
+async def compress_fit(
+    data: bytes,
+    session_factory: async_sessionmaker[AsyncSession] = async_session_maker,
+) -> tuple[bytes, dict[str, str]]:
+    """Compress FIT bytes with the configured codec.
+
+    Returns:
+        Tuple of (compressed bytes, metadata with ``codec`` and ``dict_id``).
+    """
+    if settings.fit_compression_codec == CODEC_ZSTD and zstandard is not None:
+        try:
+            dictionary = await get_active_dictionary(session_factory)
+        except Exception as e:
+            # Compress without a dictionary rather than failing the write
+            logger.warning(f"Could not load zstd dictionary: {e}")
+            dictionary = None
+        compressed = await asyncio.to_thread(_zstd_compress, data, dictionary)
+        dict_id = dictionary.dict_id() if dictionary is not None else 0
+        return compressed, {"codec": CODEC_ZSTD, "dict_id": str(dict_id)}
+
+    compressed = await asyncio.to_thread(gzip.compress, data, 6)
+    return compressed, {"codec": CODEC_GZIP, "dict_id": "0"}
+
+
+async def _dictionary_for_frame(
+    data: bytes,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> Optional[Any]:
+    dict_id = zstandard.get_frame_parameters(data).dict_id
+    if not dict_id:
+        return None
+    return await get_dictionary(dict_id, session_factory)
+
+
+async def decompress_fit(
+    data: bytes,
+    compression: Optional[str] = None,
+    session_factory: async_sessionmaker[AsyncSession] = async_session_maker,
+) -> bytes:
+    """Decompress a stored FIT blob of any codec (detected from magic bytes).
+
+    Args:
+        data: Stored bytes.
+        compression: Declared codec; only ``"none"`` is honoured over detection.
+        session_factory: Used to load the frame's dictionary on first use.
+    """
+    if compression == CODEC_NONE:
+        return data
+    codec = detect_codec(data)
+    if codec == CODEC_GZIP:
+        return await asyncio.to_thread(gzip.decompress, data)
+    if codec == CODEC_ZSTD:
+        require_zstd()
+        dictionary = await _dictionary_for_frame(data, session_factory)
+        return await asyncio.to_thread(_zstd_decompress, data, dictionary)
+    return data
+
+
+async def stream_decompressor(
+    first_chunk: bytes,
+    session_factory: async_sessionmaker[AsyncSession] = async_session_maker,
+) -> Optional[StreamDecompressor]:
+    """Incremental decompressor matching the stream's first chunk (None if raw)."""
+    codec = detect_codec(first_chunk)
+    if codec == CODEC_GZIP:
+        return zlib.decompressobj(wbits=31)
+    if codec == CODEC_ZSTD:
+        require_zstd()
+        dictionary = await _dictionary_for_frame(first_chunk, session_factory)
+        return zstandard.ZstdDecompressor(dict_data=dictionary).decompressobj()
+    return None
+
+
+def frame_dict_id(data: bytes) -> Optional[int]:
+    """Dictionary id of a zstd blob (0 = no dictionary, None = not zstd)."""
+    if zstandard is None or detect_codec(data) != CODEC_ZSTD:
+        return None
+    return zstandard.get_frame_parameters(data).dict_id
+
+
+# -------------------------------------------------------------------------
+# Training
+# -------------------------------------------------------------------------
+
+
+async def train_dictionary(
+    db: AsyncSession,
+    samples: list[bytes],
+    note: Optional[str] = None,
+) -> CompressionDictionary:
+    """Train a dictionary on sample FIT files, store it and make it active.
+
+    Args:
+        db: Database session.
+        samples: Raw (decompressed) FIT files representative of the corpus.
+        note: Free-form description stored with the dictionary.
+
+    Returns:
+        The new active CompressionDictionary row.
+    """
+    require_zstd()
+    if len(samples) < 8:
+        raise ValueError("At least 8 sample files are needed to train a dictionary")
+
+    trained = await asyncio.to_thread(
+        zstandard.train_dictionary, settings.fit_zstd_dict_size, samples
+    )
+    await db.execute(
+        update(CompressionDictionary)
+        .where(CompressionDictionary.is_active.is_(True))
+        .values(is_active=False)
+    )
+    row = CompressionDictionary(
+        dict_id=trained.dict_id(),
+        codec=CODEC_ZSTD,
+        content=trained.as_bytes(),
+        sample_count=len(samples),
+        is_active=True,
+        note=note,
+    )
+    db.add(row)
+    await db.commit()
+    reset_registry()
+    logger.info(f"Trained zstd dictionary {row.dict_id} on {len(samples)} FIT files")
+    return row
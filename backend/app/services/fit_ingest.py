@@ -0,0 +1,240 @@
+"""Ingest FIT files uploaded directly to R2 (analyze_fit jobs).
+
+``POST /upload/complete`` enqueues an ``analyze_fit`` job; the FIT ingest
+worker (``app.workers.fit_worker``), or the API process itself when no
+worker is alive, calls ``ingest_uploaded_fit`` which:
+
+1. Streams the object from R2 and gunzips it on the fly.
+2. Skips work if this exact file (SHA-256) was already ingested for the
+   activity, or marks the upload as a duplicate of another activity.
+3. Parses the FIT in a thread and bulk-inserts samples, laps and metrics
+   through the same pipeline as the Garmin sync.
+4. Recomputes fitness aggregates from the activity date onward.
+"""
+
+import asyncio
+import hashlib
+import logging
+from collections.abc import Callable
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.adapters.garmin_adapter import GarminConnectAdapter
+from app.core.config import get_settings
+from app.core.database import async_session_maker
+from app.models.activity import Activity, ActivityLap, ActivitySample
+from app.models.user import User
+from app.services.r2_storage import R2StorageService, get_r2_service
+from app.services.storage_accounting import account_object
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+ANALYZE_FIT_TASK_NAME = "analyze_fit"
+
+SessionFactory = Callable[[], AsyncSession]
+
+
+def _parse_time(value: Any) -> Optional[datetime]:
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return value
+
+
+def apply_session_summary(activity: Activity, session_data: dict[str, Any]) -> None:
+    """Fill activity summary fields from the FIT session message.
+
+    Upload placeholders are created before the file exists, so their start
+    time, distance, duration and HR come from the file itself.
+    """
+    start_time = _parse_time(session_data.get("start_time"))
+    if start_time:
+        activity.start_time = start_time
+    if session_data.get("total_distance") is not None:
+        activity.distance_meters = session_data["total_distance"]
+    duration = session_data.get("total_timer_time") or session_data.get(
+        "total_elapsed_time"
+    )
+    if duration is not None:
+        activity.duration_seconds = int(duration)
+    if session_data.get("total_elapsed_time") is not None:
+        activity.elapsed_seconds = int(session_data["total_elapsed_time"])
+    if session_data.get("avg_heart_rate") is not None:
+        activity.avg_hr = session_data["avg_heart_rate"]
+    if session_data.get("max_heart_rate") is not None:
+        activity.max_hr = session_data["max_heart_rate"]
+    if session_data.get("total_calories") is not None:
+        activity.calories = session_data["total_calories"]
+    if session_data.get("total_ascent") is not None:
+        activity.elevation_gain = session_data["total_ascent"]
+
+
+def _set_status(activity: Activity, status: str, **details: Any) -> None:
+    # Reassign (not mutate) so the JSON column change is detected
+    metadata = dict(activity.storage_metadata or {})
+    metadata.update({"status": status, **details})
+    activity.storage_metadata = metadata
+
+
+async def ingest_uploaded_fit(
+    db: AsyncSession,
+    activity_id: int,
+    user_id: int,
+    r2: Optional[R2StorageService] = None,
+) -> dict[str, Any]:
+    """Download, parse and store an uploaded FIT file.
+
+    Args:
+        db: Database session.
+        activity_id: Activity the file was uploaded for.
+        user_id: Owner (must match the activity).
+        r2: R2 storage service (defaults to the singleton).
+
+    Returns:
+        Result dictionary with status and counts.
+    """
+    from app.services.sync_service import GarminSyncService
+
+    r2 = r2 or get_r2_service()
+
+    result = await db.execute(
+        select(Activity).where(Activity.id == activity_id, Activity.user_id == user_id)
+    )
+    activity = result.scalar_one_or_none()
+    if activity is None:
+        logger.warning(
+            f"analyze_fit: activity {activity_id} not found for user {user_id}"
+        )
+        return {"success": False, "error": "Activity not found"}
+    if not activity.r2_key:
+        return {"success": False, "error": "Activity has no uploaded file"}
+
+    fit_data = await r2.download_by_key(
+        activity.r2_key, max_bytes=settings.fit_ingest_max_bytes
+    )
+    if not fit_data:
+        _set_status(activity, "analysis_failed", error="FIT file not found in storage")
+        await db.commit()
+        return {"success": False, "error": "FIT file not found in storage"}
+
+    file_hash = hashlib.sha256(fit_data).hexdigest()
+
+    # Idempotency: same bytes already ingested for this activity
+    if activity.has_fit_file and activity.fit_file_hash == file_hash:
+        logger.info(
+            f"analyze_fit: activity {activity_id} already ingested ({file_hash[:12]})"
+        )
+        return {
+            "success": True,
+            "status": "already_analyzed",
+            "activity_id": activity_id,
+        }
+
+    # Same file already ingested under another activity of this user
+    duplicate_result = await db.execute(
+        select(Activity.id)
+        .where(
+            Activity.user_id == user_id,
+            Activity.id != activity_id,
+            Activity.fit_file_hash == file_hash,
+            Activity.has_fit_file.is_(True),
+        )
+        .limit(1)
+    )
+    duplicate_of = duplicate_result.scalar_one_or_none()
+    if duplicate_of is not None:
+        activity.fit_file_hash = file_hash
+        _set_status(activity, "duplicate", duplicate_of=duplicate_of)
+        await db.commit()
+        logger.info(
+            f"analyze_fit: activity {activity_id} duplicates activity {duplicate_of}"
+        )
+        return {
+            "success": True,
+            "status": "duplicate",
+            "activity_id": activity_id,
+            "duplicate_of": duplicate_of,
+        }
+
+    user = await db.get(User, user_id)
+    adapter = GarminConnectAdapter()  # parse_fit_file needs no Garmin session
+    try:
+        # fitparse is CPU-bound; keep the event loop free for other jobs
+        parsed = await asyncio.to_thread(adapter.parse_fit_file, fit_data)
+    except Exception as e:
+        logger.warning(
+            f"analyze_fit: failed to parse FIT for activity {activity_id}: {e}"
+        )
+        activity.fit_file_hash = file_hash
+        _set_status(activity, "analysis_failed", error=str(e))
+        await db.commit()
+        return {"success": False, "error": f"FIT parsing failed: {e}"}
+
+    # Re-analysis of a replaced file: drop previously stored series
+    await db.execute(
+        delete(ActivitySample).where(ActivitySample.activity_id == activity_id)
+    )
+    await db.execute(delete(ActivityLap).where(ActivityLap.activity_id == activity_id))
+
+    apply_session_summary(activity, parsed.get("session") or {})
+
+    sync = GarminSyncService(db, adapter, user)
+    await sync.store_fit_data(activity, parsed)
+
+    activity.fit_file_hash = file_hash
+    activity.fit_file_size = len(fit_data)
+    activity.has_fit_file = True
+    await account_object(db, activity, original_size=len(fit_data))
+    _set_status(
+        activity,
+        "analyzed",
+        analyzed_at=datetime.now(timezone.utc).isoformat(),
+        file_hash=file_hash,
+    )
+    await db.commit()
+
+    await sync.update_fitness_metrics(since=activity.start_time.date())
+
+    sample_count = len(parsed.get("records", []))
+    lap_count = len(parsed.get("laps", []))
+    logger.info(
+        f"analyze_fit: ingested activity {activity_id}: "
+        f"{sample_count} samples, {lap_count} laps"
+    )
+    return {
+        "success": True,
+        "status": "analyzed",
+        "activity_id": activity_id,
+        "samples": sample_count,
+        "laps": lap_count,
+    }
+
+
+async def run_fit_ingest(
+    activity_id: int,
+    user_id: int,
+    session_factory: SessionFactory = async_session_maker,
+) -> dict[str, Any]:
+    """Run ``ingest_uploaded_fit`` in its own session.
+
+    Used by the ``analyze_fit`` worker job and, when no worker is alive, as
+    a background task of ``POST /upload/complete``.
+
+    Args:
+        activity_id: Activity the file was uploaded for.
+        user_id: Owner of the activity.
+        session_factory: Factory for the database session.
+
+    Returns:
+        Result dictionary with ingest status.
+    """
+    async with session_factory() as db:
+        try:
+            return await ingest_uploaded_fit(db, activity_id, user_id)
+        except Exception as e:
+            logger.exception(f"Error analyzing FIT for activity {activity_id}")
+            await db.rollback()
+            return {"success": False, "error": str(e)}
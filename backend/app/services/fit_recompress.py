@@ -0,0 +1,246 @@
+"""Background recompression of stored FIT files with the active codec.
+
+Walks activities in id order (resumable from any id) and rewrites R2 objects
+and DB blobs that are not yet compressed with the active zstd dictionary.
+Used by ``scripts/recompress_fit_files.py``.
+"""
+
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.activity import Activity
+from app.models.garmin import GarminRawFile
+from app.services.fit_blob_store import FitBlobStore
+from app.services.fit_compression import (
+    CODEC_ZSTD,
+    CONTENT_TYPES,
+    compress_fit,
+    decompress_fit,
+    detect_codec,
+    frame_dict_id,
+    get_active_dictionary,
+    zstd_available,
+)
+from app.services.r2_storage import R2StorageService
+from app.services.storage_accounting import account_object
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+async def collect_training_samples(
+    db: AsyncSession,
+    limit: int,
+    store: Optional[FitBlobStore] = None,
+) -> list[bytes]:
+    """Read up to ``limit`` recent FIT files (any tier) to train a dictionary."""
+    store = store or FitBlobStore()
+    result = await db.execute(
+        select(Activity)
+        .where(Activity.has_fit_file.is_(True))
+        .order_by(Activity.start_time.desc())
+        .limit(limit * 2)  # Some files may no longer exist anywhere
+    )
+    samples: list[bytes] = []
+    for activity in result.scalars():
+        data = await store.get(db, activity)
+        if data:
+            samples.append(data)
+        if len(samples) >= limit:
+            break
+    return samples
+
+
+def _is_current(blob: bytes, target_dict_id: int) -> bool:
+    return detect_codec(blob) == CODEC_ZSTD and frame_dict_id(blob) == target_dict_id
+
+
+async def _recompress_r2_object(
+    r2: R2StorageService,
+    activity: Activity,
+    target_dict_id: int,
+) -> Optional[tuple[int, int, dict[str, str]]]:
+    """Rewrite one R2 object; returns (old size, new size, codec metadata) or None if current."""
+    stored = b"".join(
+        [chunk async for chunk in r2.iter_object(activity.r2_key, decompress=False)]
+    )
+    if _is_current(stored, target_dict_id):
+        return None
+    data = await decompress_fit(stored)
+    blob, codec_metadata = await compress_fit(data)
+    metadata = {
+        "original_size": str(len(data)),
+        "file_hash": hashlib.sha256(data).hexdigest(),
+        "compressed": "true",
+        "user_id": str(activity.user_id),
+        "activity_id": str(activity.id),
+        "uploaded_at": datetime.now(timezone.utc).isoformat(),
+        **codec_metadata,
+    }
+    await r2.put_object_bytes(
+        activity.r2_key, blob, CONTENT_TYPES[codec_metadata["codec"]], metadata
+    )
+    return len(stored), len(blob), codec_metadata
+
+
+async def _recompress_blob(
+    blob: bytes, compression: Optional[str], target_dict_id: int
+) -> Optional[bytes]:
+    if _is_current(blob, target_dict_id):
+        return None
+    data = await decompress_fit(blob, compression)
+    new_blob, _ = await compress_fit(data)
+    return new_blob
+
+
+async def recompress_batch(
+    db: AsyncSession,
+    r2: R2StorageService,
+    after_id: int = 0,
+    limit: Optional[int] = None,
+    concurrency: Optional[int] = None,
+) -> dict[str, Any]:
+    """Recompress the stored FIT files of the next batch of activities.
+
+    R2 objects are rewritten concurrently (bounded); DB blobs are rewritten
+    one at a time on the session. Objects already compressed with the active
+    dictionary are skipped, so the walk can be stopped and resumed freely.
+
+    Args:
+        db: Database session.
+        r2: R2 storage service.
+        after_id: Resume after this activity id.
+        limit: Activities per batch (default FIT_RECOMPRESS_BATCH_SIZE).
+        concurrency: Parallel R2 rewrites (default FIT_RECOMPRESS_CONCURRENCY).
+
+    Returns:
+        Stats including ``last_id`` to pass as ``after_id`` next time
+        (``scanned == 0`` when the walk is complete).
+    """
+    if settings.fit_compression_codec != CODEC_ZSTD or not zstd_available():
+        raise ValueError(
+            "Recompression needs FIT_COMPRESSION_CODEC=zstd and the 'zstandard' package"
+        )
+    dictionary = await get_active_dictionary()
+    target_dict_id = dictionary.dict_id() if dictionary is not None else 0
+    stats: dict[str, Any] = {
+        "last_id": after_id,
+        "scanned": 0,
+        "recompressed": 0,
+        "skipped": 0,
+        "failed": 0,
+        "bytes_before": 0,
+        "bytes_after": 0,
+    }
+
+    result = await db.execute(
+        select(Activity)
+        .where(
+            Activity.id > after_id,
+            or_(Activity.r2_key.isnot(None), Activity.fit_file_content.isnot(None)),
+        )
+        .order_by(Activity.id)
+        .limit(limit or settings.fit_recompress_batch_size)
+    )
+    activities = list(result.scalars())
+    if not activities:
+        return stats
+    stats["scanned"] = len(activities)
+    stats["last_id"] = activities[-1].id
+
+    def _count(outcome: Optional[tuple[int, int]]) -> None:
+        if outcome is None:
+            stats["skipped"] += 1
+        else:
+            stats["recompressed"] += 1
+            stats["bytes_before"] += outcome[0]
+            stats["bytes_after"] += outcome[1]
+
+    # R2 objects: network-bound, rewrite concurrently
+    semaphore = asyncio.Semaphore(concurrency or settings.fit_recompress_concurrency)
+
+    async def _r2_item(activity: Activity) -> tuple[Activity, Any]:
+        async with semaphore:
+            try:
+                return activity, await _recompress_r2_object(
+                    r2, activity, target_dict_id
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Recompress: R2 object for activity {activity.id} failed: {e}"
+                )
+                return activity, e
+
+    if r2.is_available:
+        r2_results = await asyncio.gather(
+            *(_r2_item(a) for a in activities if a.r2_key)
+        )
+        for activity, outcome in r2_results:
+            if isinstance(outcome, Exception):
+                stats["failed"] += 1
+                continue
+            _count(outcome[:2] if outcome else None)
+            if outcome:
+                activity.storage_metadata = {
+                    **(activity.storage_metadata or {}),
+                    **outcome[2],
+                }
+                await account_object(
+                    db,
+                    activity,
+                    stored_size=outcome[1],
+                    original_size=activity.fit_file_size,
+                )
+
+    # DB blobs (Activity.fit_file_content, GarminRawFile.file_content)
+    ids = [a.id for a in activities]
+    blob_rows = await db.execute(
+        select(Activity.id, Activity.fit_file_content).where(
+            Activity.id.in_(ids), Activity.fit_file_content.isnot(None)
+        )
+    )
+    by_id = {a.id: a for a in activities}
+    for activity_id, blob in blob_rows.all():
+        try:
+            new_blob = await _recompress_blob(blob, None, target_dict_id)
+        except Exception as e:
+            logger.warning(
+                f"Recompress: DB blob for activity {activity_id} failed: {e}"
+            )
+            stats["failed"] += 1
+            continue
+        _count((len(blob), len(new_blob)) if new_blob is not None else None)
+        if new_blob is not None:
+            by_id[activity_id].fit_file_content = new_blob
+
+    raw_rows = await db.execute(
+        select(
+            GarminRawFile.id, GarminRawFile.file_content, GarminRawFile.compression_type
+        ).where(
+            GarminRawFile.activity_id.in_(ids), GarminRawFile.file_content.isnot(None)
+        )
+    )
+    for raw_file_id, blob, compression in raw_rows.all():
+        try:
+            new_blob = await _recompress_blob(blob, compression, target_dict_id)
+        except Exception as e:
+            logger.warning(f"Recompress: raw file {raw_file_id} failed: {e}")
+            stats["failed"] += 1
+            continue
+        _count((len(blob), len(new_blob)) if new_blob is not None else None)
+        if new_blob is not None:
+            await db.execute(
+                update(GarminRawFile)
+                .where(GarminRawFile.id == raw_file_id)
+                .values(file_content=new_blob, compression_type=detect_codec(new_blob))
+            )
+
+    await db.commit()
+    return stats
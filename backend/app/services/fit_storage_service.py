@@ -6,8 +6,12 @@ from pathlib import Path
 from typing import Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import get_settings
 from app.models.garmin import GarminRawFile
 from app.models.activity import Activity
+from app.services import fit_compression
+
+settings = get_settings()
 
 
 class FitStorageService:
@@ -27,10 +31,11 @@ class FitStorageService:
         if compression == "gzip":
             return gzip.compress(file_content, compresslevel=6)
         elif compression == "zstd":
-            # Optional: Use zstandard for better compression
-            # import zstandard as zstd
-            # cctx = zstd.ZstdCompressor(level=3)
-            # return cctx.compress(file_content)
+            # Dictionary-less zstd; store_fit_file_to_db uses the trained dictionary
+            if fit_compression.zstd_available():
+                return fit_compression.zstandard.ZstdCompressor(
+                    level=settings.fit_zstd_level
+                ).compress(file_content)
             return gzip.compress(file_content, compresslevel=6)
         else:
             return file_content
@@ -46,13 +51,17 @@ class FitStorageService:
         Returns:
             Original file bytes
         """
-        if compression == "gzip":
-            return gzip.decompress(compressed)
-        elif compression == "zstd":
-            # import zstandard as zstd
-            # dctx = zstd.ZstdDecompressor()
-            # return dctx.decompress(compressed)
+        if compression == "none":
+            return compressed
+        # Detect from magic bytes: "zstd" rows written before zstd support hold gzip
+        codec = fit_compression.detect_codec(compressed)
+        if codec == "gzip":
             return gzip.decompress(compressed)
+        elif codec == "zstd":
+            if fit_compression.frame_dict_id(compressed):
+                raise ValueError("Dictionary-compressed data: use fit_compression.decompress_fit")
+            fit_compression.require_zstd()
+            return fit_compression.zstandard.ZstdDecompressor().decompress(compressed)
         else:
             return compressed
 
@@ -76,8 +85,12 @@ class FitStorageService:
             file_content: Raw FIT file bytes
             compression: Compression type to use
         """
-        # Compress the file
-        compressed = self.compress_file(file_content, compression)
+        # Compress the file (zstd uses the trained dictionary when available)
+        if compression == "zstd":
+            compressed, codec_metadata = await fit_compression.compress_fit(file_content)
+            compression = codec_metadata["codec"]
+        else:
+            compressed = self.compress_file(file_content, compression)
 
         # Calculate hash
         file_hash = self.calculate_hash(file_content)
@@ -116,7 +129,7 @@ class FitStorageService:
 
         # Decompress the file
         compression = garmin_file.compression_type or "gzip"
-        file_content = self.decompress_file(garmin_file.file_content, compression)
+        file_content = await fit_compression.decompress_fit(garmin_file.file_content, compression)
 
         # Verify hash if available
         if garmin_file.file_hash:
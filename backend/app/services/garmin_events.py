@@ -0,0 +1,186 @@
+"""Date-range fetch of Garmin all-day events with a per-day cache.
+
+Garmin only serves all-day events one day at a time, and
+``GarminConnectAdapter.get_events_in_range`` walks the days sequentially,
+so a few months on ``/races/garmin/events`` meant hundreds of back-to-back
+calls per page view. ``GarminEventsFetcher.fetch_range``:
+
+- reads every day of the range from Redis (``garmin:events:<user>:<date>``)
+  in one MGET and only requests the days that are missing;
+- requests those days in parallel, at most GARMIN_EVENTS_FETCH_CONCURRENCY
+  at a time per range, each on its own copy of the adapter's session (the
+  pooled adapter is not shared between threads);
+- stores each day's normalized events for GARMIN_EVENTS_CACHE_TTL_SECONDS
+  (empty days too, so quiet stretches are not refetched). Days that fail
+  are skipped and not cached.
+
+Without Redis every day is fetched, still in parallel.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import date, timedelta
+from typing import Any, Optional
+
+from redis.exceptions import RedisError
+
+from app.adapters.garmin_adapter import (
+    GarminAPIError,
+    GarminConnectAdapter,
+    normalize_day_events,
+)
+from app.core.config import get_settings
+from app.core.session import get_redis
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def _day_key(user_id: int, day: date) -> str:
+    return f"garmin:events:{user_id}:{day.isoformat()}"
+
+
+class GarminEventsFetcher:
+    """Parallel, cached fetch of a user's all-day events over a date range."""
+
+    def __init__(
+        self,
+        redis_client: Any = None,
+        use_redis: bool = True,
+        ttl_seconds: Optional[int] = None,
+        concurrency: Optional[int] = None,
+    ) -> None:
+        """Initialize the fetcher.
+
+        Args:
+            redis_client: Redis client (default: the shared client from ``get_redis``).
+            use_redis: False disables the cache (tests, scripts).
+            ttl_seconds: Cache lifetime of a day (default GARMIN_EVENTS_CACHE_TTL_SECONDS).
+            concurrency: Day requests in flight per range fetch.
+        """
+        self._redis = redis_client
+        self._use_redis = use_redis
+        self.ttl_seconds = (
+            settings.garmin_events_cache_ttl_seconds
+            if ttl_seconds is None
+            else ttl_seconds
+        )
+        self.concurrency = max(
+            1, concurrency or settings.garmin_events_fetch_concurrency
+        )
+
+    async def _client(self) -> Any:
+        if not self._use_redis or self.ttl_seconds <= 0:
+            return None
+        if self._redis is None:
+            self._redis = await get_redis()
+        return self._redis
+
+    async def fetch_range(
+        self,
+        user_id: int,
+        adapter: GarminConnectAdapter,
+        start_date: date,
+        end_date: date,
+    ) -> list[dict[str, Any]]:
+        """All-day events between two dates, in date order.
+
+        Args:
+            user_id: Owner of the adapter's session (cache namespace).
+            adapter: Authenticated Garmin adapter.
+            start_date: Start date (inclusive).
+            end_date: End date (inclusive).
+
+        Returns:
+            Normalized event dictionaries with ``event_date`` set. Days whose
+            request fails are left out (and fetched again next time).
+
+        Raises:
+            GarminAuthError: If the adapter has no session to fetch with.
+        """
+        days = [
+            start_date + timedelta(days=i)
+            for i in range((end_date - start_date).days + 1)
+        ]
+        if not days:
+            return []
+
+        by_day = await self._read_cached(user_id, days)
+        missing = [day for day in days if day not in by_day]
+        if missing:
+            fetched = await self._fetch_days(adapter, missing)
+            by_day.update(fetched)
+            await self._write_cached(user_id, fetched)
+
+        logger.debug(
+            f"Garmin events {start_date}..{end_date} for user {user_id}: "
+            f"{len(days) - len(missing)} cached, {len(missing)} fetched"
+        )
+        return [event for day in days for event in by_day.get(day, [])]
+
+    async def _fetch_days(
+        self, adapter: GarminConnectAdapter, days: list[date]
+    ) -> dict[date, list[dict[str, Any]]]:
+        # One session per request in flight; the queue also bounds concurrency
+        sessions: asyncio.Queue[GarminConnectAdapter] = asyncio.Queue()
+        for _ in range(min(self.concurrency, len(days))):
+            sessions.put_nowait(adapter.clone())
+        loop = asyncio.get_running_loop()
+
+        async def fetch(day: date) -> Optional[list[dict[str, Any]]]:
+            session = await sessions.get()
+            try:
+                raw = await loop.run_in_executor(None, session.get_all_day_events, day)
+            except GarminAPIError:
+                return None  # Logged by the adapter; retried on the next request
+            finally:
+                sessions.put_nowait(session)
+            return normalize_day_events(raw, day)
+
+        results = await asyncio.gather(*(fetch(day) for day in days))
+        return {day: events for day, events in zip(days, results) if events is not None}
+
+    async def _read_cached(
+        self, user_id: int, days: list[date]
+    ) -> dict[date, list[dict[str, Any]]]:
+        client = await self._client()
+        if client is None:
+            return {}
+        try:
+            values = await client.mget([_day_key(user_id, day) for day in days])
+        except RedisError as e:
+            logger.warning(f"Failed to read cached Garmin events: {e}")
+            return {}
+        return {
+            day: json.loads(value)
+            for day, value in zip(days, values)
+            if value is not None
+        }
+
+    async def _write_cached(
+        self, user_id: int, by_day: dict[date, list[dict[str, Any]]]
+    ) -> None:
+        client = await self._client()
+        if client is None or not by_day:
+            return
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for day, events in by_day.items():
+                    pipe.set(
+                        _day_key(user_id, day), json.dumps(events), ex=self.ttl_seconds
+                    )
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Failed to cache Garmin events: {e}")
+
+
+_fetcher: Optional[GarminEventsFetcher] = None
+
+
+def get_garmin_events_fetcher() -> GarminEventsFetcher:
+    """Get singleton Garmin events fetcher."""
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = GarminEventsFetcher()
+    return _fetcher
@@ -0,0 +1,393 @@
+"""Garmin sync runs as ARQ jobs instead of web-worker background tasks.
+
+Syncs run on the ``garmin_sync`` queue (``app.workers.garmin_worker``), so
+API workers only serve requests:
+
+- ``POST /ingest/run`` takes the per-user sync lock and enqueues a
+  ``sync_garmin_user`` job carrying the lock owner; the job releases it.
+- ``schedule_garmin_syncs`` (worker cron) enqueues incremental syncs for
+  every user with a stored Garmin session whose last attempt is older than
+  GARMIN_SCHEDULED_SYNC_INTERVAL_MINUTES, least recently successful first,
+  so data is already fresh when users open the app.
+
+One job syncs one user and the worker runs GARMIN_SYNC_CONCURRENCY jobs at
+a time: each due user gets a turn per interval and the number of users
+talking to Garmin at once stays bounded.
+"""
+
+import asyncio
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Optional
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import get_settings
+from app.core.database import async_session_maker
+from app.core.queue import get_arq_pool, has_live_worker
+from app.core.session import acquire_lock, extend_lock, release_lock
+from app.models.garmin import GarminSession, GarminSyncState
+from app.models.user import User
+from app.services.ai_snapshot import ensure_ai_training_snapshot
+from app.services.sync_service import GarminSyncService, create_sync_service
+from app.services.sync_status import get_sync_status_store
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+GARMIN_SYNC_TASK_NAME = "sync_garmin_user"
+
+
+def sync_lock_name(user_id: int) -> str:
+    """Get lock name for user sync."""
+    return f"sync:user:{user_id}"
+
+
+def _scheduled_marker(user_id: int) -> str:
+    return f"garmin-sync:scheduled:{user_id}"
+
+
+# -------------------------------------------------------------------------
+# Running a sync
+# -------------------------------------------------------------------------
+
+
+async def _claim_lock(user_id: int, lock_owner: Optional[str]) -> Optional[str]:
+    """Take (or confirm) the user's sync lock; None if another sync holds it.
+
+    A lock taken by the API when the job was enqueued may have expired while
+    the job waited in the queue; it is re-acquired under the same owner.
+    """
+    lock_name = sync_lock_name(user_id)
+    if lock_owner and await extend_lock(
+        lock_name, lock_owner, settings.sync_lock_ttl_seconds
+    ):
+        return lock_owner
+    return await acquire_lock(
+        lock_name, ttl_seconds=settings.sync_lock_ttl_seconds, owner=lock_owner
+    )
+
+
+async def run_user_sync(
+    user_id: int,
+    endpoints: Optional[list[str]] = None,
+    lock_owner: Optional[str] = None,
+    full_backfill: bool = False,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    force: bool = False,
+    session_factory: async_sessionmaker[AsyncSession] = async_session_maker,
+) -> dict[str, Any]:
+    """Sync a user's Garmin data under the per-user sync lock.
+
+    The lock is extended periodically so long syncs (1000+ activities) keep
+    it, and released when the run ends. Progress is published through the
+    shared sync status store.
+
+    Args:
+        user_id: User ID to sync.
+        endpoints: Endpoints to sync (default: all).
+        lock_owner: Owner token of a lock already taken for this run; if
+            None the lock is acquired here.
+        full_backfill: If True, sync all historical data.
+        start_date: Optional start date filter.
+        end_date: Optional end date filter.
+        force: If True, also sync endpoints that are not due yet.
+        session_factory: Factory for the sync's database session.
+
+    Returns:
+        Run summary (``skipped`` is set when another sync holds the lock).
+    """
+    endpoints = endpoints or list(GarminSyncService.ENDPOINTS)
+    lock_name = sync_lock_name(user_id)
+    lock_owner = await _claim_lock(user_id, lock_owner)
+    if not lock_owner:
+        logger.info(f"Sync already running for user {user_id}; skipping")
+        return {"success": False, "user_id": user_id, "skipped": "already running"}
+
+    # Shared status (visible to every API worker) with progress tracking
+    sync_status = get_sync_status_store()
+    await sync_status.start(user_id, endpoints)
+    errors: list[str] = []
+
+    # Background task to periodically extend lock during long syncs
+    async def extend_lock_periodically():
+        """Extend lock every N minutes to prevent expiration during long syncs."""
+        try:
+            while True:
+                await asyncio.sleep(settings.sync_lock_extension_interval)
+                success = await extend_lock(
+                    lock_name,
+                    lock_owner,
+                    ttl_seconds=settings.sync_lock_ttl_seconds,
+                )
+                if success:
+                    logger.debug(f"Extended sync lock for user {user_id}")
+                else:
+                    logger.warning(f"Failed to extend sync lock for user {user_id}")
+        except asyncio.CancelledError:
+            # Normal cancellation when sync completes
+            pass
+
+    # Start lock extension task
+    extension_task = asyncio.create_task(extend_lock_periodically())
+
+    try:
+        async with session_factory() as session:
+            # Get user
+            result = await session.execute(select(User).where(User.id == user_id))
+            user = result.scalar_one_or_none()
+            if not user:
+                logger.error(f"User {user_id} not found")
+                await sync_status.set_error(user_id, "User not found")
+                return {"success": False, "user_id": user_id, "error": "User not found"}
+
+            # Create sync service
+            sync_service = await create_sync_service(session, user)
+            if not sync_service:
+                logger.error(f"Could not create sync service for user {user_id}")
+                await sync_status.set_error(user_id, "Garmin 연결이 필요합니다")
+                return {
+                    "success": False,
+                    "user_id": user_id,
+                    "error": "Garmin not connected",
+                }
+
+            # Stage timings of the whole run (spans, histograms, per-run trace)
+            with sync_service.trace.run():
+                # Sync user profile once per run (max HR, raw snapshot)
+                await sync_service.sync_user_profile()
+
+                # Run sync for each endpoint
+                for idx, endpoint in enumerate(endpoints):
+                    # Update progress before starting each endpoint
+                    await sync_status.set_progress(
+                        user_id, endpoint, idx, len(endpoints)
+                    )
+
+                    try:
+                        result = await sync_service.sync_endpoint(
+                            endpoint,
+                            start_date=start_date,
+                            end_date=end_date,
+                            full_backfill=full_backfill,
+                            force=force,
+                        )
+
+                        # Per-endpoint result (also updates items_synced)
+                        await sync_status.record_result(
+                            user_id,
+                            endpoint,
+                            {
+                                "success": result.success,
+                                "items_fetched": result.items_fetched,
+                                "items_created": result.items_created,
+                                "items_updated": result.items_updated,
+                                "skipped": result.skipped,
+                                "error": result.error,
+                            },
+                        )
+
+                        logger.info(
+                            f"Sync {endpoint} for user {user_id}: "
+                            f"fetched={result.items_fetched}, "
+                            f"created={result.items_created}, "
+                            f"updated={result.items_updated}"
+                        )
+                    except Exception as e:
+                        logger.exception(f"Error syncing {endpoint} for user {user_id}")
+                        errors.append(f"{endpoint}: {str(e)[:50]}")
+                        await sync_status.record_result(
+                            user_id, endpoint, {"success": False, "error": str(e)[:200]}
+                        )
+
+            # Store error summary if any failures
+            if errors:
+                await sync_status.set_error(
+                    user_id, "; ".join(errors[:3])
+                )  # Max 3 errors
+
+            try:
+                await ensure_ai_training_snapshot(session, user)
+            except Exception as e:
+                logger.warning(
+                    "Failed to refresh AI snapshot for user %s: %s",
+                    user_id,
+                    e,
+                )
+
+            try:
+                await sync_status.record_trace(user_id, sync_service.trace.to_dict())
+            except Exception as e:
+                logger.warning(f"Failed to store sync trace for user {user_id}: {e}")
+
+    except Exception as e:
+        logger.exception(f"Background sync error for user {user_id}")
+        await sync_status.set_error(user_id, str(e)[:100])
+        errors.append(str(e)[:100])
+    finally:
+        # Cancel lock extension task
+        extension_task.cancel()
+        try:
+            await extension_task
+        except asyncio.CancelledError:
+            pass
+
+        # Always release the lock when done
+        await release_lock(lock_name, lock_owner)
+        try:
+            await sync_status.finish(user_id)
+        except Exception as e:
+            logger.warning(f"Failed to publish sync completion for user {user_id}: {e}")
+
+    return {"success": not errors, "user_id": user_id, "errors": errors}
+
+
+# -------------------------------------------------------------------------
+# Queueing
+# -------------------------------------------------------------------------
+
+
+async def has_sync_worker(pool: Any) -> bool:
+    """Check whether a worker is consuming the Garmin sync queue."""
+    return await has_live_worker(pool, settings.garmin_sync_queue_name)
+
+
+async def enqueue_user_sync(
+    user_id: int,
+    endpoints: list[str],
+    lock_owner: str,
+    full_backfill: bool = False,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    force: bool = False,
+    pool: Optional[Any] = None,
+) -> bool:
+    """Push a requested sync to the Garmin sync queue.
+
+    Args:
+        user_id: User ID to sync.
+        endpoints: Endpoints to sync.
+        lock_owner: Owner token of the lock taken for this run (the job releases it).
+        full_backfill: If True, sync all historical data.
+        start_date: Optional start date filter.
+        end_date: Optional end date filter.
+        force: If True, also sync endpoints that are not due yet.
+        pool: ArqRedis pool (default: the shared pool).
+
+    Returns:
+        True if the job was queued; False if the queue is unavailable or no
+        sync worker is consuming it (the caller then runs the sync itself).
+    """
+    try:
+        pool = pool or await get_arq_pool()
+        if pool is None:
+            return False
+        if not await has_sync_worker(pool):
+            logger.warning(
+                f"No Garmin sync worker running; not queueing sync for user {user_id}"
+            )
+            return False
+        job = await pool.enqueue_job(
+            GARMIN_SYNC_TASK_NAME,
+            user_id=user_id,
+            endpoints=endpoints,
+            lock_owner=lock_owner,
+            full_backfill=full_backfill,
+            start_date=start_date,
+            end_date=end_date,
+            force=force,
+            _job_id=f"garmin-sync:{user_id}:{lock_owner}",
+            _queue_name=settings.garmin_sync_queue_name,
+        )
+        return job is not None
+    except Exception as e:
+        logger.warning(f"Failed to queue Garmin sync for user {user_id}: {e}")
+        return False
+
+
+async def due_sync_user_ids(
+    session_factory: async_sessionmaker[AsyncSession] = async_session_maker,
+    now: Optional[datetime] = None,
+) -> list[int]:
+    """Users with a Garmin session due for a scheduled sync, most stale first.
+
+    A user is due when no endpoint was attempted within the scheduling
+    interval; users who never synced come first, then by oldest
+    ``last_success_at`` across their endpoints.
+    """
+    now = now or datetime.now(timezone.utc)
+    due_before = now - timedelta(
+        minutes=settings.garmin_scheduled_sync_interval_minutes
+    )
+    states = (
+        select(
+            GarminSyncState.user_id,
+            func.max(GarminSyncState.last_sync_at).label("last_attempt_at"),
+            func.max(GarminSyncState.last_success_at).label("last_success_at"),
+        )
+        .group_by(GarminSyncState.user_id)
+        .subquery()
+    )
+    async with session_factory() as db:
+        result = await db.execute(
+            select(GarminSession.user_id)
+            .outerjoin(states, states.c.user_id == GarminSession.user_id)
+            .where(
+                GarminSession.session_data.isnot(None),
+                or_(
+                    states.c.last_attempt_at.is_(None),
+                    states.c.last_attempt_at < due_before,
+                ),
+            )
+            .order_by(
+                states.c.last_success_at.asc().nulls_first(), GarminSession.user_id
+            )
+        )
+        return list(result.scalars().all())
+
+
+async def schedule_garmin_syncs(
+    pool: Any,
+    session_factory: async_sessionmaker[AsyncSession] = async_session_maker,
+) -> dict[str, int]:
+    """Enqueue incremental syncs for due users.
+
+    At most GARMIN_SCHEDULED_SYNC_BATCH_SIZE users are enqueued per run so
+    the queue stays short and manual syncs are not stuck behind a full
+    sweep. Each user is enqueued at most once per interval (a Redis marker),
+    so users whose syncs keep failing before touching their sync state do
+    not take every slot.
+
+    Args:
+        pool: ARQ pool used to enqueue jobs.
+        session_factory: Factory for database sessions.
+
+    Returns:
+        Counts of due and enqueued users.
+    """
+    interval_minutes = settings.garmin_scheduled_sync_interval_minutes
+    if interval_minutes <= 0:
+        return {"due": 0, "enqueued": 0}
+
+    user_ids = await due_sync_user_ids(session_factory)
+    enqueued = 0
+    for user_id in user_ids:
+        if enqueued >= settings.garmin_scheduled_sync_batch_size:
+            break
+        if not await pool.set(
+            _scheduled_marker(user_id), 1, nx=True, ex=interval_minutes * 60
+        ):
+            continue  # Already given its turn this interval
+        job = await pool.enqueue_job(
+            GARMIN_SYNC_TASK_NAME,
+            user_id=user_id,
+            _job_id=f"garmin-sync:{user_id}",
+            _queue_name=settings.garmin_sync_queue_name,
+        )
+        if job is not None:
+            enqueued += 1
+
+    logger.info(f"Garmin sync scheduler: {len(user_ids)} due, {enqueued} enqueued")
+    return {"due": len(user_ids), "enqueued": enqueued}
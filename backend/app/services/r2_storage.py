@@ -2,20 +2,37 @@
 
 This module provides S3-compatible storage for FIT files using Cloudflare R2.
 It supports compression, hash verification, and presigned URLs for direct uploads.
+
+boto3 is blocking, so every network call runs on a dedicated bounded thread
+pool (sized with R2_EXECUTOR_WORKERS) against a client whose HTTP connection
+pool matches it. Many downloads/uploads can be in flight without stalling the
+event loop, and a burst of storage work cannot starve the default executor
+used elsewhere in the app.
 """
 
+import asyncio
+import functools
 import gzip
 import hashlib
+import io
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError
 
 from app.core.config import get_settings
 from app.core.debug_utils import CloudMigrationDebug, trace_storage
+from app.services.fit_compression import (
+    CODEC_NONE,
+    CONTENT_TYPES,
+    compress_fit,
+    stream_decompressor,
+)
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -25,10 +42,12 @@ class R2StorageService:
     """Service for managing FIT files in Cloudflare R2.
 
     This service provides:
-    - Upload/download with automatic gzip compression
+    - Upload/download with automatic compression (zstd dictionary or gzip)
     - Presigned URLs for direct client uploads (bypasses server)
     - SHA-256 hash verification
     - Storage statistics and quota tracking
+    - Streaming (chunked, decompress-on-the-fly) downloads
+    - Multipart uploads for large objects
     """
 
     def __init__(self):
@@ -36,6 +55,17 @@ class R2StorageService:
         self._client = None
         self._initialized = False
         self._init_error: Optional[str] = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.r2_executor_workers,
+            thread_name_prefix="r2",
+        )
+
+    async def _run(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking boto3 call on the storage executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
 
     def _ensure_initialized(self) -> bool:
         """Lazy initialization of boto3 client."""
@@ -56,6 +86,9 @@ class R2StorageService:
                 retries={'max_attempts': 3, 'mode': 'adaptive'},
                 connect_timeout=10,
                 read_timeout=30,
+                # One pooled connection per executor thread (+ multipart parts)
+                max_pool_connections=settings.r2_max_pool_connections,
+                tcp_keepalive=True,
             )
 
             self._client = boto3.client(
@@ -195,30 +228,28 @@ class R2StorageService:
         file_hash = self.calculate_hash(fit_data)
         original_size = len(fit_data)
 
-        # Compress if requested
-        if compress:
-            upload_data, compression_ratio = self.compress_data(fit_data)
-            content_type = 'application/gzip'
+        # Compress if requested (zstd + trained dictionary, gzip fallback)
+        if compress and fit_data:
+            upload_data, codec_metadata = await compress_fit(fit_data)
+            compression_ratio = (1 - len(upload_data) / original_size) * 100
         else:
             upload_data = fit_data
+            codec_metadata = {'codec': CODEC_NONE, 'dict_id': '0'}
             compression_ratio = 0.0
-            content_type = 'application/octet-stream'
+        content_type = CONTENT_TYPES[codec_metadata['codec']]
+
+        metadata = {
+            'original_size': str(original_size),
+            'file_hash': file_hash,
+            'compressed': str(compress).lower(),
+            **codec_metadata,
+            'user_id': str(user_id),
+            'activity_id': str(activity_id),
+            'uploaded_at': datetime.now(timezone.utc).isoformat()
+        }
 
         try:
-            self.client.put_object(
-                Bucket=self.bucket_name,
-                Key=key,
-                Body=upload_data,
-                ContentType=content_type,
-                Metadata={
-                    'original_size': str(original_size),
-                    'file_hash': file_hash,
-                    'compressed': str(compress).lower(),
-                    'user_id': str(user_id),
-                    'activity_id': str(activity_id),
-                    'uploaded_at': datetime.now(timezone.utc).isoformat()
-                }
-            )
+            await self.put_object_bytes(key, upload_data, content_type, metadata)
 
             logger.info(
                 f"Uploaded FIT to R2: key={key}, "
@@ -245,6 +276,7 @@ class R2StorageService:
                 'compressed_size': len(upload_data),
                 'compression_ratio': compression_ratio,
                 'file_hash': file_hash,
+                **codec_metadata,
                 'success': True
             }
 
@@ -264,11 +296,146 @@ class R2StorageService:
             logger.error(error_msg)
             return {'key': key, 'success': False, 'error': error_msg}
 
+    async def put_object_bytes(
+        self,
+        key: str,
+        data: bytes,
+        content_type: str,
+        metadata: Dict[str, str],
+    ) -> None:
+        """Write already-encoded bytes to a key (multipart above the threshold).
+
+        Raises:
+            ClientError: If the upload fails.
+        """
+        if len(data) >= settings.r2_multipart_threshold_bytes:
+            await self._upload_multipart(key, data, content_type, metadata)
+        else:
+            await self._run(
+                self.client.put_object,
+                Bucket=self.bucket_name,
+                Key=key,
+                Body=data,
+                ContentType=content_type,
+                Metadata=metadata,
+            )
+
+    async def _upload_multipart(
+        self,
+        key: str,
+        data: bytes,
+        content_type: str,
+        metadata: Dict[str, str],
+    ) -> None:
+        """Upload a large object in parts (parallel part uploads, per-part retries)."""
+        transfer_config = TransferConfig(
+            multipart_threshold=settings.r2_multipart_threshold_bytes,
+            multipart_chunksize=settings.r2_multipart_chunk_bytes,
+            max_concurrency=settings.r2_multipart_concurrency,
+        )
+        await self._run(
+            self.client.upload_fileobj,
+            io.BytesIO(data),
+            self.bucket_name,
+            key,
+            ExtraArgs={'ContentType': content_type, 'Metadata': metadata},
+            Config=transfer_config,
+        )
+
+    async def _iter_body(
+        self,
+        body: Any,
+        decompress: bool,
+        max_bytes: Optional[int] = None,
+        key: str = "",
+    ) -> AsyncIterator[bytes]:
+        """Yield an object body chunk by chunk, decompressing on the fly.
+
+        The codec (gzip or zstd) is detected from the magic bytes (presigned
+        client uploads carry no metadata), so only the current chunk is held
+        in memory.
+        """
+        chunks = iter(body.iter_chunks(chunk_size=settings.r2_stream_chunk_bytes))
+        decompressor = None
+        first = True
+        total = 0
+        try:
+            while True:
+                chunk = await self._run(next, chunks, None)
+                if chunk is None:
+                    break
+                if first:
+                    first = False
+                    if decompress:
+                        decompressor = await stream_decompressor(chunk)
+                data = decompressor.decompress(chunk) if decompressor else chunk
+                total += len(data)
+                if max_bytes is not None and total > max_bytes:
+                    raise ValueError(f"Object {key} exceeds {max_bytes} bytes after decompression")
+                if data:
+                    yield data
+            if decompressor:
+                tail = decompressor.flush()
+                if tail:
+                    yield tail
+        finally:
+            body.close()
+
+    async def iter_object(
+        self,
+        key: str,
+        decompress: bool = True,
+        max_bytes: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        """Stream an object by key as (decompressed) chunks.
+
+        Args:
+            key: Object key (e.g. activity.r2_key).
+            decompress: Decompress gzip/zstd content while streaming.
+            max_bytes: Abort if the (decompressed) size exceeds this.
+
+        Raises:
+            ClientError: If the object cannot be fetched.
+            ValueError: If max_bytes is exceeded.
+        """
+        response = await self._run(self.client.get_object, Bucket=self.bucket_name, Key=key)
+        async for chunk in self._iter_body(response['Body'], decompress, max_bytes, key):
+            yield chunk
+
+    async def read_prefix(self, key: str, length: int = 4) -> Optional[bytes]:
+        """Read the first ``length`` bytes of an object (e.g. to detect its codec).
+
+        Args:
+            key: Object key.
+            length: Number of bytes to read.
+
+        Returns:
+            The bytes read or None if not found / R2 unavailable.
+        """
+        if not self.is_available:
+            return None
+        try:
+            response = await self._run(
+                self.client.get_object,
+                Bucket=self.bucket_name,
+                Key=key,
+                Range=f"bytes=0-{length - 1}",
+            )
+        except ClientError as e:
+            logger.warning(f"R2 read failed for {key}: {e}")
+            return None
+        body = response['Body']
+        try:
+            return await self._run(body.read)
+        finally:
+            body.close()
+
     async def download_fit(
         self,
         user_id: int,
         activity_id: int,
-        decompress: bool = True
+        decompress: bool = True,
+        key: Optional[str] = None,
     ) -> Optional[bytes]:
         """Download FIT file from R2.
 
@@ -276,6 +443,7 @@ class R2StorageService:
             user_id: User ID
             activity_id: Activity ID
             decompress: Whether to decompress after download (default True)
+            key: Stored object key (defaults to the current-year key)
 
         Returns:
             FIT file data or None if not found
@@ -284,21 +452,24 @@ class R2StorageService:
             logger.error(f"R2 not available: {self._init_error}")
             return None
 
-        key = self._generate_key(user_id, activity_id)
+        key = key or self._generate_key(user_id, activity_id)
 
         try:
-            response = self.client.get_object(Bucket=self.bucket_name, Key=key)
-            data = response['Body'].read()
+            response = await self._run(self.client.get_object, Bucket=self.bucket_name, Key=key)
             metadata = response.get('Metadata', {})
 
-            # Decompress if needed
-            if decompress and metadata.get('compressed', 'false').lower() == 'true':
-                data = self.decompress_data(data)
+            # Hash is computed incrementally over the streamed, decompressed chunks
+            hasher = hashlib.sha256()
+            parts: list[bytes] = []
+            async for chunk in self._iter_body(response['Body'], decompress, key=key):
+                hasher.update(chunk)
+                parts.append(chunk)
+            data = b"".join(parts)
 
-            # Verify hash if available
+            # Verify hash if available (only meaningful for decompressed content)
             expected_hash = metadata.get('file_hash')
-            if expected_hash:
-                actual_hash = self.calculate_hash(data)
+            if expected_hash and decompress:
+                actual_hash = hasher.hexdigest()
                 if actual_hash != expected_hash:
                     logger.error(f"Hash mismatch for {key}: expected={expected_hash}, actual={actual_hash}")
                     return None
@@ -331,6 +502,37 @@ class R2StorageService:
             logger.error(f"Unexpected error downloading from R2: {e}")
             return None
 
+    async def download_by_key(
+        self,
+        key: str,
+        max_bytes: Optional[int] = None,
+    ) -> Optional[bytes]:
+        """Download an object by key, decompressing gzip/zstd content while streaming.
+
+        Unlike download_fit, this uses the stored key (e.g. activity.r2_key)
+        rather than deriving it from the current year.
+
+        Args:
+            key: Object key.
+            max_bytes: Abort if the decompressed size exceeds this.
+
+        Returns:
+            Object bytes or None if not found / R2 unavailable.
+        """
+        if not self.is_available:
+            logger.error(f"R2 not available: {self._init_error}")
+            return None
+
+        try:
+            return b"".join([chunk async for chunk in self.iter_object(key, max_bytes=max_bytes)])
+        except ClientError as e:
+            error_code = e.response.get('Error', {}).get('Code', '')
+            if error_code == 'NoSuchKey':
+                logger.warning(f"Object not found in R2: {key}")
+            else:
+                logger.error(f"R2 download failed for {key}: {e}")
+            return None
+
     def generate_presigned_upload_url(
         self,
         user_id: int,
@@ -382,7 +584,8 @@ class R2StorageService:
         self,
         user_id: int,
         activity_id: int,
-        expires_in: int = 300
+        expires_in: int = 300,
+        key: Optional[str] = None,
     ) -> Optional[str]:
         """Generate presigned URL for download.
 
@@ -390,6 +593,7 @@ class R2StorageService:
             user_id: User ID
             activity_id: Activity ID
             expires_in: URL expiration in seconds (default 5 minutes)
+            key: Stored object key (defaults to the current-year key)
 
         Returns:
             Presigned download URL or None on failure
@@ -398,7 +602,7 @@ class R2StorageService:
             logger.error(f"R2 not available for presigned URL: {self._init_error}")
             return None
 
-        key = self._generate_key(user_id, activity_id)
+        key = key or self._generate_key(user_id, activity_id)
 
         try:
             url = self.client.generate_presigned_url(
@@ -412,12 +616,18 @@ class R2StorageService:
             logger.error(f"Failed to generate presigned download URL: {e}")
             return None
 
-    async def delete_fit(self, user_id: int, activity_id: int) -> bool:
+    async def delete_fit(
+        self,
+        user_id: int,
+        activity_id: int,
+        key: Optional[str] = None,
+    ) -> bool:
         """Delete FIT file from R2.
 
         Args:
             user_id: User ID
             activity_id: Activity ID
+            key: Stored object key (defaults to the current-year key)
 
         Returns:
             True if deleted successfully, False otherwise
@@ -426,10 +636,10 @@ class R2StorageService:
             logger.error(f"R2 not available: {self._init_error}")
             return False
 
-        key = self._generate_key(user_id, activity_id)
+        key = key or self._generate_key(user_id, activity_id)
 
         try:
-            self.client.delete_object(Bucket=self.bucket_name, Key=key)
+            await self._run(self.client.delete_object, Bucket=self.bucket_name, Key=key)
             logger.info(f"Deleted FIT from R2: key={key}")
             CloudMigrationDebug.log_r2_operation(
                 operation="delete",
@@ -472,19 +682,20 @@ class R2StorageService:
         if year:
             prefix += f"{year}/"
 
-        try:
-            response = self.client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=prefix
-            )
-
+        def _list() -> List[Dict[str, Any]]:
             files = []
-            for obj in response.get('Contents', []):
-                files.append({
-                    'key': obj['Key'],
-                    'size': obj['Size'],
-                    'last_modified': obj['LastModified'].isoformat(),
-                })
+            paginator = self.client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+                for obj in page.get('Contents', []):
+                    files.append({
+                        'key': obj['Key'],
+                        'size': obj['Size'],
+                        'last_modified': obj['LastModified'].isoformat(),
+                    })
+            return files
+
+        try:
+            files = await self._run(_list)
 
             logger.debug(f"Listed {len(files)} files for user {user_id}")
             return files
@@ -518,16 +729,19 @@ class R2StorageService:
 
         prefix = f"users/{user_id}/" if user_id else ""
 
-        try:
+        def _totals() -> Tuple[int, int]:
             # Handle pagination for large buckets
-            total_size = 0
-            file_count = 0
+            size = 0
+            count = 0
             paginator = self.client.get_paginator('list_objects_v2')
-
             for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
                 for obj in page.get('Contents', []):
-                    total_size += obj['Size']
-                    file_count += 1
+                    size += obj['Size']
+                    count += 1
+            return size, count
+
+        try:
+            total_size, file_count = await self._run(_totals)
 
             free_tier_gb = 10
             total_gb = total_size / (1024 ** 3)
@@ -557,6 +771,32 @@ class R2StorageService:
                 'free_tier_used_percent': 0.0
             }
 
+    async def object_sizes(self, prefix: str = "users/") -> Dict[str, int]:
+        """Map every key under ``prefix`` to its stored size (full bucket walk).
+
+        Used by the storage usage reconciliation job; request paths read the
+        DB counters instead. Errors propagate so a failed walk never
+        overwrites the counters with partial totals.
+
+        Args:
+            prefix: Key prefix to walk
+
+        Returns:
+            Dictionary of key -> size in bytes
+        """
+        if not self.is_available:
+            raise RuntimeError(self._init_error or 'R2 not configured')
+
+        def _walk() -> Dict[str, int]:
+            sizes: Dict[str, int] = {}
+            paginator = self.client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+                for obj in page.get('Contents', []):
+                    sizes[obj['Key']] = obj['Size']
+            return sizes
+
+        return await self._run(_walk)
+
 
 # Singleton instance with lazy initialization
 _r2_service: Optional[R2StorageService] = None
@@ -0,0 +1,376 @@
+"""Archive tier for raw Garmin responses.
+
+Every Garmin response is kept as a ``GarminRawEvent`` for reprocessing.
+Storing each one as inline JSONB let the table outgrow the data it backs:
+safety-window resyncs store the same payloads again on every run, and old
+events are never read outside of rebuilds.
+
+- Payloads are canonicalized (sorted keys, compact separators) and hashed;
+  a payload identical to one already stored for the same user and endpoint
+  only refreshes that event's ``fetched_at``.
+- Bodies are stored compressed (zstd when available, gzip otherwise) in
+  ``body`` instead of JSONB.
+- ``archive_raw_events`` (hourly ARQ cron in the FIT worker) compresses
+  events still stored inline and moves bodies older than
+  RAW_EVENT_COLD_AFTER_DAYS to R2 under ``raw-events/``, leaving the row
+  as a pointer.
+- ``iter_raw_events`` streams events back from any tier, for rebuilds
+  (``scripts/export_raw_events.py``).
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import time
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from sqlalchemy import null, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import undefer
+
+from app.core.config import get_settings
+from app.core.database import async_session_maker
+from app.models.garmin import GarminRawEvent
+from app.services.fit_compression import (
+    CODEC_GZIP,
+    CODEC_ZSTD,
+    CONTENT_TYPES,
+    detect_codec,
+    require_zstd,
+    zstandard,
+)
+from app.services.r2_storage import R2StorageService, get_r2_service
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+RAW_EVENT_PREFIX = "raw-events"
+
+
+# -------------------------------------------------------------------------
+# Encoding
+# -------------------------------------------------------------------------
+
+
+def canonicalize(payload: Any) -> tuple[dict[str, Any], bytes]:
+    """Wrap a payload as stored (lists under ``data``) and serialize it canonically."""
+    wrapped = payload if isinstance(payload, dict) else {"data": payload}
+    canonical = json.dumps(
+        wrapped, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    ).encode("utf-8")
+    return wrapped, canonical
+
+
+def count_records(payload: dict[str, Any]) -> int:
+    """Number of records in a stored payload (list length for wrapped lists)."""
+    data = payload.get("data")
+    return len(data) if isinstance(data, (list, dict)) else 1
+
+
+def encode_body(canonical: bytes) -> bytes:
+    """Compress canonical JSON for storage."""
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(
+            level=settings.raw_event_zstd_level, write_content_size=True
+        ).compress(canonical)
+    return gzip.compress(canonical, 6)
+
+
+def decode_body(body: bytes) -> dict[str, Any]:
+    """Decompress a stored body back into its payload."""
+    codec = detect_codec(body)
+    if codec == CODEC_ZSTD:
+        require_zstd()
+        body = zstandard.ZstdDecompressor().decompress(body)
+    elif codec == CODEC_GZIP:
+        body = gzip.decompress(body)
+    return json.loads(body)
+
+
+def encode_event(payload: Any) -> dict[str, Any]:
+    """Archive columns for a payload (``payload_hash``, ``body``, sizes)."""
+    wrapped, canonical = canonicalize(payload)
+    return {
+        "payload_hash": hashlib.sha256(canonical).hexdigest(),
+        "body": encode_body(canonical),
+        "body_size": len(canonical),
+        "record_count": count_records(wrapped),
+    }
+
+
+# -------------------------------------------------------------------------
+# Writes
+# -------------------------------------------------------------------------
+
+
+async def store_raw_events(
+    db: AsyncSession,
+    user_id: int,
+    events: list[tuple[str, Any]],
+    stats: Optional[dict[str, int]] = None,
+) -> list[int]:
+    """Store raw responses, skipping exact duplicates (caller commits).
+
+    Args:
+        db: Database session.
+        user_id: Owner of the events.
+        events: ``(endpoint, payload)`` pairs.
+        stats: If given, ``new`` and ``unchanged`` are incremented by the
+            number of payloads stored and already known.
+
+    Returns:
+        Raw event id for each input, in order (an existing id for duplicates).
+    """
+    if not events:
+        return []
+    encoded = [(endpoint, encode_event(payload)) for endpoint, payload in events]
+    now = datetime.now(timezone.utc)
+
+    hashes = {columns["payload_hash"] for _, columns in encoded}
+    rows = await db.execute(
+        select(GarminRawEvent.id, GarminRawEvent.endpoint, GarminRawEvent.payload_hash)
+        .where(
+            GarminRawEvent.user_id == user_id, GarminRawEvent.payload_hash.in_(hashes)
+        )
+        .order_by(GarminRawEvent.id)
+    )
+    known: dict[tuple[str, str], int] = {}
+    for event_id, endpoint, payload_hash in rows.all():
+        known.setdefault((endpoint, payload_hash), event_id)
+
+    seen = [
+        known[key]
+        for key in {(e, c["payload_hash"]) for e, c in encoded}
+        if key in known
+    ]
+    if seen:
+        await db.execute(
+            update(GarminRawEvent)
+            .where(GarminRawEvent.id.in_(seen))
+            .values(fetched_at=now)
+            .execution_options(synchronize_session=False)
+        )
+
+    new_rows: dict[tuple[str, str], dict[str, Any]] = {}
+    for endpoint, columns in encoded:
+        key = (endpoint, columns["payload_hash"])
+        if key not in known and key not in new_rows:
+            new_rows[key] = {
+                "user_id": user_id,
+                "endpoint": endpoint,
+                "fetched_at": now,
+                **columns,
+            }
+    if new_rows:
+        result = await db.execute(
+            insert(GarminRawEvent).returning(
+                GarminRawEvent.id, sort_by_parameter_order=True
+            ),
+            list(new_rows.values()),
+        )
+        known.update(zip(new_rows, result.scalars().all()))
+
+    if stats is not None:
+        stats["new"] = stats.get("new", 0) + len(new_rows)
+        stats["unchanged"] = stats.get("unchanged", 0) + len(encoded) - len(new_rows)
+
+    return [known[(endpoint, columns["payload_hash"])] for endpoint, columns in encoded]
+
+
+async def store_raw_event(
+    db: AsyncSession,
+    user_id: int,
+    endpoint: str,
+    payload: Any,
+    stats: Optional[dict[str, int]] = None,
+) -> int:
+    """Store one raw response (see ``store_raw_events``) and return its id."""
+    return (await store_raw_events(db, user_id, [(endpoint, payload)], stats))[0]
+
+
+# -------------------------------------------------------------------------
+# Reads
+# -------------------------------------------------------------------------
+
+
+async def load_payload(
+    event: GarminRawEvent,
+    r2: Optional[R2StorageService] = None,
+) -> dict[str, Any]:
+    """Return an event's payload from whichever tier holds it.
+
+    ``body`` must be loaded (``undefer``) for events still in the database.
+
+    Raises:
+        ValueError: If the event has no payload in any tier.
+        ClientError: If the cold-tier object cannot be fetched.
+    """
+    if event.payload is not None:
+        return event.payload
+    if event.body is not None:
+        return decode_body(event.body)
+    if event.r2_key:
+        r2 = r2 or get_r2_service()
+        body = b"".join(
+            [chunk async for chunk in r2.iter_object(event.r2_key, decompress=False)]
+        )
+        return decode_body(body)
+    raise ValueError(f"Raw event {event.id} has no stored payload")
+
+
+async def iter_raw_events(
+    user_id: Optional[int] = None,
+    endpoint: Optional[str] = None,
+    since: Optional[datetime] = None,
+    r2: Optional[R2StorageService] = None,
+    session_factory: async_sessionmaker[AsyncSession] = async_session_maker,
+    batch_size: int = 200,
+) -> AsyncIterator[tuple[GarminRawEvent, dict[str, Any]]]:
+    """Stream ``(event, payload)`` in id order, one short session per batch.
+
+    Args:
+        user_id: Only this user's events.
+        endpoint: Only this endpoint (a trailing ``/`` matches a prefix,
+            e.g. ``activity_details/``).
+        since: Only events fetched at or after this time.
+        r2: R2 service for cold-tier events.
+        session_factory: Session factory for batch queries.
+        batch_size: Events per query.
+    """
+    after_id = 0
+    while True:
+        query = (
+            select(GarminRawEvent)
+            .options(undefer(GarminRawEvent.body))
+            .where(GarminRawEvent.id > after_id)
+            .order_by(GarminRawEvent.id)
+            .limit(batch_size)
+        )
+        if user_id is not None:
+            query = query.where(GarminRawEvent.user_id == user_id)
+        if endpoint:
+            if endpoint.endswith("/"):
+                query = query.where(GarminRawEvent.endpoint.startswith(endpoint))
+            else:
+                query = query.where(GarminRawEvent.endpoint == endpoint)
+        if since is not None:
+            query = query.where(GarminRawEvent.fetched_at >= since)
+
+        async with session_factory() as db:
+            events = (await db.scalars(query)).all()
+        if not events:
+            return
+        for event in events:
+            yield event, await load_payload(event, r2)
+        after_id = events[-1].id
+
+
+# -------------------------------------------------------------------------
+# Maintenance
+# -------------------------------------------------------------------------
+
+
+def _cold_key(event: GarminRawEvent) -> str:
+    suffix = "zst" if detect_codec(event.body) == CODEC_ZSTD else "gz"
+    return f"{RAW_EVENT_PREFIX}/{event.user_id}/{event.fetched_at:%Y/%m}/{event.id}.json.{suffix}"
+
+
+async def _compact_batch(db: AsyncSession, batch_size: int) -> int:
+    """Move inline JSONB payloads into compressed bodies."""
+    events = (
+        await db.scalars(
+            select(GarminRawEvent)
+            .where(GarminRawEvent.payload.isnot(None))
+            .order_by(GarminRawEvent.id)
+            .limit(batch_size)
+        )
+    ).all()
+    for event in events:
+        for column, value in encode_event(event.payload).items():
+            setattr(event, column, value)
+        # SQL NULL rather than a JSON null, so the row leaves the inline set
+        event.payload = null()
+    await db.commit()
+    return len(events)
+
+
+async def _age_out_batch(
+    db: AsyncSession, r2: R2StorageService, cutoff: datetime, batch_size: int
+) -> int:
+    """Upload bodies older than ``cutoff`` to R2 and drop them from the row."""
+    events = (
+        await db.scalars(
+            select(GarminRawEvent)
+            .options(undefer(GarminRawEvent.body))
+            .where(
+                GarminRawEvent.body.isnot(None),
+                GarminRawEvent.r2_key.is_(None),
+                GarminRawEvent.fetched_at < cutoff,
+            )
+            .order_by(GarminRawEvent.id)
+            .limit(batch_size)
+        )
+    ).all()
+    for event in events:
+        key = _cold_key(event)
+        await r2.put_object_bytes(
+            key,
+            event.body,
+            CONTENT_TYPES[detect_codec(event.body)],
+            {
+                "endpoint": event.endpoint[:200],
+                "payload-hash": event.payload_hash or "",
+            },
+        )
+        event.r2_key = key
+        event.body = None
+    await db.commit()
+    return len(events)
+
+
+async def archive_raw_events(
+    r2: Optional[R2StorageService] = None,
+    session_factory: async_sessionmaker[AsyncSession] = async_session_maker,
+    batch_size: Optional[int] = None,
+    max_seconds: Optional[float] = None,
+) -> dict[str, Any]:
+    """Compress inline raw events and move old bodies to the cold tier.
+
+    Works in committed batches and stops after ``max_seconds``; the next
+    run continues where this one stopped.
+
+    Returns:
+        Archive statistics.
+    """
+    batch_size = batch_size or settings.raw_event_archive_batch_size
+    deadline = time.monotonic() + (
+        max_seconds or settings.raw_event_archive_max_seconds
+    )
+    stats = {"compacted": 0, "archived": 0}
+
+    async with session_factory() as db:
+        while time.monotonic() < deadline:
+            done = await _compact_batch(db, batch_size)
+            stats["compacted"] += done
+            if done < batch_size:
+                break
+
+        r2 = r2 or get_r2_service()
+        if settings.raw_event_cold_after_days > 0 and r2.is_available:
+            cutoff = datetime.now(timezone.utc) - timedelta(
+                days=settings.raw_event_cold_after_days
+            )
+            while time.monotonic() < deadline:
+                done = await _age_out_batch(db, r2, cutoff, batch_size)
+                stats["archived"] += done
+                if done < batch_size:
+                    break
+
+    logger.info(
+        f"Raw event archive: {stats['compacted']} compacted, {stats['archived']} moved to R2"
+    )
+    return stats
@@ -0,0 +1,244 @@
+"""Per-user R2 storage accounting.
+
+Usage is kept in ``storage_usage`` counters that are adjusted whenever an
+object is written, replaced or deleted, so ``GET /upload/stats`` is a
+single row read instead of listing the user's prefix (which costs one
+Class A operation per 1,000 keys and grows with the bucket).
+
+Each activity records what it contributed in ``storage_metadata``
+(``stored_size`` / ``original_size``), which makes adjustments idempotent:
+re-recording an object only applies the difference, and deleting it
+subtracts exactly what was added.
+
+``reconcile_storage_usage`` walks the bucket periodically (ARQ cron in the
+FIT worker) and overwrites the counters, correcting drift from failed
+writes, objects stored before accounting existed, or out-of-band changes.
+"""
+
+import logging
+import re
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import async_session_maker
+from app.models.activity import Activity
+from app.models.storage import StorageUsage
+from app.models.user import User
+from app.services.r2_storage import R2StorageService, get_r2_service
+
+logger = logging.getLogger(__name__)
+
+_OWNER_RE = re.compile(r"^users/(\d+)/")
+
+
+async def adjust_usage(
+    db: AsyncSession,
+    user_id: int,
+    objects: int = 0,
+    stored_bytes: int = 0,
+    original_bytes: int = 0,
+) -> None:
+    """Apply deltas to a user's counters (caller commits).
+
+    Uses an in-place ``col = col + delta`` update so concurrent writers never
+    lose each other's increments; the row is created on first use.
+    """
+    if not (objects or stored_bytes or original_bytes):
+        return
+
+    stmt = (
+        update(StorageUsage)
+        .where(StorageUsage.user_id == user_id)
+        .values(
+            object_count=StorageUsage.object_count + objects,
+            stored_bytes=StorageUsage.stored_bytes + stored_bytes,
+            original_bytes=StorageUsage.original_bytes + original_bytes,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    if result.rowcount:
+        return
+
+    try:
+        async with db.begin_nested():
+            db.add(
+                StorageUsage(
+                    user_id=user_id,
+                    object_count=max(0, objects),
+                    stored_bytes=max(0, stored_bytes),
+                    original_bytes=max(0, original_bytes),
+                )
+            )
+    except IntegrityError:
+        # Row was created concurrently; apply the delta to it instead
+        await db.execute(stmt)
+
+
+async def account_object(
+    db: AsyncSession,
+    activity: Activity,
+    stored_size: Optional[int] = None,
+    original_size: Optional[int] = None,
+) -> None:
+    """Record (or re-record) the activity's R2 object in its owner's counters.
+
+    Args:
+        db: Database session (caller commits).
+        activity: Activity owning the object.
+        stored_size: Size of the object as stored; None keeps the recorded size.
+        original_size: Uncompressed size; None keeps the recorded size
+            (or uses ``stored_size`` for a new object).
+    """
+    metadata = dict(activity.storage_metadata or {})
+    recorded = "stored_size" in metadata
+    old_stored = metadata.get("stored_size", 0)
+    old_original = metadata.get("original_size", 0)
+
+    if stored_size is None:
+        stored_size = old_stored if recorded else original_size
+    if original_size is None:
+        original_size = old_original if recorded else stored_size
+    if stored_size is None:
+        return
+
+    await adjust_usage(
+        db,
+        activity.user_id,
+        objects=0 if recorded else 1,
+        stored_bytes=stored_size - old_stored,
+        original_bytes=original_size - old_original,
+    )
+    metadata.update(stored_size=stored_size, original_size=original_size)
+    # Reassign (not mutate) so the JSON column change is detected
+    activity.storage_metadata = metadata
+
+
+async def release_object(db: AsyncSession, activity: Activity) -> None:
+    """Subtract the activity's recorded object from its owner's counters (caller commits)."""
+    metadata = dict(activity.storage_metadata or {})
+    if "stored_size" not in metadata:
+        return  # Never accounted; the next reconciliation fixes the totals
+    await adjust_usage(
+        db,
+        activity.user_id,
+        objects=-1,
+        stored_bytes=-metadata.pop("stored_size"),
+        original_bytes=-metadata.pop("original_size", 0),
+    )
+    activity.storage_metadata = metadata
+
+
+async def get_usage(db: AsyncSession, user_id: int) -> Optional[StorageUsage]:
+    """Return the user's counters (None until their first object or reconciliation)."""
+    return await db.scalar(select(StorageUsage).where(StorageUsage.user_id == user_id))
+
+
+def _owner(key: str) -> Optional[int]:
+    match = _OWNER_RE.match(key)
+    return int(match.group(1)) if match else None
+
+
+async def reconcile_storage_usage(
+    r2: Optional[R2StorageService] = None,
+    session_factory: async_sessionmaker[AsyncSession] = async_session_maker,
+) -> dict[str, Any]:
+    """Rebuild every user's counters from a full walk of the bucket.
+
+    Stored sizes come from the listing; original sizes come from the owning
+    activities (objects without one count as uncompressed). Activities whose
+    recorded ``stored_size`` is missing or stale are backfilled so later
+    deletes subtract the right amount.
+
+    Adjustments made while the walk is running can be overwritten; the
+    next run corrects them.
+
+    Returns:
+        Reconciliation statistics.
+    """
+    r2 = r2 or get_r2_service()
+    sizes = await r2.object_sizes("users/")
+    now = datetime.now(timezone.utc)
+    stats = {"objects": len(sizes), "users": 0, "backfilled": 0}
+
+    async with session_factory() as db:
+        originals: dict[str, int] = {}
+        rows = await db.execute(
+            select(
+                Activity.id,
+                Activity.r2_key,
+                Activity.fit_file_size,
+                Activity.storage_metadata,
+            ).where(Activity.r2_key.isnot(None))
+        )
+        for activity_id, key, fit_file_size, metadata in rows.all():
+            stored = sizes.get(key)
+            if stored is None:
+                continue  # Object is gone; nothing to account
+            metadata = metadata or {}
+            original = metadata.get("original_size") or fit_file_size or stored
+            originals[key] = original
+            if (
+                metadata.get("stored_size") != stored
+                or metadata.get("original_size") != original
+            ):
+                await db.execute(
+                    update(Activity)
+                    .where(Activity.id == activity_id)
+                    .values(
+                        storage_metadata={
+                            **metadata,
+                            "stored_size": stored,
+                            "original_size": original,
+                        }
+                    )
+                )
+                stats["backfilled"] += 1
+
+        totals: dict[int, list[int]] = {}
+        for key, stored in sizes.items():
+            user_id = _owner(key)
+            if user_id is None:
+                continue
+            entry = totals.setdefault(user_id, [0, 0, 0])
+            entry[0] += 1
+            entry[1] += stored
+            entry[2] += originals.get(key, stored)
+
+        # Prefixes of deleted users have no row to attach counters to
+        existing_users = (
+            set(
+                (
+                    await db.scalars(select(User.id).where(User.id.in_(list(totals))))
+                ).all()
+            )
+            if totals
+            else set()
+        )
+        usage_rows = {
+            row.user_id: row for row in (await db.scalars(select(StorageUsage))).all()
+        }
+
+        for user_id in existing_users | set(usage_rows):
+            count, stored, original = totals.get(user_id, (0, 0, 0))
+            row = usage_rows.get(user_id)
+            if row is None:
+                row = StorageUsage(user_id=user_id)
+                db.add(row)
+            row.object_count = count
+            row.stored_bytes = stored
+            row.original_bytes = original
+            row.reconciled_at = now
+            stats["users"] += 1
+
+        await db.commit()
+
+    logger.info(
+        f"Storage usage reconciled: {stats['objects']} objects, {stats['users']} users, "
+        f"{stats['backfilled']} activities backfilled"
+    )
+    return stats
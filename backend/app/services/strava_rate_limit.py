@@ -0,0 +1,259 @@
+"""Shared Strava API rate limiter.
+
+Strava enforces two application-wide limits: requests per 15 minutes
+(windows start at :00/:15/:30/:45) and requests per day (reset at midnight
+UTC). Every response reports the current usage and limits in the
+``X-RateLimit-Usage`` / ``X-RateLimit-Limit`` headers as ``"<15min>,<daily>"``.
+
+``StravaRateLimiter`` keeps a token budget per window in Redis so all worker
+processes draw from the same allowance:
+
+- ``acquire()`` atomically takes a token from both windows, or reports how
+  long until the exhausted window resets.
+- ``observe()`` folds the response headers back in, so usage by other
+  clients of the same application (API requests, other deployments) and the
+  real limits granted by Strava are respected.
+
+Without Redis the budget is tracked in process memory (single-worker
+deployments).
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Mapping
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from redis.exceptions import RedisError
+
+from app.core.config import get_settings
+from app.core.session import get_redis
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+SHORT_WINDOW_SECONDS = 15 * 60
+_KEY_PREFIX = "strava:ratelimit"
+
+# KEYS: short counter, daily counter, limits hash
+# ARGV: default short limit, default daily limit, reserve, short ttl, daily ttl
+# Returns 0 on success, 1 if the 15-minute window is exhausted, 2 if the daily one is.
+_ACQUIRE_SCRIPT = """
+local short_limit = tonumber(redis.call('HGET', KEYS[3], 'short') or ARGV[1]) - tonumber(ARGV[3])
+local daily_limit = tonumber(redis.call('HGET', KEYS[3], 'daily') or ARGV[2]) - tonumber(ARGV[3])
+if tonumber(redis.call('GET', KEYS[2]) or '0') >= daily_limit then return 2 end
+if tonumber(redis.call('GET', KEYS[1]) or '0') >= short_limit then return 1 end
+redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[5])
+return 0
+"""
+
+# KEYS: short counter, daily counter, limits hash
+# ARGV: short usage, daily usage, short limit, daily limit, short ttl, daily ttl
+_OBSERVE_SCRIPT = """
+local function raise_to(key, value, ttl)
+  if tonumber(value) > tonumber(redis.call('GET', key) or '0') then
+    redis.call('SET', key, value, 'EX', ttl)
+  end
+end
+raise_to(KEYS[1], ARGV[1], ARGV[5])
+raise_to(KEYS[2], ARGV[2], ARGV[6])
+redis.call('HSET', KEYS[3], 'short', ARGV[3], 'daily', ARGV[4])
+return 0
+"""
+
+
+class StravaRateLimited(Exception):
+    """Raised when the shared Strava budget is exhausted for longer than a caller will wait."""
+
+    def __init__(self, retry_after: float, scope: str) -> None:
+        super().__init__(
+            f"Strava {scope} rate limit reached; retry in {retry_after:.0f}s"
+        )
+        self.retry_after = retry_after
+        self.scope = scope
+
+
+def _parse_pair(value: Optional[str]) -> Optional[tuple[int, int]]:
+    try:
+        short, daily = (int(part.strip()) for part in value.split(",")[:2])
+        return short, daily
+    except (AttributeError, ValueError):
+        return None
+
+
+def _windows(now: datetime) -> tuple[int, str, int, int]:
+    """(short window start, day, seconds to short reset, seconds to daily reset)."""
+    epoch = int(now.timestamp())
+    short_start = epoch - epoch % SHORT_WINDOW_SECONDS
+    midnight = (now + timedelta(days=1)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    return (
+        short_start,
+        now.strftime("%Y%m%d"),
+        short_start + SHORT_WINDOW_SECONDS - epoch,
+        int((midnight - now).total_seconds()) + 1,
+    )
+
+
+class StravaRateLimiter:
+    """Cross-process token budget for Strava API calls."""
+
+    def __init__(self, redis_client: Any = None, use_redis: bool = True) -> None:
+        """Initialize the limiter.
+
+        Args:
+            redis_client: Redis client (default: the shared client from ``get_redis``).
+            use_redis: False forces the in-process fallback (tests, scripts).
+        """
+        self._redis = redis_client
+        self._use_redis = use_redis
+        self._scripts: dict[str, Any] = {}
+        # In-process fallback state
+        self._limits = (
+            settings.strava_rate_limit_15min,
+            settings.strava_rate_limit_daily,
+        )
+        self._local: dict[str, int] = {}
+        self._lock = asyncio.Lock()
+
+    async def _client(self) -> Any:
+        if not self._use_redis:
+            return None
+        if self._redis is None:
+            self._redis = await get_redis()
+        return self._redis
+
+    def _script(self, client: Any, name: str, source: str) -> Any:
+        if name not in self._scripts:
+            self._scripts[name] = client.register_script(source)
+        return self._scripts[name]
+
+    @staticmethod
+    def _keys(short_start: int, day: str) -> list[str]:
+        return [
+            f"{_KEY_PREFIX}:15m:{short_start}",
+            f"{_KEY_PREFIX}:day:{day}",
+            f"{_KEY_PREFIX}:limits",
+        ]
+
+    async def try_acquire(self) -> float:
+        """Take one request token.
+
+        Returns:
+            0 if the request may proceed, otherwise seconds until a token frees up.
+        """
+        short_start, day, short_ttl, daily_ttl = _windows(datetime.now(timezone.utc))
+        keys = self._keys(short_start, day)
+        reserve = settings.strava_rate_limit_reserve
+
+        client = await self._client()
+        if client is not None:
+            try:
+                outcome = await self._script(client, "acquire", _ACQUIRE_SCRIPT)(
+                    keys=keys,
+                    args=[*self._limits, reserve, short_ttl, daily_ttl],
+                )
+                return {0: 0.0, 1: float(short_ttl), 2: float(daily_ttl)}[int(outcome)]
+            except RedisError as e:
+                logger.warning(
+                    f"Strava rate limiter falling back to process memory: {e}"
+                )
+
+        async with self._lock:
+            self._prune(keys)
+            if self._local.get(keys[1], 0) >= self._limits[1] - reserve:
+                return float(daily_ttl)
+            if self._local.get(keys[0], 0) >= self._limits[0] - reserve:
+                return float(short_ttl)
+            self._local[keys[0]] = self._local.get(keys[0], 0) + 1
+            self._local[keys[1]] = self._local.get(keys[1], 0) + 1
+            return 0.0
+
+    async def acquire(self, max_wait: Optional[float] = None) -> None:
+        """Wait for a request token.
+
+        Args:
+            max_wait: Longest the caller is willing to sleep
+                (default STRAVA_RATE_LIMIT_MAX_WAIT_SECONDS).
+
+        Raises:
+            StravaRateLimited: If the budget frees up later than ``max_wait``.
+        """
+        max_wait = (
+            settings.strava_rate_limit_max_wait_seconds
+            if max_wait is None
+            else max_wait
+        )
+        deadline = time.monotonic() + max_wait
+        while True:
+            wait = await self.try_acquire()
+            if wait <= 0:
+                return
+            if time.monotonic() + wait > deadline:
+                scope = "15-minute" if wait <= SHORT_WINDOW_SECONDS else "daily"
+                raise StravaRateLimited(wait, scope)
+            await asyncio.sleep(wait)
+
+    async def observe(self, headers: Mapping[str, str]) -> None:
+        """Fold Strava's reported usage and limits into the shared budget."""
+        usage = _parse_pair(headers.get("X-RateLimit-Usage"))
+        limits = _parse_pair(headers.get("X-RateLimit-Limit"))
+        if usage is None or limits is None:
+            return
+        self._limits = limits
+
+        short_start, day, short_ttl, daily_ttl = _windows(datetime.now(timezone.utc))
+        keys = self._keys(short_start, day)
+
+        client = await self._client()
+        if client is not None:
+            try:
+                await self._script(client, "observe", _OBSERVE_SCRIPT)(
+                    keys=keys,
+                    args=[*usage, *limits, short_ttl, daily_ttl],
+                )
+                return
+            except RedisError as e:
+                logger.warning(f"Failed to record Strava rate limit usage: {e}")
+
+        async with self._lock:
+            self._prune(keys)
+            for key, used in zip(keys, usage):
+                self._local[key] = max(self._local.get(key, 0), used)
+
+    async def exhaust(self) -> None:
+        """Mark the current 15-minute window as used up (429 without usage headers)."""
+        short, daily = self._limits
+        await self.observe(
+            {"X-RateLimit-Usage": f"{short},0", "X-RateLimit-Limit": f"{short},{daily}"}
+        )
+
+    def limited_error(self, headers: Mapping[str, str]) -> StravaRateLimited:
+        """Describe which window a 429 response exhausted."""
+        _, _, short_ttl, daily_ttl = _windows(datetime.now(timezone.utc))
+        usage = _parse_pair(headers.get("X-RateLimit-Usage"))
+        limits = _parse_pair(headers.get("X-RateLimit-Limit"))
+        if usage and limits and usage[1] >= limits[1]:
+            return StravaRateLimited(float(daily_ttl), "daily")
+        return StravaRateLimited(float(short_ttl), "15-minute")
+
+    def _prune(self, current_keys: list[str]) -> None:
+        for key in list(self._local):
+            if key not in current_keys:
+                del self._local[key]
+
+
+_limiter: Optional[StravaRateLimiter] = None
+
+
+def get_strava_rate_limiter() -> StravaRateLimiter:
+    """Get singleton Strava rate limiter instance."""
+    global _limiter
+    if _limiter is None:
+        _limiter = StravaRateLimiter()
+    return _limiter
@@ -2,21 +2,27 @@
 
 This module provides the core logic for uploading FIT files to Strava,
 handling retries, polling for upload completion, and tracking upload status.
+
+All Strava API calls share one pooled HTTP client and draw from the shared
+rate limit budget (``app.services.strava_rate_limit``), so uploads can run
+concurrently across worker processes without tripping Strava's limits.
 """
 
 import asyncio
 import logging
 import time
-from datetime import datetime, timezone
-from pathlib import Path
-from typing import Optional
+import uuid
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
 
 import httpx
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, literal, or_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.dialects.postgresql import insert
 
 from app.core.config import get_settings
+from app.core.queue import enqueue_jobs_bulk, get_arq_pool
 from app.models.activity import Activity
 from app.models.strava import (
     StravaSession,
@@ -26,22 +32,167 @@ from app.models.strava import (
     StravaUploadStatus,
 )
 from app.observability import get_metrics_backend
+from app.services.fit_blob_store import FitStream, get_fit_blob_store
+from app.services.strava_rate_limit import (
+    StravaRateLimited,
+    StravaRateLimiter,
+    get_strava_rate_limiter,
+)
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+STRAVA_UPLOAD_TASK_NAME = "process_strava_upload"
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_strava_http_client() -> httpx.AsyncClient:
+    """Get the shared Strava HTTP client (keep-alive connection pool)."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.strava_http_max_connections,
+                max_keepalive_connections=settings.strava_http_max_connections,
+            ),
+            timeout=settings.strava_http_timeout_short_seconds,
+        )
+    return _http_client
+
+
+async def close_strava_http_client() -> None:
+    """Close the shared Strava HTTP client (worker shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+async def enqueue_upload_jobs(job_ids: list[int], pool: Optional[Any] = None) -> int:
+    """Push upload jobs to the ARQ queue with overlapping round-trips.
+
+    Best effort: without Redis the jobs stay queued in the database and the
+    worker's pending-uploads sweep picks them up.
+
+    Args:
+        job_ids: StravaUploadJob ids.
+        pool: ArqRedis pool (default: the shared pool).
+
+    Returns:
+        Number of jobs pushed.
+    """
+    if not job_ids:
+        return 0
+    try:
+        pool = pool or await get_arq_pool()
+        if pool is None:
+            return 0
+        return await enqueue_jobs_bulk(
+            pool,
+            STRAVA_UPLOAD_TASK_NAME,
+            ((f"strava-upload:{job_id}", {"job_id": job_id}) for job_id in job_ids),
+            queue_name=settings.strava_upload_queue_name,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to push {len(job_ids)} Strava upload jobs to ARQ: {e}")
+        return 0
+
+
+def _multipart_body(
+    fields: dict[str, str],
+    file_field: str,
+    filename: str,
+    fit_stream: FitStream,
+) -> tuple[str, Optional[int], AsyncIterator[bytes]]:
+    """Build a streaming multipart/form-data body around a FIT chunk stream.
+
+    ``fit_stream.size`` must be set: it fixes the Content-Length, and a
+    stream that yields a different number of bytes aborts the body.
+
+    Returns:
+        Tuple of (content type, content length, body chunks).
+
+    Raises:
+        StravaUploadError: While streaming, if the FIT size does not match.
+    """
+    boundary = uuid.uuid4().hex
+    head = b"".join(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        for name, value in fields.items()
+    ) + (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; '
+        f'filename="{filename}"\r\nContent-Type: application/octet-stream\r\n\r\n'
+    ).encode()
+    tail = f"\r\n--{boundary}--\r\n".encode()
+
+    async def _chunks() -> AsyncIterator[bytes]:
+        yield head
+        sent = 0
+        async for chunk in fit_stream.chunks:
+            sent += len(chunk)
+            yield chunk
+        if sent != fit_stream.size:
+            raise StravaUploadError(f"FIT stream was {sent} bytes, expected {fit_stream.size}")
+        yield tail
+
+    length = len(head) + fit_stream.size + len(tail)
+    return f"multipart/form-data; boundary={boundary}", length, _chunks()
+
+
+async def _sized(fit_stream: FitStream, activity: Activity) -> FitStream:
+    """Give a stream of unknown size (R2 tier) a size for Content-Length.
+
+    Uses the recorded uncompressed size; without one the file is read into
+    memory (FIT files are small) so the upload is never sent chunked.
+    """
+    if fit_stream.size is not None:
+        return fit_stream
+    known = activity.fit_file_size or (activity.storage_metadata or {}).get("original_size")
+    if known:
+        return FitStream(fit_stream.chunks, int(known))
+    data = b"".join([chunk async for chunk in fit_stream.chunks])
+
+    async def _data() -> AsyncIterator[bytes]:
+        yield data
+
+    return FitStream(_data(), len(data))
+
+
+def _stale_upload_clause(now: datetime) -> Any:
+    """Match jobs left in UPLOADING by a worker that died or was cancelled."""
+    return and_(
+        StravaUploadJob.status == StravaUploadStatus.UPLOADING.value,
+        StravaUploadJob.started_at
+        < now - timedelta(seconds=settings.strava_upload_stale_seconds),
+    )
+
+
+class StravaUploadError(Exception):
+    """Strava rejected an upload while processing it (e.g. duplicate or corrupt file)."""
+
 
 class StravaUploadService:
     """Service for uploading activities to Strava."""
 
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: AsyncSession,
+        http: Optional[httpx.AsyncClient] = None,
+        limiter: Optional[StravaRateLimiter] = None,
+    ):
         """Initialize the upload service.
 
         Args:
             db: Database session for persistence operations.
+            http: HTTP client (default: the shared Strava client).
+            limiter: Rate limiter (default: the shared Strava limiter).
         """
         self.db = db
         self.metrics = get_metrics_backend()
+        self.http = http or get_strava_http_client()
+        self.limiter = limiter or get_strava_rate_limiter()
+        self.deferred = False  # Set when the last job was pushed back by the rate limit
 
     async def enqueue_activity(
         self,
@@ -123,6 +274,11 @@ class StravaUploadService:
     ) -> int:
         """Queue all pending activities for upload.
 
+        Runs as one ``INSERT ... SELECT ... ON CONFLICT DO NOTHING RETURNING``
+        statement (already-queued activities hit the unique activity_id and
+        are skipped), then pushes the new jobs to the worker queue with
+        their Redis round-trips overlapped.
+
         Args:
             user_id: User ID.
             since: Only queue activities after this time (optional).
@@ -130,35 +286,50 @@ class StravaUploadService:
         Returns:
             Number of activities queued.
         """
-        # Find activities with FIT files that haven't been uploaded
-        query = (
-            select(Activity.id)
+        now = datetime.now(timezone.utc)
+
+        # Activities with FIT files that haven't been uploaded
+        eligible = (
+            select(
+                Activity.user_id,
+                Activity.id,
+                literal(StravaUploadStatus.QUEUED.value),
+                literal(0),
+                literal(now),
+            )
             .outerjoin(StravaActivityMap)
-            .outerjoin(StravaUploadJob)
             .where(
                 and_(
                     Activity.user_id == user_id,
                     Activity.has_fit_file == True,
                     StravaActivityMap.id == None,  # Not already uploaded
-                    StravaUploadJob.id == None,  # Not already queued
                 )
             )
         )
 
         if since:
-            query = query.where(Activity.start_time >= since)
+            eligible = eligible.where(Activity.start_time >= since)
 
-        result = await self.db.execute(query)
-        activity_ids = [row[0] for row in result.fetchall()]
+        stmt = (
+            insert(StravaUploadJob)
+            .from_select(
+                ["user_id", "activity_id", "status", "attempts", "next_retry_at"],
+                eligible,
+            )
+            .on_conflict_do_nothing(index_elements=["activity_id"])
+            .returning(StravaUploadJob.id)
+        )
+        result = await self.db.execute(stmt)
+        job_ids = list(result.scalars().all())
+        await self.db.commit()
 
-        queued_count = 0
-        for activity_id in activity_ids:
-            job = await self.enqueue_activity(user_id, activity_id)
-            if job:
-                queued_count += 1
+        pushed = await enqueue_upload_jobs(job_ids)
 
-        logger.info(f"Queued {queued_count} activities for Strava upload (user {user_id})")
-        return queued_count
+        logger.info(
+            f"Queued {len(job_ids)} activities for Strava upload (user {user_id}, "
+            f"{pushed} pushed to worker)"
+        )
+        return len(job_ids)
 
     async def process_job(self, job: StravaUploadJob) -> bool:
         """Process a single upload job.
@@ -169,13 +340,10 @@ class StravaUploadService:
         Returns:
             True if upload succeeded, False otherwise.
         """
-        now = datetime.now(timezone.utc)
-
-        # Mark as uploading
-        job.status = StravaUploadStatus.UPLOADING.value
-        job.started_at = now
-        job.attempts += 1
-        await self.db.commit()
+        self.deferred = False
+        if not await self._claim_job(job):
+            logger.debug(f"Upload job {job.id} already claimed elsewhere")
+            return False
 
         try:
             # Get activity and session
@@ -196,16 +364,18 @@ class StravaUploadService:
                 await self._fail_job(job, "Failed to refresh Strava token")
                 return False
 
-            # Upload FIT file
-            upload_id = await self._upload_fit(activity, session.access_token)
+            # Upload FIT file (a retry after a polling timeout only polls again)
+            upload_id = job.strava_upload_id
             if not upload_id:
-                await self._schedule_retry(job, "Upload failed")
-                return False
+                upload_id = await self._upload_fit(activity, session.access_token)
+                if not upload_id:
+                    await self._schedule_retry(job, "Upload failed")
+                    return False
 
-            # Store upload_id and poll for completion
-            job.strava_upload_id = upload_id
-            job.status = StravaUploadStatus.POLLING.value
-            await self.db.commit()
+                # Store upload_id and poll for completion
+                job.strava_upload_id = upload_id
+                job.status = StravaUploadStatus.POLLING.value
+                await self.db.commit()
 
             # Poll for activity ID
             strava_activity_id = await self._poll_upload_status(
@@ -219,6 +389,16 @@ class StravaUploadService:
                 await self._schedule_retry(job, "Upload processing not complete")
                 return False
 
+        except StravaRateLimited as e:
+            await self._defer_job(job, e)
+            return False
+
+        except StravaUploadError as e:
+            # Upload again on retry instead of polling the rejected upload
+            job.strava_upload_id = None
+            await self._schedule_retry(job, str(e))
+            return False
+
         except httpx.HTTPStatusError as e:
             error_msg = f"HTTP {e.response.status_code}: {e.response.text[:200]}"
             if e.response.status_code == 429:
@@ -235,6 +415,76 @@ class StravaUploadService:
             await self._schedule_retry(job, str(e))
             return False
 
+    async def _claim_job(self, job: StravaUploadJob) -> bool:
+        """Atomically mark a job as uploading (one worker per job).
+
+        A job stuck in UPLOADING for longer than STRAVA_UPLOAD_STALE_SECONDS
+        is claimed again.
+        """
+        now = datetime.now(timezone.utc)
+        result = await self.db.execute(
+            update(StravaUploadJob)
+            .where(
+                StravaUploadJob.id == job.id,
+                or_(
+                    StravaUploadJob.status.in_([
+                        StravaUploadStatus.QUEUED.value,
+                        StravaUploadStatus.POLLING.value,
+                    ]),
+                    _stale_upload_clause(now),
+                ),
+            )
+            .values(
+                status=StravaUploadStatus.UPLOADING.value,
+                started_at=now,
+                attempts=StravaUploadJob.attempts + 1,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+        if not result.rowcount:
+            return False
+        await self.db.refresh(job)
+        return True
+
+    async def _api_request(
+        self,
+        method: str,
+        path: str,
+        endpoint: str,
+        budget_acquired: bool = False,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Call the Strava API within the shared rate limit budget.
+
+        ``budget_acquired`` means the caller already took the request's
+        token (e.g. before opening a FIT stream).
+
+        Raises:
+            StravaRateLimited: If no budget frees up within the allowed wait
+                or Strava answered 429.
+        """
+        if not budget_acquired:
+            await self.limiter.acquire()
+        start_time = time.perf_counter()
+        status_code = 500
+        try:
+            response = await self.http.request(
+                method, f"{settings.strava_api_base_url}{path}", **kwargs
+            )
+            status_code = response.status_code
+        finally:
+            duration_ms = (time.perf_counter() - start_time) * 1000
+            self.metrics.observe_external_api("strava", endpoint, status_code, duration_ms)
+
+        await self.limiter.observe(response.headers)
+        if response.status_code == 429:
+            # Someone else used the budget up; wait for the window to reset
+            if "X-RateLimit-Usage" not in response.headers:
+                await self.limiter.exhaust()
+            raise self.limiter.limited_error(response.headers)
+        return response
+
     async def _get_activity(self, activity_id: int) -> Optional[Activity]:
         """Get activity by ID."""
         result = await self.db.execute(
@@ -260,19 +510,18 @@ class StravaUploadService:
             return None
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://www.strava.com/oauth/token",
-                    data={
-                        "client_id": settings.strava_client_id,
-                        "client_secret": settings.strava_client_secret,
-                        "refresh_token": session.refresh_token,
-                        "grant_type": "refresh_token",
-                    },
-                    timeout=settings.strava_http_timeout_short_seconds,
-                )
-                response.raise_for_status()
-                tokens = response.json()
+            response = await self.http.post(
+                f"{settings.strava_oauth_base_url}/token",
+                data={
+                    "client_id": settings.strava_client_id,
+                    "client_secret": settings.strava_client_secret,
+                    "refresh_token": session.refresh_token,
+                    "grant_type": "refresh_token",
+                },
+                timeout=settings.strava_http_timeout_short_seconds,
+            )
+            response.raise_for_status()
+            tokens = response.json()
 
             session.access_token = tokens["access_token"]
             session.refresh_token = tokens["refresh_token"]
@@ -294,86 +543,98 @@ class StravaUploadService:
         Returns:
             Upload ID if successful, None otherwise.
         """
-        if not activity.fit_file_path:
-            return None
-
-        fit_path = Path(activity.fit_file_path)
-        if not fit_path.exists():
-            logger.error(f"FIT file not found: {fit_path}")
+        # Wait for rate limit budget before opening the stream, so an R2 body
+        # is not held open while waiting
+        await self.limiter.acquire()
+
+        # Streamed from the fastest tier (cache, disk, R2, DB) into the request body
+        fit_stream = await get_fit_blob_store().stream(self.db, activity)
+        if fit_stream is None:
+            logger.error(f"FIT file not found for activity {activity.id}")
             return None
 
-        start_time = time.perf_counter()
-        status_code = 500
-
+        fields = {
+            "data_type": "fit",
+            "name": activity.name or f"Run {activity.start_time.strftime('%Y-%m-%d')}",
+            "activity_type": "run",
+        }
         try:
-            async with httpx.AsyncClient() as client:
-                with fit_path.open("rb") as f:
-                    files = {"file": (fit_path.name, f, "application/octet-stream")}
-                    data = {
-                        "data_type": "fit",
-                        "name": activity.name or f"Run {activity.start_time.strftime('%Y-%m-%d')}",
-                        "activity_type": "run",
-                    }
-                    response = await client.post(
-                        "https://www.strava.com/api/v3/uploads",
-                        headers={"Authorization": f"Bearer {access_token}"},
-                        files=files,
-                        data=data,
-                        timeout=settings.strava_http_timeout_seconds,
-                    )
-                    status_code = response.status_code
-                    response.raise_for_status()
-                    result = response.json()
-
-            return result.get("id")
-
+            fit_stream = await _sized(fit_stream, activity)
+            content_type, content_length, body = _multipart_body(
+                fields, "file", f"activity_{activity.garmin_id}.fit", fit_stream
+            )
+            headers = {
+                "Authorization": f"Bearer {access_token}",
+                "Content-Type": content_type,
+                "Content-Length": str(content_length),
+            }
+            response = await self._api_request(
+                "POST",
+                "/uploads",
+                "upload",
+                budget_acquired=True,
+                headers=headers,
+                content=body,
+                timeout=settings.strava_http_timeout_seconds,
+            )
         finally:
-            duration_ms = (time.perf_counter() - start_time) * 1000
-            self.metrics.observe_external_api("strava", "upload", status_code, duration_ms)
+            # Release the file handle / R2 body if the request never consumed it
+            await fit_stream.chunks.aclose()
+        response.raise_for_status()
+        return response.json().get("id")
 
     async def _poll_upload_status(
         self,
         upload_id: int,
         access_token: str,
-        max_attempts: int = 5,
-        delay_seconds: int = 3,
+        max_attempts: Optional[int] = None,
     ) -> Optional[int]:
-        """Poll Strava for upload completion.
+        """Poll Strava for upload completion with exponential backoff.
+
+        Strava usually processes a file within a few seconds, so the first
+        polls are quick; later ones back off (up to
+        STRAVA_UPLOAD_POLL_MAX_SECONDS) to save rate limit budget.
 
         Args:
             upload_id: Strava upload ID.
             access_token: Valid access token.
-            max_attempts: Maximum polling attempts.
-            delay_seconds: Delay between attempts.
+            max_attempts: Maximum polling attempts (default STRAVA_UPLOAD_POLL_ATTEMPTS).
 
         Returns:
-            Strava activity ID if complete, None otherwise.
+            Strava activity ID if complete, None if still processing.
+
+        Raises:
+            StravaUploadError: If Strava reports the upload failed.
+            StravaRateLimited: If the rate limit budget runs out while polling.
         """
-        for attempt in range(max_attempts):
-            if attempt > 0:
-                await asyncio.sleep(delay_seconds)
+        delay = settings.strava_upload_poll_initial_seconds
+        for attempt in range(max_attempts or settings.strava_upload_poll_attempts):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.strava_upload_poll_max_seconds)
 
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(
-                        f"https://www.strava.com/api/v3/uploads/{upload_id}",
-                        headers={"Authorization": f"Bearer {access_token}"},
-                        timeout=settings.strava_http_timeout_short_seconds,
-                    )
-                    if response.status_code == 200:
-                        result = response.json()
-                        activity_id = result.get("activity_id")
-                        if activity_id:
-                            return activity_id
-
-                        # Check for error
-                        error = result.get("error")
-                        if error:
-                            logger.warning(f"Strava upload error: {error}")
-                            return None
-
-            except Exception as e:
+                response = await self._api_request(
+                    "GET",
+                    f"/uploads/{upload_id}",
+                    "upload_status",
+                    headers={"Authorization": f"Bearer {access_token}"},
+                    timeout=settings.strava_http_timeout_short_seconds,
+                )
+            except httpx.HTTPError as e:
                 logger.warning(f"Polling attempt {attempt + 1} failed: {e}")
+                continue
+
+            if response.status_code != 200:
+                continue
+            result = response.json()
+            activity_id = result.get("activity_id")
+            if activity_id:
+                return activity_id
+
+            error = result.get("error")
+            if error:
+                logger.warning(f"Strava upload error: {error}")
+                raise StravaUploadError(error)
 
         return None
 
@@ -440,7 +701,6 @@ class StravaUploadService:
         if rate_limited:
             delay_seconds *= 2
 
-        from datetime import timedelta
         job.next_retry_at = now + timedelta(seconds=delay_seconds)
         job.status = StravaUploadStatus.QUEUED.value
 
@@ -450,6 +710,15 @@ class StravaUploadService:
             f"next_retry={job.next_retry_at}"
         )
 
+    async def _defer_job(self, job: StravaUploadJob, limited: StravaRateLimited) -> None:
+        """Requeue a job until the rate limit window resets (not counted as an attempt)."""
+        job.status = StravaUploadStatus.QUEUED.value
+        job.attempts = max(0, job.attempts - 1)
+        job.next_retry_at = datetime.now(timezone.utc) + timedelta(seconds=limited.retry_after)
+        await self.db.commit()
+        self.deferred = True
+        logger.info(f"Strava upload deferred: job={job.id}, {limited}")
+
     async def _update_sync_state(self, user_id: int, success: bool) -> None:
         """Update Strava sync state."""
         now = datetime.now(timezone.utc)
@@ -469,6 +738,34 @@ class StravaUploadService:
         )
         await self.db.execute(stmt)
 
+    async def get_pending_job_ids(self, limit: int = 10) -> list[int]:
+        """Get ids of pending jobs ready for processing (oldest due first).
+
+        Includes stale UPLOADING jobs whose worker never finished them.
+
+        Args:
+            limit: Maximum number of ids to return.
+
+        Returns:
+            List of job ids.
+        """
+        now = datetime.now(timezone.utc)
+        result = await self.db.execute(
+            select(StravaUploadJob.id)
+            .where(
+                or_(
+                    and_(
+                        StravaUploadJob.status == StravaUploadStatus.QUEUED.value,
+                        StravaUploadJob.next_retry_at <= now,
+                    ),
+                    _stale_upload_clause(now),
+                )
+            )
+            .order_by(StravaUploadJob.next_retry_at)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
     async def get_pending_jobs(self, limit: int = 10) -> list[StravaUploadJob]:
         """Get pending jobs ready for processing.
 
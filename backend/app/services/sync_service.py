@@ -11,7 +11,7 @@ from datetime import datetime, timedelta, date, timezone
 from pathlib import Path
 from typing import Any, Optional, Callable
 
-from sqlalchemy import select, and_
+from sqlalchemy import insert as sa_insert, select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.dialects.postgresql import insert
 
@@ -19,19 +19,26 @@ from app.models import (
     User,
     GarminSession,
     GarminSyncState,
-    GarminRawEvent,
     GarminRawFile,
     Activity,
-    Sleep,
-    HRRecord,
     BodyComposition,
 )
-from app.models.health import HealthMetric, FitnessMetricDaily
+from app.models.health import FitnessMetricDaily
 from app.models.activity import ActivitySample, ActivityLap, ActivityMetric
 from app.models.gear import Gear, ActivityGear, GearType, GearStatus
 from app.adapters.garmin_adapter import GarminConnectAdapter
+from app.adapters.garmin_pool import get_garmin_pool
 from app.core.config import get_settings
 from app.observability import get_metrics_backend
+from app.services.batch_upsert import (
+    BufferedUpsertWriter,
+    HEALTH_METRIC_UPSERT,
+    HR_RECORD_UPSERT,
+    SLEEP_UPSERT,
+)
+from app.services.fit_blob_store import get_fit_blob_store
+from app.services.raw_archive import store_raw_event
+from app.services.sync_trace import SyncTrace
 
 settings = get_settings()
 
@@ -41,6 +48,18 @@ logger = logging.getLogger(__name__)
 GARMIN_API_TIMEOUT = 60
 
 
+def cadence_backoff(unchanged_runs: int) -> Optional[timedelta]:
+    """How long incremental syncs skip an endpoint after unchanged runs.
+
+    Nothing after a run that stored new data; then GARMIN_CADENCE_BASE_MINUTES,
+    doubling per further unchanged run up to GARMIN_CADENCE_MAX_MINUTES.
+    """
+    if unchanged_runs <= 0 or not settings.garmin_adaptive_cadence:
+        return None
+    minutes = settings.garmin_cadence_base_minutes * 2 ** min(unchanged_runs - 1, 16)
+    return timedelta(minutes=min(minutes, settings.garmin_cadence_max_minutes))
+
+
 class SyncResult:
     """Result of a sync operation."""
 
@@ -51,6 +70,7 @@ class SyncResult:
         self.items_created = 0
         self.items_updated = 0
         self.items_failed = 0  # Count of failed items/dates
+        self.skipped = False  # Not due yet (adaptive cadence); nothing fetched
         self.error: Optional[str] = None
         self.failed_dates: list[str] = []  # Track failed dates for retry
 
@@ -62,6 +82,7 @@ class SyncResult:
             "items_created": self.items_created,
             "items_updated": self.items_updated,
             "items_failed": self.items_failed,
+            "skipped": self.skipped,
             "error": self.error,
             "failed_dates": self.failed_dates,
         }
@@ -94,6 +115,17 @@ class GarminSyncService:
         # "body_composition",  # Not available in current garminconnect library
     ]
 
+    # Single-call endpoints that rarely change; only these are backed off.
+    # Date-keyed endpoints (sleep, hrv, ...) get a new day's data at any time.
+    BACKOFF_ENDPOINTS = {
+        "personal_records",
+        "goals",
+        "race_predictions",
+        "max_metrics",
+        "training_status",
+        "stats",
+    }
+
     def __init__(
         self,
         session: AsyncSession,
@@ -109,12 +141,17 @@ class GarminSyncService:
         self.fit_storage_path = Path(fit_storage_path or settings.fit_storage_path_absolute)
         self.fit_storage_path.mkdir(parents=True, exist_ok=True)
         self.metrics = get_metrics_backend()
+        # Raw payloads stored vs already known during the current endpoint sync
+        self.raw_stats: dict[str, int] = {"new": 0, "unchanged": 0}
+        # Stage timings of this run (API calls, FIT download/parse, DB writes, ...)
+        self.trace = SyncTrace(user.id)
 
     async def _run_with_timeout(
         self,
         func: Callable,
         timeout: float = GARMIN_API_TIMEOUT,
         operation_name: str = "Garmin API",
+        stage: str = "garmin_api",
     ) -> Any:
         """Run a synchronous function in executor with timeout.
 
@@ -122,6 +159,7 @@ class GarminSyncService:
             func: Synchronous callable to execute.
             timeout: Timeout in seconds (default: 60s).
             operation_name: Name for logging.
+            stage: Sync trace stage the call is timed under.
 
         Returns:
             Result of the function.
@@ -133,10 +171,11 @@ class GarminSyncService:
 
         loop = asyncio.get_event_loop()
         try:
-            return await asyncio.wait_for(
-                loop.run_in_executor(None, func),
-                timeout=timeout,
-            )
+            with self.trace.stage(stage):
+                return await asyncio.wait_for(
+                    loop.run_in_executor(None, func),
+                    timeout=timeout,
+                )
         except asyncio.TimeoutError:
             logger.error(f"{operation_name} timed out after {timeout}s for user {self.user.id}")
             raise
@@ -154,7 +193,7 @@ class GarminSyncService:
             )
 
             if profile_data:
-                await self._store_raw_event("user_profile", profile_data, flush=False)
+                await self._store_raw_event("user_profile", profile_data)
 
             # Garmin user summary에서 maxHr 추출
             max_hr = profile_data.get("userDailySummary", {}).get("maxHeartRate")
@@ -177,6 +216,7 @@ class GarminSyncService:
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
         full_backfill: bool = False,
+        force: bool = False,
     ) -> dict[str, SyncResult]:
         """Sync all endpoints.
 
@@ -184,6 +224,7 @@ class GarminSyncService:
             start_date: Start date for sync (default: last sync or 30 days ago)
             end_date: End date for sync (default: today)
             full_backfill: If True, ignore last sync state and fetch all data
+            force: If True, sync endpoints that are not due yet
 
         Returns:
             Dictionary of endpoint -> SyncResult
@@ -200,6 +241,7 @@ class GarminSyncService:
                     start_date=start_date,
                     end_date=end_date,
                     full_backfill=full_backfill,
+                    force=force,
                 )
                 results[endpoint] = result
             except Exception as e:
@@ -216,9 +258,14 @@ class GarminSyncService:
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
         full_backfill: bool = False,
+        force: bool = False,
     ) -> SyncResult:
         """Sync a single endpoint.
 
+        Incremental syncs skip BACKOFF_ENDPOINTS whose recent runs stored no
+        new payloads until their backoff expires (``cadence_backoff``); an
+        explicit date range, a full backfill or ``force`` always syncs.
+
         Args:
             endpoint: The endpoint to sync (activities, sleep, heart_rate, body_battery, stress,
                 hrv, respiration, spo2, training_status, max_metrics, stats, race_predictions,
@@ -226,11 +273,13 @@ class GarminSyncService:
             start_date: Start date for sync
             end_date: End date for sync
             full_backfill: If True, ignore last sync state
+            force: If True, sync even if the endpoint is not due yet
 
         Returns:
             SyncResult with operation details
         """
         result = SyncResult(endpoint)
+        self.raw_stats = {"new": 0, "unchanged": 0}
 
         # Determine date range based on settings
         # garmin_safety_window_days: overlap period for incremental sync (default: 3)
@@ -238,8 +287,28 @@ class GarminSyncService:
         safety_window = settings.garmin_safety_window_days
         backfill_days = settings.garmin_backfill_days
 
+        unchanged_runs = 0
         if not full_backfill:
             sync_state = await self._get_sync_state(endpoint)
+            if sync_state:
+                unchanged_runs = sync_state.unchanged_runs or 0
+            if (
+                sync_state
+                and sync_state.next_sync_at
+                and not (force or start_date or end_date)
+                and endpoint in self.BACKOFF_ENDPOINTS
+            ):
+                next_sync_at = sync_state.next_sync_at
+                if next_sync_at.tzinfo is None:
+                    next_sync_at = next_sync_at.replace(tzinfo=timezone.utc)
+                if next_sync_at > datetime.now(timezone.utc):
+                    logger.info(
+                        f"Skipping {endpoint} for user {self.user.id}: unchanged in "
+                        f"{unchanged_runs} runs, next due {next_sync_at:%Y-%m-%d %H:%M}"
+                    )
+                    result.success = True
+                    result.skipped = True
+                    return result
             if sync_state and sync_state.last_success_at and not start_date:
                 # Use safety window from settings for incremental sync
                 start_date = sync_state.last_success_at.date() - timedelta(days=safety_window)
@@ -257,69 +326,83 @@ class GarminSyncService:
         logger.info(f"Syncing {endpoint} for user {self.user.id}: {start_date} to {end_date}")
 
         start_time = time.perf_counter()
-        try:
-            # Dispatch to appropriate sync method
-            if endpoint == "gear":
-                await self._sync_gear(result)
-            elif endpoint == "activities":
-                await self._sync_activities(result, start_date, end_date)
-            elif endpoint == "sleep":
-                await self._sync_sleep(result, start_date, end_date)
-            elif endpoint == "heart_rate":
-                await self._sync_heart_rate(result, start_date, end_date)
-            elif endpoint == "body_battery":
-                await self._sync_body_battery(result, start_date, end_date)
-            elif endpoint == "stress":
-                await self._sync_stress(result, start_date, end_date)
-            elif endpoint == "hrv":
-                await self._sync_hrv(result, start_date, end_date)
-            elif endpoint == "respiration":
-                await self._sync_respiration(result, start_date, end_date)
-            elif endpoint == "spo2":
-                await self._sync_spo2(result, start_date, end_date)
-            elif endpoint == "training_status":
-                await self._sync_training_status(result, start_date, end_date)
-            elif endpoint == "max_metrics":
-                await self._sync_max_metrics(result, start_date, end_date)
-            elif endpoint == "stats":
-                await self._sync_stats(result, start_date, end_date)
-            elif endpoint == "race_predictions":
-                await self._sync_race_predictions(result, start_date, end_date)
-            elif endpoint == "personal_records":
-                await self._sync_personal_records(result)
-            elif endpoint == "goals":
-                await self._sync_goals(result)
-            elif endpoint == "body_composition":
-                await self._sync_body_composition(result, start_date, end_date)
-            else:
-                raise ValueError(f"Unknown endpoint: {endpoint}")
+        with self.trace.endpoint(endpoint) as trace_entry:
+            try:
+                # Dispatch to appropriate sync method
+                if endpoint == "gear":
+                    await self._sync_gear(result)
+                elif endpoint == "activities":
+                    await self._sync_activities(result, start_date, end_date)
+                elif endpoint == "sleep":
+                    await self._sync_sleep(result, start_date, end_date)
+                elif endpoint == "heart_rate":
+                    await self._sync_heart_rate(result, start_date, end_date)
+                elif endpoint == "body_battery":
+                    await self._sync_body_battery(result, start_date, end_date)
+                elif endpoint == "stress":
+                    await self._sync_stress(result, start_date, end_date)
+                elif endpoint == "hrv":
+                    await self._sync_hrv(result, start_date, end_date)
+                elif endpoint == "respiration":
+                    await self._sync_respiration(result, start_date, end_date)
+                elif endpoint == "spo2":
+                    await self._sync_spo2(result, start_date, end_date)
+                elif endpoint == "training_status":
+                    await self._sync_training_status(result, start_date, end_date)
+                elif endpoint == "max_metrics":
+                    await self._sync_max_metrics(result, start_date, end_date)
+                elif endpoint == "stats":
+                    await self._sync_stats(result, start_date, end_date)
+                elif endpoint == "race_predictions":
+                    await self._sync_race_predictions(result, start_date, end_date)
+                elif endpoint == "personal_records":
+                    await self._sync_personal_records(result)
+                elif endpoint == "goals":
+                    await self._sync_goals(result)
+                elif endpoint == "body_composition":
+                    await self._sync_body_composition(result, start_date, end_date)
+                else:
+                    raise ValueError(f"Unknown endpoint: {endpoint}")
 
-            # Update sync state - partial success if some items failed
-            if result.items_failed > 0:
-                logger.warning(
-                    f"Partial sync for {endpoint}: {result.items_created} succeeded, "
-                    f"{result.items_failed} failed. Failed dates: {result.failed_dates[:5]}"
-                )
-                # Still mark as success if most items succeeded, but log the partial failure
-                result.success = result.items_created > 0
-                result.error = f"{result.items_failed} items failed"
-            else:
-                result.success = True
+                # Update sync state - partial success if some items failed
+                if result.items_failed > 0:
+                    logger.warning(
+                        f"Partial sync for {endpoint}: {result.items_created} succeeded, "
+                        f"{result.items_failed} failed. Failed dates: {result.failed_dates[:5]}"
+                    )
+                    # Still mark as success if most items succeeded, but log the partial failure
+                    result.success = result.items_created > 0
+                    result.error = f"{result.items_failed} items failed"
+                else:
+                    result.success = True
 
-            await self._update_sync_state(endpoint, success=result.success)
+                # Payload hashes tell whether Garmin had anything new for this endpoint
+                changed = self.raw_stats["new"] > 0 or endpoint not in self.BACKOFF_ENDPOINTS
+                await self._update_sync_state(
+                    endpoint,
+                    success=result.success,
+                    unchanged_runs=0 if changed else unchanged_runs + 1,
+                )
 
-        except Exception as e:
-            logger.exception(f"Error syncing {endpoint}")
-            result.error = str(e)
-            # Rollback the session to clear any pending errors before updating state
-            try:
-                await self.session.rollback()
-            except Exception:
-                pass
-            try:
-                await self._update_sync_state(endpoint, success=False)
-            except Exception as state_error:
-                logger.warning(f"Failed to update sync state after error: {state_error}")
+            except Exception as e:
+                logger.exception(f"Error syncing {endpoint}")
+                result.error = str(e)
+                # Rollback the session to clear any pending errors before updating state
+                try:
+                    await self.session.rollback()
+                except Exception:
+                    pass
+                try:
+                    await self._update_sync_state(endpoint, success=False)
+                except Exception as state_error:
+                    logger.warning(f"Failed to update sync state after error: {state_error}")
+
+        trace_entry.update(
+            success=result.success,
+            fetched=result.items_fetched,
+            created=result.items_created,
+            updated=result.items_updated,
+        )
 
         duration_ms = (time.perf_counter() - start_time) * 1000
         self.metrics.observe_sync_job(
@@ -361,7 +444,7 @@ class GarminSyncService:
         result.items_fetched = len(activities_data)
 
         # Store raw event
-        raw_event = await self._store_raw_event("activities", activities_data)
+        raw_event_id = await self._store_raw_event("activities", activities_data)
 
         for act_data in activities_data:
             garmin_id = act_data.get("activityId")
@@ -374,6 +457,7 @@ class GarminSyncService:
                 details = await self._run_with_timeout(
                     lambda act_id=garmin_id: self.adapter.get_activity_details(act_id),
                     operation_name=f"get_activity_details({garmin_id})",
+                    stage="details_fetch",
                 )
                 # Store activity details as raw event (for data recovery/reprocessing)
                 if details:
@@ -384,25 +468,26 @@ class GarminSyncService:
             except Exception as e:
                 logger.warning(f"Failed to fetch activity details for {garmin_id}: {e}")
 
-            # Check if activity exists
-            existing = await self.session.execute(
-                select(Activity).where(
-                    and_(
-                        Activity.user_id == self.user.id,
-                        Activity.garmin_id == garmin_id,
+            with self.trace.stage("activity_upsert"):
+                # Check if activity exists
+                existing = await self.session.execute(
+                    select(Activity).where(
+                        and_(
+                            Activity.user_id == self.user.id,
+                            Activity.garmin_id == garmin_id,
+                        )
                     )
                 )
-            )
-            activity = existing.scalar_one_or_none()
+                activity = existing.scalar_one_or_none()
 
-            if activity:
-                # Update existing
-                await self._update_activity(activity, act_data)
-                result.items_updated += 1
-            else:
-                # Create new
-                activity = await self._create_activity(act_data, raw_event_id=raw_event.id)
-                result.items_created += 1
+                if activity:
+                    # Update existing
+                    await self._update_activity(activity, act_data)
+                    result.items_updated += 1
+                else:
+                    # Create new
+                    activity = await self._create_activity(act_data, raw_event_id=raw_event_id)
+                    result.items_created += 1
 
             # Download FIT file if not already downloaded or if local file is missing
             need_download = not activity.has_fit_file
@@ -415,18 +500,25 @@ class GarminSyncService:
                 await self._download_fit_file(activity, garmin_id)
 
             # Link activity to gear (shoes, etc.)
-            await self._link_activity_gear(activity, garmin_id)
+            with self.trace.stage("gear_link"):
+                await self._link_activity_gear(activity, garmin_id)
 
-        await self.session.commit()
+        with self.trace.stage("db_write"):
+            await self.session.commit()
 
         # Update today's fitness metrics after activity sync
-        await self._update_fitness_metrics_after_sync()
+        with self.trace.stage("fitness_metrics"):
+            await self.update_fitness_metrics()
 
         # Queue new activities for Strava upload if auto-upload is enabled
-        await self._queue_strava_uploads(result)
+        with self.trace.stage("strava_queue"):
+            await self._queue_strava_uploads(result)
+
+    async def update_fitness_metrics(self, since: Optional[date] = None) -> None:
+        """Update FitnessMetricDaily after activity sync.
 
-    async def _update_fitness_metrics_after_sync(self) -> None:
-        """Update FitnessMetricDaily for today after activity sync.
+        Recomputes each day from ``since`` (default: yesterday) through today,
+        capped at settings.fit_ingest_fitness_backfill_days.
 
         Uses synchronous session for DashboardService compatibility.
         """
@@ -435,14 +527,17 @@ class GarminSyncService:
 
         try:
             user_id = self.user.id
+            today = date.today()
+            # Default: also update yesterday in case activities were backdated
+            start = since or today - timedelta(days=1)
+            start = max(start, today - timedelta(days=settings.fit_ingest_fitness_backfill_days))
 
             def update_metrics(sync_session: SyncSession) -> None:
                 dashboard = DashboardService(sync_session, user_id)
-                today = date.today()
-                dashboard.save_fitness_metrics_for_date(today)
-                # Also update yesterday in case activities were backdated
-                yesterday = today - timedelta(days=1)
-                dashboard.save_fitness_metrics_for_date(yesterday)
+                day = start
+                while day <= today:
+                    dashboard.save_fitness_metrics_for_date(day)
+                    day += timedelta(days=1)
 
             # Execute using async session's run_sync
             await self.session.run_sync(update_metrics)
@@ -487,27 +582,21 @@ class GarminSyncService:
         else:
             max_consecutive_empty = base_max_empty
         consecutive_empty = 0
-        batch_size = 50  # Commit every 50 records
-
-        items_in_batch = 0
+        # Raw events are written (and deduplicated) in batches
+        writer = BufferedUpsertWriter(self.session, self.user.id, raw_stats=self.raw_stats)
 
         for current_date in dates_to_sync:
             try:
-                data = await loop.run_in_executor(
-                    None,
-                    lambda d=current_date: fetcher(d),
-                )
+                with self.trace.stage("garmin_api"):
+                    data = await loop.run_in_executor(
+                        None,
+                        lambda d=current_date: fetcher(d),
+                    )
                 if data:
                     result.items_fetched += 1
-                    await self._store_raw_event(endpoint, data, flush=False)
+                    writer.add(endpoint, data)
                     result.items_created += 1
                     consecutive_empty = 0  # Reset on success
-                    items_in_batch += 1
-
-                    # Batch commit
-                    if items_in_batch >= batch_size:
-                        await self.session.commit()
-                        items_in_batch = 0
                 else:
                     consecutive_empty += 1
 
@@ -515,6 +604,10 @@ class GarminSyncService:
                 logger.warning(f"Failed to fetch {endpoint} for {current_date}: {e}")
                 consecutive_empty += 1
 
+            # Batch commit
+            if writer.full:
+                await self._flush_writer(writer)
+
             # Early termination: stop if too many consecutive empty days
             if consecutive_empty >= max_consecutive_empty:
                 logger.info(
@@ -523,7 +616,7 @@ class GarminSyncService:
                 )
                 break
 
-        await self.session.commit()
+        await self._flush_writer(writer)
 
     async def _sync_single_raw(
         self,
@@ -535,10 +628,11 @@ class GarminSyncService:
         import asyncio
 
         loop = asyncio.get_event_loop()
-        data = await loop.run_in_executor(
-            None,
-            fetcher,
-        )
+        with self.trace.stage("garmin_api"):
+            data = await loop.run_in_executor(
+                None,
+                fetcher,
+            )
         if not data:
             return
 
@@ -547,7 +641,7 @@ class GarminSyncService:
         else:
             result.items_fetched = 1
 
-        await self._store_raw_event(endpoint, data, flush=False)
+        await self._store_raw_event(endpoint, data)
         result.items_created = 1
         await self.session.commit()
 
@@ -627,37 +721,28 @@ class GarminSyncService:
         else:
             max_consecutive_empty = base_max_empty
         consecutive_empty = 0
-        batch_size = 50
-        items_in_batch = 0
+        # Raw events and metrics are written in multi-row batches
+        writer = BufferedUpsertWriter(self.session, self.user.id, raw_stats=self.raw_stats)
 
         for current_date in dates_to_sync:
             try:
-                data = await loop.run_in_executor(
-                    None,
-                    lambda d=current_date: fetcher(d),
-                )
+                with self.trace.stage("garmin_api"):
+                    data = await loop.run_in_executor(
+                        None,
+                        lambda d=current_date: fetcher(d),
+                    )
                 if data:
                     result.items_fetched += 1
-                    # Must flush to get raw_event.id for linking to health metrics
-                    raw_event = await self._store_raw_event(endpoint, data, flush=True)
                     result.items_created += 1
                     consecutive_empty = 0
-                    items_in_batch += 1
 
-                    # Extract and store normalized health metrics
+                    # Extract normalized health metrics (linked to the raw event on flush)
+                    rows: list[dict[str, Any]] = []
                     try:
-                        metrics = extractor(data, current_date)
-                        for metric_data in metrics:
-                            await self._store_health_metric(
-                                metric_data,
-                                raw_event_id=raw_event.id,  # Now guaranteed to have id
-                            )
+                        rows = [self._health_metric_row(m) for m in extractor(data, current_date)]
                     except Exception as e:
                         logger.warning(f"Failed to extract {endpoint} metrics for {current_date}: {e}")
-
-                    if items_in_batch >= batch_size:
-                        await self.session.commit()
-                        items_in_batch = 0
+                    writer.add(endpoint, data, HEALTH_METRIC_UPSERT, rows)
                 else:
                     consecutive_empty += 1
 
@@ -667,6 +752,9 @@ class GarminSyncService:
                 result.failed_dates.append(str(current_date))
                 consecutive_empty += 1
 
+            if writer.full:
+                await self._flush_writer(writer)
+
             if consecutive_empty >= max_consecutive_empty:
                 logger.info(
                     f"Early termination for {endpoint}: {consecutive_empty} consecutive "
@@ -674,7 +762,7 @@ class GarminSyncService:
                 )
                 break
 
-        await self.session.commit()
+        await self._flush_writer(writer)
 
     def _extract_body_battery_metrics(
         self, data: dict[str, Any], metric_date: date
@@ -857,38 +945,16 @@ class GarminSyncService:
 
         return metrics
 
-    async def _store_health_metric(
-        self,
-        metric_data: dict[str, Any],
-        raw_event_id: Optional[int] = None,
-    ) -> None:
-        """Store a health metric to the HealthMetric table.
-
-        Uses PostgreSQL upsert for efficient insert-or-update.
-        """
-        stmt = insert(HealthMetric).values(
-            user_id=self.user.id,
-            metric_type=metric_data["metric_type"],
-            metric_time=metric_data["metric_time"],
-            value=metric_data.get("value"),
-            unit=metric_data.get("unit"),
-            payload=metric_data.get("payload"),
-            raw_event_id=raw_event_id,
-        )
-        update_values = {
-            "value": stmt.excluded.value,
-            "unit": stmt.excluded.unit,
-            "payload": stmt.excluded.payload,
-            "updated_at": datetime.now(timezone.utc),
+    def _health_metric_row(self, metric_data: dict[str, Any]) -> dict[str, Any]:
+        """Build a HealthMetric row for the batched upsert."""
+        return {
+            "user_id": self.user.id,
+            "metric_type": metric_data["metric_type"],
+            "metric_time": metric_data["metric_time"],
+            "value": metric_data.get("value"),
+            "unit": metric_data.get("unit"),
+            "payload": metric_data.get("payload"),
         }
-        if raw_event_id is not None:
-            update_values["raw_event_id"] = stmt.excluded.raw_event_id
-
-        stmt = stmt.on_conflict_do_update(
-            constraint="uq_health_metric_user_type_time",
-            set_=update_values,
-        )
-        await self.session.execute(stmt)
 
     async def _sync_respiration(
         self,
@@ -1123,6 +1189,7 @@ class GarminSyncService:
                 lambda: self.adapter.download_fit_file(garmin_id, str(user_dir)),
                 timeout=120,  # 2 minutes for large FIT files
                 operation_name=f"download_fit_file({garmin_id})",
+                stage="fit_download",
             )
 
             if not fit_data:
@@ -1162,8 +1229,10 @@ class GarminSyncService:
                     lambda: self.adapter.parse_fit_file(fit_data),
                     timeout=90,  # 90 seconds for parsing large files
                     operation_name=f"parse_fit_file({garmin_id})",
+                    stage="fit_parse",
                 )
-                await self._store_fit_data(activity, parsed_data)
+                with self.trace.stage("sample_insert"):
+                    await self.store_fit_data(activity, parsed_data)
                 sample_count = len(parsed_data.get("records", []))
                 parse_success = True
                 # Only set has_fit_file=True after successful parse
@@ -1179,6 +1248,8 @@ class GarminSyncService:
                 and parse_success
                 and sample_count >= settings.fit_min_samples_for_delete
             ):
+                # Keep a hot copy in the bounded local cache (e.g. for the Strava upload that follows)
+                await get_fit_blob_store().put(activity, fit_data)
                 await self._delete_fit_file(activity, file_path, garmin_id)
 
         except Exception as e:
@@ -1225,9 +1296,12 @@ class GarminSyncService:
         except Exception as e:
             logger.warning(f"Failed to delete FIT file for activity {garmin_id}: {e}")
 
-    async def _store_fit_data(self, activity: Activity, parsed_data: dict[str, Any]) -> None:
+    async def store_fit_data(self, activity: Activity, parsed_data: dict[str, Any]) -> None:
         """Store parsed FIT data as samples and laps.
 
+        Used by the Garmin sync and by the analyze_fit worker for uploaded
+        files (see app.services.fit_ingest).
+
         Args:
             activity: Activity to attach data to.
             parsed_data: Parsed FIT data from adapter.parse_fit_file()
@@ -1235,7 +1309,7 @@ class GarminSyncService:
         # Store records as ActivitySample
         records = parsed_data.get("records", [])
         if records:
-            samples_to_add = []
+            sample_rows: list[dict[str, Any]] = []
             for record in records:
                 timestamp = record.get("timestamp")
                 if not timestamp:
@@ -1259,7 +1333,7 @@ class GarminSyncService:
                 if longitude is not None and abs(longitude) > 180:
                     longitude = longitude * (180 / 2**31)
 
-                sample = ActivitySample(
+                sample_rows.append(dict(
                     activity_id=activity.id,
                     timestamp=timestamp,
                     hr=record.get("heart_rate"),
@@ -1275,12 +1349,13 @@ class GarminSyncService:
                     ground_contact_time=record.get("ground_contact_time") or record.get("stance_time"),
                     vertical_oscillation=record.get("vertical_oscillation"),
                     stride_length=record.get("step_length"),
-                )
-                samples_to_add.append(sample)
+                ))
 
-            if samples_to_add:
-                self.session.add_all(samples_to_add)
-                logger.info(f"Stored {len(samples_to_add)} samples for activity {activity.id}")
+            if sample_rows:
+                # Core executemany insert: thousands of rows per activity, no ORM
+                # identity-map overhead (nothing reads these objects back here)
+                await self.session.execute(sa_insert(ActivitySample), sample_rows)
+                logger.info(f"Stored {len(sample_rows)} samples for activity {activity.id}")
 
         # Store laps as ActivityLap
         laps = parsed_data.get("laps", [])
@@ -1375,7 +1450,8 @@ class GarminSyncService:
             logger.info(f"External HR monitor detected for activity {activity.id}")
 
         # Calculate and store derived metrics (TRIMP, EF, etc.)
-        await self._calculate_and_store_metrics(activity, records)
+        with self.trace.stage("activity_metrics"):
+            await self._calculate_and_store_metrics(activity, records)
 
     async def _calculate_and_store_metrics(
         self,
@@ -1538,66 +1614,47 @@ class GarminSyncService:
 
         loop = asyncio.get_event_loop()
         current_date = start_date
+        writer = BufferedUpsertWriter(self.session, self.user.id, raw_stats=self.raw_stats)
 
         while current_date <= end_date:
             try:
                 # Run synchronous adapter method in thread pool
-                sleep_data = await loop.run_in_executor(
-                    None,
-                    lambda d=current_date: self.adapter.get_sleep_data(d),
-                )
+                with self.trace.stage("garmin_api"):
+                    sleep_data = await loop.run_in_executor(
+                        None,
+                        lambda d=current_date: self.adapter.get_sleep_data(d),
+                    )
                 if sleep_data:
                     result.items_fetched += 1
-                    raw_event = await self._store_raw_event("sleep", sleep_data)
-                    await self._store_sleep(
-                        sleep_data,
-                        current_date,
-                        raw_event_id=raw_event.id,
-                    )
+                    writer.add("sleep", sleep_data, SLEEP_UPSERT, [
+                        self._sleep_row(sleep_data, current_date),
+                    ])
                     result.items_created += 1
             except Exception as e:
                 logger.warning(f"Failed to fetch sleep for {current_date}: {e}")
                 result.items_failed += 1
                 result.failed_dates.append(str(current_date))
 
+            if writer.full:
+                await self._flush_writer(writer)
             current_date += timedelta(days=1)
 
-        await self.session.commit()
+        await self._flush_writer(writer)
 
-    async def _store_sleep(
-        self,
-        data: dict[str, Any],
-        sleep_date: date,
-        raw_event_id: Optional[int] = None,
-    ) -> None:
-        """Store or update sleep record."""
-        # Use upsert pattern
-        stmt = insert(Sleep).values(
-            user_id=self.user.id,
-            date=sleep_date,
-            duration_seconds=data.get("sleepTimeSeconds"),
-            score=data.get("overallSleepScore"),
-            stages={
+    def _sleep_row(self, data: dict[str, Any], sleep_date: date) -> dict[str, Any]:
+        """Build a Sleep row for the batched upsert."""
+        return {
+            "user_id": self.user.id,
+            "date": sleep_date,
+            "duration_seconds": data.get("sleepTimeSeconds"),
+            "score": data.get("overallSleepScore"),
+            "stages": {
                 "deep": data.get("deepSleepSeconds"),
                 "light": data.get("lightSleepSeconds"),
                 "rem": data.get("remSleepSeconds"),
                 "awake": data.get("awakeSleepSeconds"),
             },
-            raw_event_id=raw_event_id,
-        )
-        update_values = {
-            "duration_seconds": stmt.excluded.duration_seconds,
-            "score": stmt.excluded.score,
-            "stages": stmt.excluded.stages,
-            "updated_at": datetime.now(timezone.utc),
         }
-        if raw_event_id is not None:
-            update_values["raw_event_id"] = stmt.excluded.raw_event_id
-        stmt = stmt.on_conflict_do_update(
-            constraint="uq_sleep_user_date",
-            set_=update_values,
-        )
-        await self.session.execute(stmt)
 
     async def _sync_heart_rate(
         self,
@@ -1610,39 +1667,35 @@ class GarminSyncService:
 
         loop = asyncio.get_event_loop()
         current_date = start_date
+        writer = BufferedUpsertWriter(self.session, self.user.id, raw_stats=self.raw_stats)
 
         while current_date <= end_date:
             try:
                 # Run synchronous adapter method in thread pool
-                hr_data = await loop.run_in_executor(
-                    None,
-                    lambda d=current_date: self.adapter.get_heart_rate(d),
-                )
+                with self.trace.stage("garmin_api"):
+                    hr_data = await loop.run_in_executor(
+                        None,
+                        lambda d=current_date: self.adapter.get_heart_rate(d),
+                    )
                 if hr_data:
                     result.items_fetched += 1
-                    raw_event = await self._store_raw_event("heart_rate", hr_data)
-                    await self._store_heart_rate(
-                        hr_data,
-                        current_date,
-                        raw_event_id=raw_event.id,
-                    )
+                    writer.add("heart_rate", hr_data, HR_RECORD_UPSERT, [
+                        self._heart_rate_row(hr_data, current_date),
+                    ])
                     result.items_created += 1
             except Exception as e:
                 logger.warning(f"Failed to fetch heart rate for {current_date}: {e}")
                 result.items_failed += 1
                 result.failed_dates.append(str(current_date))
 
+            if writer.full:
+                await self._flush_writer(writer)
             current_date += timedelta(days=1)
 
-        await self.session.commit()
+        await self._flush_writer(writer)
 
-    async def _store_heart_rate(
-        self,
-        data: dict[str, Any],
-        hr_date: date,
-        raw_event_id: Optional[int] = None,
-    ) -> None:
-        """Store or update heart rate record using upsert.
+    def _heart_rate_row(self, data: dict[str, Any], hr_date: date) -> dict[str, Any]:
+        """Build an HRRecord row for the batched upsert.
 
         Garmin HR data fields:
         - restingHeartRate: Resting HR for the day
@@ -1661,31 +1714,16 @@ class GarminSyncService:
         start_time = datetime.combine(hr_date, datetime.min.time(), tzinfo=timezone.utc)
         end_time = datetime.combine(hr_date, datetime.max.time(), tzinfo=timezone.utc)
 
-        stmt = insert(HRRecord).values(
-            user_id=self.user.id,
-            date=hr_date,
-            start_time=start_time,
-            end_time=end_time,
-            avg_hr=avg_hr,
-            max_hr=data.get("maxHeartRate"),
-            resting_hr=data.get("restingHeartRate"),
-            samples=samples,
-            raw_event_id=raw_event_id,
-        )
-        update_values = {
-            "avg_hr": stmt.excluded.avg_hr,
-            "max_hr": stmt.excluded.max_hr,
-            "resting_hr": stmt.excluded.resting_hr,
-            "samples": stmt.excluded.samples,
-            "updated_at": datetime.now(timezone.utc),
+        return {
+            "user_id": self.user.id,
+            "date": hr_date,
+            "start_time": start_time,
+            "end_time": end_time,
+            "avg_hr": avg_hr,
+            "max_hr": data.get("maxHeartRate"),
+            "resting_hr": data.get("restingHeartRate"),
+            "samples": samples,
         }
-        if raw_event_id is not None:
-            update_values["raw_event_id"] = stmt.excluded.raw_event_id
-        stmt = stmt.on_conflict_do_update(
-            constraint="uq_hr_record_user_date",
-            set_=update_values,
-        )
-        await self.session.execute(stmt)
 
     async def _sync_body_composition(
         self,
@@ -1735,23 +1773,19 @@ class GarminSyncService:
         )
         await self.session.execute(stmt)
 
-    async def _store_raw_event(
-        self,
-        endpoint: str,
-        payload: Any,
-        flush: bool = True,
-    ) -> GarminRawEvent:
-        """Store raw API response."""
-        raw_event = GarminRawEvent(
-            user_id=self.user.id,
-            endpoint=endpoint,
-            fetched_at=datetime.now(timezone.utc),
-            payload=payload if isinstance(payload, dict) else {"data": payload},
-        )
-        self.session.add(raw_event)
-        if flush:
-            await self.session.flush()
-        return raw_event
+    async def _flush_writer(self, writer: BufferedUpsertWriter) -> None:
+        """Write buffered rows and commit them."""
+        with self.trace.stage("db_write"):
+            await writer.flush()
+            await self.session.commit()
+
+    async def _store_raw_event(self, endpoint: str, payload: Any) -> int:
+        """Store raw API response in the archive (deduplicated, compressed).
+
+        Returns:
+            Raw event id (the existing event's id if the payload is unchanged).
+        """
+        return await store_raw_event(self.session, self.user.id, endpoint, payload, self.raw_stats)
 
     async def _get_sync_state(self, endpoint: str) -> Optional[GarminSyncState]:
         """Get sync state for an endpoint."""
@@ -1777,10 +1811,11 @@ class GarminSyncService:
 
         try:
             # Get user profile to get userProfileNumber for gear API
-            profile_data = await loop.run_in_executor(
-                None,
-                self.adapter.get_user_profile,
-            )
+            with self.trace.stage("garmin_api"):
+                profile_data = await loop.run_in_executor(
+                    None,
+                    self.adapter.get_user_profile,
+                )
             # The profile 'id' field is the userProfileNumber needed for gear API
             user_profile_number = str(
                 profile_data.get("id")
@@ -1794,10 +1829,11 @@ class GarminSyncService:
             logger.info(f"Using profile number {user_profile_number} for gear sync")
 
             # Fetch gear list from Garmin
-            gear_list = await loop.run_in_executor(
-                None,
-                lambda: self.adapter.get_gear(user_profile_number),
-            )
+            with self.trace.stage("garmin_api"):
+                gear_list = await loop.run_in_executor(
+                    None,
+                    lambda: self.adapter.get_gear(user_profile_number),
+                )
 
             if not gear_list:
                 logger.info(f"No gear found for user {self.user.id}")
@@ -1806,7 +1842,7 @@ class GarminSyncService:
             result.items_fetched = len(gear_list)
 
             # Store raw event
-            await self._store_raw_event("gear", gear_list, flush=False)
+            await self._store_raw_event("gear", gear_list)
 
             for gear_data in gear_list:
                 garmin_uuid = gear_data.get("uuid") or gear_data.get("gearUUID")
@@ -1814,10 +1850,11 @@ class GarminSyncService:
                     continue
 
                 # Get gear stats for distance (stored in initial_distance_meters)
-                gear_stats = await loop.run_in_executor(
-                    None,
-                    lambda uuid=garmin_uuid: self.adapter.get_gear_stats(uuid),
-                )
+                with self.trace.stage("garmin_api"):
+                    gear_stats = await loop.run_in_executor(
+                        None,
+                        lambda uuid=garmin_uuid: self.adapter.get_gear_stats(uuid),
+                    )
                 # Garmin's totalDistance is the cumulative distance tracked by Garmin
                 garmin_distance = gear_stats.get("totalDistance", 0) or 0  # in meters
                 # Try different key names for activity count
@@ -1902,10 +1939,11 @@ class GarminSyncService:
 
         try:
             # Fetch gear for this activity from Garmin
-            activity_gear_list = await loop.run_in_executor(
-                None,
-                lambda: self.adapter.get_activity_gear(garmin_activity_id),
-            )
+            with self.trace.stage("garmin_api"):
+                activity_gear_list = await loop.run_in_executor(
+                    None,
+                    lambda: self.adapter.get_activity_gear(garmin_activity_id),
+                )
 
             if not activity_gear_list:
                 return
@@ -1953,15 +1991,35 @@ class GarminSyncService:
         except Exception as e:
             logger.warning(f"Failed to link activity {activity.id} to gear: {e}")
 
-    async def _update_sync_state(self, endpoint: str, success: bool) -> None:
-        """Update sync state for an endpoint."""
+    async def _update_sync_state(
+        self,
+        endpoint: str,
+        success: bool,
+        unchanged_runs: Optional[int] = None,
+    ) -> None:
+        """Update sync state for an endpoint.
+
+        Args:
+            endpoint: Synced endpoint.
+            success: Whether the sync succeeded.
+            unchanged_runs: New count of consecutive runs without new data
+                (successful runs only); sets when the endpoint is next due.
+        """
         now = datetime.now(timezone.utc)
+        cadence: dict[str, Any] = {"next_sync_at": None}  # Failed runs retry next time
+        if success and unchanged_runs is not None:
+            backoff = cadence_backoff(unchanged_runs)
+            cadence = {
+                "unchanged_runs": unchanged_runs,
+                "next_sync_at": now + backoff if backoff else None,
+            }
 
         stmt = insert(GarminSyncState).values(
             user_id=self.user.id,
             endpoint=endpoint,
             last_sync_at=now,
             last_success_at=now if success else None,
+            **cadence,
         )
         stmt = stmt.on_conflict_do_update(
             constraint="uq_garmin_sync_state_user_endpoint",
@@ -1969,6 +2027,7 @@ class GarminSyncService:
                 "last_sync_at": now,
                 "last_success_at": now if success else GarminSyncState.last_success_at,
                 "updated_at": now,
+                **cadence,
             },
         )
         await self.session.execute(stmt)
@@ -2061,9 +2120,8 @@ async def create_sync_service(
     if not garmin_session or not garmin_session.is_valid:
         return None
 
-    # Create adapter with session data
-    adapter = GarminConnectAdapter()
-    adapter.restore_session(garmin_session.session_data)
+    # Warm adapter from the per-user pool (restored from session data on a miss)
+    adapter = await get_garmin_pool().acquire(user.id, garmin_session.session_data)
 
     return GarminSyncService(
         session=session,
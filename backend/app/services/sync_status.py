@@ -0,0 +1,295 @@
+"""Shared Garmin sync status and progress events.
+
+Sync progress used to live in a per-process dict, so with several API
+workers ``GET /ingest/status`` answered from whichever process happened to
+serve the request. Status is now kept in a Redis hash per user
+(``sync:status:<user_id>``) that every process (and the ARQ worker) reads
+and writes, and each change is published on ``sync:events:<user_id>`` so
+clients can follow a sync over Server-Sent Events instead of polling.
+
+The stage-timing traces of a user's last SYNC_TRACE_HISTORY_SIZE runs
+(``app.services.sync_trace``) are kept in a list next to the status
+(``sync:traces:<user_id>``).
+
+Without Redis the same API is served from process memory (single-worker
+deployments), matching the lock fallback in ``app.core.session``.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from redis.exceptions import RedisError
+
+from app.core.config import get_settings
+from app.core.session import get_redis
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+TERMINAL_EVENT = "finished"
+
+
+def _status_key(user_id: int) -> str:
+    return f"sync:status:{user_id}"
+
+
+def _channel(user_id: int) -> str:
+    return f"sync:events:{user_id}"
+
+
+def _traces_key(user_id: int) -> str:
+    return f"sync:traces:{user_id}"
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+class SyncStatusStore:
+    """Per-user sync status shared across processes."""
+
+    def __init__(self, redis_client: Any = None, use_redis: bool = True) -> None:
+        """Initialize the store.
+
+        Args:
+            redis_client: Redis client (default: the shared client from ``get_redis``).
+            use_redis: False forces the in-process fallback (tests, scripts).
+        """
+        self._redis = redis_client
+        self._use_redis = use_redis
+        # In-process fallback state
+        self._local: dict[int, dict[str, str]] = {}
+        self._local_traces: dict[int, list[dict[str, Any]]] = {}
+        self._subscribers: dict[int, set[asyncio.Queue]] = {}
+
+    async def _client(self) -> Any:
+        if not self._use_redis:
+            return None
+        if self._redis is None:
+            self._redis = await get_redis()
+        return self._redis
+
+    async def _update(
+        self, user_id: int, fields: dict[str, Any], event: dict[str, Any]
+    ) -> None:
+        """Write status fields and publish the matching event."""
+        encoded = {
+            name: value if isinstance(value, str) else json.dumps(value)
+            for name, value in fields.items()
+        }
+        message = json.dumps(event)
+        client = await self._client()
+        if client is not None:
+            try:
+                async with client.pipeline(transaction=True) as pipe:
+                    if encoded:
+                        pipe.hset(_status_key(user_id), mapping=encoded)
+                    pipe.expire(_status_key(user_id), settings.sync_status_ttl_seconds)
+                    pipe.publish(_channel(user_id), message)
+                    await pipe.execute()
+                return
+            except RedisError as e:
+                logger.warning(f"Sync status falling back to process memory: {e}")
+
+        self._local.setdefault(user_id, {}).update(encoded)
+        for queue in self._subscribers.get(user_id, ()):
+            queue.put_nowait(message)
+
+    async def start(self, user_id: int, endpoints: list[str]) -> None:
+        """Reset status for a new sync run."""
+        now = datetime.now(timezone.utc).isoformat()
+        progress = {
+            "current_endpoint": endpoints[0] if endpoints else "",
+            "current_index": 0,
+            "total_endpoints": len(endpoints),
+            "items_synced": 0,
+        }
+        client = await self._client()
+        if client is not None:
+            try:
+                await client.delete(_status_key(user_id))
+            except RedisError:
+                pass
+        self._local.pop(user_id, None)
+        await self._update(
+            user_id,
+            {
+                "started_at": now,
+                "error": "",
+                "finished_at": "",
+                "progress": progress,
+                "results": {},
+            },
+            {"type": "started", "started_at": now, "endpoints": endpoints},
+        )
+
+    async def set_progress(
+        self, user_id: int, endpoint: str, index: int, total: int, items_synced: int = 0
+    ) -> None:
+        """Record the endpoint currently being synced."""
+        progress = {
+            "current_endpoint": endpoint,
+            "current_index": index,
+            "total_endpoints": total,
+            "items_synced": items_synced,
+        }
+        await self._update(
+            user_id, {"progress": progress}, {"type": "progress", **progress}
+        )
+
+    async def record_result(
+        self, user_id: int, endpoint: str, result: dict[str, Any]
+    ) -> None:
+        """Record one endpoint's outcome (counts or error)."""
+        status = await self.get(user_id)
+        results = status.get("results") or {}
+        results[endpoint] = result
+        progress = status.get("progress") or {}
+        if progress.get("current_endpoint") == endpoint:
+            progress["items_synced"] = result.get("items_created", 0) + result.get(
+                "items_updated", 0
+            )
+        await self._update(
+            user_id,
+            {"results": results, "progress": progress},
+            {"type": "endpoint", "endpoint": endpoint, **result},
+        )
+
+    async def set_error(self, user_id: int, error: str) -> None:
+        """Record the run's error summary."""
+        await self._update(user_id, {"error": error}, {"type": "error", "error": error})
+
+    async def finish(self, user_id: int) -> None:
+        """Mark the run as finished."""
+        now = datetime.now(timezone.utc).isoformat()
+        status = await self.get(user_id)
+        await self._update(
+            user_id,
+            {"finished_at": now},
+            {"type": TERMINAL_EVENT, "finished_at": now, "error": status.get("error")},
+        )
+
+    async def record_trace(self, user_id: int, trace: dict[str, Any]) -> None:
+        """Keep a finished run's stage timings (newest first, bounded)."""
+        keep = settings.sync_trace_history_size
+        if keep <= 0:
+            return
+        client = await self._client()
+        if client is not None:
+            try:
+                async with client.pipeline(transaction=True) as pipe:
+                    pipe.lpush(_traces_key(user_id), json.dumps(trace))
+                    pipe.ltrim(_traces_key(user_id), 0, keep - 1)
+                    pipe.expire(_traces_key(user_id), settings.sync_status_ttl_seconds)
+                    await pipe.execute()
+                return
+            except RedisError as e:
+                logger.warning(f"Sync traces falling back to process memory: {e}")
+        traces = self._local_traces.setdefault(user_id, [])
+        traces.insert(0, trace)
+        del traces[keep:]
+
+    async def traces(self, user_id: int) -> list[dict[str, Any]]:
+        """Stage timings of the user's recent runs, newest first."""
+        client = await self._client()
+        if client is not None:
+            try:
+                return [
+                    json.loads(raw)
+                    for raw in await client.lrange(_traces_key(user_id), 0, -1)
+                ]
+            except RedisError as e:
+                logger.warning(f"Failed to read sync traces: {e}")
+        return list(self._local_traces.get(user_id, []))
+
+    async def get(self, user_id: int) -> dict[str, Any]:
+        """Current status (empty dict if no sync has been recorded).
+
+        Returns:
+            Dict with ``started_at``/``finished_at`` (datetime or None),
+            ``error`` (str or None), ``progress`` and ``results`` dicts.
+        """
+        raw: Optional[dict[str, str]] = None
+        client = await self._client()
+        if client is not None:
+            try:
+                raw = await client.hgetall(_status_key(user_id))
+            except RedisError as e:
+                logger.warning(f"Failed to read sync status: {e}")
+        if raw is None:
+            raw = self._local.get(user_id, {})
+        if not raw:
+            return {}
+        return {
+            "started_at": _parse_time(raw.get("started_at")),
+            "finished_at": _parse_time(raw.get("finished_at")),
+            "error": raw.get("error") or None,
+            "progress": json.loads(raw["progress"]) if raw.get("progress") else None,
+            "results": json.loads(raw["results"]) if raw.get("results") else {},
+        }
+
+    async def subscribe(self, user_id: int) -> "SyncEventSubscription":
+        """Subscribe to a user's sync events.
+
+        The subscription is active when this returns, so reading the current
+        status afterwards cannot miss an event published in between.
+        """
+        client = await self._client()
+        if client is not None:
+            try:
+                pubsub = client.pubsub()
+                await pubsub.subscribe(_channel(user_id))
+                return SyncEventSubscription(pubsub=pubsub)
+            except RedisError as e:
+                logger.warning(f"Sync events falling back to process memory: {e}")
+
+        queue: asyncio.Queue = asyncio.Queue()
+        subscribers = self._subscribers.setdefault(user_id, set())
+        subscribers.add(queue)
+        return SyncEventSubscription(
+            queue=queue, on_close=lambda: subscribers.discard(queue)
+        )
+
+
+class SyncEventSubscription:
+    """Stream of one user's sync events (Redis pub/sub or in-process queue)."""
+
+    def __init__(
+        self, pubsub: Any = None, queue: Optional[asyncio.Queue] = None, on_close=None
+    ):
+        self._pubsub = pubsub
+        self._queue = queue
+        self._on_close = on_close
+
+    async def next(self, timeout: Optional[float] = None) -> Optional[dict[str, Any]]:
+        """Next event, or None if nothing arrives within ``timeout`` seconds."""
+        timeout = timeout or settings.sync_events_keepalive_seconds
+        if self._pubsub is not None:
+            message = await self._pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=timeout
+            )
+            return json.loads(message["data"]) if message else None
+        try:
+            return json.loads(await asyncio.wait_for(self._queue.get(), timeout))
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self) -> None:
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+        if self._on_close is not None:
+            self._on_close()
+
+
+_store: Optional[SyncStatusStore] = None
+
+
+def get_sync_status_store() -> SyncStatusStore:
+    """Get singleton sync status store instance."""
+    global _store
+    if _store is None:
+        _store = SyncStatusStore()
+    return _store
@@ -0,0 +1,136 @@
+"""Stage timing for Garmin sync runs.
+
+``observe_sync_job`` only sees an endpoint's total time. ``SyncTrace``
+breaks a run down by stage (Garmin API calls, activity details, FIT
+download, parse, sample insert, derived metrics, gear linking, fitness
+recomputation, Strava queueing):
+
+- every stage occurrence is observed in the ``sync_stage_duration_ms``
+  histogram (by endpoint and stage) and, when tracing is enabled, opened as
+  an OpenTelemetry span under the endpoint and run spans;
+- stage times are *self* times (a nested stage is not counted twice), and
+  time not covered by any stage is reported as ``other``, so the stages of
+  an endpoint add up to its duration;
+- ``to_dict`` gives a compact per-run summary, the last
+  SYNC_TRACE_HISTORY_SIZE of which are kept per user by the sync status
+  store and shown on ``GET /ingest/history``.
+"""
+
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from typing import Any, Iterator, Optional
+
+from app.observability import get_metrics_backend, get_tracer
+
+OTHER_STAGE = "other"
+
+
+class _Frame:
+    """An open endpoint or stage and the time spent in its nested stages."""
+
+    __slots__ = ("name", "is_endpoint", "started_at", "child_ms")
+
+    def __init__(self, name: str, is_endpoint: bool = False) -> None:
+        self.name = name
+        self.is_endpoint = is_endpoint
+        self.started_at = time.perf_counter()
+        self.child_ms = 0.0
+
+
+class SyncTrace:
+    """Stage timings of one sync run (one ``GarminSyncService``)."""
+
+    def __init__(self, user_id: Optional[int] = None) -> None:
+        self.user_id = user_id
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.perf_counter()
+        self._metrics = get_metrics_backend()
+        self._tracer = get_tracer(__name__)
+        self._stack: list[_Frame] = []
+        # endpoint -> {"ms", "stages": {stage: [count, self_ms]}} plus outcome fields
+        self.endpoints: dict[str, dict[str, Any]] = {}
+
+    def _span(self, name: str, **attributes: Any):
+        if self._tracer is None:
+            return nullcontext()
+        return self._tracer.start_as_current_span(
+            name, attributes={k: v for k, v in attributes.items() if v is not None}
+        )
+
+    @contextmanager
+    def run(self) -> Iterator["SyncTrace"]:
+        """Span covering a whole sync run."""
+        with self._span("garmin.sync", **{"user.id": self.user_id}):
+            yield self
+
+    @contextmanager
+    def endpoint(self, endpoint: str) -> Iterator[dict[str, Any]]:
+        """Time one endpoint; yields its summary entry for outcome fields."""
+        entry = self.endpoints.setdefault(endpoint, {"ms": 0.0, "stages": {}})
+        frame = _Frame(endpoint, is_endpoint=True)
+        self._stack.append(frame)
+        try:
+            with self._span("garmin.sync.endpoint", **{"sync.endpoint": endpoint}):
+                yield entry
+        finally:
+            self._stack.pop()
+            total_ms = (time.perf_counter() - frame.started_at) * 1000
+            entry["ms"] += total_ms
+            self._add(entry, OTHER_STAGE, total_ms - frame.child_ms, count=0)
+
+    @contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        """Time one stage occurrence inside the current endpoint.
+
+        Outside an endpoint (e.g. FIT imports reusing ``store_fit_data``)
+        only the span and histogram are recorded.
+        """
+        frame = _Frame(stage)
+        endpoint = next((f.name for f in reversed(self._stack) if f.is_endpoint), None)
+        self._stack.append(frame)
+        try:
+            with self._span(f"garmin.sync.{stage}", **{"sync.endpoint": endpoint}):
+                yield
+        finally:
+            self._stack.pop()
+            total_ms = (time.perf_counter() - frame.started_at) * 1000
+            if self._stack:
+                self._stack[-1].child_ms += total_ms
+            self._metrics.observe_sync_stage(endpoint or "none", stage, total_ms)
+            if endpoint is not None:
+                self._add(self.endpoints[endpoint], stage, total_ms - frame.child_ms)
+
+    @staticmethod
+    def _add(entry: dict[str, Any], stage: str, self_ms: float, count: int = 1) -> None:
+        stats = entry["stages"].setdefault(stage, [0, 0.0])
+        stats[0] += count
+        stats[1] += self_ms
+
+    def to_dict(self) -> dict[str, Any]:
+        """Compact run summary (milliseconds rounded to 0.1)."""
+        stage_totals: dict[str, list] = {}
+        endpoints: dict[str, Any] = {}
+        for endpoint, entry in self.endpoints.items():
+            stages = {}
+            for stage, (count, ms) in entry["stages"].items():
+                stages[stage] = {"n": count, "ms": round(ms, 1)}
+                totals = stage_totals.setdefault(stage, [0, 0.0])
+                totals[0] += count
+                totals[1] += ms
+            endpoints[endpoint] = {
+                **{k: v for k, v in entry.items() if k not in ("ms", "stages")},
+                "ms": round(entry["ms"], 1),
+                "stages": stages,
+            }
+        return {
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round((time.perf_counter() - self._started) * 1000, 1),
+            "stages": {
+                stage: {"n": count, "ms": round(ms, 1)}
+                for stage, (count, ms) in sorted(
+                    stage_totals.items(), key=lambda kv: -kv[1][1]
+                )
+            },
+            "endpoints": endpoints,
+        }
@@ -0,0 +1,97 @@
+"""ARQ worker for AI plan/workout generation.
+
+Runs queued generation jobs created by ``POST /api/v1/ai/jobs`` and a
+periodic sweep that enqueues off-peak scheduled jobs and recovers jobs that
+never reached (or fell out of) Redis.
+
+Usage:
+    # Start the worker
+    arq app.workers.ai_worker.WorkerSettings
+"""
+
+import logging
+from typing import Any
+
+from arq import cron
+
+from app.core.config import get_settings
+from app.core.database import async_session_maker
+from app.services.ai_generation import run_generation_job, sweep_generation_jobs
+from app.workers.strava_worker import get_redis_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+async def process_ai_generation(ctx: dict, job_id: int) -> dict[str, Any]:
+    """Process a single AI generation job.
+
+    Args:
+        ctx: ARQ context.
+        job_id: ID of the AIGenerationJob to process.
+
+    Returns:
+        Result dictionary with job status.
+    """
+    logger.info(f"Processing AI generation job {job_id}")
+    try:
+        return await run_generation_job(job_id, session_factory=ctx["session_factory"])
+    except Exception as e:
+        logger.exception(f"Error processing AI generation job {job_id}")
+        return {"success": False, "error": str(e)}
+
+
+async def sweep_ai_generation_jobs(ctx: dict) -> dict[str, int]:
+    """Enqueue due (off-peak/retry) jobs and recover stuck ones.
+
+    Args:
+        ctx: ARQ context (contains the Redis pool).
+
+    Returns:
+        Sweep statistics.
+    """
+    return await sweep_generation_jobs(
+        ctx["redis"], session_factory=ctx["session_factory"]
+    )
+
+
+async def startup(ctx: dict) -> None:
+    """Worker startup hook."""
+    # Share the application's engine pool; sessions are opened per phase
+    ctx["session_factory"] = async_session_maker
+    logger.info("AI generation worker starting up")
+
+
+async def shutdown(ctx: dict) -> None:
+    """Worker shutdown hook."""
+    logger.info("AI generation worker shutting down")
+
+
+class WorkerSettings:
+    """ARQ worker configuration."""
+
+    # Redis connection
+    redis_settings = get_redis_settings()
+
+    # Task functions
+    functions = [
+        process_ai_generation,
+        sweep_ai_generation_jobs,
+    ]
+
+    # Sweep every 5 minutes (picks up the off-peak batch once it is due)
+    cron_jobs = [
+        cron(sweep_ai_generation_jobs, minute=set(range(0, 60, 5)), unique=True),
+    ]
+
+    # Worker settings
+    on_startup = startup
+    on_shutdown = shutdown
+
+    # Job settings
+    max_jobs = settings.ai_generation_concurrency
+    job_timeout = settings.ai_generation_job_timeout_seconds
+    keep_result = 3600  # Keep results for 1 hour
+    queue_name = settings.ai_generation_queue_name
+    # Refresh the health-check key often: the API only enqueues while it exists
+    health_check_interval = 60
@@ -0,0 +1,125 @@
+"""ARQ worker for ingesting FIT files uploaded to R2.
+
+Processes ``analyze_fit`` jobs enqueued by ``POST /api/v1/upload/complete``:
+the file is streamed from R2, parsed and stored as samples/laps/metrics.
+Also runs the daily storage usage reconciliation (full bucket walk) and
+the hourly raw Garmin event archive job.
+
+Usage:
+    # Start the worker
+    arq app.workers.fit_worker.WorkerSettings
+"""
+
+import logging
+from typing import Any
+
+from arq import cron
+
+from app.core.config import get_settings
+from app.core.database import async_session_maker
+from app.services.fit_ingest import run_fit_ingest
+from app.services.raw_archive import archive_raw_events
+from app.services.storage_accounting import reconcile_storage_usage
+from app.workers.strava_worker import get_redis_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+async def analyze_fit(ctx: dict, activity_id: int, user_id: int) -> dict[str, Any]:
+    """Ingest an uploaded FIT file.
+
+    Args:
+        ctx: ARQ context.
+        activity_id: Activity the file was uploaded for.
+        user_id: Owner of the activity.
+
+    Returns:
+        Result dictionary with ingest status.
+    """
+    logger.info(f"Analyzing uploaded FIT for activity {activity_id}")
+    return await run_fit_ingest(
+        activity_id, user_id, session_factory=ctx["session_factory"]
+    )
+
+
+async def reconcile_storage(ctx: dict) -> dict[str, Any]:
+    """Rebuild the per-user storage usage counters from the bucket.
+
+    Args:
+        ctx: ARQ context.
+
+    Returns:
+        Reconciliation statistics.
+    """
+    try:
+        return await reconcile_storage_usage(session_factory=ctx["session_factory"])
+    except Exception as e:
+        logger.exception("Storage usage reconciliation failed")
+        return {"success": False, "error": str(e)}
+
+
+async def archive_raw(ctx: dict) -> dict[str, Any]:
+    """Compress inline raw Garmin events and move old ones to R2.
+
+    Args:
+        ctx: ARQ context.
+
+    Returns:
+        Archive statistics.
+    """
+    try:
+        return await archive_raw_events(session_factory=ctx["session_factory"])
+    except Exception as e:
+        logger.exception("Raw event archive failed")
+        return {"success": False, "error": str(e)}
+
+
+async def startup(ctx: dict) -> None:
+    """Worker startup hook."""
+    # Share one engine pool across jobs instead of an engine per job
+    ctx["session_factory"] = async_session_maker
+    logger.info("FIT ingest worker starting up")
+
+
+async def shutdown(ctx: dict) -> None:
+    """Worker shutdown hook."""
+    logger.info("FIT ingest worker shutting down")
+
+
+class WorkerSettings:
+    """ARQ worker configuration."""
+
+    # Redis connection
+    redis_settings = get_redis_settings()
+
+    # Task functions
+    functions = [
+        analyze_fit,
+        reconcile_storage,
+        archive_raw,
+    ]
+
+    # Counters are kept current on upload/delete; the walk only corrects drift
+    cron_jobs = [
+        cron(
+            reconcile_storage,
+            hour=settings.storage_reconcile_hour_utc,
+            minute=0,
+            unique=True,
+        ),
+        # Time-boxed; a large backlog is worked off over several runs
+        cron(archive_raw, minute=30, unique=True),
+    ]
+
+    # Worker settings
+    on_startup = startup
+    on_shutdown = shutdown
+
+    # Job settings
+    max_jobs = settings.fit_ingest_concurrency
+    job_timeout = settings.fit_ingest_job_timeout_seconds
+    keep_result = 3600  # Keep results for 1 hour
+    queue_name = settings.fit_ingest_queue_name
+    # Refresh the health-check key often: the API only enqueues while it exists
+    health_check_interval = 60
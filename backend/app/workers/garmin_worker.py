@@ -0,0 +1,131 @@
+"""ARQ worker for Garmin data sync.
+
+Runs ``sync_garmin_user`` jobs enqueued by ``POST /api/v1/ingest/run`` and
+a scheduler that enqueues incremental syncs for every connected user, so
+syncs never run inside the API workers. ``max_jobs`` bounds how many users
+are synced against Garmin at once.
+
+Usage:
+    # Start the worker
+    arq app.workers.garmin_worker.WorkerSettings
+"""
+
+import logging
+from datetime import date
+from typing import Any, Optional
+
+from arq import cron
+
+from app.adapters.garmin_pool import close_garmin_pool
+from app.core.config import get_settings
+from app.core.database import async_session_maker
+from app.observability import init_tracer_provider
+from app.services.garmin_sync_jobs import run_user_sync, schedule_garmin_syncs
+from app.workers.strava_worker import get_redis_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+async def sync_garmin_user(
+    ctx: dict,
+    user_id: int,
+    endpoints: Optional[list[str]] = None,
+    lock_owner: Optional[str] = None,
+    full_backfill: bool = False,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    force: bool = False,
+) -> dict[str, Any]:
+    """Sync one user's Garmin data.
+
+    Args:
+        ctx: ARQ context.
+        user_id: User ID to sync.
+        endpoints: Endpoints to sync (default: all, incrementally).
+        lock_owner: Sync lock taken by the API when the job was requested.
+        full_backfill: If True, sync all historical data.
+        start_date: Optional start date filter.
+        end_date: Optional end date filter.
+        force: If True, also sync endpoints that are not due yet.
+
+    Returns:
+        Run summary.
+    """
+    logger.info(f"Syncing Garmin data for user {user_id}")
+    try:
+        return await run_user_sync(
+            user_id,
+            endpoints=endpoints,
+            lock_owner=lock_owner,
+            full_backfill=full_backfill,
+            start_date=start_date,
+            end_date=end_date,
+            force=force,
+            session_factory=ctx["session_factory"],
+        )
+    except Exception as e:
+        logger.exception(f"Error syncing Garmin data for user {user_id}")
+        return {"success": False, "error": str(e)}
+
+
+async def schedule_syncs(ctx: dict) -> dict[str, int]:
+    """Enqueue incremental syncs for users that are due.
+
+    Args:
+        ctx: ARQ context (contains the Redis pool).
+
+    Returns:
+        Scheduler statistics.
+    """
+    try:
+        return await schedule_garmin_syncs(
+            ctx["redis"], session_factory=ctx["session_factory"]
+        )
+    except Exception:
+        logger.exception("Garmin sync scheduler failed")
+        return {"due": 0, "enqueued": 0}
+
+
+async def startup(ctx: dict) -> None:
+    """Worker startup hook."""
+    # Share one engine pool across jobs instead of an engine per job
+    ctx["session_factory"] = async_session_maker
+    init_tracer_provider()  # Sync stage spans (OTEL_ENABLED)
+    logger.info("Garmin sync worker starting up")
+
+
+async def shutdown(ctx: dict) -> None:
+    """Worker shutdown hook."""
+    await close_garmin_pool()  # Write refreshed Garmin sessions back
+    logger.info("Garmin sync worker shutting down")
+
+
+class WorkerSettings:
+    """ARQ worker configuration."""
+
+    # Redis connection
+    redis_settings = get_redis_settings()
+
+    # Task functions
+    functions = [
+        sync_garmin_user,
+        schedule_syncs,
+    ]
+
+    # Schedule every 10 minutes; users are only enqueued once they are due
+    cron_jobs = [
+        cron(schedule_syncs, minute=set(range(0, 60, 10)), unique=True),
+    ]
+
+    # Worker settings
+    on_startup = startup
+    on_shutdown = shutdown
+
+    # Job settings
+    max_jobs = settings.garmin_sync_concurrency
+    job_timeout = settings.garmin_sync_job_timeout_seconds
+    keep_result = 3600  # Keep results for 1 hour
+    queue_name = settings.garmin_sync_queue_name
+    # Refresh the health-check key often: the API only enqueues while it exists
+    health_check_interval = 60
@@ -13,18 +13,21 @@ Usage:
 
 import asyncio
 import logging
-from datetime import datetime, timezone
-from typing import Any
+import time
+from typing import Any, Optional
 
-from arq import create_pool
+from arq import cron
 from arq.connections import RedisSettings
-from sqlalchemy import select, and_
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import select
 
 from app.core.config import get_settings
+from app.core.database import async_session_maker
 from app.models.strava import StravaUploadJob, StravaUploadStatus
-from app.services.strava_upload import StravaUploadService
+from app.services.strava_upload import (
+    StravaUploadService,
+    close_strava_http_client,
+    enqueue_upload_jobs,
+)
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -43,13 +46,6 @@ def get_redis_settings() -> RedisSettings:
     )
 
 
-async def get_db_session() -> AsyncSession:
-    """Create a database session for worker tasks."""
-    engine = create_async_engine(settings.database_url, echo=settings.database_echo)
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-    return async_session()
-
-
 async def process_strava_upload(ctx: dict, job_id: int) -> dict[str, Any]:
     """Process a single Strava upload job.
 
@@ -62,7 +58,7 @@ async def process_strava_upload(ctx: dict, job_id: int) -> dict[str, Any]:
     """
     logger.info(f"Processing Strava upload job {job_id}")
 
-    async with await get_db_session() as db:
+    async with ctx["session_factory"]() as db:
         try:
             # Fetch job
             result = await db.execute(
@@ -98,11 +94,27 @@ async def process_strava_upload(ctx: dict, job_id: int) -> dict[str, Any]:
             return {"success": False, "error": str(e)}
 
 
+async def _run_job(session_factory: Any, job_id: int) -> Optional[bool]:
+    """Process one job on its own session; None means deferred by the rate limit."""
+    async with session_factory() as db:
+        job = await db.get(StravaUploadJob, job_id)
+        if job is None:
+            return False
+        upload_service = StravaUploadService(db)
+        success = await upload_service.process_job(job)
+        return None if upload_service.deferred else success
+
+
 async def process_pending_uploads(ctx: dict) -> dict[str, Any]:
-    """Process all pending Strava upload jobs.
+    """Drain pending Strava upload jobs.
 
-    This is a scheduled task that runs periodically to process
-    any pending upload jobs that are ready for retry.
+    This is a scheduled task that runs periodically. Ready jobs are
+    uploaded concurrently (STRAVA_UPLOAD_CONCURRENCY at a time, each on its
+    own session) in rounds until the queue is empty, the Strava rate limit
+    budget runs out, or STRAVA_UPLOAD_DRAIN_SECONDS have passed; the deadline
+    is checked before each claim, so no job is started late. The shared
+    rate limiter paces the requests, so a large backlog drains at the rate
+    Strava allows.
 
     Args:
         ctx: ARQ context.
@@ -112,57 +124,63 @@ async def process_pending_uploads(ctx: dict) -> dict[str, Any]:
     """
     logger.info("Starting pending uploads processor")
 
-    processed = 0
-    succeeded = 0
-    failed = 0
-
-    async with await get_db_session() as db:
-        try:
-            upload_service = StravaUploadService(db)
-
-            # Get pending jobs (respecting concurrency limit)
-            jobs = await upload_service.get_pending_jobs(
-                limit=settings.strava_upload_concurrency
-            )
-
-            if not jobs:
-                logger.debug("No pending upload jobs")
-                return {"processed": 0, "succeeded": 0, "failed": 0}
-
-            for job in jobs:
-                try:
-                    success = await upload_service.process_job(job)
-                    processed += 1
-                    if success:
-                        succeeded += 1
-                    else:
-                        failed += 1
-
-                    # Small delay between uploads to avoid rate limiting
-                    await asyncio.sleep(1)
-
-                except Exception as e:
-                    logger.exception(f"Error processing job {job.id}")
-                    failed += 1
-
-        except Exception as e:
-            logger.exception("Error in pending uploads processor")
+    session_factory = ctx["session_factory"]
+    stats = {"processed": 0, "succeeded": 0, "failed": 0, "deferred": 0, "skipped": 0}
+    semaphore = asyncio.Semaphore(settings.strava_upload_concurrency)
+    deadline = time.monotonic() + settings.strava_upload_drain_seconds
+
+    async def _bounded(job_id: int) -> None:
+        async with semaphore:
+            # Checked before every claim: a round can outlast the drain window
+            if time.monotonic() >= deadline:
+                stats["skipped"] += 1  # Still queued; the next run picks it up
+                return
+            try:
+                outcome = await _run_job(session_factory, job_id)
+            except Exception:
+                logger.exception(f"Error processing job {job_id}")
+                outcome = False
+        if outcome is None:
+            stats["deferred"] += 1
+            return
+        stats["processed"] += 1
+        stats["succeeded" if outcome else "failed"] += 1
+
+    try:
+        while time.monotonic() < deadline:
+            async with session_factory() as db:
+                job_ids = await StravaUploadService(db).get_pending_job_ids(
+                    limit=settings.strava_upload_batch_size
+                )
+            if not job_ids:
+                break
+
+            await asyncio.gather(*(_bounded(job_id) for job_id in job_ids))
+
+            if stats["deferred"]:
+                break  # Budget exhausted; remaining jobs wait for the window to reset
+
+    except Exception:
+        logger.exception("Error in pending uploads processor")
 
     logger.info(
-        f"Pending uploads processor complete: "
-        f"processed={processed}, succeeded={succeeded}, failed={failed}"
+        "Pending uploads processor complete: "
+        + ", ".join(f"{key}={value}" for key, value in stats.items())
     )
 
-    return {"processed": processed, "succeeded": succeeded, "failed": failed}
+    return stats
 
 
 async def startup(ctx: dict) -> None:
     """Worker startup hook."""
+    # Share one engine pool across jobs instead of an engine per job
+    ctx["session_factory"] = async_session_maker
     logger.info("Strava worker starting up")
 
 
 async def shutdown(ctx: dict) -> None:
     """Worker shutdown hook."""
+    await close_strava_http_client()
     logger.info("Strava worker shutting down")
 
 
@@ -180,12 +198,8 @@ class WorkerSettings:
 
     # Scheduled tasks (cron jobs)
     cron_jobs = [
-        # Process pending uploads every 2 minutes
-        {
-            "coroutine": process_pending_uploads,
-            "minute": {0, 2, 4, 6, 8, 10, 12, 14, 16, 18, 20, 22, 24, 26, 28, 30, 32, 34, 36, 38, 40, 42, 44, 46, 48, 50, 52, 54, 56, 58},
-            "unique": True,
-        },
+        # Drain pending uploads every 2 minutes
+        cron(process_pending_uploads, minute=set(range(0, 60, 2)), unique=True),
     ]
 
     # Worker settings
@@ -196,7 +210,7 @@ class WorkerSettings:
     max_jobs = settings.strava_upload_concurrency
     job_timeout = 300  # 5 minutes per job
     keep_result = 3600  # Keep results for 1 hour
-    queue_name = "strava_uploads"
+    queue_name = settings.strava_upload_queue_name
 
 
 async def enqueue_upload_job(job_id: int) -> None:
@@ -208,6 +222,4 @@ async def enqueue_upload_job(job_id: int) -> None:
     Args:
         job_id: ID of the StravaUploadJob to process.
     """
-    redis = await create_pool(get_redis_settings())
-    await redis.enqueue_job("process_strava_upload", job_id)
-    await redis.close()
+    await enqueue_upload_jobs([job_id])
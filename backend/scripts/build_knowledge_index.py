@@ -4,17 +4,33 @@
 This script loads markdown documents from the knowledge/documents directory,
 splits them into chunks, generates embeddings, and saves the index.
 
+Builds are incremental: chunks are keyed by a hash of their normalized
+content, vectors for unchanged chunks are reused from the existing index,
+and only new or edited chunks are embedded. Running API workers pick up the
+new index automatically (see RAG_INDEX_RELOAD_INTERVAL_SECONDS).
+
 Usage:
     python scripts/build_knowledge_index.py
 
+    # Re-embed every chunk (e.g. after changing chunking rules)
+    python scripts/build_knowledge_index.py --full
+
+    # Tune embedding request batching
+    python scripts/build_knowledge_index.py --batch-size 50 --concurrency 8
+
+    # Build with the local CPU model (no API key or network needed once
+    # the model is cached; set EMBEDDING_PROVIDER=local on the API too)
+    python scripts/build_knowledge_index.py --provider local
+
 Environment variables:
     GOOGLE_AI_API_KEY: Required for Google embeddings (default)
     OPENAI_API_KEY: Required if using OpenAI embeddings
-    EMBEDDING_PROVIDER: "google" (default) or "openai"
+    EMBEDDING_PROVIDER: "google" (default), "openai" or "local"
+    LOCAL_EMBEDDING_MODEL: Model for local embeddings (fastembed name)
 """
 
+import argparse
 import asyncio
-import json
 import os
 import sys
 from pathlib import Path
@@ -33,19 +49,23 @@ try:
 except ImportError:
     print("Warning: python-dotenv not installed. Using system environment variables only.")
 
-import numpy as np
 
-
-async def main() -> None:
+async def main(full: bool, batch_size: int, concurrency: int, provider: str | None) -> None:
     """Build the knowledge base index."""
+    from app.knowledge.index_builder import build_index_incremental
     from app.knowledge.loader import load_documents
-    from app.knowledge.embeddings import generate_embeddings
 
     # Get configuration from environment
-    provider = os.environ.get("EMBEDDING_PROVIDER", "google")
+    provider = provider or os.environ.get("EMBEDDING_PROVIDER", "google")
     api_key = None
 
-    if provider == "google":
+    if provider == "local":
+        from app.knowledge.local_embeddings import DEFAULT_LOCAL_MODEL
+
+        model = os.environ.get("LOCAL_EMBEDDING_MODEL", DEFAULT_LOCAL_MODEL)
+        # One model call at a time; the model parallelizes internally
+        concurrency = 1
+    elif provider == "google":
         api_key = os.environ.get("GOOGLE_AI_API_KEY")
         if not api_key:
             print("Error: GOOGLE_AI_API_KEY environment variable is required")
@@ -81,48 +101,56 @@ async def main() -> None:
 
     print(f"Loaded {len(chunks)} chunks from documents")
 
-    # Show chunk summary
-    sources = {}
-    for chunk in chunks:
-        sources[chunk.source] = sources.get(chunk.source, 0) + 1
-
-    print("\nChunks per file:")
-    for source, count in sorted(sources.items()):
-        print(f"  {source}: {count} chunks")
-
-    # Generate embeddings
-    print(f"\nGenerating embeddings with {provider} ({model})...")
-    texts = [chunk.content for chunk in chunks]
+    # Generate embeddings (only for new or changed chunks)
+    print(f"\nUpdating index with {provider} ({model})...")
 
     try:
-        embeddings = await generate_embeddings(
-            texts=texts,
+        stats = await build_index_incremental(
+            chunks,
+            index_dir=index_dir,
             provider=provider,
             api_key=api_key,
             model=model,
+            batch_size=batch_size,
+            concurrency=concurrency,
+            full=full,
         )
     except Exception as e:
         print(f"Error generating embeddings: {e}")
         sys.exit(1)
 
-    print(f"Generated embeddings: shape={embeddings.shape}")
-
-    # Save chunks as JSON
-    chunks_path = index_dir / "chunks.json"
-    chunks_data = [chunk.model_dump() for chunk in chunks]
-    with open(chunks_path, "w", encoding="utf-8") as f:
-        json.dump(chunks_data, f, ensure_ascii=False, indent=2)
-    print(f"Saved chunks to: {chunks_path}")
-
-    # Save embeddings as numpy array
-    embeddings_path = index_dir / "embeddings.npy"
-    np.save(embeddings_path, embeddings)
-    print(f"Saved embeddings to: {embeddings_path}")
+    print("\nChunks per file:")
+    for source, count in sorted(stats.sources.items()):
+        print(f"  {source}: {count} chunks")
 
     print("\nIndex built successfully!")
-    print(f"Total chunks: {len(chunks)}")
-    print(f"Embedding dimension: {embeddings.shape[1]}")
+    print(f"Total chunks: {stats.total_chunks}")
+    print(f"Reused embeddings: {stats.reused_chunks}")
+    print(f"New embeddings: {stats.embedded_chunks}")
+    print(f"Removed chunks: {stats.removed_chunks}")
+    if stats.full_rebuild:
+        print("(full rebuild: no reusable vectors for this provider/model)")
+    print(f"Embedding dimension: {stats.embedding_dim}")
+    print(f"Index directory: {index_dir}")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Build the RAG knowledge index")
+    parser.add_argument("--full", action="store_true", help="Re-embed all chunks, ignoring stored vectors")
+    parser.add_argument("--batch-size", type=int, default=100, help="Texts per embedding request")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent embedding requests")
+    parser.add_argument(
+        "--provider",
+        choices=["google", "openai", "local"],
+        help="Embedding provider (overrides EMBEDDING_PROVIDER)",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(
+        main(
+            full=args.full,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            provider=args.provider,
+        )
+    )
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""Stream archived raw Garmin events back out for reprocessing.
+
+Events are read in id order from whichever tier holds them (inline JSONB,
+compressed body, or the R2 cold tier) and written as JSON lines:
+
+    {"id": ..., "user_id": ..., "endpoint": ..., "fetched_at": ..., "payload": {...}}
+
+Only one batch is held in memory, so the whole archive can be piped into a
+rebuild without materializing it.
+
+Usage:
+    python scripts/export_raw_events.py --user-id 1 --endpoint sleep > sleep.jsonl
+    python scripts/export_raw_events.py --endpoint activity_details/ --since 2025-01-01 -o details.jsonl
+"""
+
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.raw_archive import iter_raw_events
+
+
+async def export(args, out) -> int:
+    """Write matching events to ``out``; returns the number written."""
+    since = None
+    if args.since:
+        since = datetime.fromisoformat(args.since)
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+
+    count = 0
+    async for event, payload in iter_raw_events(
+        user_id=args.user_id,
+        endpoint=args.endpoint,
+        since=since,
+        batch_size=args.batch_size,
+    ):
+        out.write(json.dumps({
+            "id": event.id,
+            "user_id": event.user_id,
+            "endpoint": event.endpoint,
+            "fetched_at": event.fetched_at.isoformat(),
+            "payload": payload,
+        }, ensure_ascii=False, default=str))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def main():
+    """Main entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export raw Garmin events as JSON lines")
+    parser.add_argument("--user-id", type=int, help="Only this user's events")
+    parser.add_argument("--endpoint", help="Endpoint name; a trailing '/' matches a prefix")
+    parser.add_argument("--since", help="Only events fetched at or after this ISO date/time")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    args = parser.parse_args()
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        count = asyncio.run(export(args, out))
+    finally:
+        if args.output:
+            out.close()
+    print(f"Exported {count} raw events", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
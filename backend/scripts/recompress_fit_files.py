@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""Recompress stored FIT files with zstd and a trained dictionary.
+
+This script:
+1. Optionally trains a new dictionary on recent FIT files and makes it active
+2. Walks activities in id order and rewrites R2 objects and DB blobs that
+   are not yet compressed with the active dictionary
+3. Reports the storage saved
+
+Safe to stop and re-run: objects already using the active dictionary are
+skipped, and --after-id resumes from a given activity.
+
+Requires FIT_COMPRESSION_CODEC=zstd and the optional ``zstandard`` package.
+
+Usage:
+    python scripts/recompress_fit_files.py --train
+    python scripts/recompress_fit_files.py --after-id 12000
+"""
+
+import asyncio
+import os
+import sys
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import get_settings
+from app.core.database import async_session_maker
+from app.services.fit_compression import train_dictionary, zstd_available
+from app.services.fit_recompress import collect_training_samples, recompress_batch
+from app.services.r2_storage import get_r2_service
+
+
+async def train(samples: int) -> None:
+    """Train and activate a new dictionary."""
+    async with async_session_maker() as db:
+        files = await collect_training_samples(db, samples)
+        print(f"Collected {len(files)} sample FIT files")
+        row = await train_dictionary(db, files, note=f"{len(files)} recent activities")
+        print(f"Active dictionary: {row.dict_id} ({len(row.content)} bytes)")
+
+
+async def recompress(after_id: int, batch_size: int, concurrency: int) -> None:
+    """Recompress everything after the given activity id."""
+    r2 = get_r2_service()
+    totals = {"recompressed": 0, "skipped": 0, "failed": 0, "bytes_before": 0, "bytes_after": 0}
+
+    while True:
+        async with async_session_maker() as db:
+            stats = await recompress_batch(
+                db, r2, after_id=after_id, limit=batch_size, concurrency=concurrency
+            )
+        if stats["scanned"] == 0:
+            break
+        after_id = stats["last_id"]
+        for key in totals:
+            totals[key] += stats[key]
+        print(
+            f"... up to activity {after_id}: {totals['recompressed']} recompressed, "
+            f"{totals['skipped']} current, {totals['failed']} failed"
+        )
+
+    saved = totals["bytes_before"] - totals["bytes_after"]
+    print("\nDone")
+    print(f"  Recompressed: {totals['recompressed']}")
+    print(f"  Already current: {totals['skipped']}")
+    print(f"  Failed: {totals['failed']}")
+    if totals["bytes_before"]:
+        print(
+            f"  Size: {totals['bytes_before'] / 1024 / 1024:.1f} MB -> "
+            f"{totals['bytes_after'] / 1024 / 1024:.1f} MB "
+            f"({saved / totals['bytes_before'] * 100:.1f}% saved)"
+        )
+
+
+def main():
+    """Main entry point."""
+    import argparse
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Recompress stored FIT files with zstd")
+    parser.add_argument("--train", action="store_true", help="Train and activate a new dictionary first")
+    parser.add_argument("--samples", type=int, default=2000, help="FIT files to train on")
+    parser.add_argument("--train-only", action="store_true", help="Train without recompressing")
+    parser.add_argument("--after-id", type=int, default=0, help="Resume after this activity id")
+    parser.add_argument("--batch-size", type=int, default=settings.fit_recompress_batch_size)
+    parser.add_argument("--concurrency", type=int, default=settings.fit_recompress_concurrency)
+    args = parser.parse_args()
+
+    if not zstd_available():
+        sys.exit("The 'zstandard' package is required: pip install zstandard")
+
+    async def run() -> None:
+        # One event loop for both steps: the engine's pooled connections are loop-bound
+        if args.train or args.train_only:
+            await train(args.samples)
+        if not args.train_only:
+            await recompress(args.after_id, args.batch_size, args.concurrency)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
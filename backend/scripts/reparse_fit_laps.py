@@ -18,6 +18,7 @@ from sqlalchemy import select, delete
 from app.adapters.garmin_adapter import GarminConnectAdapter
 from app.core.database import async_session_maker
 from app.models.activity import Activity, ActivityLap
+from app.services.fit_blob_store import get_fit_blob_store
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
@@ -26,6 +27,7 @@ logger = logging.getLogger(__name__)
 async def reparse_fit_laps():
     """Re-parse all FIT files and store laps."""
     adapter = GarminConnectAdapter()
+    store = get_fit_blob_store()
 
     async with async_session_maker() as session:
         # Get all activities with FIT files
@@ -51,19 +53,13 @@ async def reparse_fit_laps():
                     skipped += 1
                     continue
 
-                # Read and parse FIT file
-                fit_path = Path(activity.fit_file_path)
-                if not fit_path.is_absolute():
-                    fit_path = Path(__file__).parent.parent / fit_path
-
-                if not fit_path.exists():
-                    logger.warning(f"FIT file not found: {fit_path}")
+                # Read FIT file from whichever storage tier has it
+                fit_data = await store.get(session, activity)
+                if fit_data is None:
+                    logger.warning(f"FIT file not found for activity {activity.id}")
                     errors += 1
                     continue
 
-                with open(fit_path, "rb") as f:
-                    fit_data = f.read()
-
                 parsed_data = adapter.parse_fit_file(fit_data)
 
                 # Store laps
@@ -0,0 +1,193 @@
+"""Tests for queued AI plan/workout generation jobs."""
+
+import json
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, patch
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.ai import AIConversation, AIGenerationJob, AIGenerationStatus, AIMessage
+from app.models.user import User
+from app.services.ai_generation import next_offpeak_run, run_generation_job
+
+
+async def _queued_job(db: AsyncSession, user: User, mode: str = "workout") -> AIGenerationJob:
+    conversation = AIConversation(user_id=user.id, title="gen", context_data={})
+    db.add(conversation)
+    await db.flush()
+    job = AIGenerationJob(
+        user_id=user.id,
+        conversation_id=conversation.id,
+        mode=mode,
+        status=AIGenerationStatus.QUEUED.value,
+        stage="queued",
+        attempts=0,
+        request_message="인터벌 워크아웃 만들어줘",
+    )
+    db.add(job)
+    await db.commit()
+    return job
+
+
+def _provider(content: str) -> AsyncMock:
+    return AsyncMock(return_value={"content": content, "tokens": 42})
+
+
+class TestGenerationJobs:
+    """Test suite for run_generation_job."""
+
+    def test_next_offpeak_run_is_in_future(self):
+        """The off-peak slot is always after now, at the configured hour."""
+        now = datetime(2026, 10, 18, 20, 0, tzinfo=timezone.utc)
+        with patch("app.services.ai_generation.settings") as mock_settings:
+            mock_settings.ai_generation_offpeak_hour_utc = 18
+            run_at = next_offpeak_run(now)
+        assert run_at == datetime(2026, 10, 19, 18, 0, tzinfo=timezone.utc)
+
+    async def test_workout_job_succeeds_and_saves_turn(
+        self, async_engine, db_session: AsyncSession, test_user: User
+    ):
+        """A successful job stores the chat response and both messages."""
+        job = await _queued_job(db_session, test_user)
+        factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+        payload = {
+            "status": "workout",
+            "assistant_message": "워크아웃을 만들었어요.",
+            "workout": {"name": "6x800m", "type": "interval", "steps": []},
+        }
+
+        with patch(
+            "app.api.v1.endpoints.ai._complete_prompt", new=_provider(json.dumps(payload))
+        ), patch("app.api.v1.endpoints.ai.settings.rag_enabled", False):
+            result = await run_generation_job(job.id, session_factory=factory)
+
+        assert result["success"] is True
+        await db_session.refresh(job)
+        assert job.status == AIGenerationStatus.SUCCEEDED.value
+        assert job.attempts == 1
+        assert job.result["workout"]["name"] == "6x800m"
+        assert job.result["reply"]["content"] == "워크아웃을 만들었어요."
+
+        messages = await db_session.execute(
+            select(AIMessage).where(AIMessage.conversation_id == job.conversation_id)
+        )
+        assert len(messages.scalars().all()) == 2
+
+        # A duplicate delivery does not run the job again
+        again = await run_generation_job(job.id, session_factory=factory)
+        assert again["status"] == AIGenerationStatus.SUCCEEDED.value
+
+    async def test_invalid_response_is_retried_then_failed(
+        self, async_engine, db_session: AsyncSession, test_user: User
+    ):
+        """Bad provider output requeues with backoff until attempts run out."""
+        job = await _queued_job(db_session, test_user)
+        factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+        with patch(
+            "app.api.v1.endpoints.ai._complete_prompt", new=_provider("not json")
+        ), patch("app.api.v1.endpoints.ai.settings.rag_enabled", False), patch(
+            "app.services.ai_generation.settings.ai_generation_max_attempts", 2
+        ):
+            await run_generation_job(job.id, session_factory=factory)
+            await db_session.refresh(job)
+            assert job.status == AIGenerationStatus.QUEUED.value
+            assert job.scheduled_for is not None
+
+            await run_generation_job(job.id, session_factory=factory)
+            await db_session.refresh(job)
+
+        assert job.status == AIGenerationStatus.FAILED.value
+        assert job.attempts == 2
+        assert "not valid JSON" in job.error_message
+
+    async def test_retry_after_import_reuses_the_plan(
+        self, async_engine, db_session: AsyncSession, test_user: User
+    ):
+        """A failure after the plan import committed does not import it twice."""
+        from app.models.plan import Plan
+
+        job = await _queued_job(db_session, test_user, mode="plan")
+        factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+        payload = {
+            "status": "plan",
+            "assistant_message": "플랜을 만들었어요.",
+            "plan": {
+                "plan_name": "Sub-3",
+                "goal_type": "marathon",
+                "weeks": [{"week_number": 1, "focus": "build", "workouts": []}],
+            },
+        }
+        save_turn = AsyncMock(side_effect=RuntimeError("connection lost"))
+
+        with patch(
+            "app.api.v1.endpoints.ai._complete_prompt", new=_provider(json.dumps(payload))
+        ), patch("app.api.v1.endpoints.ai.settings.rag_enabled", False):
+            with patch("app.api.v1.endpoints.ai._save_chat_turn", new=save_turn):
+                await run_generation_job(job.id, session_factory=factory)
+            await db_session.refresh(job)
+            assert job.status == AIGenerationStatus.QUEUED.value
+
+            result = await run_generation_job(job.id, session_factory=factory)
+
+        assert result["success"] is True
+        plans = await db_session.execute(select(Plan).where(Plan.user_id == test_user.id))
+        assert [plan.id for plan in plans.scalars().all()] == [result["plan_id"]]
+
+
+class _FakePool:
+    """ARQ pool stub recording enqueued jobs."""
+
+    def __init__(self, keys=()):
+        self.keys = set(keys)
+        self.jobs = []
+
+    async def exists(self, key):
+        return int(key in self.keys)
+
+    async def enqueue_job(self, function, *args, **kwargs):
+        self.jobs.append((function, args, kwargs))
+        return object()
+
+
+class TestCreateGenerationJob:
+    """Test suite for handing generation jobs to the AI worker."""
+
+    async def _create(self, db: AsyncSession, user: User, pool: _FakePool, **fields):
+        from fastapi import BackgroundTasks
+
+        from app.api.v1.endpoints.ai import GenerationJobCreate, create_generation_job
+
+        background_tasks = BackgroundTasks()
+        request = GenerationJobCreate(message="플랜 만들어줘", mode="plan", **fields)
+        with patch("app.api.v1.endpoints.ai.get_arq_pool", new=AsyncMock(return_value=pool)):
+            response = await create_generation_job(request, user, background_tasks, db)
+        return response, background_tasks
+
+    async def test_runs_in_process_without_a_live_worker(
+        self, db_session: AsyncSession, test_user: User
+    ):
+        """No worker health check: generate here, even when off-peak was asked."""
+        pool = _FakePool()
+        response, background_tasks = await self._create(
+            db_session, test_user, pool, off_peak=True
+        )
+
+        assert pool.jobs == []
+        assert response.scheduled_for is None
+        assert [task.func for task in background_tasks.tasks] == [run_generation_job]
+        assert background_tasks.tasks[0].args == (response.job_id,)
+
+    async def test_enqueued_when_the_worker_is_alive(
+        self, db_session: AsyncSession, test_user: User
+    ):
+        """A live worker gets the job and nothing runs in the API process."""
+        pool = _FakePool(keys={"ai_generation:health-check"})
+        response, background_tasks = await self._create(db_session, test_user, pool)
+
+        assert background_tasks.tasks == []
+        function, args, kwargs = pool.jobs[0]
+        assert function == "process_ai_generation"
+        assert args == (response.job_id,)
+        assert kwargs["_queue_name"] == "ai_generation"
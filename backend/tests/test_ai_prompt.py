@@ -0,0 +1,190 @@
+"""Tests for token-budgeted AI prompt assembly."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from google.api_core import exceptions as google_exceptions
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ai import AIConversation, AIMessage
+from app.models.user import User
+from app.services import ai_prompt
+from app.services.ai_prompt import (
+    HISTORY_SUMMARY_KEY,
+    assemble_prompt,
+    count_tokens,
+    get_context_block,
+    get_gemini_model,
+    truncate_to_tokens,
+)
+
+
+async def _conversation_with_messages(
+    db: AsyncSession, user: User, count: int
+) -> AIConversation:
+    conversation = AIConversation(user_id=user.id, title="test", context_data={})
+    db.add(conversation)
+    await db.flush()
+    for i in range(count):
+        db.add(
+            AIMessage(
+                conversation_id=conversation.id,
+                role="user" if i % 2 == 0 else "assistant",
+                content=f"message {i} " + "페이스 " * 20,
+            )
+        )
+    await db.flush()
+    return conversation
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.data: dict[str, str] = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+
+
+class TestTokenCounting:
+    """Test suite for token helpers."""
+
+    def test_truncate_respects_budget(self):
+        """Truncated text never exceeds the requested token count."""
+        text = "인터벌 훈련 " * 200
+        truncated = truncate_to_tokens(text, 50)
+        assert count_tokens(truncated) <= 50
+        assert truncate_to_tokens("short", 50) == "short"
+
+
+class TestAssemblePrompt:
+    """Test suite for assemble_prompt."""
+
+    async def test_older_turns_are_summarized_once(
+        self, db_session: AsyncSession, test_user: User
+    ):
+        """Turns beyond the verbatim window are folded into a stored summary."""
+        conversation = await _conversation_with_messages(db_session, test_user, 20)
+
+        with patch(
+            "app.services.ai_prompt._summarize",
+            new=AsyncMock(return_value=("- 목표: 서브3", 10)),
+        ) as mock_summarize, patch(
+            "app.services.ai_prompt.get_redis", new=AsyncMock(return_value=None)
+        ), patch("app.services.ai_prompt.settings") as mock_settings:
+            mock_settings.ai_history_verbatim_messages = 4
+            mock_settings.ai_history_summary_min_messages = 4
+            mock_settings.ai_max_history_messages = 20
+            mock_settings.ai_prompt_max_input_tokens = 100_000
+            mock_settings.ai_context_max_tokens = 1000
+
+            prompt = await assemble_prompt(
+                db_session, conversation, "다음 주 계획은?", "SYSTEM", context={"weekly_km": 50}
+            )
+            assert mock_summarize.await_count == 1
+            assert len(prompt.history) == 4
+            assert prompt.history_summary == "- 목표: 서브3"
+            stored = conversation.context_data[HISTORY_SUMMARY_KEY]
+            assert stored["text"] == "- 목표: 서브3"
+
+            # Second turn: nothing new to summarize
+            await assemble_prompt(db_session, conversation, "좋아요", "SYSTEM")
+            assert mock_summarize.await_count == 1
+
+    async def test_prompt_is_trimmed_to_budget(
+        self, db_session: AsyncSession, test_user: User
+    ):
+        """History and knowledge are trimmed so the total fits the budget."""
+        conversation = await _conversation_with_messages(db_session, test_user, 6)
+
+        with patch(
+            "app.services.ai_prompt.get_redis", new=AsyncMock(return_value=None)
+        ), patch("app.services.ai_prompt.settings") as mock_settings:
+            mock_settings.ai_history_verbatim_messages = 10
+            mock_settings.ai_history_summary_min_messages = 10
+            mock_settings.ai_max_history_messages = 20
+            mock_settings.ai_prompt_max_input_tokens = 120
+            mock_settings.ai_context_max_tokens = 1000
+
+            prompt = await assemble_prompt(
+                db_session,
+                conversation,
+                "질문",
+                "SYSTEM",
+                knowledge="참고 " * 200,
+            )
+
+        assert prompt.total_tokens <= 120
+        assert len(prompt.history) == 1
+        assert count_tokens(prompt.knowledge) < count_tokens("참고 " * 200)
+
+    async def test_context_is_only_built_on_a_cache_miss(
+        self, db_session: AsyncSession, test_user: User
+    ):
+        """The cache key comes from the sync watermark, not the built context."""
+        redis = FakeRedis()
+        build = AsyncMock(return_value={"weekly_km": 50})
+
+        with patch("app.services.ai_prompt.get_redis", new=AsyncMock(return_value=redis)):
+            first = await get_context_block(db_session, test_user.id, build)
+            second = await get_context_block(db_session, test_user.id, build)
+
+        assert first == second == '{"weekly_km":50}'
+        assert build.await_count == 1
+
+    async def test_empty_context_is_not_cached(
+        self, db_session: AsyncSession, test_user: User
+    ):
+        """A context that isn't available yet is rebuilt on the next turn."""
+        redis = FakeRedis()
+        build = AsyncMock(side_effect=[None, {"weekly_km": 50}])
+
+        with patch("app.services.ai_prompt.get_redis", new=AsyncMock(return_value=redis)):
+            first = await get_context_block(db_session, test_user.id, build)
+            second = await get_context_block(db_session, test_user.id, build)
+
+        assert first == ""
+        assert second == '{"weekly_km":50}'
+        assert build.await_count == 2
+
+
+class TestGeminiProviderCache:
+    """Test suite for Gemini CachedContent fallbacks."""
+
+    async def _model_after_failure(self, error: Exception, monkeypatch) -> MagicMock:
+        create = MagicMock(side_effect=error)
+        monkeypatch.setattr(ai_prompt, "_provider_cache", {})
+        monkeypatch.setattr(ai_prompt, "_provider_cache_unsupported", set())
+        monkeypatch.setattr(ai_prompt, "_provider_cache_retry_at", {})
+        with patch("google.generativeai.caching.CachedContent.create", create):
+            await get_gemini_model("SYSTEM")
+            await get_gemini_model("SYSTEM")
+        return create
+
+    async def test_client_error_disables_caching(self, monkeypatch):
+        """A 4xx refusal is remembered; the prompt is not uploaded again."""
+        create = await self._model_after_failure(
+            google_exceptions.InvalidArgument("too few tokens"), monkeypatch
+        )
+        assert create.call_count == 1
+        assert len(ai_prompt._provider_cache_unsupported) == 1
+
+    async def test_transient_error_is_retried_later(self, monkeypatch):
+        """Server errors and rate limits back off instead of disabling caching."""
+        create = await self._model_after_failure(
+            google_exceptions.TooManyRequests("slow down"), monkeypatch
+        )
+        assert create.call_count == 1
+        assert not ai_prompt._provider_cache_unsupported
+
+        ai_prompt._provider_cache_retry_at.update(
+            {key: 0.0 for key in ai_prompt._provider_cache_retry_at}
+        )
+        with patch(
+            "google.generativeai.caching.CachedContent.create",
+            MagicMock(side_effect=google_exceptions.ServiceUnavailable("down")),
+        ) as retried:
+            await get_gemini_model("SYSTEM")
+        assert retried.call_count == 1
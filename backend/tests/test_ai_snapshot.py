@@ -0,0 +1,208 @@
+"""Tests for incrementally maintained AI training snapshot aggregates."""
+
+import json
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.activity import Activity
+from app.models.ai_snapshot import AITrainingWeekAggregate
+from app.models.user import User
+from app.services.ai_snapshot import (
+    ensure_ai_training_snapshot,
+    get_window_totals,
+    refresh_week_aggregates,
+)
+
+
+async def _add_activity(
+    db: AsyncSession,
+    user: User,
+    garmin_id: int,
+    day: date,
+    distance_m: float,
+    duration_s: int,
+    avg_hr: int | None = 150,
+    updated_at: datetime | None = None,
+) -> Activity:
+    activity = Activity(
+        user_id=user.id,
+        garmin_id=garmin_id,
+        activity_type="running",
+        start_time=datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+        + timedelta(hours=7),
+        distance_meters=distance_m,
+        duration_seconds=duration_s,
+        avg_hr=avg_hr,
+    )
+    if updated_at is not None:
+        activity.updated_at = updated_at
+    db.add(activity)
+    await db.flush()
+    return activity
+
+
+class TestWeekAggregates:
+    """Test suite for per-week snapshot aggregates."""
+
+    async def test_window_totals_match_raw_activities(
+        self, db_session: AsyncSession, test_user: User
+    ):
+        """Combining weeks plus partial edges equals a direct scan."""
+        today = date(2026, 10, 15)  # Thursday
+        rows = [
+            (1, today, 10000, 3000, 150),
+            (2, today - timedelta(days=1), 5000, 1800, None),
+            (3, today - timedelta(days=9), 21100, 6300, 145),
+            (4, today - timedelta(days=20), 8000, 2400, 160),
+            (5, today - timedelta(days=41), 12000, 3900, 148),  # first day of 6-week window
+            (6, today - timedelta(days=42), 15000, 5000, 150),  # just outside
+        ]
+        for garmin_id, day, dist, dur, hr in rows:
+            await _add_activity(db_session, test_user, garmin_id, day, dist, dur, hr)
+
+        assert await refresh_week_aggregates(db_session, test_user.id) > 0
+
+        totals = await get_window_totals(
+            db_session, test_user.id, today - timedelta(days=41), today
+        )
+
+        inside = [r for r in rows if r[1] >= today - timedelta(days=41)]
+        assert totals.activity_count == len(inside)
+        assert totals.total_distance_m == sum(r[2] for r in inside)
+        assert totals.total_duration_s == sum(r[3] for r in inside)
+        assert totals.long_run_max_m == 21100
+        assert totals.active_days == len({r[1] for r in inside})
+        assert totals.missing_hr_count == 1
+        assert totals.pace_count == len(inside)
+
+    async def test_refresh_is_noop_when_unchanged(
+        self, db_session: AsyncSession, test_user: User
+    ):
+        """A second refresh without changes recomputes nothing.
+
+        Timestamps are set explicitly so the watermark compares equal to the
+        activity that set it, as it does on PostgreSQL.
+        """
+        synced_at = datetime(2026, 10, 2, 6, 0, tzinfo=timezone.utc)
+        await _add_activity(
+            db_session, test_user, 1, date(2026, 10, 1), 10000, 3000, updated_at=synced_at
+        )
+        await _add_activity(
+            db_session, test_user, 2, date(2026, 9, 1), 8000, 2400, updated_at=synced_at
+        )
+        assert await refresh_week_aggregates(db_session, test_user.id) == 2
+
+        assert await refresh_week_aggregates(db_session, test_user.id) == 0
+        assert not db_session.new and not db_session.dirty and not db_session.deleted
+
+    async def test_same_timestamp_activity_is_picked_up(
+        self, db_session: AsyncSession, test_user: User
+    ):
+        """An activity sharing the watermark timestamp is ordered by id."""
+        synced_at = datetime(2026, 10, 2, 6, 0, tzinfo=timezone.utc)
+        await _add_activity(
+            db_session, test_user, 1, date(2026, 10, 1), 10000, 3000, updated_at=synced_at
+        )
+        await refresh_week_aggregates(db_session, test_user.id)
+
+        await _add_activity(
+            db_session, test_user, 2, date(2026, 8, 3), 5000, 1500, updated_at=synced_at
+        )
+        assert await refresh_week_aggregates(db_session, test_user.id) == 1
+        assert await refresh_week_aggregates(db_session, test_user.id) == 0
+
+    async def test_deleted_activity_triggers_rebuild(
+        self, db_session: AsyncSession, test_user: User
+    ):
+        """Removing an activity is detected through the folded count."""
+        keep = await _add_activity(db_session, test_user, 1, date(2026, 10, 1), 10000, 3000)
+        drop = await _add_activity(db_session, test_user, 2, date(2025, 1, 1), 5000, 1500)
+        await refresh_week_aggregates(db_session, test_user.id)
+
+        await db_session.delete(drop)
+        await db_session.flush()
+        await refresh_week_aggregates(db_session, test_user.id)
+
+        result = await db_session.execute(
+            select(AITrainingWeekAggregate).where(
+                AITrainingWeekAggregate.user_id == test_user.id
+            )
+        )
+        weeks = result.scalars().all()
+        assert [w.activity_count for w in weeks] == [1]
+        assert weeks[0].total_distance_m == keep.distance_meters
+
+    async def test_moved_activity_leaves_its_old_week(
+        self, db_session: AsyncSession, test_user: User
+    ):
+        """An activity whose start time changes is removed from its previous week."""
+        await _add_activity(db_session, test_user, 1, date(2026, 10, 14), 10000, 3000)
+        placeholder = await _add_activity(db_session, test_user, 2, date(2026, 10, 15), 0, 0)
+        await refresh_week_aggregates(db_session, test_user.id)
+
+        # The uploaded file reveals the run happened two years earlier
+        placeholder.start_time = datetime(2024, 5, 1, 7, 0, tzinfo=timezone.utc)
+        placeholder.distance_meters = 5000
+        placeholder.duration_seconds = 1500
+        placeholder.updated_at = datetime.now(timezone.utc) + timedelta(minutes=1)
+        await db_session.flush()
+        assert await refresh_week_aggregates(db_session, test_user.id) == 2
+
+        result = await db_session.execute(
+            select(AITrainingWeekAggregate)
+            .where(AITrainingWeekAggregate.user_id == test_user.id)
+            .order_by(AITrainingWeekAggregate.week_start)
+            .execution_options(populate_existing=True)
+        )
+        weeks = result.scalars().all()
+        assert [(w.week_start, w.activity_count) for w in weeks] == [
+            (date(2024, 4, 29), 1),
+            (date(2026, 10, 12), 1),
+        ]
+        assert weeks[1].total_distance_m == 10000
+        assert weeks[1].activity_ids != weeks[0].activity_ids
+
+    async def test_export_all_time_includes_the_oldest_activity(
+        self, db_session: AsyncSession, test_user: User
+    ):
+        """The export's all-time totals start at the first stored week."""
+        from app.api.v1.endpoints.ai import export_summary
+        from app.services.ai_snapshot import ALL_TIME_START_YEAR
+
+        today = datetime.now(timezone.utc).date()
+        await _add_activity(db_session, test_user, 1, today, 10000, 3000)
+        await _add_activity(
+            db_session, test_user, 2, date(ALL_TIME_START_YEAR - 1, 6, 1), 42195, 12000
+        )
+
+        response = await export_summary(
+            current_user=test_user, db=db_session, format="json", include_sensitive=False
+        )
+
+        all_time = json.loads(response.content)["all_time"]
+        assert all_time["total_activities"] == 2
+        assert all_time["total_distance_km"] == 52.2
+
+
+class TestEnsureSnapshot:
+    """Test suite for reusing stored training snapshots."""
+
+    async def test_activity_change_regenerates_the_snapshot(
+        self, db_session: AsyncSession, test_user: User
+    ):
+        """An upload changes no sync state but still makes the snapshot stale."""
+        today = datetime.now(timezone.utc).date()
+        await _add_activity(db_session, test_user, 1, today, 10000, 3000)
+        first = await ensure_ai_training_snapshot(db_session, test_user, weeks=6)
+        assert first.payload["load"]["total_distance_km"] == 10.0
+
+        assert await ensure_ai_training_snapshot(db_session, test_user, weeks=6) is first
+
+        await _add_activity(
+            db_session, test_user, 2, today, 5000, 1500,
+            updated_at=first.generated_at + timedelta(seconds=1),
+        )
+        second = await ensure_ai_training_snapshot(db_session, test_user, weeks=6, commit=False)
+        assert second.payload["load"]["total_distance_km"] == 15.0
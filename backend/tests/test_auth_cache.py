@@ -0,0 +1,82 @@
+"""Tests for the verified-JWT / user snapshot cache."""
+
+import time
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core import auth_cache as auth_cache_module
+from app.core.auth_cache import AuthCache
+from app.models.user import User
+
+
+@pytest.fixture
+def cache(monkeypatch) -> AuthCache:
+    """A local-only cache installed as the process singleton."""
+    cache = AuthCache(use_redis=False, ttl_seconds=60)
+    monkeypatch.setattr(auth_cache_module, "_cache", cache)
+    return cache
+
+
+def _claims(user: User, exp_in: float = 300) -> dict:
+    return {"sub": user.clerk_user_id, "exp": int(time.time() + exp_in)}
+
+
+class TestAuthCache:
+    """Test suite for AuthCache."""
+
+    async def test_hit_attaches_user_without_query(
+        self, async_engine, db_session: AsyncSession, test_user: User, cache: AuthCache
+    ):
+        """A cached token resolves to a session-bound user with no SQL issued."""
+        test_user.clerk_user_id = "user_abc"
+        await db_session.commit()
+        await db_session.refresh(test_user)
+        cache.put("token-1", _claims(test_user), test_user)
+
+        statements: list[str] = []
+
+        def _record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", _record)
+        try:
+            session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+            async with session_factory() as db:
+                claims, user = await cache.resolve("token-1", db)
+                assert statements == []
+                assert claims["sub"] == "user_abc"
+                assert (user.id, user.email) == (test_user.id, test_user.email)
+                assert user in db
+
+                # The attached user can be modified and committed normally
+                user.max_hr = 191
+                await db.commit()
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", _record)
+
+        assert any(statement.startswith("UPDATE users") for statement in statements)
+        assert await db_session.scalar(select(User.max_hr).where(User.id == test_user.id)) == 191
+        # Committing a change to the user drops their cached entries
+        assert cache.get("token-1") is None
+
+    async def test_entry_bounded_by_token_expiry(self, test_user: User, cache: AuthCache):
+        """An entry never outlives the token's exp claim."""
+        cache.put("token-2", _claims(test_user, exp_in=-1), test_user)
+        assert cache.get("token-2") is None
+
+    async def test_webhook_invalidation_by_clerk_id(
+        self, db_session: AsyncSession, test_user: User, cache: AuthCache
+    ):
+        """Invalidating a Clerk user drops every token cached for them."""
+        test_user.clerk_user_id = "user_xyz"
+        await db_session.commit()
+        await db_session.refresh(test_user)
+        cache.put("token-a", _claims(test_user), test_user)
+        cache.put("token-b", _claims(test_user), test_user)
+
+        await cache.invalidate(clerk_user_ids=["user_xyz"])
+
+        assert cache.get("token-a") is None
+        assert cache.get("token-b") is None
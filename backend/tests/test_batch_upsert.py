@@ -0,0 +1,87 @@
+"""Tests for buffered multi-row upserts of Garmin daily data."""
+
+from datetime import date, datetime, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.garmin import GarminRawEvent
+from app.models.health import HealthMetric, Sleep
+from app.models.user import User
+from app.services.batch_upsert import (
+    HEALTH_METRIC_UPSERT,
+    SLEEP_UPSERT,
+    BufferedUpsertWriter,
+)
+from app.services.raw_archive import decode_body
+
+
+def _sleep_row(user: User, day: date, score: int) -> dict:
+    return {
+        "user_id": user.id,
+        "date": day,
+        "duration_seconds": 28800,
+        "score": score,
+        "stages": {"deep": 3600},
+    }
+
+
+class TestBufferedUpsertWriter:
+    """Test suite for BufferedUpsertWriter."""
+
+    async def test_batch_links_raw_events_and_upserts(
+        self, db_session: AsyncSession, test_user: User
+    ):
+        """One statement for raw events plus one per table; rows point at their own raw event."""
+        writer = BufferedUpsertWriter(db_session, test_user.id, batch_size=10)
+        for day in (1, 2, 3):
+            writer.add(
+                "sleep",
+                {"day": day},
+                SLEEP_UPSERT,
+                [_sleep_row(test_user, date(2025, 1, day), score=70 + day)],
+            )
+        assert not writer.full
+
+        assert await writer.flush() == 3
+        await db_session.commit()
+        assert writer.statements == 2
+
+        rows = (await db_session.execute(
+            select(Sleep.date, GarminRawEvent.body)
+            .join(GarminRawEvent, GarminRawEvent.id == Sleep.raw_event_id)
+            .order_by(Sleep.date)
+        )).all()
+        assert [(row.date.day, decode_body(row.body)["day"]) for row in rows] == [(1, 1), (2, 2), (3, 3)]
+
+        # A later batch updates existing days in place
+        writer.add("sleep", {"day": 2}, SLEEP_UPSERT, [_sleep_row(test_user, date(2025, 1, 2), score=99)])
+        await writer.flush()
+        await db_session.commit()
+
+        assert await db_session.scalar(select(func.count()).select_from(Sleep)) == 3
+        assert await db_session.scalar(select(Sleep.score).where(Sleep.date == date(2025, 1, 2))) == 99
+
+    async def test_duplicate_keys_in_batch_collapse(
+        self, db_session: AsyncSession, test_user: User
+    ):
+        """Rows with the same conflict key within a batch keep the last value."""
+        metric_time = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        writer = BufferedUpsertWriter(db_session, test_user.id, batch_size=2)
+        for value in (40.0, 45.0):
+            writer.add("hrv", {"value": value}, HEALTH_METRIC_UPSERT, [{
+                "user_id": test_user.id,
+                "metric_type": "hrv_weekly_avg",
+                "metric_time": metric_time,
+                "value": value,
+                "unit": "ms",
+                "payload": None,
+            }])
+        assert writer.full
+
+        assert await writer.flush() == 1
+        await db_session.commit()
+
+        metric = await db_session.scalar(select(HealthMetric))
+        assert float(metric.value) == 45.0
+        assert await db_session.scalar(select(func.count()).select_from(GarminRawEvent)) == 2
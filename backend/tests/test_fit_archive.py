@@ -0,0 +1,211 @@
+"""Tests for bulk FIT archive export/import."""
+
+import asyncio
+import gzip
+import io
+import json
+import zipfile
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.activity import Activity, ActivitySample
+from app.models.user import User
+from app.services.fit_archive import (
+    import_fit_archive,
+    list_export_sources,
+    stream_fit_archive,
+    synthetic_garmin_id,
+)
+from app.services.fit_blob_store import FitBlobStore, LocalLRUCache
+
+PARSED_FIT = {
+    "records": [
+        {"timestamp": "2026-10-01T07:00:00+00:00", "heart_rate": 140, "speed": 3.0},
+        {"timestamp": "2026-10-01T07:00:01+00:00", "heart_rate": 142, "speed": 3.1},
+    ],
+    "laps": [],
+    "session": {
+        "sport": "running",
+        "start_time": "2026-10-01T07:00:00+00:00",
+        "total_distance": 5000.0,
+        "total_timer_time": 1500.0,
+    },
+    "sensors": {},
+}
+
+
+def _offline_r2() -> MagicMock:
+    r2 = MagicMock()
+    r2.is_available = False
+    return r2
+
+
+def _store(async_engine, tmp_path, r2: MagicMock) -> FitBlobStore:
+    factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+    return FitBlobStore(
+        cache=LocalLRUCache(str(tmp_path / "cache"), 10_000_000),
+        r2=r2,
+        session_factory=factory,
+    )
+
+
+class TestFitArchiveExport:
+    """Test suite for the streaming ZIP export."""
+
+    async def test_export_streams_blobs_and_reports_missing(
+        self, async_engine, db_session: AsyncSession, test_user: User, tmp_path
+    ):
+        """DB blobs are exported; activities with no readable file are listed as missing."""
+        stored = Activity(
+            user_id=test_user.id,
+            garmin_id=1,
+            activity_type="running",
+            start_time=datetime(2025, 3, 2, 7, 0, tzinfo=timezone.utc),
+            fit_file_content=gzip.compress(b"FIT-ONE" * 1000),
+        )
+        gone = Activity(
+            user_id=test_user.id,
+            garmin_id=2,
+            activity_type="running",
+            start_time=datetime(2025, 3, 3, 7, 0, tzinfo=timezone.utc),
+            fit_file_path="/nonexistent/2.fit",
+        )
+        db_session.add_all([stored, gone])
+        await db_session.commit()
+
+        sources = await list_export_sources(db_session, test_user.id)
+        factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+        store = _store(async_engine, tmp_path, _offline_r2())
+        chunks = [
+            chunk
+            async for chunk in stream_fit_archive(
+                test_user.id, sources, session_factory=factory, store=store
+            )
+        ]
+
+        with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as zf:
+            assert zf.read(f"2025/2025-03-02_{stored.id}.fit") == b"FIT-ONE" * 1000
+            manifest = json.loads(zf.read("manifest.json"))
+        assert [a["activity_id"] for a in manifest["activities"]] == [stored.id]
+        assert manifest["missing_activity_ids"] == [gone.id]
+
+    async def test_failed_read_mid_file_keeps_archive_valid(
+        self, async_engine, db_session: AsyncSession, test_user: User, tmp_path
+    ):
+        """A blob that fails part-way gets no entry and is listed as failed."""
+        broken = Activity(
+            user_id=test_user.id,
+            garmin_id=3,
+            activity_type="running",
+            start_time=datetime(2025, 4, 1, 7, 0, tzinfo=timezone.utc),
+            r2_key="fit/3.fit",
+        )
+        db_session.add(broken)
+        await db_session.commit()
+
+        async def _iter_object(key, max_bytes=None):
+            yield b"FIT-PART" * 1000
+            raise ConnectionError("reset by peer")
+
+        r2 = MagicMock()
+        r2.is_available = True
+        r2.iter_object = _iter_object
+        sources = await list_export_sources(db_session, test_user.id)
+        factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+        chunks = [
+            chunk
+            async for chunk in stream_fit_archive(
+                test_user.id,
+                sources,
+                session_factory=factory,
+                store=_store(async_engine, tmp_path, r2),
+            )
+        ]
+
+        with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as zf:
+            assert zf.testzip() is None
+            assert zf.namelist() == ["manifest.json"]
+            manifest = json.loads(zf.read("manifest.json"))
+        assert manifest["failed"] == [{"activity_id": broken.id, "error": "reset by peer"}]
+
+
+class TestFitArchiveImport:
+    """Test suite for import_fit_archive."""
+
+    async def test_import_parses_each_file_once(
+        self, db_session: AsyncSession, test_user: User, tmp_path
+    ):
+        """New files become activities; duplicates inside and across imports are skipped."""
+        archive = tmp_path / "watch.zip"
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("2024/a.fit", b"file-a")
+            zf.writestr("2024/copy-of-a.fit", b"file-a")
+            zf.writestr("2024/b.fit.gz", gzip.compress(b"file-b"))
+            zf.writestr("notes.txt", b"ignored")
+
+        with patch(
+            "app.services.fit_archive.GarminConnectAdapter.parse_fit_file",
+            return_value=PARSED_FIT,
+        ) as mock_parse:
+            first = await import_fit_archive(db_session, test_user, str(archive), concurrency=2)
+            second = await import_fit_archive(db_session, test_user, str(archive))
+
+        assert first["files"] == 3
+        assert first["imported"] == 2
+        assert first["duplicates"] == 1
+        assert first["failed"] == []
+        assert second["imported"] == 0
+        assert second["duplicates"] == 3
+        assert mock_parse.call_count == 2
+
+        activities = (
+            await db_session.execute(
+                select(Activity).where(Activity.user_id == test_user.id)
+            )
+        ).scalars().all()
+        assert all(a.garmin_id < 0 and a.has_fit_file for a in activities)
+        assert {a.garmin_id for a in activities} == {
+            synthetic_garmin_id(a.fit_file_hash) for a in activities
+        }
+        sample_count = await db_session.scalar(
+            select(func.count()).select_from(ActivitySample)
+        )
+        assert sample_count == 4
+
+    async def test_parsed_files_wait_for_their_write_inside_the_limit(
+        self, db_session: AsyncSession, test_user: User, tmp_path
+    ):
+        """Files parsed but not yet written never exceed the concurrency limit."""
+        from app.services.sync_service import GarminSyncService
+
+        archive = tmp_path / "many.zip"
+        with zipfile.ZipFile(archive, "w") as zf:
+            for i in range(8):
+                zf.writestr(f"{i}.fit", f"file-{i}".encode())
+
+        in_flight = 0
+        peak = 0
+        store_fit_data = GarminSyncService.store_fit_data
+
+        def _parse(fit_data):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            return PARSED_FIT
+
+        async def _store_slowly(self, activity, parsed):
+            nonlocal in_flight
+            await asyncio.sleep(0.01)
+            await store_fit_data(self, activity, parsed)
+            in_flight -= 1
+
+        with patch(
+            "app.services.fit_archive.GarminConnectAdapter.parse_fit_file", side_effect=_parse
+        ), patch.object(GarminSyncService, "store_fit_data", _store_slowly):
+            result = await import_fit_archive(db_session, test_user, str(archive), concurrency=2)
+
+        assert result["imported"] == 8
+        assert peak <= 2
@@ -0,0 +1,131 @@
+"""Tests for the tiered FIT blob store."""
+
+import gzip
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.activity import Activity
+from app.models.user import User
+from app.services.fit_blob_store import FitBlobStore, LocalLRUCache
+
+
+def _r2(data: bytes | None = None) -> MagicMock:
+    r2 = MagicMock()
+    r2.is_available = data is not None
+    r2.download_by_key = AsyncMock(return_value=data)
+    return r2
+
+
+async def _activity(db: AsyncSession, user: User, **kwargs) -> Activity:
+    activity = Activity(
+        user_id=user.id,
+        garmin_id=kwargs.pop("garmin_id", 1),
+        activity_type="running",
+        start_time=datetime.now(timezone.utc),
+        **kwargs,
+    )
+    db.add(activity)
+    await db.commit()
+    return activity
+
+
+class TestLocalLRUCache:
+    """Test suite for the size-bounded disk cache."""
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Reading an entry protects it; the oldest untouched entry is evicted."""
+        cache = LocalLRUCache(str(tmp_path), max_bytes=25)
+        cache.put("a", b"a" * 10)
+        cache.put("b", b"b" * 10)
+        assert cache.get("a") == b"a" * 10
+
+        cache.put("c", b"c" * 10)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.total_bytes == 20
+        assert not (tmp_path / "b").exists()
+
+    def test_index_is_rebuilt_from_disk(self, tmp_path):
+        """A new instance sees entries written by a previous process."""
+        LocalLRUCache(str(tmp_path), max_bytes=100).put("a", b"1234")
+        assert LocalLRUCache(str(tmp_path), max_bytes=100).get("a") == b"1234"
+
+    def test_entries_from_another_process_are_adopted(self, tmp_path):
+        """An already loaded index still finds files written by another instance."""
+        reader = LocalLRUCache(str(tmp_path), max_bytes=100)
+        assert reader.get("a") is None  # Index loaded while the directory is empty
+
+        LocalLRUCache(str(tmp_path), max_bytes=100).put("a", b"1234")
+
+        assert reader.get("a") == b"1234"
+        with reader.open("a") as f:
+            assert f.read() == b"1234"
+        assert reader.total_bytes == 4
+
+
+class TestFitBlobStore:
+    """Test suite for FitBlobStore tiering."""
+
+    async def test_r2_reads_are_cached(
+        self, db_session: AsyncSession, test_user: User, tmp_path
+    ):
+        """The first read goes to R2; later reads are served from the cache."""
+        activity = await _activity(db_session, test_user, r2_key="users/1/2025/1.fit.gz")
+        r2 = _r2(b"FIT-FROM-R2")
+        store = FitBlobStore(cache=LocalLRUCache(str(tmp_path), 1024), r2=r2)
+
+        assert await store.get(db_session, activity) == b"FIT-FROM-R2"
+        assert await store.get(db_session, activity) == b"FIT-FROM-R2"
+        r2.download_by_key.assert_awaited_once()
+
+    async def test_db_blob_is_decompressed(
+        self, db_session: AsyncSession, test_user: User, tmp_path
+    ):
+        """Without disk or R2 copies, the gzip DB blob is used."""
+        activity = await _activity(
+            db_session, test_user, fit_file_content=gzip.compress(b"FIT-FROM-DB")
+        )
+        store = FitBlobStore(cache=LocalLRUCache(str(tmp_path), 1024), r2=_r2())
+
+        assert await store.get(db_session, activity) == b"FIT-FROM-DB"
+
+    async def test_put_serves_reads_from_another_store(
+        self, db_session: AsyncSession, test_user: User, tmp_path
+    ):
+        """A copy put by the sync is found by a separate store (e.g. the Strava worker)."""
+        activity = await _activity(db_session, test_user)
+        reader = FitBlobStore(cache=LocalLRUCache(str(tmp_path), 1024), r2=_r2())
+        assert await reader.get(db_session, activity) is None
+
+        writer = FitBlobStore(cache=LocalLRUCache(str(tmp_path), 1024), r2=_r2())
+        await writer.put(activity, b"NEW-FIT")
+
+        stream = await reader.stream(db_session, activity)
+        assert stream.size == len(b"NEW-FIT")
+        assert b"".join([chunk async for chunk in stream.chunks]) == b"NEW-FIT"
+
+    async def test_stream_from_r2_fills_cache(
+        self, db_session: AsyncSession, test_user: User, tmp_path
+    ):
+        """A fully read R2 stream is cached; the next stream comes from disk with a size."""
+        activity = await _activity(db_session, test_user, r2_key="users/1/2025/1.fit.gz")
+        r2 = _r2(b"unused")
+
+        async def _iter_object(key, max_bytes=None):
+            yield b"FIT-"
+            yield b"CHUNKS"
+
+        r2.iter_object = MagicMock(side_effect=_iter_object)
+        store = FitBlobStore(cache=LocalLRUCache(str(tmp_path), 1024), r2=r2)
+
+        stream = await store.stream(db_session, activity)
+        assert stream.size is None
+        assert [chunk async for chunk in stream.chunks] == [b"FIT-", b"CHUNKS"]
+
+        cached = await store.stream(db_session, activity)
+        assert cached.size == len(b"FIT-CHUNKS")
+        assert b"".join([chunk async for chunk in cached.chunks]) == b"FIT-CHUNKS"
+        r2.iter_object.assert_called_once()
@@ -0,0 +1,97 @@
+"""Tests for the stored FIT compression codec."""
+
+import gzip
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api.v1.endpoints.upload import get_download_url
+from app.models.activity import Activity
+from app.services import fit_compression
+from app.services.fit_compression import (
+    CODEC_GZIP,
+    compress_fit,
+    decompress_fit,
+    detect_codec,
+    train_dictionary,
+)
+
+FIT_LIKE = b".FIT" + bytes(range(64)) * 20
+
+
+class TestFitCodec:
+    """Test suite for codec selection and detection."""
+
+    async def test_gzip_fallback_without_zstandard(self, monkeypatch):
+        """Without the optional package new data is gzipped and still readable."""
+        monkeypatch.setattr(fit_compression, "zstandard", None)
+
+        blob, metadata = await compress_fit(FIT_LIKE)
+
+        assert metadata["codec"] == CODEC_GZIP
+        assert detect_codec(blob) == CODEC_GZIP
+        assert await decompress_fit(blob) == FIT_LIKE
+
+    async def test_legacy_gzip_and_raw_blobs_are_read_transparently(self):
+        """Objects written before the switch decode by magic bytes."""
+        assert await decompress_fit(gzip.compress(FIT_LIKE), "zstd") == FIT_LIKE
+        assert await decompress_fit(FIT_LIKE) == FIT_LIKE
+
+
+class TestZstdDictionary:
+    """Test suite for trained-dictionary compression."""
+
+    async def test_dictionary_roundtrip_and_versioning(
+        self, async_engine, db_session: AsyncSession, monkeypatch
+    ):
+        """Frames carry the dictionary id and decode through the registry."""
+        pytest.importorskip("zstandard")
+        monkeypatch.setattr(fit_compression.settings, "fit_compression_codec", "zstd")
+        monkeypatch.setattr(fit_compression.settings, "fit_zstd_dict_size", 4096)
+        factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+        samples = [FIT_LIKE + f"device-{i}".encode() * 30 for i in range(200)]
+
+        row = await train_dictionary(db_session, samples)
+        blob, metadata = await compress_fit(samples[0], session_factory=factory)
+
+        assert metadata == {"codec": "zstd", "dict_id": str(row.dict_id)}
+        assert fit_compression.frame_dict_id(blob) == row.dict_id
+        assert len(blob) < len(gzip.compress(samples[0]))
+
+        fit_compression.reset_registry()  # Force a lookup from the table
+        assert await decompress_fit(blob, session_factory=factory) == samples[0]
+        fit_compression.reset_registry()
+
+
+class TestDownloadUrl:
+    """Test suite for choosing how a stored FIT object is downloaded."""
+
+    @pytest.mark.parametrize(
+        ("prefix", "via_api"),
+        [(fit_compression.ZSTD_MAGIC, True), (gzip.compress(FIT_LIKE)[:4], False)],
+        ids=["zstd", "gzip"],
+    )
+    async def test_codec_is_read_from_the_object(
+        self, db_session: AsyncSession, test_user, prefix: bytes, via_api: bool
+    ):
+        """zstd objects are served through the API even without codec metadata."""
+        activity = Activity(
+            user_id=test_user.id,
+            garmin_id=1,
+            activity_type="running",
+            start_time=datetime(2026, 10, 1, 7, 0, tzinfo=timezone.utc),
+            r2_key="users/1/2026/activities/1.fit.gz",
+            storage_metadata={"status": "uploaded"},
+        )
+        db_session.add(activity)
+        await db_session.commit()
+        r2 = MagicMock()
+        r2.read_prefix = AsyncMock(return_value=prefix)
+        r2.generate_presigned_download_url.return_value = "https://r2.example/presigned"
+
+        response = await get_download_url(activity.id, test_user, db_session, r2)
+
+        r2.read_prefix.assert_awaited_once_with(activity.r2_key)
+        assert response["download_url"].endswith(f"/activities/{activity.id}/fit") is via_api
@@ -0,0 +1,223 @@
+"""Tests for the analyze_fit ingest pipeline."""
+
+import gzip
+import hashlib
+import os
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.activity import Activity, ActivitySample
+from app.models.user import User
+from app.services.fit_ingest import ingest_uploaded_fit
+from app.services.r2_storage import R2StorageService
+
+PARSED_FIT = {
+    "records": [
+        {"timestamp": "2026-10-01T07:00:00+00:00", "heart_rate": 140, "speed": 3.0},
+        {"timestamp": "2026-10-01T07:00:01+00:00", "heart_rate": 142, "speed": 3.1},
+    ],
+    "laps": [],
+    "session": {
+        "start_time": "2026-10-01T07:00:00+00:00",
+        "total_distance": 10000.0,
+        "total_timer_time": 3000.0,
+        "avg_heart_rate": 141,
+    },
+    "sensors": {},
+}
+
+
+async def _uploaded_activity(db: AsyncSession, user: User, garmin_id: int = 0) -> Activity:
+    activity = Activity(
+        user_id=user.id,
+        garmin_id=garmin_id,
+        activity_type="running",
+        start_time=datetime.now(timezone.utc),
+        r2_key=f"users/{user.id}/2026/activities/{garmin_id}.fit.gz",
+        storage_provider="r2",
+        storage_metadata={"status": "uploaded"},
+    )
+    db.add(activity)
+    await db.commit()
+    return activity
+
+
+def _r2(data: bytes) -> MagicMock:
+    r2 = MagicMock()
+    r2.download_by_key = AsyncMock(return_value=data)
+    return r2
+
+
+class TestIngestUploadedFit:
+    """Test suite for ingest_uploaded_fit."""
+
+    async def test_ingest_is_idempotent_on_file_hash(
+        self, db_session: AsyncSession, test_user: User
+    ):
+        """The same file is parsed once; a second run is a no-op."""
+        activity = await _uploaded_activity(db_session, test_user)
+        r2 = _r2(b"fit-bytes")
+
+        with patch(
+            "app.services.fit_ingest.GarminConnectAdapter.parse_fit_file",
+            return_value=PARSED_FIT,
+        ) as mock_parse:
+            first = await ingest_uploaded_fit(db_session, activity.id, test_user.id, r2=r2)
+            second = await ingest_uploaded_fit(db_session, activity.id, test_user.id, r2=r2)
+
+        assert first["status"] == "analyzed"
+        assert second["status"] == "already_analyzed"
+        assert mock_parse.call_count == 1
+
+        count = await db_session.scalar(
+            select(func.count()).select_from(ActivitySample).where(
+                ActivitySample.activity_id == activity.id
+            )
+        )
+        assert count == 2
+        await db_session.refresh(activity)
+        assert activity.distance_meters == 10000.0
+        assert activity.has_fit_file is True
+        assert activity.storage_metadata["status"] == "analyzed"
+
+    async def test_same_file_on_other_activity_is_duplicate(
+        self, db_session: AsyncSession, test_user: User
+    ):
+        """Re-uploading an ingested file under a new activity is not re-parsed."""
+        original = await _uploaded_activity(db_session, test_user, garmin_id=1)
+        copy = await _uploaded_activity(db_session, test_user, garmin_id=2)
+
+        with patch(
+            "app.services.fit_ingest.GarminConnectAdapter.parse_fit_file",
+            return_value=PARSED_FIT,
+        ) as mock_parse:
+            await ingest_uploaded_fit(db_session, original.id, test_user.id, r2=_r2(b"same"))
+            result = await ingest_uploaded_fit(db_session, copy.id, test_user.id, r2=_r2(b"same"))
+
+        assert result["status"] == "duplicate"
+        assert result["duplicate_of"] == original.id
+        assert mock_parse.call_count == 1
+
+
+class TestConfirmUploadComplete:
+    """Test suite for handing uploaded files to the FIT ingest worker."""
+
+    async def _complete(self, db: AsyncSession, user: User, pool: MagicMock):
+        from fastapi import BackgroundTasks
+
+        from app.api.v1.endpoints.upload import (
+            UploadCompleteRequest,
+            confirm_upload_complete,
+        )
+
+        activity = await _uploaded_activity(db, user)
+        background_tasks = BackgroundTasks()
+        request = UploadCompleteRequest(activity_id=activity.id, file_size=1024, checksum="abc")
+        with patch("app.api.v1.endpoints.upload.get_arq_pool", new=AsyncMock(return_value=pool)):
+            response = await confirm_upload_complete(
+                request, background_tasks, current_user=user, db=db, r2=MagicMock()
+            )
+        return activity, response, background_tasks
+
+    async def test_analyzed_in_process_without_a_live_worker(
+        self, db_session: AsyncSession, test_user: User
+    ):
+        """No worker health check: the file is ingested after the response."""
+        from app.services.fit_ingest import run_fit_ingest
+
+        pool = MagicMock()
+        pool.exists = AsyncMock(return_value=0)
+        pool.enqueue_job = AsyncMock()
+        activity, response, background_tasks = await self._complete(db_session, test_user, pool)
+
+        pool.enqueue_job.assert_not_called()
+        assert response.analysis_job_id is None
+        assert [task.func for task in background_tasks.tasks] == [run_fit_ingest]
+        assert background_tasks.tasks[0].args == (activity.id, test_user.id)
+
+    async def test_enqueued_when_the_worker_is_alive(
+        self, db_session: AsyncSession, test_user: User
+    ):
+        """A live worker gets the analyze_fit job."""
+        pool = MagicMock()
+        pool.exists = AsyncMock(return_value=1)
+        pool.enqueue_job = AsyncMock(return_value=MagicMock(job_id="analyze-fit:1:abc"))
+        _, response, background_tasks = await self._complete(db_session, test_user, pool)
+
+        pool.exists.assert_awaited_once_with("fit_ingest:health-check")
+        assert pool.enqueue_job.call_args.kwargs["_queue_name"] == "fit_ingest"
+        assert response.analysis_job_id == "analyze-fit:1:abc"
+        assert background_tasks.tasks == []
+
+
+class TestR2StreamingDownload:
+    """Test suite for R2StorageService streamed reads."""
+
+    @staticmethod
+    def _service_with_body(chunks: list[bytes], metadata: dict | None = None) -> R2StorageService:
+        body = MagicMock()
+        body.iter_chunks.return_value = chunks
+        service = R2StorageService()
+        service._initialized = True
+        service._client = MagicMock()
+        service._client.get_object.return_value = {"Body": body, "Metadata": metadata or {}}
+        return service
+
+    async def test_gzip_objects_are_decompressed_while_streaming(self):
+        """Gzip bodies are detected by magic bytes and inflated chunk by chunk."""
+        payload = b"FIT" * 100_000
+        compressed = gzip.compress(payload)
+        service = self._service_with_body(
+            [compressed[i : i + 4096] for i in range(0, len(compressed), 4096)]
+        )
+
+        assert await service.download_by_key("k") == payload
+        service._client.get_object.return_value["Body"].close.assert_called_once()
+
+    async def test_max_bytes_aborts_stream(self):
+        """Objects larger than max_bytes after decompression are rejected."""
+        payload = b"\x00" * 50_000
+        service = self._service_with_body([gzip.compress(payload)])
+
+        with pytest.raises(ValueError):
+            await service.download_by_key("k", max_bytes=1000)
+
+    async def test_download_fit_verifies_hash_over_streamed_chunks(self):
+        """download_fit uses the stored key and rejects content with a bad hash."""
+        payload = b"FIT-DATA" * 1000
+        good = self._service_with_body(
+            [gzip.compress(payload)], {"file_hash": hashlib.sha256(payload).hexdigest()}
+        )
+        assert await good.download_fit(1, 2, key="users/1/2024/2.fit.gz") == payload
+        good._client.get_object.assert_called_once_with(
+            Bucket=good.bucket_name, Key="users/1/2024/2.fit.gz"
+        )
+
+        bad = self._service_with_body([gzip.compress(payload)], {"file_hash": "0" * 64})
+        assert await bad.download_fit(1, 2) is None
+
+
+class TestR2MultipartUpload:
+    """Test suite for R2StorageService large-object uploads."""
+
+    async def test_large_uploads_use_multipart_transfer(self, monkeypatch):
+        """Payloads at/above the threshold go through upload_fileobj."""
+        from app.services import r2_storage
+
+        monkeypatch.setattr(r2_storage.settings, "r2_multipart_threshold_bytes", 1024)
+        service = R2StorageService()
+        service._initialized = True
+        service._client = MagicMock()
+
+        result = await service.upload_fit(1, 2, os.urandom(4096), compress=False)
+
+        assert result["success"] is True
+        service._client.put_object.assert_not_called()
+        service._client.upload_fileobj.assert_called_once()
+        extra_args = service._client.upload_fileobj.call_args.kwargs["ExtraArgs"]
+        assert extra_args["Metadata"]["activity_id"] == "2"
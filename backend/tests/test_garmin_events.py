@@ -0,0 +1,107 @@
+"""Tests for the cached, parallel Garmin events range fetch."""
+
+from datetime import date
+
+from app.adapters.garmin_adapter import GarminAPIError, normalize_day_events
+from app.services.garmin_events import GarminEventsFetcher
+
+
+class FakeRedis:
+    """Minimal MGET/SET/pipeline stand-in."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, str] = {}
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis) -> None:
+        self.redis = redis
+        self.ops: list[tuple[str, str]] = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, key, value, ex=None):
+        self.ops.append((key, value))
+
+    async def execute(self):
+        self.redis.data.update(self.ops)
+
+
+class FakeAdapter:
+    """Returns one race on the 10th, fails on the 12th.
+
+    Copies share the call log; the adapter they were cloned from is never called.
+    """
+
+    def __init__(self, calls: list[date] | None = None, is_clone: bool = False) -> None:
+        self.calls: list[date] = [] if calls is None else calls
+        self.is_clone = is_clone
+        self.clones: list[FakeAdapter] = []
+
+    def clone(self) -> "FakeAdapter":
+        copy = FakeAdapter(self.calls, is_clone=True)
+        self.clones.append(copy)
+        return copy
+
+    def get_all_day_events(self, day: date):
+        assert self.is_clone, "the shared adapter is not used from fetch threads"
+        self.calls.append(day)
+        if day.day == 12:
+            raise GarminAPIError("boom")
+        if day.day == 10:
+            return {"events": [{"eventName": "Seoul Marathon"}]}
+        return {}
+
+
+class TestNormalizeDayEvents:
+    """Test suite for normalize_day_events."""
+
+    def test_response_shapes(self):
+        """Lists, keyed and nested lists and single events are all extracted."""
+        day = date(2026, 3, 15)
+        assert normalize_day_events([{"name": "a"}], day) == [{"name": "a", "event_date": "2026-03-15"}]
+        assert normalize_day_events({"calendarEvents": [{"name": "b"}]}, day)[0]["name"] == "b"
+        assert normalize_day_events({"data": {"items": [{"name": "c"}]}}, day)[0]["name"] == "c"
+        assert normalize_day_events({"eventName": "d"}, day)[0]["eventName"] == "d"
+        assert normalize_day_events({"other": [{"name": "e"}]}, day)[0]["name"] == "e"
+        assert normalize_day_events({}, day) == []
+        assert normalize_day_events(None, day) == []
+
+
+class TestGarminEventsFetcher:
+    """Test suite for GarminEventsFetcher."""
+
+    async def test_only_uncached_days_are_fetched(self):
+        """Cached days (including empty ones) are served from Redis; failed days are retried."""
+        redis = FakeRedis()
+        fetcher = GarminEventsFetcher(redis_client=redis, concurrency=2)
+        adapter = FakeAdapter()
+
+        events = await fetcher.fetch_range(1, adapter, date(2026, 3, 9), date(2026, 3, 13))
+        assert [e["eventName"] for e in events] == ["Seoul Marathon"]
+        assert events[0]["event_date"] == "2026-03-10"
+        assert len(adapter.calls) == 5
+        assert len(adapter.clones) == 2  # One session per request in flight
+        assert "garmin:events:1:2026-03-12" not in redis.data
+
+        adapter.calls.clear()
+        events = await fetcher.fetch_range(1, adapter, date(2026, 3, 9), date(2026, 3, 14))
+        assert len(events) == 1
+        assert sorted(adapter.calls) == [date(2026, 3, 12), date(2026, 3, 14)]
+
+    async def test_without_redis_every_day_is_fetched(self):
+        fetcher = GarminEventsFetcher(use_redis=False)
+        adapter = FakeAdapter()
+        await fetcher.fetch_range(1, adapter, date(2026, 3, 9), date(2026, 3, 10))
+        await fetcher.fetch_range(1, adapter, date(2026, 3, 9), date(2026, 3, 10))
+        assert len(adapter.calls) == 4
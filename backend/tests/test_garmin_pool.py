@@ -0,0 +1,89 @@
+"""Tests for the per-user Garmin adapter pool."""
+
+import time
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.adapters import garmin_pool
+from app.adapters.garmin_pool import GarminAdapterPool
+from app.models.garmin import GarminSession
+from app.models.user import User
+
+
+class FakeAdapter:
+    """Stands in for GarminConnectAdapter (no network)."""
+
+    restores = 0
+
+    def __init__(self) -> None:
+        self.session_data = None
+        self.expires_at = time.time() + 3600
+
+    def restore_session(self, session_data):
+        FakeAdapter.restores += 1
+        self.session_data = dict(session_data)
+        return True
+
+    def get_session_data(self):
+        return self.session_data
+
+    def token_expires_at(self):
+        return self.expires_at
+
+    def refresh_tokens(self):
+        self.session_data = {"garth_session": self.session_data["garth_session"] + "-refreshed"}
+        self.expires_at = time.time() + 3600
+        return True
+
+
+@pytest.fixture(autouse=True)
+def fake_adapter(monkeypatch):
+    FakeAdapter.restores = 0
+    monkeypatch.setattr(garmin_pool, "GarminConnectAdapter", FakeAdapter)
+
+
+class TestGarminAdapterPool:
+    """Test suite for GarminAdapterPool."""
+
+    async def test_reuses_adapter_while_session_data_matches(self):
+        """Same stored data returns the warm adapter; new data or eviction restores."""
+        pool = GarminAdapterPool(max_entries=1, background_refresh=False)
+        first = await pool.acquire(1, {"garth_session": "a"})
+        assert await pool.acquire(1, {"garth_session": "a"}) is first
+        assert FakeAdapter.restores == 1
+
+        # Reconnected elsewhere: the stored data changed
+        second = await pool.acquire(1, {"garth_session": "b"})
+        assert second is not first
+
+        # LRU eviction
+        await pool.acquire(2, {"garth_session": "c"})
+        assert len(pool) == 1
+        assert await pool.acquire(1, {"garth_session": "b"}) is not second
+        assert FakeAdapter.restores == 4
+
+    async def test_refresh_writes_session_back_once(
+        self, async_engine, db_session: AsyncSession, test_user: User
+    ):
+        """Expiring tokens are refreshed and stored; the stored data keeps the adapter warm."""
+        db_session.add(GarminSession(user_id=test_user.id, session_data={"garth_session": "s1"}))
+        await db_session.commit()
+        session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+        pool = GarminAdapterPool(
+            refresh_margin_seconds=600, session_factory=session_factory, background_refresh=False
+        )
+
+        adapter = await pool.acquire(test_user.id, {"garth_session": "s1"})
+        adapter.expires_at = time.time() + 60
+
+        assert await pool.refresh() == {"refreshed": 1, "persisted": 1, "dropped": 0}
+        assert await pool.refresh() == {"refreshed": 0, "persisted": 0, "dropped": 0}
+
+        stored = await db_session.scalar(
+            select(GarminSession.session_data).where(GarminSession.user_id == test_user.id)
+        )
+        assert stored == {"garth_session": "s1-refreshed"}
+        assert await pool.acquire(test_user.id, stored) is adapter
+        assert FakeAdapter.restores == 1
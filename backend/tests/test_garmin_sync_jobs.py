@@ -0,0 +1,146 @@
+"""Tests for queued and scheduled Garmin syncs."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core import session as session_module
+from app.core.session import acquire_lock, check_lock, release_lock
+from app.models.garmin import GarminSession, GarminSyncState
+from app.models.user import User
+from app.services import garmin_sync_jobs
+from app.services.garmin_sync_jobs import (
+    due_sync_user_ids,
+    enqueue_user_sync,
+    run_user_sync,
+    schedule_garmin_syncs,
+    sync_lock_name,
+)
+
+
+class FakePool:
+    """Records enqueued jobs; SET NX semantics for scheduler markers."""
+
+    def __init__(self) -> None:
+        self.keys: set[str] = set()
+        self.jobs: list[dict] = []
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.keys:
+            return None
+        self.keys.add(key)
+        return True
+
+    async def exists(self, key):
+        return int(key in self.keys)
+
+    async def enqueue_job(self, function, **kwargs):
+        self.jobs.append({"function": function, **kwargs})
+        return object()
+
+
+@pytest.fixture
+def no_redis(monkeypatch):
+    """Force the in-memory lock fallback."""
+    monkeypatch.setattr(session_module, "_redis_available", False)
+
+
+async def _user(db: AsyncSession, email: str, garmin: bool = True) -> User:
+    user = User(email=email, password_hash="x", display_name=email, timezone="UTC")
+    db.add(user)
+    await db.flush()
+    if garmin:
+        db.add(GarminSession(user_id=user.id, session_data={"garth_session": "token"}))
+    return user
+
+
+class TestScheduledGarminSync:
+    """Test suite for due-user selection and the scheduler."""
+
+    async def test_due_users_ordered_by_oldest_success(
+        self, async_engine, db_session: AsyncSession, test_user: User
+    ):
+        """Never-synced users come first, then oldest success; recent attempts and unconnected users are skipped."""
+        now = datetime.now(timezone.utc)
+        stale = await _user(db_session, "stale@example.com")
+        never = await _user(db_session, "never@example.com")
+        staler = await _user(db_session, "staler@example.com")
+        fresh = await _user(db_session, "fresh@example.com")
+        await _user(db_session, "nogarmin@example.com", garmin=False)
+        for user, success_days_ago, attempt_days_ago in (
+            (stale, 2, 1), (staler, 5, 1), (fresh, 10, 0),
+        ):
+            db_session.add(GarminSyncState(
+                user_id=user.id,
+                endpoint="activities",
+                last_success_at=now - timedelta(days=success_days_ago),
+                last_sync_at=now - timedelta(days=attempt_days_ago),
+            ))
+        await db_session.commit()
+
+        session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+        assert await due_sync_user_ids(session_factory) == [never.id, staler.id, stale.id]
+
+    async def test_scheduler_batches_and_gives_each_user_one_turn(
+        self, async_engine, db_session: AsyncSession, test_user: User, monkeypatch
+    ):
+        """Each run enqueues at most a batch; a user is not enqueued again within the interval."""
+        first = await _user(db_session, "a@example.com")
+        second = await _user(db_session, "b@example.com")
+        await db_session.commit()
+        monkeypatch.setattr(garmin_sync_jobs.settings, "garmin_scheduled_sync_batch_size", 1)
+
+        session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+        pool = FakePool()
+        assert await schedule_garmin_syncs(pool, session_factory) == {"due": 2, "enqueued": 1}
+        assert await schedule_garmin_syncs(pool, session_factory) == {"due": 2, "enqueued": 1}
+        assert await schedule_garmin_syncs(pool, session_factory) == {"due": 2, "enqueued": 0}
+
+        assert [job["user_id"] for job in pool.jobs] == [first.id, second.id]
+        assert all(job["function"] == "sync_garmin_user" for job in pool.jobs)
+        assert pool.jobs[0]["_job_id"] == f"garmin-sync:{first.id}"
+
+
+class TestEnqueueUserSync:
+    """Test suite for handing requested syncs to the worker."""
+
+    async def test_not_queued_without_a_live_worker(self):
+        """Without a worker health check the caller runs the sync itself."""
+        pool = FakePool()
+        kwargs = {"user_id": 1, "endpoints": ["activities"], "lock_owner": "owner"}
+
+        assert await enqueue_user_sync(**kwargs, pool=pool) is False
+        assert pool.jobs == []
+
+        pool.keys.add("garmin_sync:health-check")
+        assert await enqueue_user_sync(**kwargs, pool=pool) is True
+        assert pool.jobs[0]["_queue_name"] == "garmin_sync"
+
+
+class TestRunUserSync:
+    """Test suite for the sync job's lock handling."""
+
+    async def test_skips_when_another_sync_holds_the_lock(self, no_redis, test_user: User):
+        """A scheduled run does not start while a manual sync is running."""
+        owner = await acquire_lock(sync_lock_name(test_user.id), ttl_seconds=60)
+        try:
+            result = await run_user_sync(test_user.id)
+            assert result["skipped"] == "already running"
+            assert await check_lock(sync_lock_name(test_user.id))
+        finally:
+            await release_lock(sync_lock_name(test_user.id), owner)
+
+    async def test_releases_lock_handed_over_by_api(
+        self, no_redis, async_engine, test_user: User
+    ):
+        """The job takes over the API's lock and releases it when done."""
+        session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+        owner = await acquire_lock(sync_lock_name(test_user.id), ttl_seconds=60)
+
+        # No Garmin session: the run ends early but still releases the lock
+        result = await run_user_sync(
+            test_user.id, ["activities"], lock_owner=owner, session_factory=session_factory
+        )
+        assert result["success"] is False
+        assert not await check_lock(sync_lock_name(test_user.id))
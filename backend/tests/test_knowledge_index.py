@@ -0,0 +1,182 @@
+"""Tests for the incremental knowledge index builder and retriever hot reload."""
+
+from unittest.mock import patch
+
+import numpy as np
+
+from app.knowledge.index_builder import (
+    CONTENT_HASH_KEY,
+    build_index_incremental,
+    compute_chunk_hash,
+    resolve_index_dir,
+)
+from app.knowledge.models import DocumentChunk
+from app.knowledge.retriever import KnowledgeRetriever
+
+
+def _chunk(chunk_id: str, content: str) -> DocumentChunk:
+    return DocumentChunk(id=chunk_id, source="guide.md", title="Section", content=content)
+
+
+async def _fake_embeddings(texts, provider="google", api_key=None, model=None):
+    """Deterministic embeddings: one 4-dim vector per text."""
+    return np.array(
+        [[len(t), t.count("a") + 1, t.count("e") + 1, 1.0] for t in texts],
+        dtype=np.float32,
+    )
+
+
+class TestIncrementalIndexBuild:
+    """Test suite for build_index_incremental."""
+
+    def test_chunk_hash_ignores_whitespace(self):
+        """Whitespace-only edits keep the same content hash."""
+        assert compute_chunk_hash("easy  run\n pace") == compute_chunk_hash("easy run pace ")
+        assert compute_chunk_hash("easy run") != compute_chunk_hash("tempo run")
+
+    async def test_first_build_embeds_everything(self, tmp_path):
+        """Without an existing index, all chunks are embedded."""
+        chunks = [_chunk("a", "easy run"), _chunk("b", "tempo run")]
+
+        with patch(
+            "app.knowledge.index_builder.generate_embeddings", side_effect=_fake_embeddings
+        ) as mock_embed:
+            stats = await build_index_incremental(chunks, tmp_path, provider="google", model="m")
+
+        assert stats.embedded_chunks == 2
+        assert stats.reused_chunks == 0
+        assert mock_embed.call_count == 1
+        assert (resolve_index_dir(tmp_path) / "manifest.json").exists()
+        assert chunks[0].metadata[CONTENT_HASH_KEY] == compute_chunk_hash("easy run")
+
+    async def test_rebuild_only_embeds_changed_chunks(self, tmp_path):
+        """Unchanged chunks reuse stored vectors; removed chunks are dropped."""
+        with patch(
+            "app.knowledge.index_builder.generate_embeddings", side_effect=_fake_embeddings
+        ):
+            await build_index_incremental(
+                [_chunk("a", "easy run"), _chunk("b", "tempo run")],
+                tmp_path,
+                provider="google",
+                model="m",
+            )
+
+        embedded_texts: list[str] = []
+
+        async def _tracking(texts, **kwargs):
+            embedded_texts.extend(texts)
+            return await _fake_embeddings(texts)
+
+        with patch("app.knowledge.index_builder.generate_embeddings", side_effect=_tracking):
+            stats = await build_index_incremental(
+                [_chunk("a", "easy run"), _chunk("c", "interval session")],
+                tmp_path,
+                provider="google",
+                model="m",
+            )
+
+        assert embedded_texts == ["interval session"]
+        assert stats.reused_chunks == 1
+        assert stats.embedded_chunks == 1
+        assert stats.removed_chunks == 1
+        assert np.load(resolve_index_dir(tmp_path) / "embeddings.npy").shape == (2, 4)
+
+    async def test_model_change_forces_full_rebuild(self, tmp_path):
+        """Vectors from a different embedding model are never reused."""
+        chunks = [_chunk("a", "easy run")]
+        with patch(
+            "app.knowledge.index_builder.generate_embeddings", side_effect=_fake_embeddings
+        ):
+            await build_index_incremental(chunks, tmp_path, provider="google", model="m1")
+            stats = await build_index_incremental(chunks, tmp_path, provider="google", model="m2")
+
+        assert stats.full_rebuild is True
+        assert stats.embedded_chunks == 1
+
+    async def test_builds_publish_versions_through_one_pointer(self, tmp_path):
+        """Each build gets its own directory; older versions are pruned."""
+        published = []
+        with patch(
+            "app.knowledge.index_builder.generate_embeddings", side_effect=_fake_embeddings
+        ):
+            for text in ("easy run", "tempo run", "long run"):
+                await build_index_incremental(
+                    [_chunk("a", text)], tmp_path, provider="google", model="m"
+                )
+                published.append(resolve_index_dir(tmp_path))
+
+        assert len(set(published)) == 3
+        assert (tmp_path / "CURRENT").read_text() == published[-1].name
+        assert [p.exists() for p in published] == [False, True, True]
+        assert not (tmp_path / "chunks.json").exists()
+
+
+class TestRetrieverHotReload:
+    """Test suite for KnowledgeRetriever.reload_if_changed."""
+
+    async def test_reload_picks_up_new_index(self, tmp_path):
+        """A rebuilt index is loaded without re-initializing the retriever."""
+        with patch(
+            "app.knowledge.index_builder.generate_embeddings", side_effect=_fake_embeddings
+        ):
+            await build_index_incremental(
+                [_chunk("a", "easy run")], tmp_path, provider="google", model="m"
+            )
+
+        retriever = KnowledgeRetriever()
+        await retriever.initialize(index_dir=tmp_path, embedding_model="m")
+        assert retriever.chunk_count == 1
+        assert retriever.reload_if_changed() is False
+
+        with patch(
+            "app.knowledge.index_builder.generate_embeddings", side_effect=_fake_embeddings
+        ):
+            await build_index_incremental(
+                [_chunk("a", "easy run"), _chunk("b", "tempo run")],
+                tmp_path,
+                provider="google",
+                model="m",
+            )
+
+        assert retriever.reload_if_changed() is True
+        assert retriever.chunk_count == 2
+        assert retriever.is_initialized
+
+
+class TestLocalQueryBatcher:
+    """Test suite for local embedding query micro-batching."""
+
+    async def test_concurrent_queries_share_one_model_call(self):
+        """Queries arriving together are embedded in a single batch."""
+        import asyncio
+
+        from app.knowledge.local_embeddings import QueryBatcher
+
+        calls: list[list[str]] = []
+
+        async def _fake_embed_local(texts, model=None, is_query=False):
+            calls.append(list(texts))
+            return await _fake_embeddings(texts)
+
+        batcher = QueryBatcher("m", window_ms=5, max_batch=8)
+        with patch(
+            "app.knowledge.local_embeddings.embed_local", side_effect=_fake_embed_local
+        ):
+            vectors = await asyncio.gather(
+                batcher.embed("easy run"), batcher.embed("tempo"), batcher.embed("a")
+            )
+
+        assert calls == [["easy run", "tempo", "a"]]
+        assert [v[0] for v in vectors] == [8, 5, 1]
+
+    async def test_local_provider_routes_to_local_model(self):
+        """generate_embeddings dispatches provider='local' without an API key."""
+        from app.knowledge.embeddings import generate_embeddings
+
+        with patch(
+            "app.knowledge.local_embeddings.embed_local", side_effect=_fake_embeddings
+        ) as mock_local:
+            vectors = await generate_embeddings(["easy run"], provider="local", model="m")
+
+        assert mock_local.call_count == 1
+        assert vectors.shape == (1, 4)
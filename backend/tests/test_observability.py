@@ -0,0 +1,155 @@
+"""Tests for request instrumentation and the in-memory metrics collector."""
+
+import logging
+import threading
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+
+from app.core.database import QueryStats, install_query_profiling, statement_shape
+from app.observability import MetricsCollector, RequestLoggingMiddleware, get_request_id
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+def _instrumented_app(sample_rate: float) -> tuple[FastAPI, MetricsCollector, RecordingHandler]:
+    metrics = MetricsCollector()
+    handler = RecordingHandler()
+    request_logger = logging.getLogger("tests.request")
+    request_logger.handlers = [handler]
+    request_logger.setLevel(logging.INFO)
+
+    app = FastAPI()
+    app.add_middleware(
+        RequestLoggingMiddleware, metrics=metrics, logger=request_logger, sample_rate=sample_rate
+    )
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int, request: Request):
+        return {"request_id": get_request_id(), "state": request.state.request_id}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"data: {i}\n\n"
+
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    return app, metrics, handler
+
+
+class TestRequestLoggingMiddleware:
+    """Test suite for RequestLoggingMiddleware."""
+
+    async def test_request_id_metrics_and_streaming(self):
+        """Request ids reach handlers and headers; streamed bodies arrive whole."""
+        app, metrics, handler = _instrumented_app(sample_rate=1.0)
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/items/42", headers={"X-Request-ID": "abc-123"})
+            assert response.headers["X-Request-ID"] == "abc-123"
+            assert response.json() == {"request_id": "abc-123", "state": "abc-123"}
+
+            response = await client.get("/stream")
+            assert response.text == "data: 0\n\ndata: 1\n\ndata: 2\n\n"
+            assert len(response.headers["X-Request-ID"]) == 36
+
+            await client.get("/missing")
+
+        rendered = metrics.render_prometheus()
+        assert 'http_requests_total{method="GET",path="/items/{item_id}",status="200"} 1' in rendered
+        assert 'http_requests_total{method="GET",path="/__unknown__",status="404"} 1' in rendered
+        assert len(handler.messages) == 3
+        assert '"path": "/items/{id}"' in handler.messages[0]
+
+    async def test_sampling_keeps_errors(self):
+        """With sampling off, only failed requests are logged."""
+        app, metrics, handler = _instrumented_app(sample_rate=0.0)
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            await client.get("/items/1")
+            await client.get("/missing")
+
+        assert len(handler.messages) == 1
+        assert '"status_code": 404' in handler.messages[0]
+        assert "http_request_duration_ms_count" in metrics.render_prometheus()
+
+
+class TestQueryProfiling:
+    """Test suite for per-request SQL profiling."""
+
+    def test_statement_shapes_ignore_literals_and_list_lengths(self):
+        stats = QueryStats()
+        stats.record("SELECT * FROM t WHERE id IN (?, ?) AND n = 3", 2.0)
+        stats.record("SELECT * FROM t WHERE id IN (?, ?, ?)\n AND n = 4", 5.0)
+        stats.record("SELECT 1", 1.0)
+        assert stats.count == 3 and stats.total_ms == 8.0 and stats.slowest_ms == 5.0
+        assert stats.repeated(1) == [(statement_shape("SELECT * FROM t WHERE id IN (?) AND n = ?"), 2)]
+
+    def test_asyncpg_casts_in_lists_share_a_shape(self):
+        """asyncpg renders expanded IN lists with a cast on every placeholder."""
+        two = "SELECT * FROM t WHERE id IN ($1::INTEGER, $2::INTEGER) AND name = $3::VARCHAR"
+        three = (
+            "SELECT * FROM t WHERE id IN ($1::INTEGER, $2::INTEGER, $3::INTEGER) "
+            "AND name = $4::VARCHAR"
+        )
+        assert statement_shape(two) == statement_shape(three)
+        assert "IN (?)" in statement_shape(two)
+        assert statement_shape("SELECT 1 WHERE x IN ($1::VARCHAR(255), $2::VARCHAR(255))") == (
+            "SELECT ? WHERE x IN (?)"
+        )
+
+    async def test_repeated_statements_are_flagged(self, async_engine):
+        """A query per loop iteration shows up in the log line and metrics."""
+        install_query_profiling(async_engine.sync_engine)
+        app, metrics, handler = _instrumented_app(sample_rate=1.0)
+
+        @app.get("/loop")
+        async def loop():
+            async with async_engine.connect() as conn:
+                for i in range(12):
+                    await conn.execute(text("SELECT :x"), {"x": i})
+            return {}
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            await client.get("/loop")
+            await client.get("/items/1")
+
+        assert '"db_queries": 12' in handler.messages[0]
+        assert '"n_plus_one": {"statement": "SELECT ?", "count": 12}' in handler.messages[0]
+        assert '"db_queries": 0' in handler.messages[1] and "n_plus_one" not in handler.messages[1]
+        rendered = metrics.render_prometheus()
+        assert 'http_request_db_queries_bucket{method="GET",path="/loop",le="10"} 0' in rendered
+        assert 'http_request_db_queries_bucket{method="GET",path="/loop",le="20"} 1' in rendered
+        assert 'http_request_n_plus_one_total{method="GET",path="/loop"} 1' in rendered
+
+
+class TestMetricsCollector:
+    """Test suite for MetricsCollector."""
+
+    def test_merges_per_thread_counters(self):
+        metrics = MetricsCollector()
+
+        def observe():
+            for _ in range(100):
+                metrics.observe_request("GET", "/x", 200, 10.0)
+
+        threads = [threading.Thread(target=observe) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        observe()
+
+        rendered = metrics.render_prometheus()
+        assert 'http_requests_total{method="GET",path="/x",status="200"} 500' in rendered
+        assert 'http_request_duration_ms_bucket{method="GET",path="/x",le="50"} 500' in rendered
+        assert 'http_request_duration_ms_sum{method="GET",path="/x"} 5000.00' in rendered
@@ -0,0 +1,118 @@
+"""Tests for the raw Garmin event archive (dedup, compression, cold tier)."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.garmin import GarminRawEvent
+from app.models.user import User
+from app.services.raw_archive import (
+    archive_raw_events,
+    decode_body,
+    iter_raw_events,
+    store_raw_event,
+    store_raw_events,
+)
+
+
+class TestStoreRawEvents:
+    """Test suite for deduplicated, compressed raw event writes."""
+
+    async def test_identical_payloads_are_stored_once(
+        self, db_session: AsyncSession, test_user: User
+    ):
+        """Key order does not matter; endpoint does; bodies round-trip."""
+        first = await store_raw_event(db_session, test_user.id, "sleep", {"a": 1, "b": [1, 2]})
+        ids = await store_raw_events(db_session, test_user.id, [
+            ("sleep", {"b": [1, 2], "a": 1}),
+            ("stress", {"a": 1, "b": [1, 2]}),
+            ("activities", [{"id": 1}, {"id": 2}]),
+            ("activities", [{"id": 1}, {"id": 2}]),
+        ])
+        await db_session.commit()
+
+        assert ids[0] == first
+        assert ids[1] != first
+        assert ids[2] == ids[3]
+        assert await db_session.scalar(select(func.count()).select_from(GarminRawEvent)) == 3
+
+        event = await db_session.get(GarminRawEvent, ids[2])
+        await db_session.refresh(event, ["body"])
+        assert event.payload is None
+        assert event.record_count == 2
+        assert decode_body(event.body) == {"data": [{"id": 1}, {"id": 2}]}
+
+
+class FakeR2:
+    """In-memory stand-in for the R2 cold tier."""
+
+    def __init__(self) -> None:
+        self.is_available = True
+        self.objects: dict[str, bytes] = {}
+        self.put_object_bytes = AsyncMock(side_effect=self._put)
+
+    async def _put(self, key, data, content_type, metadata) -> None:
+        self.objects[key] = data
+
+    async def iter_object(self, key, decompress=True):
+        yield self.objects[key]
+
+
+class TestArchiveRawEvents:
+    """Test suite for compaction, aging out and streaming back."""
+
+    async def test_compacts_ages_out_and_streams_back(
+        self, async_engine, db_session: AsyncSession, test_user: User
+    ):
+        """Inline payloads are compressed, old bodies move to R2, and every tier reads back."""
+        session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+        old = datetime.now(timezone.utc) - timedelta(days=365)
+        db_session.add(GarminRawEvent(
+            user_id=test_user.id, endpoint="stats", fetched_at=old, payload={"steps": 1000},
+        ))
+        db_session.add(GarminRawEvent(
+            user_id=test_user.id, endpoint="stats",
+            fetched_at=datetime.now(timezone.utc), payload={"steps": 2000},
+        ))
+        await db_session.commit()
+        await store_raw_event(db_session, test_user.id, "hrv", {"hrv": 50})
+        await db_session.commit()
+
+        r2 = FakeR2()
+        stats = await archive_raw_events(r2=r2, session_factory=session_factory, batch_size=1)
+
+        assert stats == {"compacted": 2, "archived": 1}
+        (key,) = r2.objects
+        assert key.startswith(f"raw-events/{test_user.id}/")
+
+        async with session_factory() as db:
+            events = (await db.scalars(select(GarminRawEvent).order_by(GarminRawEvent.id))).all()
+            assert all(event.payload is None for event in events)
+            assert [event.r2_key is not None for event in events] == [True, False, False]
+
+        streamed = [
+            payload
+            async for _, payload in iter_raw_events(
+                user_id=test_user.id, r2=r2, session_factory=session_factory, batch_size=2
+            )
+        ]
+        assert streamed == [{"steps": 1000}, {"steps": 2000}, {"hrv": 50}]
+
+    async def test_new_event_matches_compacted_duplicate(
+        self, async_engine, db_session: AsyncSession, test_user: User
+    ):
+        """Once compacted, a legacy event is found by hash like any other."""
+        session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+        legacy = GarminRawEvent(
+            user_id=test_user.id, endpoint="stats",
+            fetched_at=datetime.now(timezone.utc), payload={"steps": 1},
+        )
+        db_session.add(legacy)
+        await db_session.commit()
+
+        r2 = MagicMock(is_available=False)
+        await archive_raw_events(r2=r2, session_factory=session_factory)
+
+        assert await store_raw_event(db_session, test_user.id, "stats", {"steps": 1}) == legacy.id
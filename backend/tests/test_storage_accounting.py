@@ -0,0 +1,99 @@
+"""Tests for per-user storage usage accounting."""
+
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.activity import Activity
+from app.models.user import User
+from app.services.storage_accounting import (
+    account_object,
+    adjust_usage,
+    get_usage,
+    reconcile_storage_usage,
+    release_object,
+)
+
+
+async def _activity(db: AsyncSession, user: User, garmin_id: int, **kwargs) -> Activity:
+    activity = Activity(
+        user_id=user.id,
+        garmin_id=garmin_id,
+        activity_type="running",
+        start_time=datetime.now(timezone.utc),
+        **kwargs,
+    )
+    db.add(activity)
+    await db.commit()
+    return activity
+
+
+class TestStorageCounters:
+    """Test suite for incremental counter updates."""
+
+    async def test_upload_replace_and_delete(self, db_session: AsyncSession, test_user: User):
+        """Re-recording applies only the difference; release subtracts what was added."""
+        first = await _activity(db_session, test_user, 1, r2_key="users/1/2025/a.fit.gz")
+        second = await _activity(db_session, test_user, 2, r2_key="users/1/2025/b.fit.gz")
+
+        await account_object(db_session, first, stored_size=400)
+        await account_object(db_session, second, stored_size=300, original_size=900)
+        await db_session.commit()
+
+        # Analysis of the first upload learns its decompressed size
+        await account_object(db_session, first, original_size=1000)
+        await db_session.commit()
+
+        usage = await get_usage(db_session, test_user.id)
+        await db_session.refresh(usage)
+        assert (usage.object_count, usage.stored_bytes, usage.original_bytes) == (2, 700, 1900)
+        assert usage.saved_bytes == 1200
+
+        await release_object(db_session, second)
+        await release_object(db_session, second)  # Idempotent
+        await db_session.commit()
+
+        await db_session.refresh(usage)
+        assert (usage.object_count, usage.stored_bytes, usage.original_bytes) == (1, 400, 1000)
+        assert "stored_size" not in second.storage_metadata
+
+    async def test_unknown_user_has_no_usage(self, db_session: AsyncSession, test_user: User):
+        """Nothing recorded yet reads as no row."""
+        assert await get_usage(db_session, test_user.id) is None
+
+
+class TestReconciliation:
+    """Test suite for rebuilding counters from the bucket."""
+
+    async def test_rebuilds_counters_and_backfills(
+        self, async_engine, db_session: AsyncSession, test_user: User
+    ):
+        """Counters match the bucket; untracked activities get their sizes recorded."""
+        session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+        key = f"users/{test_user.id}/2025/activities/1.fit.gz"
+        activity = await _activity(db_session, test_user, 1, r2_key=key, fit_file_size=5000)
+        # Stale counters from drift
+        await adjust_usage(db_session, test_user.id, objects=5, stored_bytes=10)
+        await db_session.commit()
+
+        r2 = MagicMock()
+        r2.object_sizes = AsyncMock(return_value={
+            key: 1200,
+            f"users/{test_user.id}/2025/activities/orphan.fit.gz": 300,
+            "users/999999/2025/activities/1.fit.gz": 50,  # Deleted user
+            "tmp/unrelated": 10,
+        })
+
+        stats = await reconcile_storage_usage(r2=r2, session_factory=session_factory)
+
+        assert stats["users"] == 1
+        assert stats["backfilled"] == 1
+        async with session_factory() as db:
+            usage = await get_usage(db, test_user.id)
+            assert (usage.object_count, usage.stored_bytes) == (2, 1500)
+            # Original size from the activity; the orphan counts as uncompressed
+            assert usage.original_bytes == 5000 + 300
+            assert usage.reconciled_at is not None
+            refreshed = await db.get(Activity, activity.id)
+            assert refreshed.storage_metadata["stored_size"] == 1200
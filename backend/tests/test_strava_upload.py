@@ -0,0 +1,324 @@
+"""Tests for the Strava upload engine (rate limiting, deferral, polling)."""
+
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.activity import Activity
+from app.models.strava import (
+    StravaActivityMap,
+    StravaSession,
+    StravaUploadJob,
+    StravaUploadStatus,
+)
+from app.models.user import User
+from app.services import strava_upload
+from app.services.fit_blob_store import FitBlobStore, FitStream, LocalLRUCache
+from app.services.strava_rate_limit import StravaRateLimited, StravaRateLimiter
+from app.services.strava_upload import StravaUploadService
+from app.workers import strava_worker
+
+
+def _headers(usage: str, limit: str = "200,2000") -> dict[str, str]:
+    return {"X-RateLimit-Usage": usage, "X-RateLimit-Limit": limit}
+
+
+class TestStravaRateLimiter:
+    """Test suite for the shared token budget (in-process fallback)."""
+
+    async def test_budget_follows_reported_usage(self):
+        """Usage reported by Strava consumes the budget; the reserve is kept back."""
+        limiter = StravaRateLimiter(use_redis=False)
+        await limiter.observe(_headers("4,100", limit="15,1000"))
+
+        await limiter.acquire(max_wait=0)  # 5th of the 15 - 10 reserved
+        with pytest.raises(StravaRateLimited) as exc_info:
+            await limiter.acquire(max_wait=0)
+
+        assert exc_info.value.scope == "15-minute"
+        assert 0 < exc_info.value.retry_after <= 15 * 60
+
+    async def test_daily_limit_reported_on_429(self):
+        """A 429 with daily usage at the limit defers until midnight."""
+        limiter = StravaRateLimiter(use_redis=False)
+        error = limiter.limited_error(_headers("50,2000"))
+        assert error.scope == "daily"
+
+
+@pytest.fixture
+async def upload_job(db_session: AsyncSession, test_user: User, tmp_path, monkeypatch):
+    """A queued upload job for an activity whose FIT file is in the cache."""
+    activity = Activity(
+        user_id=test_user.id,
+        garmin_id=1,
+        activity_type="running",
+        start_time=datetime.now(timezone.utc),
+        has_fit_file=True,
+        fit_file_hash="abc",
+    )
+    db_session.add(activity)
+    db_session.add(StravaSession(
+        user_id=test_user.id,
+        access_token="token",
+        expires_at=datetime.now(timezone.utc) + timedelta(hours=1),
+    ))
+    await db_session.commit()
+
+    store = FitBlobStore(cache=LocalLRUCache(str(tmp_path), 1024))
+    await store.put(activity, b"FIT")
+    monkeypatch.setattr(strava_upload, "get_fit_blob_store", lambda: store)
+
+    job = StravaUploadJob(
+        user_id=test_user.id,
+        activity_id=activity.id,
+        status=StravaUploadStatus.QUEUED.value,
+        attempts=0,
+        next_retry_at=datetime.now(timezone.utc),
+    )
+    db_session.add(job)
+    await db_session.commit()
+    return job
+
+
+def _service(db: AsyncSession, handler) -> StravaUploadService:
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    service = StravaUploadService(db, http=http, limiter=StravaRateLimiter(use_redis=False))
+
+    # SQLite returns naive datetimes; token expiry is not under test here
+    async def _valid(session: StravaSession) -> StravaSession:
+        return session
+
+    service._ensure_valid_token = _valid
+    return service
+
+
+class TestStravaUploadService:
+    """Test suite for StravaUploadService.process_job."""
+
+    async def test_429_defers_without_using_an_attempt(
+        self, db_session: AsyncSession, upload_job: StravaUploadJob
+    ):
+        """A rate-limited upload is requeued for the next window, not counted as a retry."""
+        service = _service(
+            db_session, lambda request: httpx.Response(429, headers=_headers("200,300"))
+        )
+
+        assert await service.process_job(upload_job) is False
+
+        await db_session.refresh(upload_job)
+        assert service.deferred is True
+        assert upload_job.status == StravaUploadStatus.QUEUED.value
+        assert upload_job.attempts == 0
+        assert upload_job.next_retry_at is not None
+
+    async def test_polls_with_backoff_and_retries_rejected_upload(
+        self, db_session: AsyncSession, upload_job: StravaUploadJob, monkeypatch
+    ):
+        """Polling backs off; a rejected upload is uploaded again on retry."""
+        delays: list[float] = []
+
+        async def _sleep(seconds: float) -> None:
+            delays.append(seconds)
+
+        monkeypatch.setattr(strava_upload.asyncio, "sleep", _sleep)
+        polls = iter([{"activity_id": None}, {"activity_id": None}, {"error": "duplicate"}])
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.method == "POST":
+                # FIT bytes are streamed into the multipart body with a known length
+                assert b'name="data_type"\r\n\r\nfit' in request.content
+                assert b"\r\n\r\nFIT\r\n--" in request.content
+                assert request.headers["Content-Length"] == str(len(request.content))
+                return httpx.Response(201, json={"id": 77}, headers=_headers("1,1"))
+            return httpx.Response(200, content=json.dumps(next(polls)), headers=_headers("2,2"))
+
+        service = _service(db_session, handler)
+
+        assert await service.process_job(upload_job) is False
+
+        await db_session.refresh(upload_job)
+        assert delays == [1.0, 2.0, 4.0]
+        assert upload_job.status == StravaUploadStatus.QUEUED.value
+        assert upload_job.attempts == 1
+        assert upload_job.strava_upload_id is None
+        assert upload_job.last_error == "duplicate"
+
+    async def test_r2_stream_is_sent_with_content_length(
+        self, db_session: AsyncSession, upload_job: StravaUploadJob, monkeypatch
+    ):
+        """A stream of unknown size gets its length from the recorded file size.
+
+        The rate limit token is taken before the stream is opened.
+        """
+        events: list[str] = []
+
+        async def _r2_chunks():
+            yield b"FIT-"
+            yield b"R2"
+
+        class _Store:
+            async def stream(self, db, activity):
+                events.append("stream")
+                return FitStream(_r2_chunks())
+
+        monkeypatch.setattr(strava_upload, "get_fit_blob_store", lambda: _Store())
+        activity = await db_session.get(Activity, upload_job.activity_id)
+        activity.fit_file_size = len(b"FIT-R2")
+        await db_session.commit()
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.method == "POST":
+                assert b"\r\n\r\nFIT-R2\r\n--" in request.content
+                assert request.headers["Content-Length"] == str(len(request.content))
+                assert "Transfer-Encoding" not in request.headers
+                return httpx.Response(201, json={"id": 77}, headers=_headers("1,1"))
+            return httpx.Response(200, json={"activity_id": 5}, headers=_headers("2,2"))
+
+        service = _service(db_session, handler)
+        acquire = service.limiter.acquire
+
+        async def _acquire(*args, **kwargs):
+            events.append("acquire")
+            return await acquire(*args, **kwargs)
+
+        service.limiter.acquire = _acquire
+
+        assert await service.process_job(upload_job) is True
+        assert events[:2] == ["acquire", "stream"]
+
+    async def test_claimed_job_is_not_processed_twice(
+        self, db_session: AsyncSession, upload_job: StravaUploadJob
+    ):
+        """A job another worker already claimed is skipped."""
+        upload_job.status = StravaUploadStatus.UPLOADING.value
+        await db_session.commit()
+
+        service = _service(db_session, lambda request: pytest.fail("no request expected"))
+        assert await service.process_job(upload_job) is False
+
+    async def test_stale_uploading_job_is_reclaimed(
+        self, db_session: AsyncSession, upload_job: StravaUploadJob
+    ):
+        """A job left in UPLOADING by a cancelled worker is picked up again."""
+        upload_job.status = StravaUploadStatus.UPLOADING.value
+        upload_job.started_at = datetime.now(timezone.utc) - timedelta(hours=1)
+        upload_job.strava_upload_id = "77"
+        await db_session.commit()
+
+        service = _service(
+            db_session,
+            lambda request: httpx.Response(
+                200, json={"activity_id": 123}, headers=_headers("1,1")
+            ),
+        )
+        assert await service.get_pending_job_ids() == [upload_job.id]
+        assert await service.process_job(upload_job) is True
+
+        await db_session.refresh(upload_job)
+        assert upload_job.status == StravaUploadStatus.UPLOADED.value
+        assert upload_job.strava_activity_id == 123
+
+
+class TestProcessPendingUploads:
+    """Test suite for the pending uploads drain."""
+
+    async def test_deadline_is_checked_before_each_claim(
+        self, async_engine, db_session: AsyncSession, upload_job: StravaUploadJob, monkeypatch
+    ):
+        """Jobs whose turn comes after the drain deadline stay queued."""
+        for garmin_id in (2, 3):
+            activity = Activity(
+                user_id=upload_job.user_id,
+                garmin_id=garmin_id,
+                activity_type="running",
+                start_time=datetime.now(timezone.utc),
+            )
+            db_session.add(activity)
+            await db_session.flush()
+            db_session.add(StravaUploadJob(
+                user_id=upload_job.user_id,
+                activity_id=activity.id,
+                status=StravaUploadStatus.QUEUED.value,
+                attempts=0,
+                next_retry_at=datetime.now(timezone.utc),
+            ))
+        await db_session.commit()
+
+        clock = [0.0]
+        started: list[int] = []
+
+        async def _run_job(session_factory, job_id: int) -> bool:
+            started.append(job_id)
+            clock[0] += 1000  # This job outlasts the drain window
+            return True
+
+        monkeypatch.setattr(strava_worker, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+        monkeypatch.setattr(strava_worker, "_run_job", _run_job)
+        monkeypatch.setattr(strava_worker.settings, "strava_upload_concurrency", 1)
+
+        ctx = {"session_factory": async_sessionmaker(async_engine, expire_on_commit=False)}
+        stats = await strava_worker.process_pending_uploads(ctx)
+
+        assert len(started) == 1
+        assert stats["processed"] == 1
+        assert stats["skipped"] == 2
+
+
+class _FakeArqPool:
+    """Records enqueue_job calls; a job id already seen is not queued again."""
+
+    def __init__(self) -> None:
+        self.job_ids: list[str] = []
+        self.queues: set[str] = set()
+
+    async def enqueue_job(self, function, _job_id=None, _queue_name=None, **kwargs):
+        if _job_id in self.job_ids:
+            return None
+        self.job_ids.append(_job_id)
+        self.queues.add(_queue_name)
+        return object()
+
+
+class TestEnqueuePendingActivities:
+    """Test suite for the set-based enqueue."""
+
+    async def test_single_insert_select_and_pipelined_push(
+        self, db_session: AsyncSession, test_user: User, monkeypatch
+    ):
+        """Only unqueued, unuploaded activities get jobs, each pushed once."""
+        activities = [
+            Activity(
+                user_id=test_user.id,
+                garmin_id=i,
+                activity_type="running",
+                start_time=datetime.now(timezone.utc),
+                has_fit_file=i != 4,
+            )
+            for i in range(1, 5)
+        ]
+        db_session.add_all(activities)
+        await db_session.commit()
+        db_session.add(StravaActivityMap(
+            activity_id=activities[0].id, uploaded_at=datetime.now(timezone.utc)
+        ))
+        db_session.add(StravaUploadJob(user_id=test_user.id, activity_id=activities[1].id))
+        await db_session.commit()
+
+        pool = _FakeArqPool()
+
+        async def _pool():
+            return pool
+
+        monkeypatch.setattr(strava_upload, "get_arq_pool", _pool)
+
+        queued = await StravaUploadService(db_session).enqueue_pending_activities(test_user.id)
+        assert queued == 1
+        assert len(pool.job_ids) == 1 and pool.job_ids[0].startswith("strava-upload:")
+        assert pool.queues == {"strava_uploads"}
+
+        # Re-running queues nothing new
+        assert await StravaUploadService(db_session).enqueue_pending_activities(test_user.id) == 0
@@ -0,0 +1,84 @@
+"""Tests for the adaptive per-endpoint sync cadence."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.garmin import GarminSyncState
+from app.models.user import User
+from app.services.sync_service import GarminSyncService, cadence_backoff
+
+
+async def _cadence(db: AsyncSession, endpoint: str) -> tuple[int, object]:
+    row = (await db.execute(
+        select(GarminSyncState.unchanged_runs, GarminSyncState.next_sync_at)
+        .where(GarminSyncState.endpoint == endpoint)
+    )).one()
+    return row.unchanged_runs, row.next_sync_at
+
+
+class TestSyncCadence:
+    """Test suite for skipping endpoints whose payloads stopped changing."""
+
+    def test_backoff_doubles_up_to_the_cap(self):
+        """No backoff after a change; base interval doubling per unchanged run, capped."""
+        assert cadence_backoff(0) is None
+        assert cadence_backoff(1) == timedelta(minutes=60)
+        assert cadence_backoff(3) == timedelta(minutes=240)
+        assert cadence_backoff(50) == timedelta(days=3)
+
+    async def test_unchanged_endpoint_is_skipped_until_due(
+        self, db_session: AsyncSession, test_user: User, tmp_path
+    ):
+        """Identical payloads back the endpoint off; force and new data reset it."""
+        adapter = MagicMock()
+        adapter.get_goals = MagicMock(return_value=[{"goal": "sub-3"}])
+        service = GarminSyncService(db_session, adapter, test_user, fit_storage_path=str(tmp_path))
+
+        await service.sync_endpoint("goals")
+        assert await _cadence(db_session, "goals") == (0, None)
+
+        await service.sync_endpoint("goals")
+        unchanged_runs, next_sync_at = await _cadence(db_session, "goals")
+        assert unchanged_runs == 1 and next_sync_at is not None
+
+        # Not due yet: nothing is fetched
+        result = await service.sync_endpoint("goals")
+        assert result.success and result.skipped
+        assert adapter.get_goals.call_count == 2
+
+        # force syncs anyway; still unchanged, so the backoff grows
+        result = await service.sync_endpoint("goals", force=True)
+        assert not result.skipped
+        assert adapter.get_goals.call_count == 3
+        assert (await _cadence(db_session, "goals"))[0] == 2
+
+        # New data tightens the cadence again
+        adapter.get_goals.return_value = [{"goal": "sub-2:59"}]
+        await service.sync_endpoint("goals", force=True)
+        assert await _cadence(db_session, "goals") == (0, None)
+        result = await service.sync_endpoint("goals")
+        assert not result.skipped
+
+    async def test_date_keyed_endpoint_is_never_backed_off(
+        self, db_session: AsyncSession, test_user: User, tmp_path
+    ):
+        """Daily endpoints gain a new day at any time, so a stale backoff is ignored."""
+        now = datetime.now(timezone.utc)
+        db_session.add(GarminSyncState(
+            user_id=test_user.id,
+            endpoint="sleep",
+            last_success_at=now,
+            unchanged_runs=5,
+            next_sync_at=now + timedelta(days=1),
+        ))
+        await db_session.commit()
+        adapter = MagicMock()
+        adapter.get_sleep_data = MagicMock(return_value=None)
+        service = GarminSyncService(db_session, adapter, test_user, fit_storage_path=str(tmp_path))
+
+        result = await service.sync_endpoint("sleep")
+        assert not result.skipped
+        assert adapter.get_sleep_data.called
@@ -0,0 +1,85 @@
+"""Tests for the shared sync status store (in-process fallback)."""
+
+import json
+from types import SimpleNamespace
+
+from app.api.v1.endpoints import ingest
+from app.services.sync_status import TERMINAL_EVENT, SyncStatusStore
+
+
+class TestSyncStatusStore:
+    """Test suite for SyncStatusStore."""
+
+    async def test_run_lifecycle(self):
+        """Progress, results and errors accumulate until the run finishes."""
+        store = SyncStatusStore(use_redis=False)
+        assert await store.get(1) == {}
+
+        await store.start(1, ["activities", "sleep"])
+        await store.set_progress(1, "activities", 0, 2)
+        await store.record_result(1, "activities", {"items_created": 3, "items_updated": 1})
+        await store.set_progress(1, "sleep", 1, 2)
+        await store.record_result(1, "sleep", {"success": False, "error": "boom"})
+        await store.set_error(1, "sleep: boom")
+        await store.finish(1)
+
+        status = await store.get(1)
+        assert status["started_at"] is not None
+        assert status["finished_at"] >= status["started_at"]
+        assert status["error"] == "sleep: boom"
+        assert status["progress"]["current_endpoint"] == "sleep"
+        assert set(status["results"]) == {"activities", "sleep"}
+
+        # A new run starts from a clean slate
+        await store.start(1, ["activities"])
+        status = await store.get(1)
+        assert status["error"] is None
+        assert status["finished_at"] is None
+        assert status["results"] == {}
+
+    async def test_subscribers_receive_events(self):
+        """Subscribers see each update in order; a quiet stream yields a keepalive."""
+        store = SyncStatusStore(use_redis=False)
+        subscription = await store.subscribe(1)
+        other_user = await store.subscribe(2)
+
+        await store.start(1, ["activities"])
+        await store.record_result(1, "activities", {"items_created": 2, "items_updated": 0})
+        await store.finish(1)
+
+        events = [await subscription.next(timeout=0.1) for _ in range(3)]
+        assert [event["type"] for event in events] == ["started", "endpoint", TERMINAL_EVENT]
+        assert events[1]["items_created"] == 2
+        assert await subscription.next(timeout=0.01) is None
+        assert await other_user.next(timeout=0.01) is None
+
+        await subscription.close()
+        await other_user.close()
+        assert not store._subscribers[1]
+
+
+class TestIngestEventStream:
+    """Test suite for the sync progress SSE stream."""
+
+    async def test_stream_ends_when_lock_disappears(self, monkeypatch):
+        """A run that dies without a finished event still closes the stream."""
+        store = SyncStatusStore(use_redis=False)
+        await store.start(1, ["activities"])
+        lock_held = iter([True, True, False])
+
+        async def _check_lock(name: str) -> bool:
+            return next(lock_held)
+
+        monkeypatch.setattr(ingest, "get_sync_status_store", lambda: store)
+        monkeypatch.setattr(ingest, "check_lock", _check_lock)
+        monkeypatch.setattr(ingest.settings, "sync_events_keepalive_seconds", 0.01)
+
+        response = await ingest.stream_ingest_events(SimpleNamespace(id=1))
+        chunks = [chunk async for chunk in response.body_iterator]
+
+        assert chunks[1] == ": keepalive\n\n"
+        assert chunks[-1].startswith(f"event: {TERMINAL_EVENT}\n")
+        event = json.loads(chunks[-1].split("data: ", 1)[1])
+        assert event["finished_at"] is None
+        assert event["error"] == "Sync stopped unexpectedly"
+        assert not store._subscribers[1]
@@ -0,0 +1,64 @@
+"""Tests for sync stage timing and stored run traces."""
+
+import time
+from unittest.mock import MagicMock
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.user import User
+from app.observability import MetricsCollector
+from app.services.sync_service import GarminSyncService
+from app.services.sync_status import SyncStatusStore
+from app.services.sync_trace import SyncTrace
+
+
+class TestSyncTrace:
+    """Test suite for SyncTrace."""
+
+    def test_nested_stages_report_self_time(self):
+        """A nested stage is not counted twice; stages add up to the endpoint."""
+        trace = SyncTrace(user_id=1)
+        trace._metrics = MetricsCollector()
+
+        with trace.endpoint("activities") as entry:
+            with trace.stage("sample_insert"):
+                time.sleep(0.01)
+                with trace.stage("activity_metrics"):
+                    time.sleep(0.02)
+            time.sleep(0.005)
+        entry["success"] = True
+
+        summary = trace.to_dict()["endpoints"]["activities"]
+        stages = summary["stages"]
+        assert summary["success"] is True
+        assert stages["sample_insert"]["n"] == 1
+        assert 10 <= stages["sample_insert"]["ms"] < 20
+        assert stages["activity_metrics"]["ms"] >= 20
+        assert stages["other"]["ms"] >= 5
+        assert abs(sum(s["ms"] for s in stages.values()) - summary["ms"]) < 0.5
+
+        rendered = trace._metrics.render_prometheus()
+        assert 'sync_stage_duration_ms_count{endpoint="activities",stage="sample_insert"} 1' in rendered
+
+    async def test_service_traces_endpoints_and_store_keeps_recent_runs(
+        self, db_session: AsyncSession, test_user: User, tmp_path, monkeypatch
+    ):
+        """sync_endpoint times Garmin calls; the store keeps the newest traces."""
+        adapter = MagicMock()
+        adapter.get_goals = MagicMock(return_value=[{"goal": "sub-3"}])
+        service = GarminSyncService(db_session, adapter, test_user, fit_storage_path=str(tmp_path))
+
+        await service.sync_endpoint("goals")
+
+        trace = service.trace.to_dict()
+        goals = trace["endpoints"]["goals"]
+        assert goals["success"] is True and goals["fetched"] == 1
+        assert goals["stages"]["garmin_api"]["n"] == 1
+        assert set(trace["stages"]) == {"garmin_api", "other"}
+
+        monkeypatch.setattr(get_settings(), "sync_trace_history_size", 2)
+        store = SyncStatusStore(use_redis=False)
+        for run in range(3):
+            await store.record_trace(test_user.id, {**trace, "duration_ms": run})
+        assert [t["duration_ms"] for t in await store.traces(test_user.id)] == [2, 1]